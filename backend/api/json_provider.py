@@ -0,0 +1,44 @@
+"""
+Flask JSON Provider
+Routes jsonify/request.get_json through backend.utils.helpers.serialization
+(orjson when installed) instead of the stdlib encoder.
+
+Usage:
+    from backend.api.json_provider import install_json_provider
+
+    app = Flask(__name__)
+    install_json_provider(app)
+"""
+
+from typing import Any
+
+from flask import Flask, Response
+from flask.json.provider import DefaultJSONProvider
+
+from backend.utils.helpers import serialization
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """DefaultJSONProvider with the serialization layer's encoder and decoder"""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return serialization.dumps(
+            obj,
+            sort_keys=kwargs.get("sort_keys", self.sort_keys),
+            indent=bool(kwargs.get("indent")),
+        )
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return serialization.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = serialization.dumps_bytes(obj, sort_keys=self.sort_keys, indent=indent)
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
+
+def install_json_provider(app: Flask) -> Flask:
+    """Use FastJSONProvider for this app's jsonify and request JSON"""
+    app.json = FastJSONProvider(app)
+    return app
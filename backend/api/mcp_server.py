@@ -6,6 +6,7 @@ Allows external AI agents (like Claude Desktop) to query:
 - Sector/Industry constituents
 - Real-time Market Quotes
 - Instrument Metadata
+- Option chain analytics (max-pain, PCR, OI buildup, IV skew)
 
 Usage:
     mcp run backend/api/mcp_server.py
@@ -18,6 +19,11 @@ import sys
 from typing import List, Dict, Optional
 from mcp.server.fastmcp import FastMCP
 
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.core.analytics.chain_analytics import ChainAnalyticsEngine
+
 # Configuration
 DB_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../market_data.db"))
 
@@ -166,6 +172,19 @@ def get_option_chain(symbol: str, min_strike: Optional[float] = None, max_strike
         })
     return results
 
+@mcp.tool()
+def get_option_analytics(symbol: Optional[str] = None) -> List[Dict]:
+    """
+    Latest option chain analytics (PCR, max-pain, ATM IV, IV skew, CE/PE OI change
+    and buildup) for a symbol, or for every polled underlying if symbol is omitted.
+    Refreshed after each 5-minute option chain poll.
+    """
+    engine = ChainAnalyticsEngine(DB_PATH)
+    rows = engine.for_symbol(symbol) if symbol else engine.latest()
+    if not rows:
+        return [{"status": "No option analytics found (Poller inactive or symbol not polled).", "symbol": symbol}]
+    return rows
+
 @mcp.tool()
 def search_market(query: str) -> List[Dict]:
     """
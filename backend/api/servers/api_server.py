@@ -27,8 +27,14 @@ from backend.core.analytics.performance import PerformanceAnalytics
 from backend.core.risk.manager import RiskManager
 from backend.services.market_data.downloader import StockDownloader, OptionDownloader, FuturesDownloader
 from backend.services.market_data.options_chain import OptionsChainService
+from backend.utils.auth.manager import AuthManager
+from backend.api.service_registry import get_service
+from backend.services.upstox.composite import UpstreamCall, UPSTOX_API_BASE, fetch_composite, get_upstream_session
+from backend.data.database.migration_runner import run_migrations
+from backend.api.json_provider import install_json_provider
 
 app = Flask(__name__)
+install_json_provider(app)  # orjson-backed jsonify (NumPy/datetime aware)
 
 # Security configuration
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', os.urandom(24).hex())
@@ -54,6 +60,9 @@ logger = get_logger(__name__)
 # Create logs directory
 Path('logs').mkdir(exist_ok=True)
 
+# Apply schema migrations once at startup (in the gunicorn master with preload_app)
+run_migrations(DB_PATH)
+
 # Register Blueprints
 from backend.api.routers.market_quote import market_quote_bp
 app.register_blueprint(market_quote_bp, url_prefix='/api/market-quote')
@@ -135,7 +144,7 @@ def get_portfolio():
     try:
         # Check if authenticated using AuthManager
         from backend.utils.auth.manager import AuthManager
-        auth = AuthManager()
+        auth = get_service(AuthManager, db_path=DB_PATH)
         access_token = auth.get_valid_token()
         
         # If authenticated, fetch real portfolio from Upstox
@@ -146,29 +155,17 @@ def get_portfolio():
             }
             
             try:
-                # Fetch user profile (available 24/7)
-                profile_response = requests.get(
-                    'https://api.upstox.com/v2/user/profile',
-                    headers=headers,
-                    timeout=10
-                )
-                
-                # Fetch holdings (available during market hours)
-                holdings_response = requests.get(
-                    'https://api.upstox.com/v2/portfolio/short-term-positions',
-                    headers=headers,
-                    timeout=10
-                )
-                
-                # Fetch funds (available 5:30 AM - 12:00 AM IST)
-                funds_response = requests.get(
-                    'https://api.upstox.com/v2/user/get-funds-and-margin',
-                    headers=headers,
-                    timeout=10
-                )
+                # Profile (24/7), positions (market hours) and funds
+                # (5:30 AM - 12:00 AM IST) in parallel; missing pieces degrade
+                result = fetch_composite([
+                    UpstreamCall('profile', f'{UPSTOX_API_BASE}/user/profile'),
+                    UpstreamCall('holdings', f'{UPSTOX_API_BASE}/portfolio/short-term-positions'),
+                    UpstreamCall('funds', f'{UPSTOX_API_BASE}/user/get-funds-and-margin'),
+                ], headers=headers, session=get_upstream_session())
+                logger.debug(f"[TraceID: {g.trace_id}] Portfolio upstream latencies: {result.latencies}")
                 
                 # Check if we got valid responses
-                if profile_response.status_code == 200:
+                if result.ok('profile'):
                     # We're authenticated - build portfolio data
                     portfolio = {
                         'authenticated': True,
@@ -176,8 +173,8 @@ def get_portfolio():
                     }
                     
                     # Try to get funds if API is available
-                    if funds_response.status_code == 200:
-                        funds_data = funds_response.json().get('data', {})
+                    if result.ok('funds'):
+                        funds_data = result.json('funds', {}).get('data', {})
                         equity = funds_data.get('equity', {})
                         
                         portfolio.update({
@@ -204,8 +201,8 @@ def get_portfolio():
                     
                     # Get positions count
                     positions_count = 0
-                    if holdings_response.status_code == 200:
-                        positions_data = holdings_response.json().get('data', [])
+                    if result.ok('holdings'):
+                        positions_data = result.json('holdings', {}).get('data', [])
                         positions_count = len(positions_data)
                     
                     portfolio['positions_count'] = positions_count
@@ -217,7 +214,7 @@ def get_portfolio():
                 # Fall through to paper trading
         
         # Fall back to paper trading if not authenticated or error
-        paper_system = PaperTradingSystem(db_path=DB_PATH)
+        paper_system = get_service(PaperTradingSystem, db_path=DB_PATH)
         summary = paper_system.get_portfolio_summary()
         
         portfolio = {
@@ -248,8 +245,7 @@ def get_user_profile():
     """Get user profile from Upstox"""
     try:
         # Check if we have a valid token using AuthManager
-        from auth_manager import AuthManager
-        auth = AuthManager()
+        auth = get_service(AuthManager, db_path=DB_PATH)
         access_token = auth.get_valid_token()
         
         if not access_token:
@@ -261,7 +257,7 @@ def get_user_profile():
             'Accept': 'application/json'
         }
         
-        response = requests.get('https://api.upstox.com/v2/user/profile', headers=headers, timeout=10)
+        response = get_upstream_session().get(f'{UPSTOX_API_BASE}/user/profile', headers=headers, timeout=10)
         
         if response.status_code == 200:
             data = response.json()
@@ -440,11 +436,11 @@ def place_order():
                 return jsonify({'error': f'Missing required field: {field}'}), 400
         
         # Place order using paper trading system
-        paper_system = PaperTradingSystem(db_path=DB_PATH)
+        paper_system = get_service(PaperTradingSystem, db_path=DB_PATH)
         
         order = paper_system.place_order(
             symbol=data['symbol'],
-            side=data['side'],
+            transaction_type=data['side'],
             quantity=data['quantity'],
             order_type=data['order_type'],
             price=data.get('price')
@@ -547,7 +543,7 @@ def remove_from_watchlist(symbol):
 def get_performance():
     """Get performance metrics"""
     try:
-        analytics = PerformanceAnalytics(db_path=DB_PATH)
+        analytics = get_service(PerformanceAnalytics, db_path=DB_PATH)
         
         # Get comprehensive report
         report = analytics.get_comprehensive_report(days=30)
@@ -711,6 +707,37 @@ def get_signals():
         return jsonify({'error': str(e)}), 500
 
 
+from backend.core.analytics.indicators import screen_instruments
+from backend.data.database.candle_resampler import SOURCES, supported_timeframes
+
+@app.route('/api/signals/indicators', methods=['GET'])
+def get_indicator_screen():
+    """
+    Latest SMA/EMA/RSI/MACD/ATR/Bollinger/VWAP for many instruments at once
+    Query params:
+        instrument_keys: comma separated, e.g. NSE_EQ|INE002A01018,NSE_EQ|INE009A01021
+        timeframe: candle timeframe (default 1d)
+        source: candles (1m downloads) or intraday (5m poller bars)
+        bars: history per instrument (default 250)
+    """
+    try:
+        keys = [k.strip() for k in request.args.get('instrument_keys', '').split(',') if k.strip()]
+        if not keys:
+            return jsonify({'error': 'instrument_keys is required'}), 400
+        timeframe = request.args.get('timeframe', '1d')
+        source = request.args.get('source', 'candles')
+        if source not in SOURCES:
+            return jsonify({'error': f'source must be one of {list(SOURCES)}'}), 400
+        if timeframe not in supported_timeframes(source):
+            return jsonify({'error': f'timeframe must be one of {supported_timeframes(source)} for {source}'}), 400
+        bars = min(int(request.args.get('bars', 250)), 5000)
+
+        rows = screen_instruments(keys, timeframe=timeframe, source=source, bars=bars, db_path=DB_PATH)
+        return jsonify({'timeframe': timeframe, 'source': source, 'count': len(rows), 'indicators': rows})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/api/signals/<strategy>', methods=['GET'])
 def get_signals_by_strategy(strategy):
     """Get signals for specific strategy"""
@@ -754,12 +781,53 @@ def get_signals_by_strategy(strategy):
 # INSTRUMENTS & MARKET DATA
 # ============================================================================
 
+from backend.data.database.candle_resampler import CandleResampler, SOURCES
+
+@app.route('/api/candles', methods=['GET'])
+def get_candles():
+    """
+    OHLCV candles at any timeframe, derived locally from stored base bars
+    Query params:
+        instrument_key: e.g. NSE_EQ|INE002A01018
+        timeframe: 5m, 10m, 15m, 30m, 1h, 2h, 1d, 1w (default 15m); 1m and 3m with source=candles
+        source: intraday (5m poller bars) or candles (1m downloads)
+        start, end: Optional epoch seconds
+    """
+    instrument_key = request.args.get('instrument_key')
+    timeframe = request.args.get('timeframe', '15m')
+    source = request.args.get('source', 'intraday')
+    if not instrument_key:
+        return jsonify({'error': 'instrument_key parameter required'}), 400
+    if source not in SOURCES:
+        return jsonify({'error': f'Unsupported source: {source}'}), 400
+    resampler = get_service(CandleResampler, db_path=DB_PATH)
+    if timeframe not in resampler.supported_timeframes(source):
+        return jsonify({'error': f'Unsupported timeframe for {source}: {timeframe}',
+                        'supported': resampler.supported_timeframes(source)}), 400
+
+    try:
+        bars = resampler.get_candles(
+            instrument_key, timeframe, source,
+            start=request.args.get('start', type=int), end=request.args.get('end', type=int),
+        )
+        return jsonify({
+            'instrument_key': instrument_key,
+            'timeframe': timeframe,
+            'candles': [
+                {'timestamp': ts, 'open': o, 'high': h, 'low': l, 'close': c, 'volume': v}
+                for ts, o, h, l, c, v in bars
+            ],
+        })
+    except Exception as e:
+        logger.error(f"[TraceID: {g.trace_id}] Candles fetch failed: {e}", exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route("/market-data/fno-symbols", methods=["GET"])
 def get_fno_symbols():
     """Get all available FnO symbols (Indices & Equities)"""
     try:
-        from backend.services.market_data.options_chain import OptionsChainService
-        service = OptionsChainService()
+        service = get_service(OptionsChainService)
         data = service.get_fno_symbols()
         return jsonify({"status": "success", "data": data})
     except Exception as e:
@@ -880,6 +948,85 @@ def health():
     })
 
 
+# ============================================================================
+# BACKGROUND JOBS
+# ============================================================================
+
+from backend.services.jobs.job_queue import LANES, TERMINAL, get_job_queue
+
+BULK_DOWNLOAD_SYMBOLS = 5  # Larger downloads run in the bulk lane
+
+
+def submit_job(kind, params, lane='interactive'):
+    """Queue a job, making sure this process has workers draining the queue"""
+    jobs = get_job_queue()
+    jobs.ensure_workers()
+    return jobs.submit(kind, params, lane=lane)
+
+
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    """Recent jobs, optionally filtered by ?status= and ?kind="""
+    try:
+        jobs = get_job_queue().list_jobs(
+            status=request.args.get('status'),
+            kind=request.args.get('kind'),
+            limit=min(int(request.args.get('limit', 50)), 500)
+        )
+        return jsonify({'jobs': jobs, 'count': len(jobs)})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/jobs/<int:job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Job status, progress and result
+    Query params:
+        since: only partial results with seq > since (pass back next_since)
+    """
+    try:
+        jobs = get_job_queue()
+        jobs.ensure_workers()
+        job = jobs.get(job_id, since=int(request.args.get('since', 0)))
+        if job is None:
+            return jsonify({'error': 'Job not found'}), 404
+        job['done'] = job['status'] in TERMINAL
+        return jsonify(job)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/jobs/<int:job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Cancel a queued job, or stop a running one at its next checkpoint"""
+    try:
+        status = get_job_queue().cancel(job_id)
+        if status is None:
+            return jsonify({'error': 'Job not found'}), 404
+        return jsonify({'job_id': job_id, 'status': status})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+# ============================================================================
+# POLLER SCHEDULER
+# ============================================================================
+
+from backend.data.etl.poller_scheduler import load_poller_metrics
+
+
+@app.route('/api/pollers/metrics', methods=['GET'])
+def poller_metrics():
+    """Per-poller runs, duration, lag and skipped cycles over the last ?hours= (default 24)"""
+    try:
+        hours = float(request.args.get('hours', 24))
+        since = datetime.now().timestamp() - hours * 3600
+        return jsonify({'jobs': load_poller_metrics(since=since), 'hours': hours})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 # ============================================================================
 # DATA DOWNLOAD ENDPOINTS
 # ============================================================================
@@ -887,7 +1034,7 @@ def health():
 @app.route('/api/download/stocks', methods=['POST'])
 def download_stocks():
     """
-    Download stock OHLC data from Yahoo Finance
+    Queue a stock OHLC download (202 + job_id; poll /api/jobs/<job_id>)
     Request body:
     {
         "symbols": ["INFY", "TCS"],
@@ -918,28 +1065,27 @@ def download_stocks():
         
         logger.debug(f"[TraceID: {g.trace_id}] Params: symbols={symbols}, interval={interval}, save_db={save_db}")
         
-        # Download data
-        downloader = StockDownloader(db_path=DB_PATH)
-        result = downloader.download_and_process(
-            symbols=symbols,
-            start_date=start_date,
-            end_date=end_date,
-            interval=interval,
-            save_db=save_db,
-            export_format=export_format
-        )
+        # Queue the download; the client observes /api/jobs/<id>
+        lane = 'bulk' if len(symbols) > BULK_DOWNLOAD_SYMBOLS else 'interactive'
+        job_id = submit_job('download_stocks', {
+            'symbols': symbols,
+            'start_date': start_date,
+            'end_date': end_date,
+            'interval': interval,
+            'save_db': save_db,
+            'export_format': export_format,
+        }, lane=lane)
         
-        logger.info(f"[TraceID: {g.trace_id}] Download complete: {result['rows']} rows, {len(result['gaps'])} gaps")
+        logger.info(f"[TraceID: {g.trace_id}] Download queued as job {job_id} ({lane})")
         
         return jsonify({
             'success': True,
             'trace_id': g.trace_id,
-            'rows': result['rows'],
-            'filepath': result['filepath'],
-            'gaps': result['gaps'],
-            'validation_errors': result['validation_errors'],
+            'job_id': job_id,
+            'status': 'queued',
+            'status_url': f'/api/jobs/{job_id}',
             'timestamp': datetime.now().isoformat()
-        })
+        }), 202
         
     except Exception as e:
         logger.error(f"[TraceID: {g.trace_id}] Stock download failed: {e}", exc_info=True)
@@ -949,35 +1095,26 @@ def download_stocks():
         }), 500
 
 
+from backend.services.market_data.download_watcher import (
+    DOWNLOAD_LOG_PATH, get_download_index, read_new_lines, tail_lines,
+)
+
+DOWNLOAD_EVENTS_KEEPALIVE = 15  # Seconds between SSE keep-alive comments
+DOWNLOAD_LOG_MAX_LINES = 1000
+
+
 @app.route('/api/download/history', methods=['GET'])
 def download_history():
-    """Get list of downloaded files"""
+    """Get list of downloaded files (newest first) from the watched index"""
     try:
-        logger.debug(f"[TraceID: {g.trace_id}] Fetching download history")
-        
-        downloads_dir = Path('downloads')
-        if not downloads_dir.exists():
-            return jsonify({'files': []})
-        
-        files = []
-        for file in downloads_dir.iterdir():
-            if file.is_file():
-                stat = file.stat()
-                files.append({
-                    'filename': file.name,
-                    'size': stat.st_size,
-                    'created_at': datetime.fromtimestamp(stat.st_ctime).isoformat(),
-                    'format': file.suffix.lstrip('.')
-                })
-        
-        # Sort by creation date (newest first)
-        files.sort(key=lambda x: x['created_at'], reverse=True)
-        
-        logger.info(f"[TraceID: {g.trace_id}] Found {len(files)} downloaded files")
+        snapshot = get_download_index().snapshot()
+        logger.debug(f"[TraceID: {g.trace_id}] Download history: {len(snapshot['files'])} files "
+                     f"(version {snapshot['version']})")
         
         return jsonify({
-            'files': files,
-            'total': len(files)
+            'files': snapshot['files'],
+            'total': len(snapshot['files']),
+            'version': snapshot['version']
         })
         
     except Exception as e:
@@ -985,26 +1122,72 @@ def download_history():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/download/events', methods=['GET'])
+def download_events():
+    """
+    Server-sent events for the downloads directory.
+    
+    The first event is a snapshot, or only the changes since the client's
+    cursor when it reconnects with Last-Event-ID (or ?since=). After that
+    each event carries just the files added and removed:
+        id: 4242-18f3a0c1d2e.13
+        event: change
+        data: {"version": 13, "added": [...], "removed": ["old.csv"]}
+    
+    Versions are per process; an id minted by another gunicorn worker (or
+    before a restart) gets a snapshot with "reset": true instead.
+    """
+    index = get_download_index()
+    cursor = request.headers.get('Last-Event-ID') or request.args.get('since')
+    
+    def events():
+        version = index.parse_event_id(cursor)
+        if version is None:
+            snapshot = index.snapshot()
+            version = snapshot['version']
+            if cursor:
+                snapshot['reset'] = True
+            yield f"id: {index.event_id(version)}\nevent: snapshot\ndata: {json.dumps(snapshot)}\n\n"
+        while True:
+            changes = index.changes_since(version, timeout=DOWNLOAD_EVENTS_KEEPALIVE)
+            if changes['version'] == version:
+                yield ": keep-alive\n\n"
+                continue
+            version = changes['version']
+            event = 'snapshot' if changes.get('reset') else 'change'
+            yield f"id: {index.event_id(version)}\nevent: {event}\ndata: {json.dumps(changes)}\n\n"
+    
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
 @app.route('/api/download/logs', methods=['GET'])
 def download_logs():
-    """Get recent download logs"""
+    """
+    Get recent download logs.
+    
+    Query params:
+        lines: number of trailing lines (default 100)
+        after: byte offset from a previous response; returns only newer lines
+    """
     try:
-        logger.debug(f"[TraceID: {g.trace_id}] Fetching download logs")
-        
-        log_file = Path('logs/data_downloader.log')
+        log_file = Path(DOWNLOAD_LOG_PATH)
         if not log_file.exists():
-            return jsonify({'logs': []})
+            return jsonify({'logs': [], 'total_lines': 0, 'offset': 0})
         
-        # Read last 100 lines
-        with open(log_file, 'r') as f:
-            lines = f.readlines()
-            recent_logs = lines[-100:] if len(lines) > 100 else lines
+        after = request.args.get('after', type=int)
+        if after is not None:
+            recent_logs, offset = read_new_lines(str(log_file), after)
+        else:
+            lines = min(request.args.get('lines', 100, type=int), DOWNLOAD_LOG_MAX_LINES)
+            recent_logs, offset = tail_lines(str(log_file), lines)
         
-        logger.info(f"[TraceID: {g.trace_id}] Returning {len(recent_logs)} log lines")
+        logger.debug(f"[TraceID: {g.trace_id}] Returning {len(recent_logs)} log lines")
         
         return jsonify({
             'logs': recent_logs,
-            'total_lines': len(recent_logs)
+            'total_lines': len(recent_logs),
+            'offset': offset
         })
         
     except Exception as e:
@@ -1035,7 +1218,7 @@ def get_options_chain():
         logger.info(f"[TraceID: {g.trace_id}] Options chain requested: symbol={symbol}, expiry={expiry_date}")
         
         # Fetch option chain
-        service = OptionsChainService(db_path=DB_PATH)
+        service = get_service(OptionsChainService, db_path=DB_PATH)
         chain_data = service.get_option_chain(symbol=symbol, expiry_date=expiry_date)
         
         logger.info(f"[TraceID: {g.trace_id}] Returning {len(chain_data['strikes'])} strikes")
@@ -1050,13 +1233,37 @@ def get_options_chain():
         }), 500
 
 
+@app.route('/api/options/analytics', methods=['GET'])
+def get_options_analytics():
+    """
+    Latest option chain analytics computed after each poller cycle
+    Query params:
+        symbol: Underlying symbol (NIFTY, BANKNIFTY, RELIANCE, etc.)
+        expiry_date: Optional expiry date (YYYY-MM-DD)
+    """
+    try:
+        symbol = request.args.get('symbol')
+        if not symbol:
+            return jsonify({'error': 'Symbol parameter required'}), 400
+
+        service = get_service(OptionsChainService, db_path=DB_PATH)
+        analytics = service.get_chain_analytics(symbol, request.args.get('expiry_date'))
+        if analytics is None:
+            return jsonify({'error': f'No option analytics for {symbol}'}), 404
+        return jsonify(analytics)
+
+    except Exception as e:
+        logger.error(f"[TraceID: {g.trace_id}] Options analytics fetch failed: {e}", exc_info=True)
+        return jsonify({'error': str(e), 'trace_id': g.trace_id}), 500
+
+
 @app.route('/api/options/market-status', methods=['GET'])
 def get_market_status():
     """Check if market is currently open"""
     try:
         logger.debug(f"[TraceID: {g.trace_id}] Market status check")
         
-        service = OptionsChainService(db_path=DB_PATH)
+        service = get_service(OptionsChainService, db_path=DB_PATH)
         is_open, message = service.is_market_open()
         
         return jsonify({
@@ -1080,7 +1287,7 @@ from backend.services.upstox.live_api import UpstoxLiveAPI
 def get_upstox_profile():
     """Get user profile from Upstox"""
     try:
-        api = UpstoxLiveAPI()
+        api = get_service(UpstoxLiveAPI)
         profile = api.get_profile()
         return jsonify(profile)
     except Exception as e:
@@ -1092,7 +1299,7 @@ def get_upstox_profile():
 def get_upstox_holdings():
     """Get long-term holdings from Upstox"""
     try:
-        api = UpstoxLiveAPI()
+        api = get_service(UpstoxLiveAPI)
         holdings = api.get_holdings()
         return jsonify(holdings)
     except Exception as e:
@@ -1104,7 +1311,7 @@ def get_upstox_holdings():
 def get_upstox_positions():
     """Get day/net positions from Upstox"""
     try:
-        api = UpstoxLiveAPI()
+        api = get_service(UpstoxLiveAPI)
         positions = api.get_positions()
         return jsonify(positions)
     except Exception as e:
@@ -1119,7 +1326,7 @@ def get_upstox_option_chain():
         symbol = request.args.get('symbol', 'NIFTY')
         expiry_date = request.args.get('expiry_date')
         
-        api = UpstoxLiveAPI()
+        api = get_service(UpstoxLiveAPI)
         chain = api.get_option_chain(symbol, expiry_date)
         return jsonify(chain)
     except Exception as e:
@@ -1135,7 +1342,7 @@ def get_upstox_market_quote():
         if not symbol:
             return jsonify({'error': 'Symbol required'}), 400
         
-        api = UpstoxLiveAPI()
+        api = get_service(UpstoxLiveAPI)
         quote = api.get_market_quote(symbol)
         return jsonify(quote)
     except Exception as e:
@@ -1147,7 +1354,7 @@ def get_upstox_market_quote():
 def get_upstox_funds():
     """Get account funds/margin from Upstox"""
     try:
-        api = UpstoxLiveAPI()
+        api = get_service(UpstoxLiveAPI)
         funds = api.get_funds()
         return jsonify(funds)
     except Exception as e:
@@ -1170,7 +1377,7 @@ def place_upstox_order():
         if not all(k in data for k in required):
             return jsonify({'error': f'Missing required fields: {required}'}), 400
         
-        manager = OrderManager()
+        manager = get_service(OrderManager)
         result = manager.place_order(
             symbol=data['symbol'],
             quantity=data['quantity'],
@@ -1189,7 +1396,7 @@ def place_upstox_order():
 def cancel_upstox_order(order_id):
     """Cancel order via Upstox"""
     try:
-        manager = OrderManager()
+        manager = get_service(OrderManager)
         result = manager.cancel_order(order_id)
         return jsonify(result)
     except Exception as e:
@@ -1202,7 +1409,7 @@ def modify_order(order_id):
     """Modify order via Upstox"""
     try:
         data = request.json
-        manager = OrderManager()
+        manager = get_service(OrderManager)
         result = manager.modify_order(
             order_id=order_id,
             quantity=data.get('quantity'),
@@ -1219,7 +1426,7 @@ def modify_order(order_id):
 def get_order_status(order_id):
     """Get order status from Upstox"""
     try:
-        manager = OrderManager()
+        manager = get_service(OrderManager)
         status = manager.get_order_status(order_id)
         return jsonify(status)
     except Exception as e:
@@ -1233,36 +1440,40 @@ def get_order_status(order_id):
 
 from backend.core.analytics.backtesting_engine import Backtester, BacktestStrategy, create_iron_condor, create_bull_call_spread
 
+from backend.core.analytics.option_replay import STRATEGIES as REPLAY_STRATEGIES
+
+# Optional OptionReplay.run() rules accepted by /api/backtest/run
+REPLAY_RULES = ('interval', 'entry_days_before', 'entry_time', 'exit_days_before', 'exit_time',
+                'profit_target', 'stop_loss', 'slippage')
+
+
 @app.route('/api/backtest/run', methods=['POST'])
 def run_backtest():
-    """Run strategy backtest"""
+    """Queue a strategy backtest (202 + job_id; poll /api/jobs/<job_id>)"""
     try:
         data = request.json
         strategy_name = data.get('strategy')
-        entry_date = data.get('entry_date')
-        exit_date = data.get('exit_date')
+        entry_date = data.get('entry_date') or data.get('start_date')
+        exit_date = data.get('exit_date') or data.get('end_date')
         
-        # Create backtester
-        backtester = Backtester()
-        
-        # Get strategy (for now, use pre-built strategies)
-        if strategy_name == 'iron_condor':
-            strategy = create_iron_condor(spot_price=data.get('spot_price', 18000))
-        elif strategy_name == 'bull_call_spread':
-            strategy = create_bull_call_spread(spot_price=data.get('spot_price', 18000))
-        else:
+        if strategy_name not in REPLAY_STRATEGIES:
             return jsonify({'error': 'Unknown strategy'}), 400
-        
-        # Mock historical data (in production, fetch from database)
-        import pandas as pd
-        dates = pd.date_range(entry_date, exit_date, freq='H')
-        historical_data = pd.DataFrame({
-            'timestamp': dates,
-            'close': [18000 + i*10 for i in range(len(dates))]
-        })
-        
-        result = backtester.run_backtest(strategy, historical_data, entry_date, exit_date)
-        return jsonify(result)
+        if not entry_date or not exit_date:
+            return jsonify({'error': 'entry_date and exit_date are required'}), 400
+        lane = data.get('lane', 'interactive')
+        if lane not in LANES:
+            return jsonify({'error': f'lane must be one of {list(LANES)}'}), 400
+        
+        # Replayed on stored expired-contract candles for every expiry in the range
+        params = {
+            'strategy': strategy_name,
+            'entry_date': entry_date,
+            'exit_date': exit_date,
+            'underlying': data.get('underlying') or data.get('symbol') or 'NIFTY',
+        }
+        params.update({k: data[k] for k in REPLAY_RULES if data.get(k) is not None})
+        job_id = submit_job('backtest_strategy', params, lane=lane)
+        return jsonify({'job_id': job_id, 'status': 'queued', 'status_url': f'/api/jobs/{job_id}'}), 202
     except Exception as e:
         logger.error(f"[TraceID: {g.trace_id}] Backtest error: {e}", exc_info=True)
         return jsonify({'error': str(e)}), 500
@@ -1334,7 +1545,7 @@ from backend.core.analytics.portfolio import PortfolioAnalytics
 def get_performance_analytics():
     """Get comprehensive performance analytics"""
     try:
-        analytics = PortfolioAnalytics()
+        analytics = get_service(PortfolioAnalytics)
         summary = analytics.get_performance_summary()
         return jsonify(summary)
     except Exception as e:
@@ -1347,7 +1558,7 @@ def get_equity_curve():
     """Get equity curve data"""
     try:
         days = int(request.args.get('days', 30))
-        analytics = PortfolioAnalytics()
+        analytics = get_service(PortfolioAnalytics)
         curve = analytics.get_equity_curve(days=days)
         return jsonify({'equity_curve': curve})
     except Exception as e:
@@ -1635,59 +1846,21 @@ def get_next_expiry():
 
 @app.route('/api/backtest/multi-expiry', methods=['POST'])
 def backtest_multi_expiry():
-    """Backtest multi-expiry strategy with auto-rolling"""
+    """Queue a multi-expiry backtest with auto-rolling (202 + job_id; poll /api/jobs/<job_id>)"""
     try:
         data = request.json
         required = ['strategy_type', 'start_date', 'end_date', 'underlying_price']
         if not all(k in data for k in required):
             return jsonify({'error': f'Missing required fields: {required}'}), 400
-        
-        # Create strategy based on type
-        strategy_type = data['strategy_type']
-        
-        if strategy_type == 'calendar_spread':
-            strategy = create_calendar_spread(
-                underlying_price=data['underlying_price'],
-                strike=data.get('strike', data['underlying_price']),
-                near_expiry=data.get('near_expiry', '2026-02-06'),
-                far_expiry=data.get('far_expiry', '2026-02-27'),
-                option_type=data.get('option_type', 'CALL')
-            )
-        elif strategy_type == 'diagonal_spread':
-            strategy = create_diagonal_spread(
-                underlying_price=data['underlying_price'],
-                near_strike=data.get('near_strike', data['underlying_price']),
-                far_strike=data.get('far_strike', data['underlying_price'] + 200),
-                near_expiry=data.get('near_expiry', '2026-02-06'),
-                far_expiry=data.get('far_expiry', '2026-02-27'),
-                option_type=data.get('option_type', 'CALL')
-            )
-        else:
+        if data['strategy_type'] not in ('calendar_spread', 'diagonal_spread'):
             return jsonify({'error': 'Unknown strategy type'}), 400
+        lane = data.get('lane', 'interactive')
+        if lane not in LANES:
+            return jsonify({'error': f'lane must be one of {list(LANES)}'}), 400
         
-        # Create mock historical data
-        import pandas as pd
-        import numpy as np
-        dates = pd.date_range(data['start_date'], data['end_date'], freq='D')
-        prices = data['underlying_price'] + np.cumsum(np.random.randn(len(dates)) * 20)
-        
-        historical_data = pd.DataFrame({
-            'date': dates.strftime('%Y-%m-%d'),
-            'close': prices
-        })
-        
-        # Run backtest
-        backtester = MultiExpiryBacktester()
-        result = backtester.backtest_with_rolling(
-            strategy,
-            historical_data,
-            data['start_date'],
-            data['end_date'],
-            auto_roll=data.get('auto_roll', True),
-            roll_days_before=data.get('roll_days_before', 3)
-        )
-        
-        return jsonify(result)
+        params = {k: v for k, v in data.items() if k != 'lane'}
+        job_id = submit_job('backtest_multi_expiry', params, lane=lane)
+        return jsonify({'job_id': job_id, 'status': 'queued', 'status_url': f'/api/jobs/{job_id}'}), 202
     except Exception as e:
         logger.error(f"[TraceID: {g.trace_id}] Multi-expiry backtest error: {e}", exc_info=True)
         return jsonify({'error': str(e)}), 500
@@ -1713,7 +1886,13 @@ if __name__ == '__main__':
     print("\n   📥 Data Download:")
     print("   POST /api/download/stocks")
     print("   GET  /api/download/history")
+    print("   GET  /api/download/events")
     print("   GET  /api/download/logs")
+    print("\n   ⚙️ Background Jobs:")
+    print("   GET  /api/jobs")
+    print("   GET  /api/jobs/<job_id>?since=0")
+    print("   POST /api/jobs/<job_id>/cancel")
+    print("   GET  /api/pollers/metrics?hours=24")
     print("\n   📊 Options Chain:")
     print("   GET  /api/options/chain?symbol=NIFTY")
     print("   GET  /api/options/market-status")
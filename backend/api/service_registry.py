@@ -0,0 +1,65 @@
+"""
+Service Registry - long-lived, shared service instances for the API server
+
+Routes ask the registry for a service instead of constructing one per
+request, so AuthManager / PaperTradingSystem / OptionsChainService and
+friends are built once per process (per distinct constructor arguments).
+The registered services open a fresh SQLite connection per call, which
+makes one instance safe to share across request threads.
+
+Usage:
+    from backend.api.service_registry import get_service
+    paper = get_service(PaperTradingSystem, db_path=DB_PATH)
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceRegistry:
+    """Lazily builds and caches one instance per (factory, kwargs)"""
+
+    def __init__(self):
+        self._services: Dict[Tuple, Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, factory: Callable[..., Any], **kwargs) -> Any:
+        key = (factory, tuple(sorted(kwargs.items())))
+        service = self._services.get(key)
+        if service is not None:
+            return service
+
+        with self._lock:
+            service = self._services.get(key)
+            if service is None:
+                service = factory(**kwargs)
+                self._services[key] = service
+                logger.info(f"🧩 Service registered: {getattr(factory, '__name__', factory)} {kwargs or ''}")
+        return service
+
+    def clear(self):
+        """Drop all instances (tests, or after a fork that must not share state)"""
+        with self._lock:
+            self._services.clear()
+
+
+# Singleton instance
+_registry_instance: Optional[ServiceRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> ServiceRegistry:
+    """Process-wide service registry"""
+    global _registry_instance
+    with _registry_lock:
+        if _registry_instance is None:
+            _registry_instance = ServiceRegistry()
+    return _registry_instance
+
+
+def get_service(factory: Callable[..., Any], **kwargs) -> Any:
+    """Shared instance of ``factory(**kwargs)``"""
+    return get_registry().get(factory, **kwargs)
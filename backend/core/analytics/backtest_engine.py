@@ -4,29 +4,30 @@ Backtest Engine - VectorBT-based backtesting for stocks and options
 Supports multiple strategies with portfolio management and comprehensive metrics
 """
 
+from __future__ import annotations
+
 import sqlite3
 import logging
-import numpy as np
-import pandas as pd
 from typing import Dict, List, Optional, Tuple, Callable
 from dataclasses import dataclass
 from datetime import datetime
 import json
 
-try:
-    import vectorbt as vbt
-except ImportError:
-    logger = logging.getLogger(__name__)
+from backend.core.analytics import indicators as ta
+from backend.data.database.candle_resampler import CandleResampler
+from backend.utils.helpers.lazy_import import is_available, lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+vbt = lazy_import("vectorbt")  # optional; numba compilation makes it the slowest import here
+VECTORBT_AVAILABLE = is_available("vectorbt")
+
+logger = logging.getLogger(__name__)
+
+if not VECTORBT_AVAILABLE:
     logger.warning(
         "vectorbt not installed. Backtesting functionality will be limited. Install with: pip install vectorbt[full]"
     )
-    vbt = None
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
-logger = logging.getLogger(__name__)
 
 DB_PATH = "market_data.db"
 
@@ -132,8 +133,8 @@ class SMAStrategy(BaseStrategy):
         fast_period = self.params["fast_period"]
         slow_period = self.params["slow_period"]
 
-        df["sma_fast"] = df["close"].rolling(window=fast_period).mean()
-        df["sma_slow"] = df["close"].rolling(window=slow_period).mean()
+        df["sma_fast"] = ta.sma(df["close"].to_numpy(), fast_period)
+        df["sma_slow"] = ta.sma(df["close"].to_numpy(), slow_period)
 
         # Generate signals: 1 (buy) when fast > slow, -1 (sell) when fast < slow
         df["signal"] = 0
@@ -148,13 +149,18 @@ class SMAStrategy(BaseStrategy):
 
 
 class RSIStrategy(BaseStrategy):
-    """RSI (Relative Strength Index) mean-reversion strategy"""
+    """
+    RSI (Relative Strength Index) mean-reversion strategy.
+    RSI uses simple rolling means of gains/losses; ``wilder_smoothing=True``
+    switches to Wilder's RSI (same values as the screener and live indicators).
+    """
 
     def __init__(self, params: Dict = None):
         defaults = {
             "rsi_period": 14,
             "oversold_threshold": 30,
             "overbought_threshold": 70,
+            "wilder_smoothing": False,
         }
         merged_params = {**defaults, **(params or {})}
         super().__init__("RSI Mean Reversion", merged_params)
@@ -170,12 +176,16 @@ class RSIStrategy(BaseStrategy):
         oversold = self.params["oversold_threshold"]
         overbought = self.params["overbought_threshold"]
 
-        # Calculate RSI
-        delta = df["close"].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=rsi_period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=rsi_period).mean()
-        rs = gain / loss
-        df["rsi"] = 100 - (100 / (1 + rs))
+        if self.params["wilder_smoothing"]:
+            # Wilder RSI, shared with the screener and live indicator state
+            df["rsi"] = ta.rsi(df["close"].to_numpy(), rsi_period)
+        else:
+            # Calculate RSI
+            delta = df["close"].diff()
+            gain = (delta.where(delta > 0, 0)).rolling(window=rsi_period).mean()
+            loss = (-delta.where(delta < 0, 0)).rolling(window=rsi_period).mean()
+            rs = gain / loss
+            df["rsi"] = 100 - (100 / (1 + rs))
 
         # Generate signals
         df["signal"] = 0
@@ -224,7 +234,10 @@ class BacktestEngine:
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
     ) -> Optional[pd.DataFrame]:
-        """Load candle data from database"""
+        """
+        Load candle data from database. Timeframes not downloaded into
+        candles_new are derived locally from the stored 1m bars.
+        """
         try:
             conn = sqlite3.connect(DB_PATH)
 
@@ -234,6 +247,7 @@ class BacktestEngine:
                 WHERE symbol = ? AND timeframe = ?
             """
             params = [symbol, timeframe]
+            start_ts = end_ts = None
 
             if start_date:
                 start_ts = int(datetime.strptime(start_date, "%Y-%m-%d").timestamp())
@@ -248,6 +262,17 @@ class BacktestEngine:
             query += " ORDER BY timestamp ASC"
 
             df = pd.read_sql_query(query, conn, params=params)
+            if df.empty:
+                row = conn.execute(
+                    "SELECT instrument_key FROM candles_new WHERE symbol = ? LIMIT 1", (symbol,)
+                ).fetchone()
+                if row:
+                    resampler = CandleResampler(DB_PATH)
+                    # Fold in 1m bars stored since the last resample (none: serve what exists)
+                    if resampler.has_new_bars("candles"):
+                        resampler.refresh("candles")
+                    bars = resampler.get_candles(row[0], timeframe, "candles", start_ts, end_ts)
+                    df = pd.DataFrame(bars, columns=["timestamp", "open", "high", "low", "close", "volume"])
             conn.close()
 
             if df.empty:
@@ -555,4 +580,7 @@ Examples:
 
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
     exit(main())
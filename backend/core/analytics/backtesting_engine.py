@@ -3,20 +3,17 @@ Strategy Backtesting Engine
 Test option strategies on historical data with P&L simulation
 """
 
-import sys
+from __future__ import annotations
+
 import logging
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
-from pathlib import Path
-import pandas as pd
-import numpy as np
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
+from backend.utils.helpers.lazy_import import lazy_import
+
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
 
-# Setup logger
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger(__name__)
 
 
@@ -305,6 +302,9 @@ def create_bull_call_spread(underlying_price: float) -> BacktestStrategy:
 
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
     # Test backtesting engine
     print("Testing Backtesting Engine...")
 
@@ -0,0 +1,482 @@
+"""
+Technical Indicator Engine
+--------------------------
+SMA, EMA, RSI, MACD, ATR, Bollinger Bands and session VWAP in two modes
+that produce bit-identical values:
+
+- Batch: NumPy over a 2-D (time x symbol) matrix, so a whole universe
+  (e.g. NSE500) is screened in one pass. Window indicators use shifted
+  cumulative sums; recursive ones (EMA, Wilder RSI/ATR) step through time
+  once with every symbol updated per step.
+- Streaming: O(1) state per symbol updated with each new bar or tick,
+  performing the same floating point operations in the same order.
+
+Warm-up rows are NaN. Inputs must be gap-free (forward-fill missing bars).
+
+Usage:
+    from backend.core.analytics import indicators as ta
+
+    rsi = ta.rsi(closes, 14)                    # closes: (bars, symbols)
+    latest = ta.screen(highs, lows, closes, volumes)
+
+    state = ta.IndicatorState()                 # live, per symbol
+    values = state.update(high, low, close, volume, session=day)
+
+    rows = ta.screen_instruments(["NSE_EQ|INE002A01018"], timeframe="1d")
+"""
+
+from __future__ import annotations
+
+import math
+import logging
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Dict, List, Sequence
+
+from backend.data.database.candle_resampler import DAY, IST_OFFSET, CandleResampler
+from backend.utils.helpers.lazy_import import lazy_import
+
+np = lazy_import("numpy")
+
+# Configuration
+DB_PATH = "market_data.db"
+NAN = float("nan")
+
+# Periods used by screen() / IndicatorState
+SCREEN_PARAMS = {
+    "sma_fast": 20,
+    "sma_slow": 50,
+    "ema": 20,
+    "rsi": 14,
+    "macd": (12, 26, 9),
+    "atr": 14,
+    "bollinger": (20, 2.0),
+}
+
+logger = logging.getLogger("Indicators")
+
+
+# ============================================================================
+# BATCH (time x symbol)
+# ============================================================================
+
+def _matrix(values):
+    """float64 (T, N) view of a 1-D or 2-D input, and whether it was 1-D"""
+    a = np.asarray(values, dtype=np.float64)
+    return (a[:, None], True) if a.ndim == 1 else (a, False)
+
+
+def _shape(out, flat):
+    return out[:, 0] if flat else out
+
+
+def _window_sums(y, period):
+    """Rolling sums of the last `period` rows from a cumulative sum"""
+    c = np.cumsum(y, axis=0)
+    s = c.copy()
+    s[period:] -= c[:-period]
+    return s
+
+
+def _seeded(x, period, start, step):
+    """
+    Recursive smoother seeded with the mean of rows [start, start + period):
+    out[t] = step(out[t-1], x[t]) afterwards.
+    """
+    out = np.full_like(x, np.nan)
+    if len(x) - start < period:
+        return out
+    prev = np.cumsum(x[start:start + period], axis=0)[-1] / period
+    out[start + period - 1] = prev
+    for t in range(start + period, len(x)):
+        prev = step(prev, x[t])
+        out[t] = prev
+    return out
+
+
+def _ema(x, period, start=0):
+    alpha = 2.0 / (period + 1)
+    return _seeded(x, period, start, lambda prev, v: prev + alpha * (v - prev))
+
+
+def _wilder(x, period, start=0):
+    return _seeded(x, period, start, lambda prev, v: (prev * (period - 1) + v) / period)
+
+
+def sma(close, period: int):
+    """Simple moving average"""
+    x, flat = _matrix(close)
+    out = np.full_like(x, np.nan)
+    if len(x) >= period:
+        s = _window_sums(x - x[0], period)
+        out[period - 1:] = x[0] + s[period - 1:] / period
+    return _shape(out, flat)
+
+
+def ema(close, period: int):
+    """Exponential moving average seeded with the SMA of the first `period` bars"""
+    x, flat = _matrix(close)
+    return _shape(_ema(x, period), flat)
+
+
+def rsi(close, period: int = 14):
+    """Wilder's RSI; 50 when the window has no movement"""
+    x, flat = _matrix(close)
+    d = np.full_like(x, np.nan)
+    d[1:] = x[1:] - x[:-1]
+    gain = _wilder(np.maximum(d, 0.0), period, start=1)
+    loss = _wilder(np.maximum(-d, 0.0), period, start=1)
+    total = gain + loss
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = np.where(total == 0, 50.0, 100.0 * gain / total)
+    return _shape(out, flat)
+
+
+def macd(close, fast: int = 12, slow: int = 26, signal: int = 9):
+    """(macd, signal, histogram)"""
+    x, flat = _matrix(close)
+    line = _ema(x, fast) - _ema(x, slow)
+    sig = _ema(line, signal, start=max(fast, slow) - 1)
+    return _shape(line, flat), _shape(sig, flat), _shape(line - sig, flat)
+
+
+def atr(high, low, close, period: int = 14):
+    """Wilder's average true range"""
+    h, flat = _matrix(high)
+    l, _ = _matrix(low)
+    c, _ = _matrix(close)
+    tr = h - l
+    tr[1:] = np.maximum(np.maximum(tr[1:], np.abs(h[1:] - c[:-1])), np.abs(l[1:] - c[:-1]))
+    return _shape(_wilder(tr, period), flat)
+
+
+def bollinger(close, period: int = 20, k: float = 2.0):
+    """(middle, upper, lower) with population standard deviation"""
+    x, flat = _matrix(close)
+    mid = np.full_like(x, np.nan)
+    upper, lower = mid.copy(), mid.copy()
+    if len(x) >= period:
+        y = x - x[0]
+        mean = _window_sums(y, period)[period - 1:] / period
+        var = _window_sums(y * y, period)[period - 1:] / period - mean * mean
+        std = np.sqrt(np.maximum(var, 0.0))
+        mid[period - 1:] = x[0] + mean
+        upper[period - 1:] = mid[period - 1:] + k * std
+        lower[period - 1:] = mid[period - 1:] - k * std
+    return _shape(mid, flat), _shape(upper, flat), _shape(lower, flat)
+
+
+def vwap(high, low, close, volume, session=None):
+    """
+    Volume-weighted average of the typical price, reset whenever `session`
+    (per row, or per row and symbol) changes. NaN until volume trades.
+    """
+    h, flat = _matrix(high)
+    l, _ = _matrix(low)
+    c, _ = _matrix(close)
+    v, _ = _matrix(volume)
+    pv = (h + l + c) / 3.0 * v
+    cum_pv, cum_v = np.cumsum(pv, axis=0), np.cumsum(v, axis=0)
+
+    rows = np.arange(len(c))[:, None]
+    if session is None:
+        new = rows == 0
+    else:
+        s, _ = _matrix(session)
+        new = np.ones(np.broadcast_shapes(s.shape, c.shape), dtype=bool)
+        new[1:] = s[1:] != s[:-1]
+    start = np.maximum.accumulate(np.where(new, rows, 0), axis=0)
+    cols = np.arange(c.shape[1])[None, :]
+    before_pv = np.vstack([np.zeros_like(c[:1]), cum_pv[:-1]])[start, cols]
+    before_v = np.vstack([np.zeros_like(c[:1]), cum_v[:-1]])[start, cols]
+    session_v = cum_v - before_v
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = np.where(session_v > 0, (cum_pv - before_pv) / session_v, np.nan)
+    return _shape(out, flat)
+
+
+def screen(high, low, close, volume, session=None, params: Dict = None) -> Dict[str, "np.ndarray"]:
+    """Latest value of every SCREEN_PARAMS indicator per symbol (last row)"""
+    p = {**SCREEN_PARAMS, **(params or {})}
+    x, _ = _matrix(close)
+    mid, upper, lower = bollinger(x, *p["bollinger"])
+    line, sig, hist = macd(x, *p["macd"])
+    band = upper[-1] - lower[-1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pct_b = np.where(band != 0, (x[-1] - lower[-1]) / band, np.nan)
+    return {
+        "close": x[-1],
+        "sma_fast": sma(x, p["sma_fast"])[-1],
+        "sma_slow": sma(x, p["sma_slow"])[-1],
+        "ema": ema(x, p["ema"])[-1],
+        "rsi": rsi(x, p["rsi"])[-1],
+        "macd": line[-1],
+        "macd_signal": sig[-1],
+        "macd_hist": hist[-1],
+        "atr": atr(high, low, x, p["atr"])[-1],
+        "bb_mid": mid[-1],
+        "bb_upper": upper[-1],
+        "bb_lower": lower[-1],
+        "bb_pct_b": pct_b,
+        "vwap": vwap(high, low, x, volume, session)[-1],
+    }
+
+
+def warmup_bars(params: Dict = None) -> Dict[str, int]:
+    """Bars of history each screen() output needs before it is defined"""
+    p = {**SCREEN_PARAMS, **(params or {})}
+    fast, slow, signal = p["macd"]
+    bb = p["bollinger"][0]
+    return {
+        "close": 1, "sma_fast": p["sma_fast"], "sma_slow": p["sma_slow"], "ema": p["ema"],
+        "rsi": p["rsi"] + 1, "macd": max(fast, slow), "macd_signal": max(fast, slow) + signal - 1,
+        "macd_hist": max(fast, slow) + signal - 1, "atr": p["atr"], "bb_mid": bb, "bb_upper": bb,
+        "bb_lower": bb, "bb_pct_b": bb, "vwap": 1,
+    }
+
+
+# ============================================================================
+# STREAMING (one symbol, O(1) per update)
+# ============================================================================
+
+class StreamingSMA:
+    """Same shifted running sum as sma()"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.shift = None
+        self.cum = 0.0
+        self.sums = deque([0.0], maxlen=period + 1)
+        self.value = NAN
+
+    def update(self, close: float) -> float:
+        if self.shift is None:
+            self.shift = close
+        self.cum += close - self.shift
+        self.sums.append(self.cum)
+        if len(self.sums) > self.period:
+            self.value = self.shift + (self.cum - self.sums[0]) / self.period
+        return self.value
+
+
+class _StreamingSeeded(ABC):
+    """Mean of the first `period` inputs, then a recursive step"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.count = 0
+        self.total = 0.0
+        self.value = NAN
+
+    @abstractmethod
+    def _step(self, prev: float, x: float) -> float:
+        """Next value from the previous one and a new input"""
+
+    def update(self, x: float) -> float:
+        if self.count < self.period:
+            self.count += 1
+            self.total += x
+            if self.count == self.period:
+                self.value = self.total / self.period
+        else:
+            self.value = self._step(self.value, x)
+        return self.value
+
+
+class StreamingEMA(_StreamingSeeded):
+
+    def __init__(self, period: int):
+        super().__init__(period)
+        self.alpha = 2.0 / (period + 1)
+
+    def _step(self, prev: float, x: float) -> float:
+        return prev + self.alpha * (x - prev)
+
+
+class StreamingWilder(_StreamingSeeded):
+
+    def _step(self, prev: float, x: float) -> float:
+        return (prev * (self.period - 1) + x) / self.period
+
+
+class StreamingRSI:
+
+    def __init__(self, period: int = 14):
+        self.gain = StreamingWilder(period)
+        self.loss = StreamingWilder(period)
+        self.prev = None
+        self.value = NAN
+
+    def update(self, close: float) -> float:
+        if self.prev is not None:
+            d = close - self.prev
+            gain = self.gain.update(max(d, 0.0))
+            loss = self.loss.update(max(-d, 0.0))
+            total = gain + loss
+            if total == 0:
+                self.value = 50.0
+            elif not math.isnan(total):
+                self.value = 100.0 * gain / total
+        self.prev = close
+        return self.value
+
+
+class StreamingMACD:
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = StreamingEMA(fast)
+        self.slow = StreamingEMA(slow)
+        self.signal = StreamingEMA(signal)
+        self.value = (NAN, NAN, NAN)
+
+    def update(self, close: float):
+        line = self.fast.update(close) - self.slow.update(close)
+        if not math.isnan(line):
+            sig = self.signal.update(line)
+            self.value = (line, sig, line - sig)
+        return self.value
+
+
+class StreamingATR:
+
+    def __init__(self, period: int = 14):
+        self.smoother = StreamingWilder(period)
+        self.prev_close = None
+        self.value = NAN
+
+    def update(self, high: float, low: float, close: float) -> float:
+        tr = high - low
+        if self.prev_close is not None:
+            tr = max(tr, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        self.value = self.smoother.update(tr)
+        return self.value
+
+
+class StreamingBollinger:
+
+    def __init__(self, period: int = 20, k: float = 2.0):
+        self.period = period
+        self.k = k
+        self.shift = None
+        self.cum = 0.0
+        self.cum_sq = 0.0
+        self.sums = deque([(0.0, 0.0)], maxlen=period + 1)
+        self.value = (NAN, NAN, NAN)
+
+    def update(self, close: float):
+        if self.shift is None:
+            self.shift = close
+        y = close - self.shift
+        self.cum += y
+        self.cum_sq += y * y
+        self.sums.append((self.cum, self.cum_sq))
+        if len(self.sums) > self.period:
+            old, old_sq = self.sums[0]
+            mean = (self.cum - old) / self.period
+            var = (self.cum_sq - old_sq) / self.period - mean * mean
+            std = math.sqrt(max(var, 0.0))
+            mid = self.shift + mean
+            self.value = (mid, mid + self.k * std, mid - self.k * std)
+        return self.value
+
+
+class StreamingVWAP:
+
+    def __init__(self):
+        self.started = False
+        self.session = None
+        self.cum_pv = self.cum_v = 0.0
+        self.before_pv = self.before_v = 0.0
+        self.value = NAN
+
+    def update(self, high: float, low: float, close: float, volume: float, session=None) -> float:
+        if not self.started or (session is not None and session != self.session):
+            self.started = True
+            self.session = session
+            self.before_pv, self.before_v = self.cum_pv, self.cum_v
+        self.cum_pv += (high + low + close) / 3.0 * volume
+        self.cum_v += volume
+        session_v = self.cum_v - self.before_v
+        self.value = (self.cum_pv - self.before_pv) / session_v if session_v > 0 else NAN
+        return self.value
+
+
+class IndicatorState:
+    """Streaming counterpart of screen() for one symbol"""
+
+    def __init__(self, params: Dict = None):
+        p = {**SCREEN_PARAMS, **(params or {})}
+        self.sma_fast = StreamingSMA(p["sma_fast"])
+        self.sma_slow = StreamingSMA(p["sma_slow"])
+        self.ema = StreamingEMA(p["ema"])
+        self.rsi = StreamingRSI(p["rsi"])
+        self.macd = StreamingMACD(*p["macd"])
+        self.atr = StreamingATR(p["atr"])
+        self.bollinger = StreamingBollinger(*p["bollinger"])
+        self.vwap = StreamingVWAP()
+
+    def update(self, high: float, low: float, close: float, volume: float, session=None) -> Dict[str, float]:
+        line, sig, hist = self.macd.update(close)
+        mid, upper, lower = self.bollinger.update(close)
+        band = upper - lower
+        return {
+            "close": close,
+            "sma_fast": self.sma_fast.update(close),
+            "sma_slow": self.sma_slow.update(close),
+            "ema": self.ema.update(close),
+            "rsi": self.rsi.update(close),
+            "macd": line,
+            "macd_signal": sig,
+            "macd_hist": hist,
+            "atr": self.atr.update(high, low, close),
+            "bb_mid": mid,
+            "bb_upper": upper,
+            "bb_lower": lower,
+            "bb_pct_b": (close - lower) / band if band else NAN,
+            "vwap": self.vwap.update(high, low, close, volume, session),
+        }
+
+
+# ============================================================================
+# SCREENER
+# ============================================================================
+
+def screen_instruments(instrument_keys: Sequence[str], timeframe: str = "1d", source: str = "candles",
+                       bars: int = 250, db_path: str = DB_PATH) -> List[Dict]:
+    """
+    Latest indicators for many instruments from locally stored candles.
+
+    Each instrument's last `bars` candles are right-aligned into one matrix;
+    shorter histories are back-filled with their first bar, and outputs
+    whose warm-up exceeds the real history are reported as None.
+    """
+    resampler = CandleResampler(db_path)
+    keys, series = [], []
+    for key in instrument_keys:
+        rows = resampler.get_candles(key, timeframe, source)[-bars:]
+        if rows:
+            keys.append(key)
+            series.append(np.asarray(rows, dtype=np.float64))
+    if not keys:
+        return []
+
+    length = max(len(s) for s in series)
+    data = np.empty((length, len(keys), 6))
+    for i, s in enumerate(series):
+        data[length - len(s):, i] = s
+        data[:length - len(s), i] = s[0]
+        data[:length - len(s), i, 5] = 0.0  # no volume in the back-filled bars
+    ts, high, low, close, volume = data[..., 0], data[..., 2], data[..., 3], data[..., 4], data[..., 5]
+
+    latest = screen(high, low, close, volume, session=(ts + IST_OFFSET) // DAY)
+    warmup = warmup_bars()
+    results = []
+    for i, key in enumerate(keys):
+        have = len(series[i])
+        row = {"instrument_key": key, "ts": int(ts[-1, i]), "bars": have}
+        for name, values in latest.items():
+            value = float(values[i])
+            row[name] = round(value, 4) if have >= warmup[name] and not math.isnan(value) else None
+        results.append(row)
+    return results
@@ -0,0 +1,433 @@
+"""
+Option Strategy Replay
+----------------------
+Replays multi-leg option strategies on real expired-contract candles
+(expired_options + expired_candles, filled by expired_options_fetcher),
+instead of evaluating expiry payoffs against an underlying close.
+
+For every expiry in the range:
+- Entry is the first bar at or after `entry_time`, `entry_days_before`
+  calendar days before expiry. Spot is read from put-call parity: the
+  strike where the call and put trade closest gives S = K + C - P. The
+  ATM strike is the listed strike nearest that spot.
+- Legs are placed at ATM + offset and marked to market on every bar.
+  Bars are the union of the legs' timestamps, and a leg that did not trade
+  carries its last price forward.
+
+Entry prices, leg paths and exit rules (profit target and stop loss as
+multiples of the premium, time exit) are laid out as (expiry, leg, bar)
+NumPy matrices and evaluated for all expiries at once. Only the chosen
+legs' paths are read; strike selection needs one indexed seek per contract.
+
+Usage:
+    replay = OptionReplay()
+    result = replay.run(
+        "NIFTY", STRATEGIES["iron_condor"][1], "2025-01-01", "2025-12-31",
+        entry_days_before=3, profit_target=0.5, stop_loss=1.0, exit_time="15:15",
+    )
+    result["total_pnl"], result["win_rate"], result["trades"][0]
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import sqlite3
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Sequence
+
+from backend.data.database.candle_resampler import IST_OFFSET
+from backend.utils.helpers.lazy_import import lazy_import
+
+np = lazy_import("numpy")
+
+logger = logging.getLogger("OptionReplay")
+
+# Configuration
+DB_PATH = "market_data.db"
+IST = timezone(timedelta(seconds=IST_OFFSET))
+INTERVALS = ("1minute", "3minute", "5minute", "15minute", "30minute", "day")  # finest first
+ENTRY_TOLERANCE = 15 * 60  # Contracts must trade within 15 min of the entry bar to be priced
+DEFAULT_EXIT_TIME = "15:15"
+
+
+@dataclass(frozen=True)
+class LegSpec:
+    """One leg, placed relative to the ATM strike at entry"""
+
+    option_type: str  # CE or PE
+    action: str  # BUY or SELL
+    offset: float  # strike - ATM, in index points
+    qty: int = 50
+
+    @property
+    def weight(self) -> int:
+        return self.qty if self.action == "BUY" else -self.qty
+
+
+# Same shapes as create_iron_condor / create_bull_call_spread in backtesting_engine
+STRATEGIES = {
+    "iron_condor": ("Iron Condor", [
+        LegSpec("PE", "BUY", -200),
+        LegSpec("PE", "SELL", -100),
+        LegSpec("CE", "SELL", 100),
+        LegSpec("CE", "BUY", 200),
+    ]),
+    "bull_call_spread": ("Bull Call Spread", [
+        LegSpec("CE", "BUY", 0),
+        LegSpec("CE", "SELL", 200),
+    ]),
+}
+
+# First bar at or after the target, one index seek per contract
+PROBE_SQL = """
+    SELECT p.slot, p.strike, p.option_type, p.instrument_key, c.timestamp,
+           CAST(strftime('%s', c.timestamp) AS INTEGER), c.close
+    FROM replay_probe p
+    JOIN expired_candles c ON c.rowid = (
+        SELECT rowid FROM expired_candles
+        WHERE instrument_key = p.instrument_key AND interval = ?
+          AND timestamp >= p.start AND timestamp <= p.until
+        ORDER BY timestamp LIMIT 1
+    )
+"""
+
+PATH_SQL = """
+    SELECT l.slot, l.leg, CAST(strftime('%s', c.timestamp) AS INTEGER), c.close
+    FROM replay_legs l
+    JOIN expired_candles c
+      ON c.instrument_key = l.instrument_key AND c.interval = ?
+     AND c.timestamp >= l.start AND c.timestamp <= l.until
+"""
+
+
+def expired_instrument_key(exchange: str, exchange_token: str, expiry_date: str) -> str:
+    """Upstox key of an expired contract, e.g. NSE_FO|71706|03-10-2024"""
+    segment = "BSE_FO" if (exchange or "").upper() in ("BSE", "BFO", "BSE_FO") else "NSE_FO"
+    return f"{segment}|{exchange_token}|{datetime.strptime(expiry_date, '%Y-%m-%d'):%d-%m-%Y}"
+
+
+def _ist(day: date, hhmm: str) -> str:
+    """Timestamp in the format Upstox candles are stored in"""
+    return f"{day.isoformat()}T{hhmm}:00+05:30"
+
+
+def _ist_label(epoch: int) -> str:
+    return datetime.fromtimestamp(int(epoch), IST).strftime("%Y-%m-%d %H:%M")
+
+
+class OptionReplay:
+    """Mark-to-market replay of option strategies across many expiries"""
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+
+    def expiries(self, underlying: str, start_date: str, end_date: str) -> List[str]:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            rows = conn.execute(
+                """
+                SELECT DISTINCT expiry_date FROM expired_options
+                WHERE underlying_symbol = ? AND expiry_date BETWEEN ? AND ?
+                  AND option_type IN ('CE', 'PE')
+                ORDER BY expiry_date
+                """,
+                (underlying.upper(), start_date, end_date),
+            ).fetchall()
+        finally:
+            conn.close()
+        return [r[0] for r in rows]
+
+    def run(
+        self,
+        underlying: str,
+        legs: Sequence[LegSpec],
+        start_date: str,
+        end_date: str,
+        interval: Optional[str] = None,
+        entry_days_before: int = 3,
+        entry_time: str = "09:20",
+        exit_days_before: int = 0,
+        exit_time: Optional[str] = None,
+        profit_target: Optional[float] = None,
+        stop_loss: Optional[float] = None,
+        slippage: float = 0.0,
+        strategy_name: str = "Custom",
+        progress: Optional[Callable[[float, str], None]] = None,
+    ) -> Dict:
+        """
+        Replay one strategy on every expiry of `underlying` in [start_date, end_date].
+
+        Args:
+            legs: LegSpec list; offsets are index points from the ATM strike
+            interval: stored candle interval (default: finest available)
+            entry_days_before / entry_time: open at the first bar at or after this time
+            exit_days_before / exit_time: time exit (default: hold to the last bar)
+            profit_target: close when P&L >= profit_target x |entry premium|
+            stop_loss: close when P&L <= -stop_loss x |entry premium|
+            slippage: points per unit charged on every leg at entry and at exit
+            progress: optional callback(fraction, message)
+
+        Returns:
+            Summary (total_trades, win_rate, total_pnl, sharpe_ratio, ...) with
+            per-expiry `trades` and the expiries `skipped` for missing data
+        """
+        notify = progress or (lambda fraction, message: None)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            contracts = conn.execute(
+                """
+                SELECT expiry_date, option_type, strike_price, exchange, exchange_token
+                FROM expired_options
+                WHERE underlying_symbol = ? AND expiry_date BETWEEN ? AND ?
+                  AND option_type IN ('CE', 'PE') AND strike_price IS NOT NULL
+                ORDER BY expiry_date
+                """,
+                (underlying.upper(), start_date, end_date),
+            ).fetchall()
+            if not contracts:
+                return {"error": f"No expired {underlying} option contracts stored between "
+                                 f"{start_date} and {end_date}"}
+
+            expiries = sorted({c[0] for c in contracts})
+            interval = interval or self._finest_interval(conn, contracts)
+            if interval is None:
+                return {"error": f"No candles stored for {underlying} expired options"}
+            notify(0.1, f"Pricing entries for {len(expiries)} expiries ({interval})")
+
+            entries, skipped = self._select_legs(conn, contracts, expiries, legs, interval,
+                                                 entry_days_before, entry_time)
+            if not entries:
+                return {"error": "No expiry had prices for every leg at entry", "skipped": skipped}
+            notify(0.4, f"Loading {len(entries) * len(legs)} leg paths")
+
+            bar_ts, prices, n_bars = self._load_paths(conn, entries, interval)
+        finally:
+            conn.close()
+
+        notify(0.8, f"Replaying {len(entries)} trades")
+        result = self._evaluate(entries, legs, bar_ts, prices, n_bars, interval, exit_days_before,
+                                exit_time, profit_target, stop_loss, slippage)
+        result.update({
+            "strategy_name": strategy_name,
+            "underlying": underlying.upper(),
+            "interval": interval,
+            "start_date": start_date,
+            "end_date": end_date,
+            "skipped": skipped,
+        })
+        logger.info(f"🔁 Replayed {strategy_name} on {result['total_trades']} {underlying} expiries "
+                    f"({len(skipped)} skipped): P&L ₹{result['total_pnl']:,.2f}")
+        return result
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _finest_interval(conn: sqlite3.Connection, contracts: List[tuple]) -> Optional[str]:
+        for expiry, _, _, exchange, token in contracts[:: max(1, len(contracts) // 20)]:
+            rows = conn.execute(
+                "SELECT DISTINCT interval FROM expired_candles WHERE instrument_key = ?",
+                (expired_instrument_key(exchange, token, expiry),),
+            ).fetchall()
+            stored = {r[0] for r in rows}
+            for interval in INTERVALS:
+                if interval in stored:
+                    return interval
+        return None
+
+    @staticmethod
+    def _select_legs(conn, contracts, expiries, legs, interval, entry_days_before, entry_time):
+        """Entry bar, parity ATM and leg contracts per expiry"""
+        slot_of = {expiry: i for i, expiry in enumerate(expiries)}
+        entry_hhmm = "00:00" if interval == "day" else entry_time
+        probe = []
+        for expiry, option_type, strike, exchange, token in contracts:
+            expiry_day = date.fromisoformat(expiry)
+            probe.append((
+                slot_of[expiry], strike, option_type, expired_instrument_key(exchange, token, expiry),
+                _ist(expiry_day - timedelta(days=entry_days_before), entry_hhmm),
+                _ist(expiry_day, "23:59"),
+            ))
+        conn.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS replay_probe (
+                slot INTEGER, strike REAL, option_type TEXT, instrument_key TEXT, start TEXT, until TEXT)
+        """)
+        conn.execute("DELETE FROM replay_probe")
+        conn.executemany("INSERT INTO replay_probe VALUES (?, ?, ?, ?, ?, ?)", probe)
+        quotes: Dict[int, list] = {}
+        for row in conn.execute(PROBE_SQL, (interval,)):
+            quotes.setdefault(row[0], []).append(row[1:])
+
+        entries, skipped = [], []
+        for slot, expiry in enumerate(expiries):
+            rows = quotes.get(slot)
+            if not rows:
+                skipped.append({"expiry": expiry, "reason": "no candles at entry"})
+                continue
+            first = min(r[4] for r in rows)
+            start = min(r for r in rows if r[4] == first)[3]
+            book = {"CE": {}, "PE": {}}
+            for strike, option_type, key, _, epoch, close in rows:
+                if epoch <= first + ENTRY_TOLERANCE and close is not None:
+                    book[option_type][strike] = (close, key, epoch)
+
+            # Parity needs both quotes from the same bar; the ATM strike is the one nearest that spot
+            pairs = sorted(set(book["CE"]) & set(book["PE"]))
+            pairs = [k for k in pairs if book["CE"][k][2] == book["PE"][k][2]] or pairs
+            if not pairs:
+                skipped.append({"expiry": expiry, "reason": "no call/put pair priced at entry"})
+                continue
+            ref = min(pairs, key=lambda k: abs(book["CE"][k][0] - book["PE"][k][0]))
+            spot = ref + book["CE"][ref][0] - book["PE"][ref][0]
+            strikes = sorted(set(book["CE"]) | set(book["PE"]))
+            atm = min(strikes, key=lambda k: abs(k - spot))
+            spacing = float(np.median(np.diff(strikes))) if len(strikes) > 1 else 0.0
+
+            chosen = []
+            for leg in legs:
+                side = book[leg.option_type]
+                target = atm + leg.offset
+                strike = min(side, key=lambda k: abs(k - target)) if side else None
+                if strike is None or abs(strike - target) > spacing / 2 + 1e-9:
+                    break
+                chosen.append((strike, *side[strike][:2]))
+            if len(chosen) < len(legs):
+                skipped.append({"expiry": expiry, "reason": f"no {leg.option_type} near {target:g} at entry"})
+                continue
+
+            entries.append({
+                "expiry": expiry,
+                "start": start,
+                "entry_epoch": first,
+                "atm": atm,
+                "spot": spot,
+                "strikes": [c[0] for c in chosen],
+                "entry": [c[1] for c in chosen],
+                "keys": [c[2] for c in chosen],
+            })
+        return entries, skipped
+
+    @staticmethod
+    def _load_paths(conn, entries, interval):
+        """(slot, bar) timestamps and (slot, leg, bar) prices, forward-filled from entry"""
+        rows = [(slot, leg, key, entry["start"], _ist(date.fromisoformat(entry["expiry"]), "23:59"))
+                for slot, entry in enumerate(entries) for leg, key in enumerate(entry["keys"])]
+        conn.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS replay_legs (
+                slot INTEGER, leg INTEGER, instrument_key TEXT, start TEXT, until TEXT)
+        """)
+        conn.execute("DELETE FROM replay_legs")
+        conn.executemany("INSERT INTO replay_legs VALUES (?, ?, ?, ?, ?)", rows)
+        data = np.array(conn.execute(PATH_SQL, (interval,)).fetchall(), dtype=float).reshape(-1, 4)
+
+        n_slots, n_legs = len(entries), len(entries[0]["keys"])
+        slot = data[:, 0].astype(np.int64)
+        leg = data[:, 1].astype(np.int64)
+        epoch = data[:, 2].astype(np.int64)
+        entry_epoch = np.array([e["entry_epoch"] for e in entries], dtype=np.int64)
+
+        # Per-slot bar grid: union of the legs' timestamps, entry bar first
+        key = np.concatenate([slot << 32 | epoch, np.arange(n_slots, dtype=np.int64) << 32 | entry_epoch])
+        bars, inverse = np.unique(key, return_inverse=True)
+        bar_slot = bars >> 32
+        first = np.searchsorted(bar_slot, np.arange(n_slots))
+        position = np.arange(len(bars)) - first[bar_slot]
+        n_bars = np.bincount(bar_slot, minlength=n_slots)
+        width = int(n_bars.max())
+
+        bar_ts = np.zeros((n_slots, width), dtype=np.int64)
+        bar_ts[bar_slot, position] = bars & 0xFFFFFFFF
+        prices = np.full((n_slots, n_legs, width), np.nan)
+        prices[slot, leg, position[inverse[:len(data)]]] = data[:, 3]
+        prices[:, :, 0] = np.array([e["entry"] for e in entries], dtype=float)
+
+        # Forward-fill each leg along the bar axis
+        filled = np.where(np.isnan(prices), 0, np.arange(width))
+        np.maximum.accumulate(filled, axis=2, out=filled)
+        return bar_ts, np.take_along_axis(prices, filled, axis=2), n_bars
+
+    # ------------------------------------------------------------------
+    # Vectorized rules
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _evaluate(entries, legs, bar_ts, prices, n_bars, interval, exit_days_before, exit_time,
+                  profit_target, stop_loss, slippage):
+        n_slots, width = bar_ts.shape
+        weights = np.array([leg.weight for leg in legs], dtype=float)
+        entry = prices[:, :, 0]
+        cost = 2 * slippage * np.abs(weights).sum()
+
+        pnl = np.einsum("l,slt->st", weights, prices - entry[:, :, None])
+        premium = -(entry * weights).sum(axis=1)  # > 0: credit received
+        scale = np.abs(premium)[:, None]
+        bar = np.arange(width)
+        live = (bar[None, :] < n_bars[:, None]) & (bar[None, :] > 0)
+
+        stop_hit = live & (pnl <= -stop_loss * scale) if stop_loss is not None else np.zeros_like(live)
+        target_hit = live & (pnl >= profit_target * scale) if profit_target is not None else np.zeros_like(live)
+        time_hit = np.zeros_like(live)
+        if exit_time is not None or exit_days_before > 0:
+            hhmm = "00:00" if interval == "day" else (exit_time or DEFAULT_EXIT_TIME)
+            cut = np.array([
+                datetime.fromisoformat(_ist(date.fromisoformat(e["expiry"]) - timedelta(days=exit_days_before),
+                                            hhmm)).timestamp()
+                for e in entries
+            ])
+            time_hit = live & (bar_ts >= cut[:, None])
+
+        hit = stop_hit | target_hit | time_hit
+        exit_bar = np.where(hit.any(axis=1), hit.argmax(axis=1), n_bars - 1)
+        rows = np.arange(n_slots)
+        reason = np.select(
+            [stop_hit[rows, exit_bar], target_hit[rows, exit_bar], time_hit[rows, exit_bar]],
+            ["stop_loss", "profit_target", "time_exit"], "expiry",
+        )
+        held = bar[None, :] <= exit_bar[:, None]
+        final = pnl[rows, exit_bar] - cost
+        worst = np.where(held, pnl, np.inf).min(axis=1)
+        best = np.where(held, pnl, -np.inf).max(axis=1)
+
+        trades = []
+        for s, e in enumerate(entries):
+            trades.append({
+                "date": _ist_label(e["entry_epoch"]),
+                "expiry": e["expiry"],
+                "symbol": "/".join(f"{k:g}{leg.option_type}" for k, leg in zip(e["strikes"], legs)),
+                "side": "CREDIT" if premium[s] > 0 else "DEBIT",
+                "quantity": int(max(leg.qty for leg in legs)),
+                "price": round(float(abs(premium[s])) / max(leg.qty for leg in legs), 2),
+                "pnl": round(float(final[s]), 2),
+                "exit_time": _ist_label(bar_ts[s, exit_bar[s]]),
+                "exit_reason": str(reason[s]),
+                "spot": round(float(e["spot"]), 2),
+                "atm": e["atm"],
+                "max_profit": round(float(best[s]), 2),
+                "max_loss": round(float(worst[s]), 2),
+                "bars_held": int(exit_bar[s]),
+            })
+
+        equity = np.cumsum(final)
+        drawdown = float((np.maximum.accumulate(np.maximum(equity, 0)) - equity).max()) if n_slots else 0.0
+        sharpe = 0.0
+        if n_slots > 1 and final.std(ddof=1) > 0:
+            days = np.diff([date.fromisoformat(e["expiry"]).toordinal() for e in entries])
+            per_year = 365.25 / max(float(np.median(days)), 1.0)
+            sharpe = float(final.mean() / final.std(ddof=1) * math.sqrt(per_year))
+
+        wins = int((final > 0).sum())
+        return {
+            "total_trades": n_slots,
+            "winning_trades": wins,
+            "losing_trades": n_slots - wins,
+            "win_rate": wins / n_slots * 100 if n_slots else 0.0,
+            "total_pnl": round(float(final.sum()), 2),
+            "avg_pnl": round(float(final.mean()), 2) if n_slots else 0.0,
+            "sharpe_ratio": round(sharpe, 3),
+            "max_drawdown": round(drawdown, 2),
+            "equity_curve": [round(float(v), 2) for v in equity],
+            "trades": trades,
+        }
@@ -11,6 +11,8 @@ from datetime import datetime, timedelta
 import json
 import math
 
+from backend.data.database.migration_runner import ensure_schema
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -30,11 +32,12 @@ class PerformanceAnalytics:
 
     def __init__(self, db_path: str = "market_data.db"):
         self.db_path = db_path
-        self._init_analytics_db()
+        ensure_schema(self.db_path, "performance_analytics", self._init_analytics_db)
 
-    def _init_analytics_db(self):
+    @staticmethod
+    def _init_analytics_db(db_path: str):
         """Initialize analytics database tables"""
-        conn = sqlite3.connect(self.db_path)
+        conn = sqlite3.connect(db_path)
         cursor = conn.cursor()
 
         # Trade journal
@@ -3,22 +3,18 @@ Portfolio Analytics Dashboard Backend
 Sharpe ratio, max drawdown, win rate, equity curve calculations
 """
 
-import sys
+from __future__ import annotations
+
 import logging
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
-from pathlib import Path
-import numpy as np
-import pandas as pd
-
-sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from backend.data.database.database_validator import DatabaseValidator
+from backend.utils.helpers.lazy_import import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
 
-# Setup logger
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger(__name__)
 
 
@@ -346,6 +342,9 @@ def get_portfolio_analytics() -> PortfolioAnalytics:
 
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
     # Test analytics
     analytics = get_portfolio_analytics()
 
@@ -12,6 +12,8 @@ from decimal import Decimal
 import json
 import math
 
+from backend.data.database.migration_runner import ensure_schema
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -41,11 +43,12 @@ class RiskManager:
         self.max_daily_loss = max_daily_loss
         self.max_risk_per_trade = max_risk_per_trade
         self.circuit_breaker_triggered = False
-        self._init_risk_db()
+        ensure_schema(self.db_path, "risk_manager", self._init_risk_db)
 
-    def _init_risk_db(self):
+    @staticmethod
+    def _init_risk_db(db_path: str):
         """Initialize database tables for risk tracking"""
-        conn = sqlite3.connect(self.db_path)
+        conn = sqlite3.connect(db_path)
         cursor = conn.cursor()
 
         # Risk configurations table
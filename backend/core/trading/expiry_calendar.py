@@ -0,0 +1,180 @@
+"""
+NSE Expiry Calendar
+Precomputed weekly / monthly F&O expiries as integer day offsets
+
+Every date is an int64 count of days since 1970-01-01 (numpy's datetime64[D]
+view), so whole price histories can be matched against expiries with one
+np.searchsorted instead of walking the calendar day by day.
+
+Expiries fall on the weekday EXPIRY_WEEKDAYS gives for their date (Thursday
+until NSE moved derivative expiries to Tuesday from 1 Sep 2025); when that
+day is a market holiday (from the MarketInfoService `market_holidays` cache)
+the expiry moves to the previous trading day. The monthly expiry is the last
+weekly expiry of the month.
+
+Usage:
+    from backend.core.trading.expiry_calendar import get_expiry_calendar, to_day, from_day
+
+    cal = get_expiry_calendar()
+    cal.next_expiry(to_day("2026-02-02"))              # -> int day offset
+    from_day(cal.next_expiry(to_day("2026-02-02")))    # -> "2026-02-03"
+    cal.next_expiry(days_array, after=3)               # first expiry > day + 3, vectorized
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+from typing import Iterable, Optional, Sequence, Tuple
+
+from backend.utils.helpers.lazy_import import lazy_import
+
+np = lazy_import("numpy")
+
+logger = logging.getLogger("expiry_calendar")
+
+# (first date, weekday) pairs in date order; Monday=0
+EXPIRY_WEEKDAYS = (
+    ("2000-01-01", 3),  # Thursday
+    ("2025-09-01", 1),  # Tuesday (SEBI/NSE expiry day change)
+)
+FIRST_YEAR = 2000
+LAST_YEAR = 2050  # Calendar covers Jan 1 FIRST_YEAR .. Dec 31 LAST_YEAR
+HOLIDAY_EXCHANGE = "NSE"
+
+_EPOCH_WEEKDAY = 3  # 1970-01-01 was a Thursday
+
+
+def to_day(value):
+    """Date string / datetime / array of them -> int64 days since epoch"""
+    return np.asarray(value, dtype="datetime64[D]").astype(np.int64)
+
+
+def from_day(day) -> str:
+    """Int day offset -> 'YYYY-MM-DD'"""
+    return str(np.datetime64(int(day), "D"))
+
+
+def weekday_of(days):
+    """Monday=0 .. Sunday=6 for int day offsets"""
+    return (np.asarray(days) + _EPOCH_WEEKDAY) % 7
+
+
+def expiry_weekday_of(days, weekdays: Sequence[Tuple[str, int]] = EXPIRY_WEEKDAYS):
+    """Scheduled expiry weekday in force on each int day offset"""
+    starts = to_day([start for start, _ in weekdays])
+    idx = np.searchsorted(starts, np.asarray(days, dtype=np.int64), side="right") - 1
+    return np.asarray([weekday for _, weekday in weekdays])[np.maximum(idx, 0)]
+
+
+def load_cached_holidays(db_path: str = "market_data.db",
+                         exchange: str = HOLIDAY_EXCHANGE) -> list:
+    """
+    Holiday dates from the market_holidays cache filled by
+    MarketInfoService.get_market_holidays(). Rows without an exchange apply
+    to every exchange. Missing database/table -> no holidays.
+    """
+    try:
+        conn = sqlite3.connect(db_path)
+        try:
+            rows = conn.execute(
+                "SELECT DISTINCT date FROM market_holidays "
+                "WHERE exchange IS NULL OR exchange = ?",
+                (exchange,),
+            ).fetchall()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.warning(f"⚠️ No cached holidays in {db_path}: {e}")
+        return []
+    return [row[0][:10] for row in rows if row[0]]
+
+
+class ExpiryCalendar:
+    """Sorted weekly and monthly expiry arrays with vectorized lookups"""
+
+    def __init__(
+        self,
+        holidays: Iterable = (),
+        weekdays: Sequence[Tuple[str, int]] = EXPIRY_WEEKDAYS,
+        first_year: int = FIRST_YEAR,
+        last_year: int = LAST_YEAR,
+    ):
+        holidays = list(holidays)
+        self.holidays = np.unique(to_day(holidays)) if holidays else np.empty(0, dtype=np.int64)
+        self.weekdays = tuple(weekdays)
+        self.first_day = int(to_day(f"{first_year}-01-01"))
+        self.last_day = int(to_day(f"{last_year}-12-31"))
+
+        days = np.arange(self.first_day, self.last_day + 1, dtype=np.int64)
+        scheduled = days[weekday_of(days) == expiry_weekday_of(days, self.weekdays)]
+
+        months = scheduled.astype("datetime64[D]").astype("datetime64[M]")
+        last_in_month = np.append(months[1:] != months[:-1], True)
+
+        self.weekly = self._adjust(scheduled)
+        self.monthly = self._adjust(scheduled[last_in_month])
+
+    def _adjust(self, expiries):
+        """Move expiries that land on a holiday or weekend back to the previous trading day"""
+        expiries = expiries.copy()
+        closed = ~self.is_trading_day(expiries)
+        while closed.any():
+            expiries[closed] -= 1
+            closed = ~self.is_trading_day(expiries)
+        return expiries
+
+    def is_trading_day(self, days):
+        days = np.asarray(days, dtype=np.int64)
+        return (weekday_of(days) < 5) & ~np.isin(days, self.holidays)
+
+    def expiries(self, interval: str = "weekly"):
+        if interval == "weekly":
+            return self.weekly
+        if interval == "monthly":
+            return self.monthly
+        raise ValueError(f"Unknown expiry interval: {interval}")
+
+    def next_expiry(self, days, interval: str = "weekly", after: int = 0):
+        """
+        First expiry strictly later than day + after (scalar or array).
+        after=roll_days_before gives the first expiry that is still more
+        than that many days away.
+        """
+        expiries = self.expiries(interval)
+        targets = np.asarray(days, dtype=np.int64) + after
+        idx = np.searchsorted(expiries, targets, side="right")
+        if np.any(idx >= len(expiries)) or np.any(targets < self.first_day):
+            raise ValueError(
+                f"Date outside expiry calendar ({from_day(self.first_day)} .. {from_day(self.last_day)})"
+            )
+        return expiries[idx]
+
+    @classmethod
+    def from_db(cls, db_path: str = "market_data.db", exchange: str = HOLIDAY_EXCHANGE,
+                **kwargs) -> "ExpiryCalendar":
+        holidays = load_cached_holidays(db_path, exchange)
+        logger.info(f"📅 Expiry calendar built with {len(holidays)} cached {exchange} holidays")
+        return cls(holidays, **kwargs)
+
+
+_calendar: Optional[ExpiryCalendar] = None
+_calendar_lock = threading.Lock()
+
+
+def get_expiry_calendar(db_path: str = "market_data.db") -> ExpiryCalendar:
+    """Process-wide calendar, built from the holidays cache on first use"""
+    global _calendar
+    if _calendar is None:
+        with _calendar_lock:
+            if _calendar is None:
+                _calendar = ExpiryCalendar.from_db(db_path)
+    return _calendar
+
+
+def reset_expiry_calendar():
+    """Drop the cached calendar (e.g. after refreshing market holidays)"""
+    global _calendar
+    with _calendar_lock:
+        _calendar = None
@@ -3,22 +3,25 @@ Advanced Multi-Expiry Strategy Engine
 Calendar spreads, diagonal spreads, expiry rolling, and complex multi-leg strategies
 """
 
-import sys
+from __future__ import annotations
+
 import logging
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
-from pathlib import Path
-import pandas as pd
-import numpy as np
 from dataclasses import dataclass
 from enum import Enum
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
-# Setup basic logging (don't need full logger_config for this module)
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+from backend.core.trading.expiry_calendar import (
+    ExpiryCalendar,
+    from_day,
+    get_expiry_calendar,
+    to_day,
 )
+from backend.utils.helpers.lazy_import import lazy_import
+
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+
 logger = logging.getLogger("multi_expiry_strategies")
 
 
@@ -350,9 +353,16 @@ def create_double_calendar(
 class ExpiryRoller:
     """Manage expiry rolling strategies"""
 
-    def __init__(self):
+    def __init__(self, calendar: Optional[ExpiryCalendar] = None):
         self.active_positions = []
         self.roll_history = []
+        self._calendar = calendar
+
+    @property
+    def calendar(self) -> ExpiryCalendar:
+        if self._calendar is None:
+            self._calendar = get_expiry_calendar()
+        return self._calendar
 
     def should_roll(
         self, leg: MultiExpiryLeg, current_date: str, days_before_expiry: int = 3
@@ -418,32 +428,11 @@ class ExpiryRoller:
         return new_leg, roll_details
 
     def get_next_expiry(self, current_date: str, interval: str = "weekly") -> str:
-        """Get next expiry date based on interval"""
-        current_dt = datetime.strptime(current_date, "%Y-%m-%d")
-
-        if interval == "weekly":
-            # Find next Thursday (NIFTY weekly expiry)
-            days_ahead = (3 - current_dt.weekday()) % 7  # Thursday = 3
-            if days_ahead == 0:
-                days_ahead = 7  # Next week if today is Thursday
-            next_expiry = current_dt + timedelta(days=days_ahead)
-        elif interval == "monthly":
-            # Last Thursday of next month
-            next_month = current_dt.replace(day=28) + timedelta(days=4)
-            next_month = next_month.replace(day=1)
-            # Find last Thursday
-            days_in_month = (
-                next_month.replace(month=next_month.month % 12 + 1, day=1)
-                - timedelta(days=1)
-            ).day
-            for day in range(days_in_month, 0, -1):
-                test_date = next_month.replace(day=day)
-                if test_date.weekday() == 3:  # Thursday
-                    next_expiry = test_date
-                    break
-        else:
-            next_expiry = current_dt + timedelta(days=30)
+        """Next holiday-adjusted weekly/monthly expiry strictly after current_date"""
+        if interval in ("weekly", "monthly"):
+            return from_day(self.calendar.next_expiry(to_day(current_date), interval))
 
+        next_expiry = datetime.strptime(current_date, "%Y-%m-%d") + timedelta(days=30)
         return next_expiry.strftime("%Y-%m-%d")
 
 
@@ -452,11 +441,104 @@ class ExpiryRoller:
 # ============================================================================
 
 
+def _leg_pnl(leg: MultiExpiryLeg, spot, days, expiry, premium):
+    """MultiExpiryLeg.calculate_pnl over arrays of spot / day / expiry / premium"""
+    days_to_expiry = expiry - days
+    time_value = np.where(days_to_expiry > 0, premium * 0.3 * (days_to_expiry / 30), 0.0)
+
+    if leg.option_type == OptionType.CALL:
+        intrinsic = np.maximum(0, spot - leg.strike)
+    else:
+        intrinsic = np.maximum(0, leg.strike - spot)
+
+    sign = 1 if leg.action == ActionType.BUY else -1
+    return sign * (intrinsic + time_value - premium) * leg.qty
+
+
+def _leg_greeks(
+    leg: MultiExpiryLeg,
+    spot,
+    days,
+    expiry,
+    volatility: float = 0.20,
+    risk_free_rate: float = 0.06,
+) -> Dict[str, "np.ndarray"]:
+    """MultiExpiryLeg.get_greeks over arrays, with time to expiry as of each row's date"""
+    S, K = spot, leg.strike
+    size = (1 if leg.action == ActionType.BUY else -1) * leg.qty
+
+    try:
+        from scipy.stats import norm
+    except ImportError:
+        logger.warning("scipy not installed, returning approximate Greeks")
+        near = np.abs(S - K) < 100
+        if leg.option_type == OptionType.CALL:
+            delta = np.where(near, 0.5, np.where(S > K, 1.0, 0.1))
+        else:
+            delta = np.where(near, -0.5, np.where(S < K, -1.0, -0.1))
+        ones = np.ones(len(S))
+        return {
+            "delta": delta * size,
+            "gamma": 0.01 * size * ones,
+            "vega": 10 * size * ones,
+            "theta": -5 * size * ones,
+        }
+
+    T = np.maximum((expiry - days) / 365.0, 0.001)
+    sigma, r = volatility, risk_free_rate
+    d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
+    d2 = d1 - sigma * np.sqrt(T)
+    pdf_d1 = norm.pdf(d1)
+
+    if leg.option_type == OptionType.CALL:
+        delta = norm.cdf(d1)
+        theta = (-S * pdf_d1 * sigma / (2 * np.sqrt(T)) - r * K * np.exp(-r * T) * norm.cdf(d2)) / 365
+    else:
+        delta = -norm.cdf(-d1)
+        theta = (-S * pdf_d1 * sigma / (2 * np.sqrt(T)) + r * K * np.exp(-r * T) * norm.cdf(-d2)) / 365
+
+    return {
+        "delta": delta * size,
+        "gamma": pdf_d1 / (S * sigma * np.sqrt(T)) * size,
+        "vega": S * pdf_d1 * np.sqrt(T) / 100 * size,
+        "theta": theta * size,
+    }
+
+
 class MultiExpiryBacktester:
     """Backtest multi-expiry strategies with rolling"""
 
-    def __init__(self):
-        self.roller = ExpiryRoller()
+    def __init__(self, calendar: Optional[ExpiryCalendar] = None):
+        self.roller = ExpiryRoller(calendar)
+
+    def _roll_path(self, leg: MultiExpiryLeg, days, targets, roll_days_before: int):
+        """
+        Expiry and premium held on every row, plus the rows where a roll happens.
+
+        A leg rolls on the first row within roll_days_before of its expiry, into
+        the first calendar expiry more than roll_days_before away (targets).
+        From then on the leg always sits on targets[row - 1], so it rolls again
+        exactly where targets steps to the next expiry.
+        """
+        n = len(days)
+        expiry = np.full(n, int(to_day(leg.expiry_date)), dtype=np.int64)
+        premium = np.full(n, float(leg.premium))
+        if targets is None:
+            return expiry, premium, np.empty(0, dtype=np.int64)
+
+        due = np.flatnonzero(expiry - days <= roll_days_before)
+        if not len(due):
+            return expiry, premium, due
+
+        first = due[0]
+        rolled = np.zeros(n, dtype=bool)
+        rolled[first] = True
+        rolled[first + 1:] = targets[first + 1:] != targets[first:-1]
+        expiry[first:] = targets[first:]
+
+        # new_premium = old_premium * days_to_new_expiry / 7 at every roll
+        premium *= np.cumprod(np.where(rolled, (expiry - days) / 7, 1.0))
+        return expiry, premium, np.flatnonzero(rolled)
 
     def backtest_with_rolling(
         self,
@@ -469,68 +551,97 @@ class MultiExpiryBacktester:
     ) -> Dict:
         """
         Backtest strategy with automatic expiry rolling
-        """
-        results = []
-        current_strategy = strategy
 
-        # Filter historical data
+        P&L, Greeks, roll decisions and roll costs are computed for the whole
+        history at once: rows become arrays of day offsets and closes, and
+        each leg's rolled expiries come from one lookup into the expiry calendar.
+        """
         hist_filtered = historical_data[
             (historical_data["date"] >= start_date)
             & (historical_data["date"] <= end_date)
-        ].copy()
-
-        for idx, row in hist_filtered.iterrows():
-            current_date = row["date"]
-            underlying_price = row["close"]
-
-            # Check if any legs need rolling
-            if auto_roll:
-                rolled_legs = []
-                for leg in current_strategy.legs:
-                    if self.roller.should_roll(leg, current_date, roll_days_before):
-                        next_expiry = self.roller.get_next_expiry(current_date)
-                        new_leg, roll_info = self.roller.roll_position(
-                            leg, next_expiry, underlying_price, current_date
-                        )
-                        rolled_legs.append(new_leg)
-                    else:
-                        rolled_legs.append(leg)
-
-                # Update strategy with rolled legs
-                current_strategy = MultiExpiryStrategy(
-                    strategy.name, rolled_legs, underlying_price
-                )
-
-            # Calculate daily P&L
-            pnl = current_strategy.calculate_pnl(underlying_price, current_date)
-            greeks = current_strategy.get_portfolio_greeks(underlying_price)
-
-            results.append(
-                {
-                    "date": current_date,
-                    "underlying_price": underlying_price,
-                    "pnl": pnl,
-                    "delta": greeks["delta"],
-                    "gamma": greeks["gamma"],
-                    "vega": greeks["vega"],
-                    "theta": greeks["theta"],
-                }
-            )
+        ].sort_values("date", kind="stable")
+        if hist_filtered.empty:
+            raise ValueError(f"No historical data between {start_date} and {end_date}")
+
+        dates = hist_filtered["date"].tolist()
+        days = to_day(pd.to_datetime(hist_filtered["date"]).to_numpy())
+        spot = hist_filtered["close"].to_numpy(dtype=float)
+
+        targets = (
+            self.roller.calendar.next_expiry(days, after=roll_days_before)
+            if auto_roll
+            else None
+        )
 
-        # Calculate summary metrics
-        pnls = [r["pnl"] for r in results]
+        pnls = np.zeros(len(days))
+        greeks = {greek: np.zeros(len(days)) for greek in ("delta", "gamma", "vega", "theta")}
+        rolls = []
+
+        for leg_idx, leg in enumerate(strategy.legs):
+            expiry, premium, roll_rows = self._roll_path(leg, days, targets, roll_days_before)
+            pnls += _leg_pnl(leg, spot, days, expiry, premium)
+            for greek, values in _leg_greeks(leg, spot, days, expiry).items():
+                greeks[greek] += values
+
+            if not len(roll_rows):
+                continue
+
+            # Position held going into each roll row
+            old_expiry = np.concatenate(([int(to_day(leg.expiry_date))], expiry[:-1]))[roll_rows]
+            old_premium = np.concatenate(([float(leg.premium)], premium[:-1]))[roll_rows]
+            exit_pnl = _leg_pnl(leg, spot[roll_rows], days[roll_rows], old_expiry, old_premium)
+            new_premium = premium[roll_rows]
+
+            for i, row in enumerate(roll_rows.tolist()):
+                rolls.append((row, leg_idx, {
+                    "roll_date": dates[row],
+                    "old_expiry": from_day(old_expiry[i]),
+                    "new_expiry": from_day(expiry[row]),
+                    "old_strike": leg.strike,
+                    "new_strike": leg.strike,
+                    "exit_pnl": float(exit_pnl[i]),
+                    "old_premium": float(old_premium[i]),
+                    "new_premium": float(new_premium[i]),
+                    "roll_cost": float(new_premium[i] - exit_pnl[i]),  # Net cost/credit
+                }))
+
+        rolls.sort(key=lambda r: r[:2])
+        self.roller.roll_history.extend(details for _, _, details in rolls)
+        if rolls:
+            logger.info(f"Rolled {len(rolls)} legs over {len(dates)} days of {strategy.name}")
+
+        results = [
+            {
+                "date": date,
+                "underlying_price": price,
+                "pnl": pnl,
+                "delta": delta,
+                "gamma": gamma,
+                "vega": vega,
+                "theta": theta,
+            }
+            for date, price, pnl, delta, gamma, vega, theta in zip(
+                dates,
+                spot.tolist(),
+                pnls.tolist(),
+                greeks["delta"].tolist(),
+                greeks["gamma"].tolist(),
+                greeks["vega"].tolist(),
+                greeks["theta"].tolist(),
+            )
+        ]
 
         return {
             "daily_results": results,
             "roll_history": self.roller.roll_history,
             "summary": {
-                "total_pnl": sum(pnls),
-                "avg_daily_pnl": np.mean(pnls),
-                "max_pnl": max(pnls),
-                "min_pnl": min(pnls),
+                "total_pnl": float(pnls.sum()),
+                "avg_daily_pnl": float(pnls.mean()),
+                "max_pnl": float(pnls.max()),
+                "min_pnl": float(pnls.min()),
                 "sharpe_ratio": (
-                    np.mean(pnls) / np.std(pnls) * np.sqrt(252)
-                    if np.std(pnls) > 0
+                    float(pnls.mean() / pnls.std() * np.sqrt(252))
+                    if pnls.std() > 0
                     else 0
                 ),
                 "num_rolls": len(self.roller.roll_history),
@@ -542,6 +653,9 @@ class MultiExpiryBacktester:
 
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
     print("Testing Multi-Expiry Strategy Engine...")
 
     # Test calendar spread
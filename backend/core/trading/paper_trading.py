@@ -14,6 +14,7 @@ import uuid
 from backend.core.risk.manager import RiskManager
 from backend.core.analytics.performance import PerformanceAnalytics
 from backend.data.database.database_validator import DatabaseValidator
+from backend.data.database.migration_runner import ensure_schema
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -62,12 +63,13 @@ class PaperTradingSystem:
         self.analytics = PerformanceAnalytics(db_path=db_path)
         self.validator = DatabaseValidator(db_path=db_path)
 
-        self._init_paper_trading_db()
+        ensure_schema(self.db_path, "paper_trading", self._init_paper_trading_db)
         self._init_portfolio()
 
-    def _init_paper_trading_db(self):
+    @staticmethod
+    def _init_paper_trading_db(db_path: str):
         """Initialize paper trading database tables"""
-        conn = sqlite3.connect(self.db_path)
+        conn = sqlite3.connect(db_path)
         cursor = conn.cursor()
 
         # Paper trading portfolio
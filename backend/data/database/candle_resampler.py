@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Candle Resampler
+----------------
+Derives coarser timeframes locally from the finest stored bars, so
+backtests and charts never re-download them from Upstox.
+
+Sources (base bars):
+- ``intraday``: ``option_equity_intraday_ohlcv`` (5-minute, intraday poller)
+- ``candles``:  ``candles_new`` rows with timeframe '1m' (downloader)
+
+Intraday buckets are aligned to the NSE session (09:15 IST open, bars
+outside 09:15-15:30 are dropped), so 15m/30m/1h candles match the
+exchange's (the last hour bar is 15:15-15:30). Daily candles start at IST
+midnight, weekly ones on Monday.
+
+Results are materialized in ``candles_resampled`` as a cascade — each
+timeframe is folded from the largest finer one that nests into it (5m ->
+15m -> 30m -> 1h -> 1d -> 1w) with vectorized NumPy (``reduceat`` per
+bucket). ``refresh()`` is incremental: only base rows with an id above the
+stored watermark are read, and only the buckets they touch are rebuilt.
+Other timeframes (3m, 10m, 2h) are folded on read from the coarsest stored
+level that nests into them; ``supported_timeframes()`` lists what a source
+can serve.
+
+Usage:
+    from backend.data.database.candle_resampler import CandleResampler
+
+    resampler = CandleResampler()
+    resampler.refresh("intraday")                          # after each poll
+    bars = resampler.get_candles("NSE_EQ|INE002A01018", "1h", source="intraday")
+
+    python backend/data/database/candle_resampler.py --source candles
+    python backend/data/database/candle_resampler.py --source intraday --rebuild
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+import sqlite3
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from backend.utils.helpers.lazy_import import lazy_import
+
+np = lazy_import("numpy")
+
+# Configuration
+DB_PATH = "market_data.db"
+SCHEMA_PATH = Path(__file__).parent.parent.parent / "database" / "schema" / "candle_resample_schema.sql"
+KEY_BATCH = 100                   # Instruments resampled per query
+IST = timezone(timedelta(hours=5, minutes=30))
+
+IST_OFFSET = 19800                # Seconds east of UTC
+SESSION_OPEN = 9 * 3600 + 15 * 60     # 09:15 IST, seconds after midnight
+SESSION_CLOSE = 15 * 3600 + 30 * 60   # 15:30 IST
+DAY = 86400
+WEEK = 7 * DAY
+
+TIMEFRAMES = {
+    "1m": 60, "3m": 180, "5m": 300, "10m": 600, "15m": 900, "30m": 1800,
+    "1h": 3600, "2h": 7200, "1d": DAY, "1w": WEEK,
+}
+MATERIALIZED_TIMEFRAMES = ("5m", "15m", "30m", "1h", "1d", "1w")
+
+
+@dataclass(frozen=True)
+class CandleSource:
+    table: str
+    base_timeframe: str
+    ts_sql: str                   # Expression on alias ``b`` giving epoch seconds
+    iso_timestamps: bool          # ``b.timestamp`` holds ISO strings (vs epoch ints)
+    filter_sql: str = "1=1"
+
+    def native(self, epoch: int):
+        """Epoch seconds in the table's own timestamp format (for index range scans)"""
+        if self.iso_timestamps:
+            return datetime.fromtimestamp(int(epoch), IST).isoformat()
+        return int(epoch)
+
+
+SOURCES = {
+    "intraday": CandleSource(
+        table="option_equity_intraday_ohlcv",
+        base_timeframe="5m",
+        ts_sql="CAST(strftime('%s', b.timestamp) AS INTEGER)",
+        iso_timestamps=True,
+    ),
+    "candles": CandleSource(
+        table="candles_new",
+        base_timeframe="1m",
+        ts_sql="b.timestamp",
+        iso_timestamps=False,
+        filter_sql="b.timeframe = '1m'",
+    ),
+}
+
+logger = logging.getLogger("CandleResampler")
+
+
+def bucket_start(ts, timeframe: str):
+    """Bucket start (epoch seconds) of each ts; works on ints and NumPy arrays"""
+    seconds = TIMEFRAMES[timeframe]
+    local = ts + IST_OFFSET
+    midnight = local - local % DAY
+    if seconds >= WEEK:
+        weekday = (midnight // DAY + 3) % 7       # 1970-01-01 was a Thursday
+        return midnight - weekday * DAY - IST_OFFSET
+    if seconds >= DAY:
+        return midnight - IST_OFFSET
+    since_open = local - midnight - SESSION_OPEN
+    return midnight + SESSION_OPEN + since_open // seconds * seconds - IST_OFFSET
+
+
+def in_session(ts):
+    """True for bars opening inside 09:15-15:30 IST"""
+    t = (ts + IST_OFFSET) % DAY
+    return (t >= SESSION_OPEN) & (t < SESSION_CLOSE)
+
+
+def nests(fine: str, coarse: str) -> bool:
+    """Every ``coarse`` bucket is an exact union of ``fine`` buckets"""
+    f, c = TIMEFRAMES[fine], TIMEFRAMES[coarse]
+    if f >= c:
+        return False
+    if c >= DAY:
+        return f <= DAY
+    return c % f == 0
+
+
+def supported_timeframes(source: str, materialized: Sequence[str] = MATERIALIZED_TIMEFRAMES) -> List[str]:
+    """Timeframes a source can serve: its base, the materialized levels and anything they nest into"""
+    base = SOURCES[source].base_timeframe
+    stored = [base] + [tf for tf in materialized if nests(base, tf)]
+    return [tf for tf in sorted(TIMEFRAMES, key=TIMEFRAMES.get)
+            if tf in stored or any(nests(parent, tf) for parent in stored)]
+
+
+def resample_ohlcv(group, ts, open_, high, low, close, volume, bars, timeframe: str):
+    """
+    Fold bars (sorted by group, then ts) into ``timeframe`` buckets.
+    Returns (group, ts, open, high, low, close, volume, bars) arrays, one entry per bucket.
+    """
+    bucket = bucket_start(ts, timeframe)
+    n = len(ts)
+    first = np.ones(n, dtype=bool)
+    first[1:] = (group[1:] != group[:-1]) | (bucket[1:] != bucket[:-1])
+    starts = np.flatnonzero(first)
+    ends = np.append(starts[1:], n) - 1
+    return (
+        group[starts],
+        bucket[starts],
+        open_[starts],
+        np.maximum.reduceat(high, starts),
+        np.minimum.reduceat(low, starts),
+        close[ends],
+        np.add.reduceat(np.nan_to_num(volume), starts),
+        np.add.reduceat(bars, starts),
+    )
+
+
+class CandleResampler:
+    """Materialize and serve multi-timeframe candles from local base bars."""
+
+    def __init__(self, db_path: str = DB_PATH, timeframes: Sequence[str] = MATERIALIZED_TIMEFRAMES):
+        self.db_path = db_path
+        self.timeframes = tuple(timeframes)
+
+    def connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL;")
+        return conn
+
+    @staticmethod
+    def init_schema(conn: sqlite3.Connection):
+        with open(SCHEMA_PATH, "r") as f:
+            conn.executescript(f.read())
+
+    def levels(self, source: str) -> List[Tuple[str, str]]:
+        """(timeframe, parent timeframe) in build order for a source"""
+        base = SOURCES[source].base_timeframe
+        built = [base]
+        levels = []
+        for tf in sorted(self.timeframes, key=TIMEFRAMES.get):
+            parents = [p for p in built if nests(p, tf)]
+            if not parents:
+                continue
+            levels.append((tf, max(parents, key=TIMEFRAMES.get)))
+            built.append(tf)
+        return levels
+
+    # ------------------------------------------------------------------
+    # Materialization
+    # ------------------------------------------------------------------
+    def _load(self, conn: sqlite3.Connection, source: str, parent: str, starts: List[Tuple[str, int]]):
+        """Parent bars at or after each (instrument_key, bucket start), as (keys, group, ts, matrix)"""
+        src = SOURCES[source]
+        values = ", ".join("(?, ?)" for _ in starts)
+        if parent == src.base_timeframe:
+            params = [v for key, t in starts for v in (key, src.native(t))]
+            rows = conn.execute(f"""
+                WITH w(k, t) AS (VALUES {values})
+                SELECT b.instrument_key, {src.ts_sql} AS ts, b.open, b.high, b.low, b.close, b.volume, 1
+                FROM w JOIN {src.table} b ON b.instrument_key = w.k AND b.timestamp >= w.t
+                WHERE {src.filter_sql}
+                ORDER BY b.instrument_key, ts
+            """, params).fetchall()
+        else:
+            rows = self._load_resampled(conn, source, parent, starts)
+        return self._to_arrays(rows, session_only=parent == src.base_timeframe)
+
+    @staticmethod
+    def _load_resampled(conn: sqlite3.Connection, source: str, timeframe: str, starts: List[Tuple[str, int]]):
+        values = ", ".join("(?, ?)" for _ in starts)
+        return conn.execute(f"""
+            WITH w(k, t) AS (VALUES {values})
+            SELECT r.instrument_key, r.ts, r.open, r.high, r.low, r.close, r.volume, r.bars
+            FROM w JOIN candles_resampled r
+                 ON r.instrument_key = w.k AND r.ts >= w.t
+            WHERE r.source = ? AND r.timeframe = ?
+            ORDER BY r.instrument_key, r.ts
+        """, [v for pair in starts for v in pair] + [source, timeframe]).fetchall()
+
+    @staticmethod
+    def _to_arrays(rows, session_only: bool):
+        if not rows:
+            return [], None, None, None
+        ts = np.array([r[1] for r in rows], dtype=np.int64)
+        matrix = np.array([r[2:] for r in rows], dtype=float)   # open, high, low, close, volume, bars
+        keys_col = [r[0] for r in rows]
+        if session_only:
+            mask = in_session(ts)
+            ts, matrix = ts[mask], matrix[mask]
+            keys_col = [k for k, keep in zip(keys_col, mask) if keep]
+            if not keys_col:
+                return [], None, None, None
+        boundaries = np.fromiter(
+            (keys_col[i] != keys_col[i - 1] for i in range(1, len(keys_col))), dtype=bool, count=len(keys_col) - 1
+        )
+        group = np.concatenate(([0], np.cumsum(boundaries))).astype(np.intp)
+        keys = [keys_col[0]] + [keys_col[i + 1] for i in np.flatnonzero(boundaries)]
+        return keys, group, ts, matrix
+
+    def _build_level(self, conn: sqlite3.Connection, source: str, timeframe: str, parent: str,
+                     dirty: Dict[str, int]) -> int:
+        starts = [(key, int(bucket_start(ts, timeframe))) for key, ts in dirty.items()]
+        keys, group, ts, m = self._load(conn, source, parent, starts)
+        if not keys:
+            return 0
+        out = resample_ohlcv(group, ts, m[:, 0], m[:, 1], m[:, 2], m[:, 3], m[:, 4], m[:, 5], timeframe)
+        g, b, o, h, l, c, v, n = out
+        conn.executemany("""
+            INSERT OR REPLACE INTO candles_resampled
+                (source, instrument_key, timeframe, ts, open, high, low, close, volume, bars)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (source, keys[gi], timeframe, int(bi), float(oi), float(hi), float(li), float(ci), int(vi), int(ni))
+            for gi, bi, oi, hi, li, ci, vi, ni in zip(g, b, o, h, l, c, v, n)
+        ])
+        return len(g)
+
+    def has_new_bars(self, source: str = "intraday") -> bool:
+        """Cheap check: does the source table hold base bars newer than the last refresh?"""
+        src = SOURCES[source]
+        try:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, timeout=30)
+        except sqlite3.OperationalError:
+            return False
+        try:
+            try:
+                row = conn.execute("SELECT last_id FROM candle_resample_state WHERE source = ?", (source,)).fetchone()
+            except sqlite3.OperationalError:
+                row = None  # Never resampled
+            last_id = row[0] if row else 0
+            return conn.execute(f"""
+                SELECT 1 FROM {src.table} b WHERE b.id > ? AND {src.filter_sql} LIMIT 1
+            """, (last_id,)).fetchone() is not None
+        except sqlite3.OperationalError:
+            return False  # Base table not created yet
+        finally:
+            conn.close()
+
+    def refresh(self, source: str = "intraday") -> Dict:
+        """Fold base bars added since the last refresh into every materialized timeframe"""
+        src = SOURCES[source]
+        started = time.perf_counter()
+        stats = {"source": source, "new_bars": 0, "instruments": 0, "candles_written": 0}
+        conn = self.connect()
+        try:
+            self.init_schema(conn)
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (src.table,)).fetchone() is None:
+                return stats
+
+            row = conn.execute("SELECT last_id FROM candle_resample_state WHERE source = ?", (source,)).fetchone()
+            last_id = row[0] if row else 0
+            new = conn.execute(f"""
+                SELECT b.instrument_key, {src.ts_sql}, b.id FROM {src.table} b
+                WHERE b.id > ? AND {src.filter_sql}
+            """, (last_id,)).fetchall()
+            if not new:
+                return stats
+
+            # Earliest new bar per instrument: every bucket from there on is rebuilt
+            dirty: Dict[str, int] = {}
+            for key, ts, _ in new:
+                if ts is not None and (key not in dirty or ts < dirty[key]):
+                    dirty[key] = ts
+
+            keys = sorted(dirty)
+            for lo in range(0, len(keys), KEY_BATCH):
+                batch = {k: dirty[k] for k in keys[lo:lo + KEY_BATCH]}
+                for timeframe, parent in self.levels(source):
+                    stats["candles_written"] += self._build_level(conn, source, timeframe, parent, batch)
+
+            conn.execute("""
+                INSERT OR REPLACE INTO candle_resample_state (source, last_id, updated_at)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+            """, (source, max(r[2] for r in new)))
+            conn.commit()
+
+            stats.update(new_bars=len(new), instruments=len(dirty))
+        finally:
+            conn.close()
+
+        stats["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        logger.info(f"🕯️ Resampled {source}: {stats['new_bars']:,} new bars across {stats['instruments']} "
+                    f"instruments -> {stats['candles_written']:,} candles ({stats['duration_ms']} ms)")
+        return stats
+
+    def rebuild(self, source: str = "intraday") -> Dict:
+        """Drop the materialized candles of a source and rebuild them from all base bars"""
+        conn = self.connect()
+        try:
+            self.init_schema(conn)
+            conn.execute("DELETE FROM candles_resampled WHERE source = ?", (source,))
+            conn.execute("DELETE FROM candle_resample_state WHERE source = ?", (source,))
+            conn.commit()
+        finally:
+            conn.close()
+        return self.refresh(source)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def supported_timeframes(self, source: str) -> List[str]:
+        return supported_timeframes(source, self.timeframes)
+
+    def get_candles(self, instrument_key: str, timeframe: str, source: str = "intraday",
+                    start: Optional[int] = None, end: Optional[int] = None) -> List[Tuple]:
+        """(ts, open, high, low, close, volume) rows in [start, end], oldest first"""
+        src = SOURCES[source]
+        start = 0 if start is None else int(start)
+        end = int(time.time()) + WEEK if end is None else int(end)
+        if timeframe != src.base_timeframe and timeframe not in self.timeframes:
+            return self._resample_on_read(instrument_key, timeframe, source, start, end)
+        try:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, timeout=30)
+        except sqlite3.OperationalError:
+            return []
+        try:
+            if timeframe == src.base_timeframe:
+                return conn.execute(f"""
+                    SELECT {src.ts_sql} AS ts, b.open, b.high, b.low, b.close, b.volume
+                    FROM {src.table} b
+                    WHERE b.instrument_key = ? AND b.timestamp >= ? AND b.timestamp <= ? AND {src.filter_sql}
+                    ORDER BY b.timestamp
+                """, (instrument_key, src.native(start), src.native(end))).fetchall()
+            return conn.execute("""
+                SELECT ts, open, high, low, close, volume FROM candles_resampled
+                WHERE source = ? AND instrument_key = ? AND timeframe = ? AND ts BETWEEN ? AND ?
+                ORDER BY ts
+            """, (source, instrument_key, timeframe, start, end)).fetchall()
+        except sqlite3.OperationalError:
+            return []  # Base or resampled table not created yet
+        finally:
+            conn.close()
+
+    def _resample_on_read(self, instrument_key: str, timeframe: str, source: str,
+                          start: int, end: int) -> List[Tuple]:
+        """Fold a non-materialized timeframe from the coarsest stored level that nests into it"""
+        src = SOURCES[source]
+        stored = [src.base_timeframe] + [tf for tf, _ in self.levels(source)]
+        parents = [tf for tf in stored if nests(tf, timeframe)]
+        if not parents:
+            raise ValueError(f"Timeframe {timeframe} cannot be built from {source} bars; "
+                             f"use one of {self.supported_timeframes(source)}")
+        parent = max(parents, key=TIMEFRAMES.get)
+        rows = self.get_candles(instrument_key, parent, source, start, end)
+        keys, group, ts, m = self._to_arrays(
+            [(instrument_key, *row, 1) for row in rows], session_only=parent == src.base_timeframe
+        )
+        if not keys:
+            return []
+        _, b, o, h, l, c, v, _ = resample_ohlcv(group, ts, m[:, 0], m[:, 1], m[:, 2], m[:, 3], m[:, 4], m[:, 5],
+                                                timeframe)
+        return [
+            (int(bi), float(oi), float(hi), float(li), float(ci), int(vi))
+            for bi, oi, hi, li, ci, vi in zip(b, o, h, l, c, v)
+            if bi >= start
+        ]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    parser = argparse.ArgumentParser(description="Materialize multi-timeframe candles from stored base bars")
+    parser.add_argument("--source", choices=sorted(SOURCES), default="intraday")
+    parser.add_argument("--rebuild", action="store_true", help="Drop and rebuild all candles of the source")
+    args = parser.parse_args()
+
+    resampler = CandleResampler()
+    print(resampler.rebuild(args.source) if args.rebuild else resampler.refresh(args.source))
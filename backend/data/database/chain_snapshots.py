@@ -0,0 +1,263 @@
+"""
+Option Chain Snapshot Store
+---------------------------
+As-of access to intraday option chain snapshots.
+
+The poller writes every cycle twice: the wide ``optionchain_intrday_schema``
+row set (kept for rollups/archiving) and a narrow copy keyed by
+``(underlying_key, expiry_date, ts, strike_price)`` with ``ts`` in epoch
+seconds, plus one summary row per snapshot holding the aggregates (total
+CE/PE OI and volume, PCR, max-pain) computed at write time.
+
+Both tables are WITHOUT ROWID, so a snapshot is one contiguous primary-key
+range and "latest snapshot at or before T" is a single index probe on the
+summary table — no string timestamp scans over the whole day.
+
+Usage:
+    from backend.data.database.chain_snapshots import ChainSnapshotStore
+
+    store = ChainSnapshotStore("market_data.db")
+    chain = store.chain_as_of("NSE_INDEX|Nifty 50", "2026-02-26", "2026-02-10T11:00:00")
+    delta = store.oi_change("NSE_INDEX|Nifty 50", "2026-02-26", t1, t2)
+    pcr = store.summary_series("NSE_INDEX|Nifty 50", "2026-02-26", day_start, day_end)
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import logging
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from backend.utils.helpers.lazy_import import lazy_import
+
+np = lazy_import("numpy")
+
+# Configuration
+DB_PATH = "market_data.db"
+SCHEMA_PATH = Path(__file__).parent.parent.parent / "database" / "schema" / "option_chain_snapshot_schema.sql"
+
+SNAPSHOT_COLUMNS = (
+    "strike_price",
+    "ce_ltp", "ce_oi", "ce_volume", "ce_iv", "ce_delta",
+    "pe_ltp", "pe_oi", "pe_volume", "pe_iv", "pe_delta",
+)
+SUMMARY_COLUMNS = (
+    "ts", "spot", "strikes", "total_ce_oi", "total_pe_oi",
+    "total_ce_volume", "total_pe_volume", "pcr_oi", "pcr_volume", "max_pain",
+)
+
+Timestamp = Union[int, float, str, datetime]
+
+logger = logging.getLogger("ChainSnapshotStore")
+
+
+def to_epoch(value: Timestamp) -> int:
+    """Epoch seconds from an int/float, datetime, or ISO string (naive = local time)."""
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    if isinstance(value, date):
+        return int(datetime(value.year, value.month, value.day).timestamp())
+    raise TypeError(f"Unsupported timestamp: {value!r}")
+
+
+def max_pain(strikes: Sequence[float], ce_oi: Sequence[float], pe_oi: Sequence[float]) -> Optional[float]:
+    """
+    Settlement strike at which option writers pay out the least.
+
+    Payout at settlement S is sum_k ce_oi[k]*max(S-k, 0) + pe_oi[k]*max(k-S, 0),
+    evaluated for every listed strike at once as an (n x n) matrix.
+    """
+    k = np.asarray(strikes, dtype=float)
+    if k.size == 0:
+        return None
+    ce = np.nan_to_num(np.asarray(ce_oi, dtype=float))
+    pe = np.nan_to_num(np.asarray(pe_oi, dtype=float))
+    moneyness = k[:, None] - k[None, :]                 # settlement (rows) - strike (cols)
+    payout = np.maximum(moneyness, 0) @ ce + np.maximum(-moneyness, 0) @ pe
+    return float(k[int(np.argmin(payout))])
+
+
+def chain_aggregates(rows: Sequence[Sequence[Any]]) -> Dict[str, Any]:
+    """Per-snapshot aggregates from rows laid out as ``SNAPSHOT_COLUMNS``."""
+    if not rows:
+        return {"strikes": 0, "total_ce_oi": 0, "total_pe_oi": 0, "total_ce_volume": 0,
+                "total_pe_volume": 0, "pcr_oi": None, "pcr_volume": None, "max_pain": None}
+
+    m = np.array([[np.nan if v is None else v for v in r] for r in rows], dtype=float)
+    strike, ce_oi, ce_vol, pe_oi, pe_vol = m[:, 0], m[:, 2], m[:, 3], m[:, 7], m[:, 8]
+    totals = [int(np.nansum(col)) for col in (ce_oi, pe_oi, ce_vol, pe_vol)]
+    total_ce_oi, total_pe_oi, total_ce_vol, total_pe_vol = totals
+    return {
+        "strikes": len(rows),
+        "total_ce_oi": total_ce_oi,
+        "total_pe_oi": total_pe_oi,
+        "total_ce_volume": total_ce_vol,
+        "total_pe_volume": total_pe_vol,
+        "pcr_oi": round(total_pe_oi / total_ce_oi, 4) if total_ce_oi else None,
+        "pcr_volume": round(total_pe_vol / total_ce_vol, 4) if total_ce_vol else None,
+        "max_pain": max_pain(strike, ce_oi, pe_oi),
+    }
+
+
+class ChainSnapshotStore:
+    """Write and query epoch-keyed option chain snapshots."""
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+
+    def connect(self, readonly: bool = False) -> sqlite3.Connection:
+        if readonly:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, timeout=30)
+        else:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL;")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def init_schema(conn: sqlite3.Connection):
+        with open(SCHEMA_PATH, "r") as f:
+            conn.executescript(f.read())
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    @staticmethod
+    def save_snapshot(conn: sqlite3.Connection, underlying_key: str, expiry: str, ts: int,
+                      rows: Sequence[Sequence[Any]], spot: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Insert one snapshot (rows laid out as ``SNAPSHOT_COLUMNS``) and its summary.
+        Runs inside the caller's transaction; returns the computed aggregates.
+        """
+        conn.executemany(f"""
+            INSERT OR REPLACE INTO optionchain_snapshot (
+                underlying_key, expiry_date, ts, {", ".join(SNAPSHOT_COLUMNS)}
+            ) VALUES (?, ?, ?, {", ".join("?" * len(SNAPSHOT_COLUMNS))})
+        """, [(underlying_key, expiry, ts, *r) for r in rows if r[0] is not None])
+
+        agg = chain_aggregates([r for r in rows if r[0] is not None])
+        conn.execute(f"""
+            INSERT OR REPLACE INTO optionchain_snapshot_summary (
+                underlying_key, expiry_date, {", ".join(SUMMARY_COLUMNS)}
+            ) VALUES (?, ?, {", ".join("?" * len(SUMMARY_COLUMNS))})
+        """, (underlying_key, expiry, ts, spot, *(agg[c] for c in SUMMARY_COLUMNS[2:])))
+        return agg
+
+    def prune(self, before: Timestamp) -> int:
+        """Drop per-strike snapshot rows older than ``before`` (summaries are kept)."""
+        conn = self.connect()
+        try:
+            cur = conn.execute("DELETE FROM optionchain_snapshot WHERE ts < ?", (to_epoch(before),))
+            conn.commit()
+            return cur.rowcount
+        finally:
+            conn.close()
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _resolve_ts(conn: sqlite3.Connection, underlying_key: str, expiry: str, at: Timestamp) -> Optional[int]:
+        """Latest snapshot ts at or before ``at`` (one summary primary-key probe)."""
+        row = conn.execute("""
+            SELECT MAX(ts) FROM optionchain_snapshot_summary
+            WHERE underlying_key = ? AND expiry_date = ? AND ts <= ?
+        """, (underlying_key, expiry, to_epoch(at))).fetchone()
+        return row[0] if row else None
+
+    def snapshot_times(self, underlying_key: str, expiry: str,
+                       start: Timestamp = 0, end: Optional[Timestamp] = None) -> List[int]:
+        """Snapshot timestamps in [start, end]."""
+        conn = self.connect(readonly=True)
+        try:
+            rows = conn.execute("""
+                SELECT ts FROM optionchain_snapshot_summary
+                WHERE underlying_key = ? AND expiry_date = ? AND ts BETWEEN ? AND ?
+                ORDER BY ts
+            """, (underlying_key, expiry, to_epoch(start),
+                  to_epoch(end) if end is not None else 2 ** 62)).fetchall()
+            return [r[0] for r in rows]
+        finally:
+            conn.close()
+
+    def chain_as_of(self, underlying_key: str, expiry: str, at: Timestamp) -> Optional[Dict[str, Any]]:
+        """
+        The chain as it stood at ``at``: summary of the latest snapshot at or
+        before it plus its strikes, or None if there is no earlier snapshot.
+        """
+        conn = self.connect(readonly=True)
+        try:
+            ts = self._resolve_ts(conn, underlying_key, expiry, at)
+            if ts is None:
+                return None
+            summary = conn.execute(f"""
+                SELECT {", ".join(SUMMARY_COLUMNS)} FROM optionchain_snapshot_summary
+                WHERE underlying_key = ? AND expiry_date = ? AND ts = ?
+            """, (underlying_key, expiry, ts)).fetchone()
+            strikes = conn.execute(f"""
+                SELECT {", ".join(SNAPSHOT_COLUMNS)} FROM optionchain_snapshot
+                WHERE underlying_key = ? AND expiry_date = ? AND ts = ?
+                ORDER BY strike_price
+            """, (underlying_key, expiry, ts)).fetchall()
+            return {
+                "underlying_key": underlying_key,
+                "expiry_date": expiry,
+                **dict(summary),
+                "chain": [dict(r) for r in strikes],
+            }
+        finally:
+            conn.close()
+
+    def oi_change(self, underlying_key: str, expiry: str, t1: Timestamp, t2: Timestamp) -> Optional[Dict[str, Any]]:
+        """
+        Per-strike OI and LTP change between the snapshots as of ``t1`` and ``t2``.
+        Strikes missing at ``t1`` count from zero OI.
+        """
+        conn = self.connect(readonly=True)
+        try:
+            ts1 = self._resolve_ts(conn, underlying_key, expiry, t1)
+            ts2 = self._resolve_ts(conn, underlying_key, expiry, t2)
+            if ts2 is None:
+                return None
+            rows = conn.execute("""
+                SELECT b.strike_price,
+                       b.ce_oi, b.ce_oi - COALESCE(a.ce_oi, 0) AS ce_oi_change,
+                       b.pe_oi, b.pe_oi - COALESCE(a.pe_oi, 0) AS pe_oi_change,
+                       b.ce_ltp, b.ce_ltp - a.ce_ltp AS ce_ltp_change,
+                       b.pe_ltp, b.pe_ltp - a.pe_ltp AS pe_ltp_change
+                FROM optionchain_snapshot b
+                LEFT JOIN optionchain_snapshot a
+                       ON a.underlying_key = b.underlying_key AND a.expiry_date = b.expiry_date
+                      AND a.ts = ? AND a.strike_price = b.strike_price
+                WHERE b.underlying_key = ? AND b.expiry_date = ? AND b.ts = ?
+                ORDER BY b.strike_price
+            """, (ts1 if ts1 is not None else -1, underlying_key, expiry, ts2)).fetchall()
+            return {
+                "underlying_key": underlying_key,
+                "expiry_date": expiry,
+                "from_ts": ts1,
+                "to_ts": ts2,
+                "strikes": [dict(r) for r in rows],
+            }
+        finally:
+            conn.close()
+
+    def summary_series(self, underlying_key: str, expiry: str,
+                       start: Timestamp, end: Timestamp) -> List[Dict[str, Any]]:
+        """Per-snapshot aggregates (PCR, max-pain, totals) in [start, end]."""
+        conn = self.connect(readonly=True)
+        try:
+            rows = conn.execute(f"""
+                SELECT {", ".join(SUMMARY_COLUMNS)} FROM optionchain_snapshot_summary
+                WHERE underlying_key = ? AND expiry_date = ? AND ts BETWEEN ? AND ?
+                ORDER BY ts
+            """, (underlying_key, expiry, to_epoch(start), to_epoch(end))).fetchall()
+            return [dict(r) for r in rows]
+        finally:
+            conn.close()
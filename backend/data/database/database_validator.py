@@ -11,6 +11,8 @@ from datetime import datetime
 from decimal import Decimal
 import re
 
+from backend.data.database.migration_runner import ensure_schema
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -29,12 +31,13 @@ class DatabaseValidator:
 
     def __init__(self, db_path: str = "market_data.db"):
         self.db_path = db_path
-        self._apply_constraints()
-        self._create_indexes()
+        ensure_schema(self.db_path, "validation_rules", self._apply_constraints)
+        ensure_schema(self.db_path, "validation_indexes", self._create_indexes)
 
-    def _apply_constraints(self):
+    @staticmethod
+    def _apply_constraints(db_path: str):
         """Apply database constraints for data integrity"""
-        conn = sqlite3.connect(self.db_path)
+        conn = sqlite3.connect(db_path)
         cursor = conn.cursor()
 
         # Note: SQLite doesn't support ALTER TABLE ADD CONSTRAINT easily
@@ -118,9 +121,10 @@ class DatabaseValidator:
         conn.commit()
         conn.close()
 
-    def _create_indexes(self):
+    @staticmethod
+    def _create_indexes(db_path: str):
         """Create database indexes for performance"""
-        conn = sqlite3.connect(self.db_path)
+        conn = sqlite3.connect(db_path)
         cursor = conn.cursor()
 
         indexes = [
@@ -137,9 +141,6 @@ class DatabaseValidator:
             # Stop-loss indexes
             ("idx_stop_loss_symbol", "stop_loss_orders", "symbol"),
             ("idx_stop_loss_status", "stop_loss_orders", "status"),
-            # Error logs indexes
-            ("idx_error_logs_timestamp", "error_logs", "timestamp"),
-            ("idx_error_logs_type", "error_logs", "error_type"),
             # Auth tokens indexes
             ("idx_auth_tokens_user", "auth_tokens", "user_id"),
             ("idx_auth_tokens_expiry", "auth_tokens", "expires_at"),
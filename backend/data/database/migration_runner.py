@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Versioned Schema Migration Runner
+Applies every service's CREATE TABLE / CREATE INDEX DDL once per database
+(recorded in ``schema_migrations``) instead of on every service construction.
+
+The API server runs this at import time, which under gunicorn ``preload_app``
+means once in the master before workers fork. Service constructors call
+``ensure_schema()``, which skips their DDL for databases migrated by this
+process; scripts that never run migrations still self-initialize.
+
+Usage:
+    python backend/data/database/migration_runner.py
+    python backend/data/database/migration_runner.py --db market_data.db --status
+"""
+
+import os
+import sys
+import sqlite3
+import logging
+import argparse
+import importlib
+import threading
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+sys.path.append(str(Path(__file__).parent.parent.parent.parent))
+
+logger = logging.getLogger("MigrationRunner")
+
+DB_PATH = "market_data.db"
+
+# (version, name, "module:Class.staticmethod") — append only, never renumber.
+# Each target takes a db_path and must be idempotent (IF NOT EXISTS).
+MIGRATIONS: List[Tuple[int, str, str]] = [
+    (1, "auth_tokens", "backend.utils.auth.manager:AuthManager._init_database"),
+    (2, "risk_manager", "backend.core.risk.manager:RiskManager._init_risk_db"),
+    (3, "performance_analytics", "backend.core.analytics.performance:PerformanceAnalytics._init_analytics_db"),
+    (4, "validation_rules", "backend.data.database.database_validator:DatabaseValidator._apply_constraints"),
+    (5, "validation_indexes", "backend.data.database.database_validator:DatabaseValidator._create_indexes"),
+    (6, "paper_trading", "backend.core.trading.paper_trading:PaperTradingSystem._init_paper_trading_db"),
+]
+
+_applied = set()  # (schema name, absolute db path) migrated by this process
+_applied_lock = threading.Lock()
+
+
+def _schema_key(db_path, name: str):
+    db_path = str(db_path)
+    if db_path == ":memory:":
+        return None  # every connection is a fresh database
+    return (name, os.path.abspath(db_path))
+
+
+def ensure_schema(db_path, name: str, apply: Callable[[str], None]) -> bool:
+    """
+    Run ``apply(db_path)`` unless ``run_migrations()`` already brought schema
+    ``name`` up to date for this database in this process.
+    Returns True if the DDL ran.
+    """
+    key = _schema_key(db_path, name)
+    if key is not None:
+        with _applied_lock:
+            if key in _applied:
+                return False
+    apply(db_path)
+    return True
+
+
+def _mark_applied(db_path, name: str):
+    key = _schema_key(db_path, name)
+    if key is not None:
+        with _applied_lock:
+            _applied.add(key)
+
+
+def _resolve(target: str) -> Callable[[str], None]:
+    module_name, attr_path = target.split(":")
+    obj = importlib.import_module(module_name)
+    for attr in attr_path.split("."):
+        obj = getattr(obj, attr)
+    return obj
+
+
+def _ensure_migrations_table(conn: sqlite3.Connection):
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+    conn.commit()
+
+
+def applied_versions(db_path=DB_PATH) -> List[int]:
+    """Versions recorded in schema_migrations"""
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        _ensure_migrations_table(conn)
+        return [v for (v,) in conn.execute("SELECT version FROM schema_migrations ORDER BY version")]
+    finally:
+        conn.close()
+
+
+def run_migrations(db_path=DB_PATH) -> List[int]:
+    """
+    Apply pending migrations in version order.
+    Returns the versions applied by this call.
+    """
+    done = set(applied_versions(db_path))
+    newly_applied = []
+
+    for version, name, target in MIGRATIONS:
+        if version in done:
+            # Already on disk: let constructors skip their DDL in this process
+            _mark_applied(db_path, name)
+            continue
+
+        logger.info(f"🔧 Applying migration {version:03d}_{name}")
+        _resolve(target)(db_path)
+
+        conn = sqlite3.connect(db_path, timeout=30)
+        try:
+            # OR IGNORE: workers started without preload may race on first boot
+            conn.execute(
+                "INSERT OR IGNORE INTO schema_migrations (version, name) VALUES (?, ?)",
+                (version, name),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        _mark_applied(db_path, name)
+        newly_applied.append(version)
+
+    if newly_applied:
+        logger.info(f"✅ Applied {len(newly_applied)} migrations to {db_path}")
+    else:
+        logger.debug(f"Schema up to date: {db_path}")
+    return newly_applied
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    parser = argparse.ArgumentParser(description="Apply versioned schema migrations")
+    parser.add_argument("--db", default=os.getenv("DATABASE_PATH", DB_PATH), help="SQLite database path")
+    parser.add_argument("--status", action="store_true", help="Show applied/pending versions only")
+    args = parser.parse_args()
+
+    if args.status:
+        done = set(applied_versions(args.db))
+        for version, name, _ in MIGRATIONS:
+            print(f"{'✅' if version in done else '⏳'} {version:03d}_{name}")
+    else:
+        run_migrations(args.db)
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Market Data Retention & Rollup
+------------------------------
+Keeps the 5-minute snapshot tables written by the ETL pollers small.
+
+For every snapshot table older than ``RAW_RETENTION_DAYS``:
+- Downsamples raw snapshots into 15-minute and daily OHLC+OI rollups
+  (``market_quota_rollup`` / ``optionchain_rollup``).
+- Moves the raw rows into per-month archive files
+  (``archive/market_data_YYYY_MM.db``) which are ATTACHed only on demand.
+- Drops per-strike rows of the epoch-keyed chain snapshots past the same
+  cutoff (their per-snapshot summaries are kept).
+- Runs ``PRAGMA incremental_vacuum`` / ``ANALYZE`` so freed pages are returned
+  and the planner statistics stay current.
+
+Usage:
+    python backend/data/database/retention_manager.py --once
+    python backend/data/database/retention_manager.py --days 14 --once
+    python backend/data/database/retention_manager.py            # scheduled (daily after close)
+"""
+
+import os
+import re
+import sys
+import time
+import sqlite3
+import logging
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from backend.data.database.chain_snapshots import to_epoch
+
+# Configuration
+DB_PATH = "market_data.db"
+ARCHIVE_DIR = "archive"
+SCHEMA_PATH = Path(__file__).parent.parent.parent / "database" / "schema" / "retention_schema.sql"
+RAW_RETENTION_DAYS = int(os.getenv("RAW_RETENTION_DAYS", "7"))
+VACUUM_PAGES_PER_RUN = 20000      # ~80 MB at the default 4 KB page size
+MAX_ATTACHED_ARCHIVES = 8         # SQLite default SQLITE_MAX_ATTACHED is 10
+
+# Snapshot tables under retention -> rollup kind
+QUOTE_TABLES = ("market_quota_fo_data", "market_quota_nse500_data", "market_quota_sme_data")
+CHAIN_TABLES = ("optionchain_intrday_schema",)
+SNAPSHOT_TABLES = ("optionchain_snapshot", "optionchain_snapshot_summary")
+ROLLUP_INTERVALS = ("15m", "1d")
+
+logger = logging.getLogger("RetentionManager")
+
+
+def bucket_sql(interval: str, column: str = "timestamp") -> str:
+    """SQL expression mapping an ISO timestamp to its bucket start."""
+    if interval == "15m":
+        return (
+            f"strftime('%Y-%m-%d %H:', {column}) || "
+            f"printf('%02d:00', (CAST(strftime('%M', {column}) AS INTEGER) / 15) * 15)"
+        )
+    if interval == "1d":
+        return f"date({column})"
+    raise ValueError(f"Unsupported rollup interval: {interval}")
+
+
+def archive_path(month: str, archive_dir: str = ARCHIVE_DIR) -> Path:
+    """Archive file for a 'YYYY-MM' month."""
+    return Path(archive_dir) / f"market_data_{month.replace('-', '_')}.db"
+
+
+def _month_bounds(month: str) -> tuple:
+    start = datetime.strptime(month, "%Y-%m")
+    end = (start + timedelta(days=32)).replace(day=1)
+    return start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+
+
+def _qualify_ddl(sql: str, schema: str) -> str:
+    """Rewrite a sqlite_master CREATE statement to target an attached schema."""
+    return re.sub(
+        r'^CREATE\s+(UNIQUE\s+)?(TABLE|INDEX)\s+(IF\s+NOT\s+EXISTS\s+)?"?(\w+)"?',
+        lambda m: f"CREATE {m.group(1) or ''}{m.group(2)} IF NOT EXISTS {schema}.{m.group(4)}",
+        sql.strip(),
+        count=1,
+        flags=re.IGNORECASE,
+    )
+
+
+class RetentionManager:
+    """Rollup, archive and vacuum the intraday snapshot tables."""
+
+    def __init__(self, db_path: str = DB_PATH, archive_dir: str = ARCHIVE_DIR,
+                 retention_days: int = RAW_RETENTION_DAYS):
+        self.db_path = db_path
+        self.archive_dir = archive_dir
+        self.retention_days = retention_days
+
+    def connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("PRAGMA synchronous=NORMAL;")
+        return conn
+
+    def init_schema(self, conn: sqlite3.Connection):
+        with open(SCHEMA_PATH, "r") as f:
+            conn.executescript(f.read())
+        conn.commit()
+
+    def cutoff(self, now: Optional[datetime] = None) -> str:
+        """Midnight N days ago, so rollup buckets are always whole days."""
+        now = now or datetime.now()
+        return (now - timedelta(days=self.retention_days)).strftime("%Y-%m-%d")
+
+    @staticmethod
+    def _table_exists(conn: sqlite3.Connection, table: str, schema: str = "main") -> bool:
+        row = conn.execute(
+            f"SELECT 1 FROM {schema}.sqlite_master WHERE type='table' AND name=?", (table,)
+        ).fetchone()
+        return row is not None
+
+    # ------------------------------------------------------------------
+    # Rollups
+    # ------------------------------------------------------------------
+    def rollup_quotes(self, conn: sqlite3.Connection, table: str, cutoff: str, interval: str) -> int:
+        """Fold quote snapshots older than cutoff into market_quota_rollup."""
+        bucket = bucket_sql(interval)
+        # Daily bars can use the exchange's day high/low; 15m bars only see snapshots.
+        high = "MAX(COALESCE(high, close))" if interval == "1d" else "MAX(close)"
+        low = "MIN(COALESCE(NULLIF(low, 0), close))" if interval == "1d" else "MIN(close)"
+
+        cur = conn.execute(f"""
+            INSERT OR REPLACE INTO market_quota_rollup (
+                source_table, instrument_key, interval, bucket,
+                open, high, low, close, volume, oi, samples
+            )
+            SELECT ?, a.instrument_key, ?, a.bucket,
+                   o.close, a.high, a.low, c.close, c.volume, c.oi, a.samples
+            FROM (
+                SELECT instrument_key, {bucket} AS bucket,
+                       MIN(timestamp) AS t_first, MAX(timestamp) AS t_last,
+                       {high} AS high, {low} AS low, COUNT(*) AS samples
+                FROM {table}
+                WHERE timestamp < ?
+                GROUP BY instrument_key, bucket
+            ) a
+            JOIN {table} o ON o.instrument_key = a.instrument_key AND o.timestamp = a.t_first
+            JOIN {table} c ON c.instrument_key = a.instrument_key AND c.timestamp = a.t_last
+        """, (table, interval, cutoff))
+        return cur.rowcount
+
+    def rollup_chain(self, conn: sqlite3.Connection, table: str, cutoff: str, interval: str) -> int:
+        """Fold option chain snapshots older than cutoff into optionchain_rollup."""
+        bucket = bucket_sql(interval)
+        cur = conn.execute(f"""
+            INSERT OR REPLACE INTO optionchain_rollup (
+                underlying_key, expiry_date, strike_price, interval, bucket,
+                ce_open, ce_high, ce_low, ce_close, ce_volume, ce_oi, ce_oi_change,
+                pe_open, pe_high, pe_low, pe_close, pe_volume, pe_oi, pe_oi_change,
+                samples
+            )
+            SELECT a.underlying_key, a.expiry_date, a.strike_price, ?, a.bucket,
+                   o.ce_ltp, a.ce_high, a.ce_low, c.ce_ltp, c.ce_volume, c.ce_oi, c.ce_oi - o.ce_oi,
+                   o.pe_ltp, a.pe_high, a.pe_low, c.pe_ltp, c.pe_volume, c.pe_oi, c.pe_oi - o.pe_oi,
+                   a.samples
+            FROM (
+                SELECT underlying_key, expiry_date, strike_price, {bucket} AS bucket,
+                       MIN(timestamp) AS t_first, MAX(timestamp) AS t_last,
+                       MAX(ce_ltp) AS ce_high, MIN(ce_ltp) AS ce_low,
+                       MAX(pe_ltp) AS pe_high, MIN(pe_ltp) AS pe_low,
+                       COUNT(*) AS samples
+                FROM {table}
+                WHERE timestamp < ?
+                GROUP BY underlying_key, expiry_date, strike_price, bucket
+            ) a
+            JOIN {table} o ON o.underlying_key = a.underlying_key AND o.expiry_date = a.expiry_date
+                          AND o.strike_price = a.strike_price AND o.timestamp = a.t_first
+            JOIN {table} c ON c.underlying_key = a.underlying_key AND c.expiry_date = a.expiry_date
+                          AND c.strike_price = a.strike_price AND c.timestamp = a.t_last
+        """, (interval, cutoff))
+        return cur.rowcount
+
+    # ------------------------------------------------------------------
+    # Archiving
+    # ------------------------------------------------------------------
+    def _ensure_archive_table(self, conn: sqlite3.Connection, table: str, schema: str):
+        ddl = conn.execute(
+            "SELECT sql FROM main.sqlite_master WHERE tbl_name=? AND sql IS NOT NULL "
+            "ORDER BY type DESC",  # 'table' before 'index'
+            (table,),
+        ).fetchall()
+        for (sql,) in ddl:
+            conn.execute(_qualify_ddl(sql, schema))
+
+    def archive_table(self, conn: sqlite3.Connection, table: str, cutoff: str) -> Dict[str, int]:
+        """Move rows older than cutoff into per-month archive databases."""
+        months = [r[0] for r in conn.execute(
+            f"SELECT DISTINCT substr(timestamp, 1, 7) FROM {table} WHERE timestamp < ?", (cutoff,)
+        ).fetchall()]
+
+        moved: Dict[str, int] = {}
+        Path(self.archive_dir).mkdir(parents=True, exist_ok=True)
+        for month in sorted(months):
+            start, end = _month_bounds(month)
+            end = min(end, cutoff)
+            path = archive_path(month, self.archive_dir)
+
+            conn.commit()  # ATTACH is not allowed inside a transaction
+            conn.execute("ATTACH DATABASE ? AS archive", (str(path),))
+            try:
+                self._ensure_archive_table(conn, table, "archive")
+                conn.execute(
+                    f"INSERT OR IGNORE INTO archive.{table} "
+                    f"SELECT * FROM main.{table} WHERE timestamp >= ? AND timestamp < ?",
+                    (start, end),
+                )
+                cur = conn.execute(
+                    f"DELETE FROM main.{table} WHERE timestamp >= ? AND timestamp < ?", (start, end)
+                )
+                conn.commit()
+                moved[path.name] = cur.rowcount
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.execute("DETACH DATABASE archive")
+
+            logger.info(f"Archived {moved[path.name]:,} rows of {table} into {path}")
+        return moved
+
+    def archive_months(self, start: str, end: str) -> List[str]:
+        """Existing archive months ('YYYY-MM') overlapping [start, end)."""
+        months = []
+        cursor = datetime.strptime(start[:7], "%Y-%m")
+        last = datetime.strptime(end[:7], "%Y-%m")
+        while cursor <= last:
+            month = cursor.strftime("%Y-%m")
+            if archive_path(month, self.archive_dir).exists():
+                months.append(month)
+            cursor = (cursor + timedelta(days=32)).replace(day=1)
+        return months
+
+    @contextmanager
+    def attached_archives(self, conn: sqlite3.Connection, months: Sequence[str]) -> Iterator[List[str]]:
+        """ATTACH the given archive months read-only; yields their schema aliases."""
+        if len(months) > MAX_ATTACHED_ARCHIVES:
+            raise ValueError(f"Cannot attach more than {MAX_ATTACHED_ARCHIVES} archives at once")
+        aliases = []
+        try:
+            for month in months:
+                alias = f"arch_{month.replace('-', '_')}"
+                uri = f"file:{archive_path(month, self.archive_dir)}?mode=ro"
+                conn.execute("ATTACH DATABASE ? AS " + alias, (uri,))
+                aliases.append(alias)
+            yield aliases
+        finally:
+            for alias in aliases:
+                conn.execute(f"DETACH DATABASE {alias}")
+
+    def query_snapshots(self, table: str, start: str, end: str,
+                        where: str = "1=1", params: Sequence = ()) -> List[sqlite3.Row]:
+        """
+        Read raw snapshots in [start, end) across the hot table and any archives.
+
+        Args:
+            table: Snapshot table name
+            start, end: ISO timestamps bounding the range
+            where: Extra SQL predicate (e.g. "instrument_key = ?")
+            params: Parameters for ``where``
+        """
+        conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        conn.row_factory = sqlite3.Row
+        try:
+            months = self.archive_months(start, end)
+            with self.attached_archives(conn, months) as aliases:
+                sources = ["main"] + [a for a in aliases if self._table_exists(conn, table, a)]
+                union = " UNION ALL ".join(
+                    f"SELECT * FROM {s}.{table} WHERE timestamp >= ? AND timestamp < ? AND ({where})"
+                    for s in sources
+                )
+                args: List = []
+                for _ in sources:
+                    args.extend([start, end, *params])
+                return conn.execute(f"{union} ORDER BY timestamp", args).fetchall()
+        finally:
+            conn.close()
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+    def run_maintenance(self, conn: sqlite3.Connection, allow_full_vacuum: bool = False,
+                        pages: int = VACUUM_PAGES_PER_RUN) -> Dict:
+        """
+        Return free pages to the OS and refresh planner statistics.
+
+        Incremental vacuum needs ``auto_vacuum=INCREMENTAL``; switching an existing
+        database to that mode takes one full VACUUM, which only runs when
+        ``allow_full_vacuum`` is set (weekend job).
+        """
+        conn.commit()
+        stats = {"freelist_before": conn.execute("PRAGMA freelist_count").fetchone()[0]}
+        mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+
+        if mode != 2 and allow_full_vacuum:
+            logger.info("Switching database to auto_vacuum=INCREMENTAL (full VACUUM)...")
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")
+            mode = 2
+
+        if mode == 2:
+            conn.execute(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+
+        for table in QUOTE_TABLES + CHAIN_TABLES + SNAPSHOT_TABLES + ("market_quota_rollup", "optionchain_rollup"):
+            if self._table_exists(conn, table):
+                conn.execute(f"ANALYZE {table}")
+        conn.execute("PRAGMA optimize")
+        conn.commit()
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+        stats["freelist_after"] = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        stats["auto_vacuum"] = mode
+        return stats
+
+    # ------------------------------------------------------------------
+    # Entry points
+    # ------------------------------------------------------------------
+    def run(self, now: Optional[datetime] = None, allow_full_vacuum: bool = False) -> Dict:
+        """Rollup + archive every snapshot table, then vacuum/analyze."""
+        cutoff = self.cutoff(now)
+        summary = {"cutoff": cutoff, "tables": {}}
+        conn = self.connect()
+        try:
+            self.init_schema(conn)
+            for table in QUOTE_TABLES + CHAIN_TABLES:
+                if not self._table_exists(conn, table):
+                    continue
+                t0 = time.perf_counter()
+                rolled = 0
+                for interval in ROLLUP_INTERVALS:
+                    if table in CHAIN_TABLES:
+                        rolled += self.rollup_chain(conn, table, cutoff, interval)
+                    else:
+                        rolled += self.rollup_quotes(conn, table, cutoff, interval)
+                conn.commit()
+
+                moved = self.archive_table(conn, table, cutoff)
+                duration_ms = int((time.perf_counter() - t0) * 1000)
+                conn.execute("""
+                    INSERT INTO retention_log
+                        (table_name, cutoff, rows_rolled_up, rows_archived, archive_files, duration_ms)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (table, cutoff, rolled, sum(moved.values()), ",".join(moved), duration_ms))
+                conn.commit()
+
+                summary["tables"][table] = {
+                    "rolled_up": rolled, "archived": sum(moved.values()), "duration_ms": duration_ms
+                }
+                logger.info(f"{table}: {rolled:,} rollup rows, {sum(moved.values()):,} archived "
+                            f"({duration_ms} ms)")
+
+            if self._table_exists(conn, "optionchain_snapshot"):
+                cur = conn.execute("DELETE FROM optionchain_snapshot WHERE ts < ?", (to_epoch(cutoff),))
+                conn.commit()
+                summary["snapshots_pruned"] = cur.rowcount
+                logger.info(f"optionchain_snapshot: {cur.rowcount:,} rows pruned")
+
+            summary["maintenance"] = self.run_maintenance(conn, allow_full_vacuum=allow_full_vacuum)
+        finally:
+            conn.close()
+        return summary
+
+    def start_scheduler(self):
+        """Run retention daily after market close; allow a full VACUUM on Sundays."""
+        import pytz
+        from apscheduler.schedulers.blocking import BlockingScheduler
+        from apscheduler.triggers.cron import CronTrigger
+
+        ist_tz = pytz.timezone("Asia/Kolkata")
+        scheduler = BlockingScheduler(timezone=ist_tz)
+        scheduler.add_job(
+            func=self.run,
+            trigger=CronTrigger(day_of_week="mon-fri", hour=16, minute=15, timezone=ist_tz),
+            id="retention_daily",
+            name="Daily snapshot rollup/archive",
+            replace_existing=True,
+        )
+        scheduler.add_job(
+            func=self.run,
+            trigger=CronTrigger(day_of_week="sun", hour=3, minute=0, timezone=ist_tz),
+            kwargs={"allow_full_vacuum": True},
+            id="retention_weekly_vacuum",
+            name="Weekly rollup/archive with full VACUUM",
+            replace_existing=True,
+        )
+        logger.info("Retention scheduler started (weekdays 16:15 IST, Sunday 03:00 IST)")
+        scheduler.start()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    os.makedirs("logs", exist_ok=True)
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        handlers=[logging.FileHandler("logs/retention.log"), logging.StreamHandler()],
+    )
+
+    parser = argparse.ArgumentParser(description="Rollup and archive intraday snapshot tables")
+    parser.add_argument("--once", action="store_true", help="Run one retention pass and exit")
+    parser.add_argument("--days", type=int, default=RAW_RETENTION_DAYS, help="Days of raw data to keep")
+    parser.add_argument("--full-vacuum", action="store_true", help="Allow a full VACUUM this run")
+    args = parser.parse_args()
+
+    manager = RetentionManager(retention_days=args.days)
+    try:
+        if args.once:
+            print(manager.run(allow_full_vacuum=args.full_vacuum))
+        else:
+            manager.start_scheduler()
+    except KeyboardInterrupt:
+        pass
@@ -15,6 +15,14 @@ logger = logging.getLogger(__name__)
 
 DB_PATH = Path(__file__).parent.parent.parent / "market_data.db"
 
+# Index code -> membership flag column in instruments_tier1
+INDEX_FLAG_COLUMNS = {
+    'NIFTY50': 'is_nifty50',
+    'NIFTY100': 'is_nifty100',
+    'NIFTY200': 'is_nifty200',
+    'NIFTY500': 'is_nifty500',
+}
+
 
 class IndexLabelingUtility:
     """
@@ -100,57 +108,24 @@ class IndexLabelingUtility:
             logger.info("   3. Populate index_constituents_v2 table")
             return
         
-        # NIFTY 50
-        self.cursor.execute("""
-        UPDATE instruments_tier1
-        SET is_nifty50 = 1,
-            index_memberships = COALESCE(index_memberships || ',', '') || 'NIFTY50'
-        WHERE symbol IN (
-            SELECT DISTINCT symbol 
-            FROM index_constituents 
-            WHERE index_code = 'NIFTY50' AND is_active = 1
-        )
-        """)
-        self.stats['nifty50_marked'] = self.cursor.rowcount
-        
-        # NIFTY 100
-        self.cursor.execute("""
-        UPDATE instruments_tier1
-        SET is_nifty100 = 1,
-            index_memberships = COALESCE(index_memberships || ',', '') || 'NIFTY100'
-        WHERE symbol IN (
-            SELECT DISTINCT symbol 
-            FROM index_constituents 
-            WHERE index_code = 'NIFTY100' AND is_active = 1
-        )
-        """)
-        self.stats['nifty100_marked'] = self.cursor.rowcount
-        
-        # NIFTY 200
-        self.cursor.execute("""
-        UPDATE instruments_tier1
-        SET is_nifty200 = 1,
-            index_memberships = COALESCE(index_memberships || ',', '') || 'NIFTY200'
-        WHERE symbol IN (
-            SELECT DISTINCT symbol 
-            FROM index_constituents 
-            WHERE index_code = 'NIFTY200' AND is_active = 1
-        )
-        """)
-        self.stats['nifty200_marked'] = self.cursor.rowcount
-        
-        # NIFTY 500
-        self.cursor.execute("""
-        UPDATE instruments_tier1
-        SET is_nifty500 = 1,
-            index_memberships = COALESCE(index_memberships || ',', '') || 'NIFTY500'
-        WHERE symbol IN (
-            SELECT DISTINCT symbol 
-            FROM index_constituents 
-            WHERE index_code = 'NIFTY500' AND is_active = 1
-        )
-        """)
-        self.stats['nifty500_marked'] = self.cursor.rowcount
+        # One set-based UPDATE per index; the membership append is skipped when
+        # the code is already present so reruns don't duplicate it.
+        for index_code, flag_col in INDEX_FLAG_COLUMNS.items():
+            self.cursor.execute(f"""
+            UPDATE instruments_tier1
+            SET {flag_col} = 1,
+                index_memberships = CASE
+                    WHEN ',' || COALESCE(index_memberships, '') || ',' LIKE '%,' || :code || ',%'
+                        THEN index_memberships
+                    ELSE COALESCE(NULLIF(index_memberships, '') || ',', '') || :code
+                END
+            WHERE symbol IN (
+                SELECT DISTINCT symbol 
+                FROM index_constituents 
+                WHERE index_code = :code AND is_active = 1
+            )
+            """, {'code': index_code})
+            self.stats[f"{index_code.lower()}_marked"] = self.cursor.rowcount
         
         self.conn.commit()
         
@@ -249,12 +224,11 @@ class IndexLabelingUtility:
             ('DIVISLAB', 'Pharmaceuticals', 'Drugs & Pharma'),
         ]
         
-        for symbol, sector, industry in sector_mappings:
-            self.cursor.execute("""
-            UPDATE instruments_tier1
-            SET sector = ?, industry = ?
-            WHERE symbol = ?
-            """, (sector, industry, symbol))
+        self.cursor.executemany("""
+        UPDATE instruments_tier1
+        SET sector = ?, industry = ?
+        WHERE symbol = ?
+        """, sector_mappings)
         
         self.stats['sector_updated'] = self.cursor.rowcount
         self.conn.commit()
@@ -0,0 +1,196 @@
+"""
+Intraday Candle Sync State (Table A)
+------------------------------------
+Per-instrument bookkeeping behind IntradayPoller's incremental 5-minute sync.
+Features:
+- Tracks the newest stored bar per instrument in memory, seeded once from
+  option_equity_intraday_ohlcv, so a cycle only asks for instruments that
+  have a newly closed bar and only keeps the bars after the stored one.
+- Bar-close aware: the bar still forming at poll time is never stored
+  (INSERT OR IGNORE would freeze its partial values).
+- Completeness: stored bars per day are checked against the bar count the
+  market calendar expects for that session. Today's holes are filled from
+  the intraday response already in hand; earlier days go to a backfill
+  queue that the poller drains in a separate low-priority lane.
+
+Timestamps stay in Upstox's ISO form ('2026-01-05T09:15:00+05:30'), which
+orders correctly as plain strings.
+
+Usage:
+    sync = IntradaySyncState()
+    sync.seed(keys)
+    cutoff = sync.closed_cutoff()
+    due = [k for k in keys if sync.needs_update(k, cutoff)]
+    rows = sync.merge_intraday(key, candles, cutoff)     # newest-first API candles -> rows to insert
+    sync.plan_backfill(keys)
+    for key, from_date, to_date in sync.next_backfill(20):
+        rows = sync.merge_backfill(key, candles)
+"""
+
+import logging
+import sqlite3
+import time
+from collections import deque
+from datetime import date, datetime, timedelta
+from typing import Deque, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from backend.services.market_data.market_calendar import DAY, IST, IST_OFFSET, MarketCalendar, get_market_calendar
+
+logger = logging.getLogger("IntradaySync")
+
+DB_PATH = "market_data.db"
+TABLE = "option_equity_intraday_ohlcv"
+BAR_SECONDS = 300         # 5-minute bars
+BACKFILL_DAYS = 5         # Trading days before today checked for missing bars
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, IST).isoformat()
+
+
+def _day_start(day: str) -> int:
+    return (date.fromisoformat(day) - date(1970, 1, 1)).days * DAY - IST_OFFSET
+
+
+class IntradaySyncState:
+    """Newest stored bar and bar counts per instrument, plus the backfill queue"""
+
+    def __init__(self, db_path: str = DB_PATH, calendar: Optional[MarketCalendar] = None):
+        self.db_path = db_path
+        self._calendar = calendar
+        self.last_bar: Dict[str, str] = {}                  # instrument_key -> newest stored bar start
+        self.day_counts: Dict[Tuple[str, str], int] = {}    # (instrument_key, 'YYYY-MM-DD') -> stored bars
+        self.backfill_queue: Deque[Tuple[str, str, str]] = deque()  # (instrument_key, from_date, to_date)
+        self._backfill_seen: Set[Tuple[str, str]] = set()
+        self.seeded = False
+
+    @property
+    def calendar(self) -> MarketCalendar:
+        return self._calendar or get_market_calendar(self.db_path)
+
+    def seed(self, keys: Iterable[str], now: Optional[float] = None):
+        """Load newest bar and recent per-day counts for these instruments"""
+        wanted = set(keys)
+        since = self.trading_days(BACKFILL_DAYS, now)[0] if BACKFILL_DAYS else self.today(now)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            last = conn.execute(
+                f"SELECT instrument_key, MAX(timestamp) FROM {TABLE} GROUP BY instrument_key"
+            ).fetchall()
+            counts = conn.execute(
+                f"SELECT instrument_key, substr(timestamp, 1, 10), COUNT(*) FROM {TABLE} "
+                f"WHERE timestamp >= ? GROUP BY 1, 2",
+                (since,),
+            ).fetchall()
+        except sqlite3.OperationalError as e:
+            logger.warning(f"No stored intraday bars to seed from: {e}")
+            last, counts = [], []
+        finally:
+            conn.close()
+
+        self.last_bar.update({key: ts for key, ts in last if key in wanted and ts})
+        self.day_counts.update({(key, day): n for key, day, n in counts if key in wanted})
+        self.seeded = True
+        logger.info(f"Seeded sync state: {len(self.last_bar)}/{len(wanted)} instruments have stored bars")
+
+    # ------------------------------------------------------------------ calendar
+
+    def today(self, now: Optional[float] = None) -> str:
+        return datetime.fromtimestamp(time.time() if now is None else now, IST).date().isoformat()
+
+    def trading_days(self, n: int, now: Optional[float] = None) -> List[str]:
+        """The n trading days before today, oldest first"""
+        days, day = [], date.fromisoformat(self.today(now))
+        for _ in range(n * 3 + 10):
+            if len(days) == n:
+                break
+            day -= timedelta(days=1)
+            if self.calendar.is_trading_day(day):
+                days.append(day.isoformat())
+        return days[::-1]
+
+    def expected_bars(self, day: str, now: Optional[float] = None) -> int:
+        """5-minute bars the session(s) of this day should have closed by now"""
+        now = time.time() if now is None else now
+        start = _day_start(day)
+        return sum(
+            max(0, (min(close, now) - open_) // BAR_SECONDS)
+            for open_, close in self.calendar.sessions_between(start, start + DAY)
+        )
+
+    def closed_cutoff(self, now: Optional[float] = None) -> str:
+        """Start of the newest bar that has fully closed"""
+        now = time.time() if now is None else now
+        return _iso(now // BAR_SECONDS * BAR_SECONDS - BAR_SECONDS)
+
+    # ------------------------------------------------------------------ live lane
+
+    def needs_update(self, key: str, cutoff: str) -> bool:
+        return self.last_bar.get(key, "") < cutoff
+
+    def merge_intraday(self, key: str, candles: Sequence[Sequence], cutoff: str) -> List[Sequence]:
+        """
+        Rows to store from a newest-first intraday (today only) response.
+        Normally just the bars after the stored one; the whole closed day when
+        the stored count shows holes earlier in the session.
+        """
+        last = self.last_bar.get(key, "")
+        first_closed = 0
+        while first_closed < len(candles) and candles[first_closed][0] > cutoff:
+            first_closed += 1  # Still forming
+
+        new = []
+        for candle in candles[first_closed:]:
+            if candle[0] <= last:
+                break
+            new.append(candle)
+
+        closed = len(candles) - first_closed
+        if not closed:
+            return []
+        day = candles[first_closed][0][:10]
+        stored = self.day_counts.get((key, day), 0) + len(new)
+        if stored < closed:
+            new = list(candles[first_closed:])  # Holes earlier today: the response has them
+            stored = closed
+
+        if new:
+            self.last_bar[key] = max(last, new[0][0])
+            self.day_counts[(key, day)] = stored
+        return new
+
+    # ------------------------------------------------------------------ backfill lane
+
+    def plan_backfill(self, keys: Iterable[str], now: Optional[float] = None) -> int:
+        """Queue each instrument's recent days that hold fewer bars than their sessions (once per day)"""
+        days = self.trading_days(BACKFILL_DAYS, now)
+        expected = {day: self.expected_bars(day, now) for day in days}
+        queued = 0
+        for key in keys:
+            missing = [
+                day for day in days
+                if (key, day) not in self._backfill_seen
+                and self.day_counts.get((key, day), 0) < expected[day]
+            ]
+            if missing:
+                self._backfill_seen.update((key, day) for day in missing)
+                self.backfill_queue.append((key, missing[0], missing[-1]))
+                queued += 1
+        return queued
+
+    def next_backfill(self, limit: int) -> List[Tuple[str, str, str]]:
+        return [self.backfill_queue.popleft() for _ in range(min(limit, len(self.backfill_queue)))]
+
+    def merge_backfill(self, key: str, candles: Sequence[Sequence]) -> List[Sequence]:
+        """All bars of a historical response (closed days); counts and newest bar updated"""
+        if not candles:
+            return []
+        per_day: Dict[str, int] = {}
+        for candle in candles:
+            per_day[candle[0][:10]] = per_day.get(candle[0][:10], 0) + 1
+        for day, n in per_day.items():
+            self.day_counts[(key, day)] = max(self.day_counts.get((key, day), 0), n)
+        newest = max(candle[0] for candle in candles)
+        if newest > self.last_bar.get(key, ""):
+            self.last_bar[key] = newest
+        return list(candles)
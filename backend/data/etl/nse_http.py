@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Shared NSE HTTP client
+One keep-alive session + one polite rate limiter for every NSE/niftyindices
+download (index scraper, indices fetcher), with ETag/Last-Modified
+conditional requests so unchanged constituent CSVs come back as 304.
+"""
+
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from backend.utils.helpers.rate_limiter import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = Path(__file__).parent.parent.parent / "market_data.db"
+
+NSE_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
+}
+
+NSE_REQUESTS_PER_SECOND = 2.0   # Combined rate across all workers
+NSE_MAX_WORKERS = 6             # Concurrent downloads (and pooled connections)
+
+
+class NSEHttpClient:
+    """
+    Thread-safe NSE downloader.
+    - ``session``: pooled keep-alive session sized for NSE_MAX_WORKERS
+    - ``limiter``: shared token bucket (NSE_REQUESTS_PER_SECOND)
+    - ETag/Last-Modified validators persisted in ``nse_http_cache`` per
+      (consumer, url), so each consumer only skips what it has itself stored
+    """
+
+    def __init__(self, db_path=DB_PATH, requests_per_second: float = NSE_REQUESTS_PER_SECOND,
+                 pool_size: int = NSE_MAX_WORKERS):
+        self.db_path = db_path
+        self.session = requests.Session()
+        self.session.headers.update(NSE_HEADERS)
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=2)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.limiter = RateLimiter(rate=requests_per_second, burst=2)
+        self._validators: Optional[Dict[Tuple[str, str], Dict[str, str]]] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(nse_http_cache)")]
+        if columns and "consumer" not in columns:
+            # Pre-consumer layout (url only): validators are a cache, start over
+            conn.execute("DROP TABLE nse_http_cache")
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS nse_http_cache (
+            consumer TEXT NOT NULL,
+            url TEXT NOT NULL,
+            etag TEXT,
+            last_modified TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (consumer, url)
+        )
+        """)
+        return conn
+
+    def _load_validators(self) -> Dict[Tuple[str, str], Dict[str, str]]:
+        with self._lock:
+            if self._validators is None:
+                try:
+                    conn = self._connect()
+                    rows = conn.execute(
+                        "SELECT consumer, url, etag, last_modified FROM nse_http_cache"
+                    ).fetchall()
+                    conn.close()
+                    self._validators = {
+                        (consumer, url): {"etag": etag, "last_modified": last_modified}
+                        for consumer, url, etag, last_modified in rows
+                    }
+                except sqlite3.Error as e:
+                    logger.warning(f"⚠️  Could not load HTTP validators: {e}")
+                    self._validators = {}
+            return self._validators
+
+    def conditional_headers(self, consumer: str, url: str) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for a URL this consumer has stored"""
+        cached = self._load_validators().get((consumer, url)) or {}
+        headers = {}
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+        return headers
+
+    def remember(self, consumer: str, url: str, response: requests.Response):
+        """
+        Persist validators from a 200 response.
+        Call only once the consumer has committed the data it derived from the
+        body; a stored validator turns every later request into a 304.
+        """
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not isinstance(etag, str) and not isinstance(last_modified, str):
+            return
+
+        validators = self._load_validators()
+        with self._lock:
+            validators[(consumer, url)] = {"etag": etag, "last_modified": last_modified}
+            try:
+                conn = self._connect()
+                conn.execute("""
+                INSERT INTO nse_http_cache (consumer, url, etag, last_modified, updated_at)
+                VALUES (?, ?, ?, ?, datetime('now'))
+                ON CONFLICT(consumer, url) DO UPDATE SET
+                    etag = excluded.etag,
+                    last_modified = excluded.last_modified,
+                    updated_at = excluded.updated_at
+                """, (consumer, url, etag, last_modified))
+                conn.commit()
+                conn.close()
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️  Could not store HTTP validators for {consumer} {url}: {e}")
+
+    def forget(self, consumer: str, url: str):
+        """Drop validators so the next request downloads the full body"""
+        self._load_validators().pop((consumer, url), None)
+
+    def get(self, url: str, consumer: Optional[str] = None, timeout: int = 30) -> requests.Response:
+        """
+        Rate-limited GET on the shared session.
+        With a ``consumer`` the request is conditional on that consumer's stored
+        validators and a 304 response is returned as-is (not raised). Validators
+        are not stored here: call ``remember()`` after the body has been written.
+        """
+        headers = self.conditional_headers(consumer, url) if consumer else {}
+        with self.limiter:
+            response = self.session.get(url, headers=headers, timeout=timeout)
+        if consumer and response.status_code == 304:
+            return response
+        response.raise_for_status()
+        return response
+
+
+# Singleton instance
+_client_instance: Optional[NSEHttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_nse_client(db_path=DB_PATH) -> NSEHttpClient:
+    """Process-wide NSE client (one session, one rate limiter)"""
+    global _client_instance
+    with _client_lock:
+        if _client_instance is None:
+            _client_instance = NSEHttpClient(db_path=db_path)
+    return _client_instance
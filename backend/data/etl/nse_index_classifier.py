@@ -3,6 +3,10 @@
 NSE Index Classifier
 Maps scraped NSE index constituents to instruments_tier1 table
 Updates index membership flags and populates index_constituents_v2
+
+Matching is a vectorized join on symbol (falling back to ISIN); each index is
+staged once into a temp table and all flag/weight/membership/sector updates
+are applied as set-based UPDATEs in a single transaction.
 """
 
 import sqlite3
@@ -19,6 +23,30 @@ DB_PATH = Path(__file__).parent.parent.parent / "market_data.db"
 DATA_DIR = Path(__file__).parent.parent.parent / "data" / "nse_indices"
 
 
+# Index code -> (flag column, weight column) in instruments_tier1
+FLAG_MAPPING = {
+    'NIFTY50': ('is_nifty50', 'weight_nifty50'),
+    'NIFTYNEXT50': ('is_niftynext50', None),
+    'NIFTY100': ('is_nifty100', 'weight_nifty100'),
+    'NIFTY200': ('is_nifty200', None),
+    'NIFTY500': ('is_nifty500', 'weight_nifty500'),
+    'NIFTYMIDCAP150': ('is_midcap', None),
+    'NIFTYMIDCAP100': ('is_midcap', None),
+    'NIFTYMIDCAP50': ('is_midcap', None),
+    'NIFTYSMALLCAP500': ('is_smallcap', None),
+    'NIFTYSMALLCAP250': ('is_smallcap', None),
+    'NIFTYSMALLCAP100': ('is_smallcap', None),
+}
+
+
+def _column(df: pd.DataFrame, name: str, default=None) -> pd.Series:
+    """Column as object Series with NaN -> default (sqlite-friendly)"""
+    if name not in df.columns:
+        return pd.Series([default] * len(df), index=df.index, dtype=object)
+    col = df[name].astype(object)
+    return col.where(col.notna(), default)
+
+
 class NSEIndexClassifier:
     """
     Classifies instruments based on NSE index membership
@@ -44,24 +72,35 @@ class NSEIndexClassifier:
         }
         
         # Cache for instrument lookups
-        self.instrument_cache: Dict[str, str] = {}  # symbol -> instrument_key
+        self.instrument_cache: Dict[str, str] = {}  # symbol / "ISIN:<isin>" -> instrument_key
+        self._by_symbol = pd.Series(dtype=object)   # symbol -> instrument_key (join index)
+        self._by_isin = pd.Series(dtype=object)     # isin -> instrument_key
+        # classify_batch reuse: only within one classify_dataframe() call (batch token)
+        self._batch_seq = 0
+        self._batch: Optional[int] = None                # Token of the batch in progress
+        self._staged: Optional[Tuple[str, int]] = None   # (index_code, token) loaded in classify_batch
+        self._staged_rows = 0
         self._build_instrument_cache()
     
     def _build_instrument_cache(self):
-        """Build cache of symbol -> instrument_key mappings"""
+        """Build symbol/ISIN -> instrument_key lookup indexes"""
         logger.info("📦 Building instrument cache...")
         
-        self.cursor.execute("""
+        instruments = pd.read_sql_query("""
         SELECT symbol, instrument_key, isin 
         FROM instruments_tier1 
         WHERE exchange = 'NSE' AND is_active = 1
-        """)
+        """, self.conn)
         
-        for symbol, instrument_key, isin in self.cursor.fetchall():
-            self.instrument_cache[symbol] = instrument_key
-            # Also cache by ISIN for better matching
-            if isin:
-                self.instrument_cache[f"ISIN:{isin}"] = instrument_key
+        # Later rows win on duplicates (same as dict assignment order)
+        self._by_symbol = (instruments.drop_duplicates('symbol', keep='last')
+                           .set_index('symbol')['instrument_key'])
+        with_isin = instruments[instruments['isin'].notna() & (instruments['isin'] != '')]
+        self._by_isin = (with_isin.drop_duplicates('isin', keep='last')
+                         .set_index('isin')['instrument_key'])
+        
+        self.instrument_cache = dict(self._by_symbol.items())
+        self.instrument_cache.update((f"ISIN:{isin}", key) for isin, key in self._by_isin.items())
         
         logger.info(f"✅ Cached {len(self.instrument_cache)} instruments")
     
@@ -85,30 +124,22 @@ class NSEIndexClassifier:
         """
         Match constituent symbols to instruments_tier1
         Returns DataFrame with added instrument_key column
+        
+        Joins the whole frame on symbol first, then fills misses by ISIN.
         """
-        instrument_keys = []
-        unmatched = []
+        symbols = _column(df, 'symbol', '').astype(str).str.strip()
+        isins = _column(df, 'isin', '').astype(str).str.strip()
         
-        for idx, row in df.iterrows():
-            symbol = row.get('symbol', '').strip()
-            isin = row.get('isin', '').strip()
-            
-            # Try matching by symbol first
-            instrument_key = self.instrument_cache.get(symbol)
-            
-            # Fallback to ISIN matching
-            if not instrument_key and isin:
-                instrument_key = self.instrument_cache.get(f"ISIN:{isin}")
-            
-            if instrument_key:
-                instrument_keys.append(instrument_key)
-                self.stats['constituents_matched'] += 1
-            else:
-                instrument_keys.append(None)
-                unmatched.append(symbol)
-                self.stats['unmatched_symbols'].append(symbol)
+        instrument_keys = symbols.map(self._by_symbol)
+        instrument_keys = instrument_keys.fillna(isins.map(self._by_isin))
+        
+        df['symbol'] = symbols
+        df['instrument_key'] = instrument_keys.astype(object).where(instrument_keys.notna(), None)
         
-        df['instrument_key'] = instrument_keys
+        matched = int(instrument_keys.notna().sum())
+        unmatched = symbols[instrument_keys.isna()].tolist()
+        self.stats['constituents_matched'] += matched
+        self.stats['unmatched_symbols'].extend(unmatched)
         
         if unmatched:
             logger.warning(f"⚠️  {len(unmatched)} symbols not matched: {unmatched[:10]}")
@@ -126,20 +157,19 @@ class NSEIndexClassifier:
             logger.warning(f"⚠️  No matched constituents for {index_code}")
             return
         
-        # Prepare data for insertion
-        records = []
-        for _, row in matched_df.iterrows():
-            records.append((
-                index_code,
-                row['instrument_key'],
-                row.get('symbol', ''),
-                row.get('company_name', ''),
-                row.get('isin', ''),
-                row.get('weight', None),
-                row.get('sector', None),
-                row.get('industry', None),
-                datetime.now().date()
-            ))
+        # Prepare data for insertion (column arrays, no per-row Python objects)
+        effective_date = datetime.now().date()
+        records = list(zip(
+            [index_code] * len(matched_df),
+            matched_df['instrument_key'],
+            _column(matched_df, 'symbol', ''),
+            _column(matched_df, 'company_name', ''),
+            _column(matched_df, 'isin', ''),
+            _column(matched_df, 'weight'),
+            _column(matched_df, 'sector'),
+            _column(matched_df, 'industry'),
+            [effective_date] * len(matched_df),
+        ))
         
         # Bulk insert with conflict handling
         self.cursor.executemany("""
@@ -149,154 +179,151 @@ class NSEIndexClassifier:
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 1, datetime('now'))
         """, records)
         
-        self.conn.commit()
         self.stats['mappings_created'] += len(records)
         
         logger.info(f"✅ Inserted {len(records)} constituents")
     
+    def _stage_batch(self, index_code: str, df: pd.DataFrame) -> int:
+        """
+        Load matched constituents into temp table classify_batch.
+        Staged once per classify_dataframe() batch; the update_* methods join
+        against it. Direct calls outside a batch always restage.
+        """
+        if self._batch is not None and self._staged == (index_code, self._batch):
+            return self._staged_rows
+        
+        matched_df = df[df['instrument_key'].notna()].drop_duplicates('instrument_key', keep='last')
+        
+        self.cursor.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS classify_batch (
+            instrument_key TEXT PRIMARY KEY,
+            weight REAL,
+            sector TEXT,
+            industry TEXT
+        )
+        """)
+        self.cursor.execute("DELETE FROM temp.classify_batch")
+        self.cursor.executemany(
+            "INSERT INTO temp.classify_batch (instrument_key, weight, sector, industry) VALUES (?, ?, ?, ?)",
+            list(zip(
+                matched_df['instrument_key'],
+                _column(matched_df, 'weight'),
+                _column(matched_df, 'sector'),
+                _column(matched_df, 'industry'),
+            )),
+        )
+        
+        self._staged = (index_code, self._batch) if self._batch is not None else None
+        self._staged_rows = len(matched_df)
+        return self._staged_rows
+    
     def update_tier1_flags(self, index_code: str, df: pd.DataFrame):
         """Update boolean flags in instruments_tier1 for quick filtering"""
         logger.info(f"🚩 Updating tier1 flags for {index_code}...")
         
-        # Mapping of index codes to column names
-        flag_mapping = {
-            'NIFTY50': ('is_nifty50', 'weight_nifty50'),
-            'NIFTYNEXT50': ('is_niftynext50', None),
-            'NIFTY100': ('is_nifty100', 'weight_nifty100'),
-            'NIFTY200': ('is_nifty200', None),
-            'NIFTY500': ('is_nifty500', 'weight_nifty500'),
-            'NIFTYMIDCAP150': ('is_midcap', None),
-            'NIFTYMIDCAP100': ('is_midcap', None),
-            'NIFTYMIDCAP50': ('is_midcap', None),
-            'NIFTYSMALLCAP500': ('is_smallcap', None),
-            'NIFTYSMALLCAP250': ('is_smallcap', None),
-            'NIFTYSMALLCAP100': ('is_smallcap', None),
-        }
-        
-        if index_code not in flag_mapping:
+        if index_code not in FLAG_MAPPING:
             logger.debug(f"  ℹ️  No flag mapping for {index_code}, skipping flag update")
             return
         
-        flag_col, weight_col = flag_mapping[index_code]
-        
-        # Get matched instrument keys
-        matched_df = df[df['instrument_key'].notna()].copy()
-        instrument_keys = matched_df['instrument_key'].tolist()
+        flag_col, weight_col = FLAG_MAPPING[index_code]
         
-        if not instrument_keys:
+        staged = self._stage_batch(index_code, df)
+        if not staged:
             return
         
         # Update flag
-        placeholders = ','.join(['?' for _ in instrument_keys])
         self.cursor.execute(f"""
         UPDATE instruments_tier1
         SET {flag_col} = 1, last_updated = datetime('now')
-        WHERE instrument_key IN ({placeholders})
-        """, instrument_keys)
+        WHERE instrument_key IN (SELECT instrument_key FROM temp.classify_batch)
+        """)
         
         # Update weight if applicable
-        if weight_col and 'weight' in matched_df.columns:
-            for _, row in matched_df.iterrows():
-                if row['weight'] is not None:
-                    self.cursor.execute(f"""
-                    UPDATE instruments_tier1
-                    SET {weight_col} = ?, last_updated = datetime('now')
-                    WHERE instrument_key = ?
-                    """, (row['weight'], row['instrument_key']))
-        
-        self.conn.commit()
-        self.stats['tier1_updated'] += len(instrument_keys)
-        
-        logger.info(f"✅ Updated {len(instrument_keys)} instruments with {flag_col}=1")
+        if weight_col and 'weight' in df.columns:
+            self.cursor.execute(f"""
+            UPDATE instruments_tier1
+            SET {weight_col} = (
+                SELECT b.weight FROM temp.classify_batch b
+                WHERE b.instrument_key = instruments_tier1.instrument_key
+            ),
+                last_updated = datetime('now')
+            WHERE instrument_key IN (
+                SELECT instrument_key FROM temp.classify_batch WHERE weight IS NOT NULL
+            )
+            """)
+        
+        self.stats['tier1_updated'] += staged
+        
+        logger.info(f"✅ Updated {staged} instruments with {flag_col}=1")
     
     def update_index_memberships(self, index_code: str, df: pd.DataFrame):
         """Update comma-separated index_memberships column"""
         logger.info(f"🏷️  Updating index_memberships for {index_code}...")
         
-        matched_df = df[df['instrument_key'].notna()].copy()
+        self._stage_batch(index_code, df)
         
-        for instrument_key in matched_df['instrument_key']:
-            # Get current memberships
-            self.cursor.execute("""
-            SELECT index_memberships FROM instruments_tier1
-            WHERE instrument_key = ?
-            """, (instrument_key,))
-            
-            result = self.cursor.fetchone()
-            if not result:
-                continue
-            
-            current = result[0] or ''
+        # One read of current memberships for the whole index
+        self.cursor.execute("""
+        SELECT t.instrument_key, t.index_memberships
+        FROM instruments_tier1 t
+        JOIN temp.classify_batch b ON b.instrument_key = t.instrument_key
+        """)
+        
+        updates = []
+        for instrument_key, current in self.cursor.fetchall():
             memberships = set(current.split(',')) if current else set()
+            if index_code in memberships:
+                continue
             memberships.add(index_code)
             memberships.discard('')  # Remove empty strings
-            
-            # Update with sorted comma-separated list
-            new_memberships = ','.join(sorted(memberships))
-            self.cursor.execute("""
-            UPDATE instruments_tier1
-            SET index_memberships = ?, last_updated = datetime('now')
-            WHERE instrument_key = ?
-            """, (new_memberships, instrument_key))
+            # Sorted comma-separated list
+            updates.append((','.join(sorted(memberships)), instrument_key))
+        
+        self.cursor.executemany("""
+        UPDATE instruments_tier1
+        SET index_memberships = ?, last_updated = datetime('now')
+        WHERE instrument_key = ?
+        """, updates)
         
-        self.conn.commit()
-        logger.info(f"✅ Updated index_memberships for {len(matched_df)} instruments")
+        logger.info(f"✅ Updated index_memberships for {len(updates)} instruments")
     
-    def update_sector_industry(self, df: pd.DataFrame):
+    def update_sector_industry(self, df: pd.DataFrame, index_code: str = ''):
         """Update sector/industry metadata from enriched data"""
         logger.info(f"🏭 Updating sector/industry metadata...")
         
-        matched_df = df[df['instrument_key'].notna()].copy()
-        
         # Check what columns are available
-        has_sector = 'sector' in matched_df.columns
-        has_industry = 'industry' in matched_df.columns
-        
-        if not has_sector and not has_industry:
+        if 'sector' not in df.columns and 'industry' not in df.columns:
             logger.info("  ℹ️  No sector/industry data to update")
             return
         
-        # Filter rows with metadata
-        if has_sector and has_industry:
-            has_metadata = matched_df[
-                matched_df['sector'].notna() | matched_df['industry'].notna()
-            ]
-        elif has_sector:
-            has_metadata = matched_df[matched_df['sector'].notna()]
-        else:  # has_industry only
-            has_metadata = matched_df[matched_df['industry'].notna()]
-        
-        if has_metadata.empty:
+        self._stage_batch(index_code, df)
+        
+        # Only overwrite with non-null values (COALESCE keeps the existing one)
+        self.cursor.execute("""
+        UPDATE instruments_tier1
+        SET sector = COALESCE((
+                SELECT b.sector FROM temp.classify_batch b
+                WHERE b.instrument_key = instruments_tier1.instrument_key
+            ), sector),
+            industry = COALESCE((
+                SELECT b.industry FROM temp.classify_batch b
+                WHERE b.instrument_key = instruments_tier1.instrument_key
+            ), industry),
+            last_updated = datetime('now')
+        WHERE instrument_key IN (
+            SELECT instrument_key FROM temp.classify_batch
+            WHERE sector IS NOT NULL OR industry IS NOT NULL
+        )
+        """)
+        updated = self.cursor.rowcount
+        
+        if not updated:
             logger.info("  ℹ️  No sector/industry data to update")
             return
         
-        for _, row in has_metadata.iterrows():
-            updates = []
-            params = []
-            
-            if has_sector and pd.notna(row.get('sector')):
-                updates.append("sector = ?")
-                params.append(row['sector'])
-            
-            if has_industry and pd.notna(row.get('industry')):
-                updates.append("industry = ?")
-                params.append(row['industry'])
-            
-            if updates:
-                updates.append("last_updated = datetime('now')")
-                params.append(row['instrument_key'])
-                
-                query = f"""
-                UPDATE instruments_tier1
-                SET {', '.join(updates)}
-                WHERE instrument_key = ?
-                """
-                self.cursor.execute(query, params)
-        
-        self.conn.commit()
-        self.stats['sectors_added'] += len(has_metadata)
-        
-        logger.info(f"✅ Updated sector/industry for {len(has_metadata)} instruments")
+        self.stats['sectors_added'] += updated
+        
+        logger.info(f"✅ Updated sector/industry for {updated} instruments")
     
     def classify_index(self, index_code: str):
         """Complete classification workflow for one index"""
@@ -310,26 +337,56 @@ class NSEIndexClassifier:
             logger.error(f"❌ Cannot classify {index_code} - no data found")
             return
         
+        self.classify_dataframe(index_code, df)
+    
+    def classify_dataframe(self, index_code: str, df: pd.DataFrame):
+        """Classify one index from an in-memory enriched DataFrame (one transaction)"""
         self.stats['constituents_found'] += len(df)
         
         # Match to instruments_tier1
         df = self.match_to_instruments(df)
         
-        # Populate mappings table
-        self.populate_constituents_table(index_code, df)
-        
-        # Update tier1 flags
-        self.update_tier1_flags(index_code, df)
-        
-        # Update index_memberships
-        self.update_index_memberships(index_code, df)
-        
-        # Update sector/industry
-        self.update_sector_industry(df)
+        self._batch_seq += 1
+        self._batch = self._batch_seq
+        try:
+            # Populate mappings table
+            self.populate_constituents_table(index_code, df)
+            
+            # Update tier1 flags
+            self.update_tier1_flags(index_code, df)
+            
+            # Update index_memberships
+            self.update_index_memberships(index_code, df)
+            
+            # Update sector/industry
+            self.update_sector_industry(df, index_code)
+            
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            self._batch = None
+            self._staged = None
         
         self.stats['indices_processed'] += 1
         logger.info(f"✅ {index_code} classification complete")
     
+    def classify_frames(self, frames: Dict[str, pd.DataFrame]):
+        """Classify indices handed over in memory by the scraper (no CSV round-trip)"""
+        if not frames:
+            logger.info("ℹ️  No changed indices to classify")
+            return
+        
+        for i, (index_code, df) in enumerate(sorted(frames.items()), 1):
+            logger.info(f"\n[{i}/{len(frames)}] Processing {index_code}...")
+            logger.info(f"\n{'=' * 70}")
+            logger.info(f"CLASSIFYING: {index_code}")
+            logger.info(f"{'=' * 70}")
+            self.classify_dataframe(index_code, df.copy())
+        
+        self.print_summary()
+    
     def get_all_scraped_indices(self) -> List[str]:
         """Get list of indices with enriched CSV files"""
         csv_files = DATA_DIR.glob('*_enriched.csv')
@@ -6,25 +6,35 @@ Coordinates the complete NSE index classification pipeline:
 2. Scrape all 18 NSE indices (CSV + HTML)
 3. Classify and map to instruments_tier1
 4. Validation and reporting
+
+All steps run in-process: the scraper hands changed indices to the classifier
+as DataFrames, so an unchanged day (all CSVs 304) finishes in seconds.
 """
 
+import os
 import sqlite3
 import logging
-import subprocess
 import sys
+import time
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional
 
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from backend.data.database import schema_indices
+from backend.data.etl.nse_index_scraper import NSEIndexScraper
+from backend.data.etl.nse_index_classifier import NSEIndexClassifier
+
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
 # Paths
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 DB_PATH = PROJECT_ROOT / "market_data.db"
-SCHEMA_SCRIPT = PROJECT_ROOT / "scripts" / "schema_indices_v1.py"
-SCRAPER_SCRIPT = PROJECT_ROOT / "scripts" / "etl" / "nse_index_scraper.py"
-CLASSIFIER_SCRIPT = PROJECT_ROOT / "scripts" / "etl" / "nse_index_classifier.py"
 
 
 class NSEIndexOrchestrator:
@@ -38,10 +48,13 @@ class NSEIndexOrchestrator:
     - Logs to database
     """
     
-    def __init__(self, db_path=DB_PATH):
-        self.db_path = db_path
+    def __init__(self, db_path=DB_PATH, force: bool = False):
+        self.db_path = Path(db_path)
         self.conn = sqlite3.connect(db_path)
         self.cursor = self.conn.cursor()
+        self.force = force  # Re-download every CSV, ignoring ETag/Last-Modified
+        self.scraped: Dict[str, pd.DataFrame] = {}
+        self.scraper: Optional[NSEIndexScraper] = None  # Holds CSV validators until classification commits
         
         self.execution_log = {
             'start_time': datetime.now(),
@@ -96,20 +109,6 @@ class NSEIndexOrchestrator:
         else:
             logger.info(f"✅ instruments_tier1: {tier1_count:,} stocks")
         
-        # Check script files exist
-        scripts = [
-            ('Schema Migration', SCHEMA_SCRIPT),
-            ('NSE Scraper', SCRAPER_SCRIPT),
-            ('Index Classifier', CLASSIFIER_SCRIPT)
-        ]
-        
-        for name, path in scripts:
-            if not path.exists():
-                logger.error(f"❌ {name} not found: {path}")
-                checks_passed = False
-            else:
-                logger.info(f"✅ {name}: {path.name}")
-        
         # Check Python packages
         try:
             import requests
@@ -124,7 +123,7 @@ class NSEIndexOrchestrator:
         return checks_passed
     
     def run_schema_migration(self) -> bool:
-        """Execute schema migration script"""
+        """Execute schema migration (in-process)"""
         logger.info("=" * 70)
         logger.info("STEP 1: SCHEMA MIGRATION")
         logger.info("=" * 70)
@@ -142,30 +141,17 @@ class NSEIndexOrchestrator:
                 return True
             
             # Run migration
-            logger.info(f"🔧 Running: {SCHEMA_SCRIPT.name}")
-            result = subprocess.run(
-                [sys.executable, str(SCHEMA_SCRIPT)],
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
+            logger.info("🔧 Running: schema_indices migration")
+            schema_indices.migrate_instruments_tier1(self.conn)
+            schema_indices.create_nse_index_metadata_table(self.conn)
+            schema_indices.create_index_constituents_v2_table(self.conn)
+            schema_indices.create_index_scrape_log_table(self.conn)
+            schema_indices.seed_index_metadata(self.conn)
             
-            if result.returncode == 0:
-                logger.info("✅ Schema migration completed")
-                logger.info(result.stdout)
-                self.execution_log['schema_migration'] = 'SUCCESS'
-                return True
-            else:
-                logger.error(f"❌ Schema migration failed (exit code {result.returncode})")
-                logger.error(result.stderr)
-                self.execution_log['schema_migration'] = 'FAILED'
-                self.execution_log['errors'].append(f"Schema: {result.stderr}")
-                return False
+            logger.info("✅ Schema migration completed")
+            self.execution_log['schema_migration'] = 'SUCCESS'
+            return True
                 
-        except subprocess.TimeoutExpired:
-            logger.error("❌ Schema migration timed out")
-            self.execution_log['schema_migration'] = 'TIMEOUT'
-            return False
         except Exception as e:
             logger.error(f"❌ Schema migration error: {e}")
             self.execution_log['schema_migration'] = 'ERROR'
@@ -173,44 +159,40 @@ class NSEIndexOrchestrator:
             return False
     
     def run_scraper(self) -> bool:
-        """Execute NSE index scraper"""
+        """Execute NSE index scraper (in-process, concurrent, conditional GETs)"""
         logger.info("\n" + "=" * 70)
         logger.info("STEP 2: NSE INDEX SCRAPER")
         logger.info("=" * 70)
         
+        scraper = None
         try:
-            logger.info(f"🕷️  Running: {SCRAPER_SCRIPT.name}")
-            logger.info("   This will download CSVs and scrape HTML for all 18 indices")
-            logger.info("   Estimated time: 2-3 minutes (rate limited)")
+            logger.info("🕷️  Downloading CSVs and scraping HTML for all 18 indices")
+            step_start = time.time()
             
-            result = subprocess.run(
-                [sys.executable, str(SCRAPER_SCRIPT)],
-                capture_output=True,
-                text=True,
-                timeout=300  # 5 minutes max
-            )
+            scraper = NSEIndexScraper(db_path=self.db_path)
+            self.scraped = scraper.scrape_all_indices(conditional=not self.force, commit_validators=False)
+            self.scraper = scraper
             
-            if result.returncode == 0:
-                logger.info("✅ Scraper completed")
-                logger.info(result.stdout)
-                self.execution_log['scraper'] = 'SUCCESS'
-                return True
-            else:
-                logger.error(f"❌ Scraper failed (exit code {result.returncode})")
-                logger.error(result.stderr)
+            logger.info(f"✅ Scraper completed in {time.time() - step_start:.1f}s: "
+                        f"{len(self.scraped)} changed, {len(scraper.unchanged)} unchanged")
+            
+            if not self.scraped and not scraper.unchanged:
+                logger.error("❌ Scraper produced no data")
                 self.execution_log['scraper'] = 'FAILED'
-                self.execution_log['errors'].append(f"Scraper: {result.stderr}")
+                self.execution_log['errors'].extend(scraper.stats['errors'])
                 return False
+            
+            self.execution_log['scraper'] = 'SUCCESS'
+            return True
                 
-        except subprocess.TimeoutExpired:
-            logger.error("❌ Scraper timed out (>5 minutes)")
-            self.execution_log['scraper'] = 'TIMEOUT'
-            return False
         except Exception as e:
             logger.error(f"❌ Scraper error: {e}")
             self.execution_log['scraper'] = 'ERROR'
             self.execution_log['errors'].append(f"Scraper: {str(e)}")
             return False
+        finally:
+            if scraper is not None:
+                scraper.close()
     
     def run_classifier(self) -> bool:
         """Execute index classifier"""
@@ -218,38 +200,32 @@ class NSEIndexOrchestrator:
         logger.info("STEP 3: INDEX CLASSIFIER")
         logger.info("=" * 70)
         
+        if not self.scraped:
+            logger.info("⏭️  No index changed since last run, skipping classification")
+            self.execution_log['classifier'] = 'SKIPPED'
+            return True
+        
+        classifier = None
         try:
-            logger.info(f"🏷️  Running: {CLASSIFIER_SCRIPT.name}")
-            logger.info("   This will map constituents to instruments_tier1")
+            logger.info(f"🏷️  Mapping {len(self.scraped)} changed indices to instruments_tier1")
             
-            result = subprocess.run(
-                [sys.executable, str(CLASSIFIER_SCRIPT)],
-                capture_output=True,
-                text=True,
-                timeout=120  # 2 minutes max
-            )
+            classifier = NSEIndexClassifier(db_path=self.db_path)
+            classifier.classify_frames(self.scraped)
+            # Only now may an unchanged CSV (304) skip these indices on later runs
+            self.scraper.commit_validators(list(self.scraped))
             
-            if result.returncode == 0:
-                logger.info("✅ Classifier completed")
-                logger.info(result.stdout)
-                self.execution_log['classifier'] = 'SUCCESS'
-                return True
-            else:
-                logger.error(f"❌ Classifier failed (exit code {result.returncode})")
-                logger.error(result.stderr)
-                self.execution_log['classifier'] = 'FAILED'
-                self.execution_log['errors'].append(f"Classifier: {result.stderr}")
-                return False
+            logger.info("✅ Classifier completed")
+            self.execution_log['classifier'] = 'SUCCESS'
+            return True
                 
-        except subprocess.TimeoutExpired:
-            logger.error("❌ Classifier timed out (>2 minutes)")
-            self.execution_log['classifier'] = 'TIMEOUT'
-            return False
         except Exception as e:
             logger.error(f"❌ Classifier error: {e}")
             self.execution_log['classifier'] = 'ERROR'
             self.execution_log['errors'].append(f"Classifier: {str(e)}")
             return False
+        finally:
+            if classifier is not None:
+                classifier.close()
     
     def validate_results(self) -> bool:
         """Validate classification results"""
@@ -445,7 +421,12 @@ class NSEIndexOrchestrator:
 
 def main():
     """CLI entry point"""
-    orchestrator = NSEIndexOrchestrator()
+    import argparse
+    parser = argparse.ArgumentParser(description="Run the NSE index classification pipeline")
+    parser.add_argument("--force", action="store_true", help="Re-download all CSVs even if unchanged")
+    args = parser.parse_args()
+    
+    orchestrator = NSEIndexOrchestrator(force=args.force)
     
     try:
         success = orchestrator.run_pipeline()
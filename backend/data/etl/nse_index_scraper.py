@@ -3,24 +3,38 @@
 NSE Index Scraper - Production Grade
 Downloads CSVs and scrapes HTML for all 18 NSE indices
 Extracts sector/industry metadata and merges with official CSV data
+
+Indices are fetched concurrently through the shared NSE client (one keep-alive
+session, one rate limiter); CSVs use ETag/Last-Modified so unchanged indices
+are skipped with a 304.
 """
 
+import os
+import sys
 import requests
 import pandas as pd
 import logging
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 from bs4 import BeautifulSoup
 import sqlite3
 
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from backend.data.etl.nse_http import get_nse_client, NSE_MAX_WORKERS
+
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
 DB_PATH = Path(__file__).parent.parent.parent / "market_data.db"
 DATA_DIR = Path(__file__).parent.parent.parent / "data" / "nse_indices"
 DATA_DIR.mkdir(parents=True, exist_ok=True)
+HTTP_CONSUMER = "nse_index_scraper"  # Key for this scraper's ETag/Last-Modified validators
 
 
 class NSEIndexScraper:
@@ -32,36 +46,55 @@ class NSEIndexScraper:
     
     def __init__(self, db_path=DB_PATH):
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
+        # Shared by worker threads; every DB access goes through _db_lock
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
         self.cursor = self.conn.cursor()
+        self._db_lock = threading.Lock()
         
-        # HTTP session with retry logic
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-        })
+        # Shared keep-alive session + polite rate limiter
+        self.http = get_nse_client(db_path)
+        self.session = self.http.session
         
+        self.unchanged: Set[str] = set()  # Indices whose CSV returned 304
+        # index_code -> (csv_url, 200 response) whose validators wait for commit_validators()
+        self.pending_validators: Dict[str, Tuple[str, requests.Response]] = {}
         self.stats = {
             'total_indices': 0,
             'csv_success': 0,
             'html_success': 0,
             'merged_success': 0,
+            'not_modified': 0,
             'errors': []
         }
     
+    def _log_scrape(self, index_code: str, scrape_type: str, status: str, found: int,
+                    duration: float, error_message: Optional[str] = None):
+        """Record a scrape attempt in nse_index_scrape_log"""
+        with self._db_lock:
+            if error_message is None:
+                self.cursor.execute("""
+                INSERT INTO nse_index_scrape_log 
+                (index_code, scrape_type, status, constituents_found, duration_seconds)
+                VALUES (?, ?, ?, ?, ?)
+                """, (index_code, scrape_type, status, found, duration))
+            else:
+                self.cursor.execute("""
+                INSERT INTO nse_index_scrape_log 
+                (index_code, scrape_type, status, constituents_found, duration_seconds, error_message)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """, (index_code, scrape_type, status, found, duration, error_message))
+            self.conn.commit()
+    
     def get_index_config(self, index_code: str) -> Optional[Dict]:
         """Fetch index configuration from database"""
-        self.cursor.execute("""
-        SELECT index_code, index_name, index_type, expected_count, csv_url, html_url
-        FROM nse_index_metadata
-        WHERE index_code = ?
-        """, (index_code,))
-        
-        row = self.cursor.fetchone()
+        with self._db_lock:
+            self.cursor.execute("""
+            SELECT index_code, index_name, index_type, expected_count, csv_url, html_url
+            FROM nse_index_metadata
+            WHERE index_code = ?
+            """, (index_code,))
+            
+            row = self.cursor.fetchone()
         if not row:
             return None
         
@@ -79,10 +112,15 @@ class NSEIndexScraper:
         self.cursor.execute("SELECT index_code FROM nse_index_metadata ORDER BY index_code")
         return [row[0] for row in self.cursor.fetchall()]
     
-    def download_csv(self, index_code: str, csv_url: str) -> Optional[pd.DataFrame]:
+    def download_csv(self, index_code: str, csv_url: str, conditional: bool = False) -> Optional[pd.DataFrame]:
         """
         Download official NSE CSV
         Returns DataFrame with: Symbol, Company Name, Industry, ISIN Code
+        
+        With ``conditional=True`` the request carries If-None-Match/If-Modified-Since;
+        on 304 the index is added to ``self.unchanged`` and None is returned.
+        Validators of a fresh CSV are only held in ``pending_validators`` until
+        ``commit_validators()`` confirms the data was written downstream.
         """
         scrape_start = time.time()
         
@@ -90,7 +128,17 @@ class NSEIndexScraper:
             logger.info(f"📥 Downloading CSV for {index_code}...")
             logger.debug(f"   URL: {csv_url}")
             
-            response = self.session.get(csv_url, timeout=30)
+            headers = self.http.conditional_headers(HTTP_CONSUMER, csv_url) if conditional else {}
+            with self.http.limiter:
+                response = self.session.get(csv_url, headers=headers, timeout=30)
+            
+            if conditional and response.status_code == 304:
+                with self._db_lock:
+                    self.unchanged.add(index_code)
+                    self.stats['not_modified'] += 1
+                logger.info(f"⏭️  {index_code} CSV not modified (304)")
+                return None
+            
             response.raise_for_status()
             
             # Parse CSV
@@ -127,12 +175,9 @@ class NSEIndexScraper:
             duration = time.time() - scrape_start
             
             # Log to database
-            self.cursor.execute("""
-            INSERT INTO nse_index_scrape_log 
-            (index_code, scrape_type, status, constituents_found, duration_seconds)
-            VALUES (?, 'CSV', 'SUCCESS', ?, ?)
-            """, (index_code, len(df), duration))
-            self.conn.commit()
+            self._log_scrape(index_code, 'CSV', 'SUCCESS', len(df), duration)
+            with self._db_lock:
+                self.pending_validators[index_code] = (csv_url, response)
             
             self.stats['csv_success'] += 1
             logger.info(f"✅ CSV downloaded: {len(df)} constituents in {duration:.2f}s")
@@ -143,12 +188,7 @@ class NSEIndexScraper:
             duration = time.time() - scrape_start
             error_msg = str(e)
             
-            self.cursor.execute("""
-            INSERT INTO nse_index_scrape_log 
-            (index_code, scrape_type, status, constituents_found, duration_seconds, error_message)
-            VALUES (?, 'CSV', 'FAILED', 0, ?, ?)
-            """, (index_code, duration, error_msg))
-            self.conn.commit()
+            self._log_scrape(index_code, 'CSV', 'FAILED', 0, duration, error_msg)
             
             logger.error(f"❌ CSV download failed for {index_code}: {error_msg}")
             self.stats['errors'].append(f"{index_code}_CSV: {error_msg}")
@@ -166,7 +206,8 @@ class NSEIndexScraper:
             logger.info(f"🌐 Scraping HTML metadata for {index_code}...")
             logger.debug(f"   URL: {html_url}")
             
-            response = self.session.get(html_url, timeout=30)
+            with self.http.limiter:
+                response = self.session.get(html_url, timeout=30)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.text, 'html.parser')
@@ -227,12 +268,7 @@ class NSEIndexScraper:
             duration = time.time() - scrape_start
             
             # Log success
-            self.cursor.execute("""
-            INSERT INTO nse_index_scrape_log 
-            (index_code, scrape_type, status, constituents_found, duration_seconds)
-            VALUES (?, 'HTML', 'SUCCESS', ?, ?)
-            """, (index_code, len(df), duration))
-            self.conn.commit()
+            self._log_scrape(index_code, 'HTML', 'SUCCESS', len(df), duration)
             
             self.stats['html_success'] += 1
             logger.info(f"✅ HTML scraped: {len(df)} constituents in {duration:.2f}s")
@@ -243,12 +279,7 @@ class NSEIndexScraper:
             duration = time.time() - scrape_start
             error_msg = str(e)
             
-            self.cursor.execute("""
-            INSERT INTO nse_index_scrape_log 
-            (index_code, scrape_type, status, constituents_found, duration_seconds, error_message)
-            VALUES (?, 'HTML', 'FAILED', 0, ?, ?)
-            """, (index_code, duration, error_msg))
-            self.conn.commit()
+            self._log_scrape(index_code, 'HTML', 'FAILED', 0, duration, error_msg)
             
             logger.warning(f"⚠️  HTML scraping failed for {index_code}: {error_msg}")
             # HTML scraping is optional, so don't add to errors
@@ -290,9 +321,13 @@ class NSEIndexScraper:
         
         return merged
     
+    @staticmethod
+    def enriched_path(index_code: str) -> Path:
+        return DATA_DIR / f"{index_code}_enriched.csv"
+    
     def save_enriched_data(self, index_code: str, df: pd.DataFrame):
         """Save enriched data to CSV for auditing"""
-        output_path = DATA_DIR / f"{index_code}_enriched.csv"
+        output_path = self.enriched_path(index_code)
         
         # Add metadata
         df['index_code'] = index_code
@@ -301,13 +336,15 @@ class NSEIndexScraper:
         df.to_csv(output_path, index=False)
         logger.info(f"  💾 Saved to: {output_path}")
     
-    def scrape_index(self, index_code: str) -> Optional[pd.DataFrame]:
+    def scrape_index(self, index_code: str, conditional: bool = False) -> Optional[pd.DataFrame]:
         """
         Complete scraping workflow for one index
-        1. Download CSV (official data)
+        1. Download CSV (official data) - skipped on 304 when ``conditional``
         2. Scrape HTML (enrichment)
         3. Merge data
         4. Save to file
+        
+        Returns the enriched DataFrame, or None if the index failed or is unchanged.
         """
         logger.info(f"\n{'=' * 70}")
         logger.info(f"SCRAPING: {index_code}")
@@ -321,14 +358,26 @@ class NSEIndexScraper:
         
         scrape_start = time.time()
         
+        # A 304 is only trustworthy while the previous enriched output still exists
+        if conditional and not self.enriched_path(index_code).exists():
+            conditional = False
+        
         # Step 1: Download CSV
-        csv_df = self.download_csv(index_code, config['csv_url'])
+        csv_df = self.download_csv(index_code, config['csv_url'], conditional=conditional)
         if csv_df is None:
+            if index_code in self.unchanged:
+                with self._db_lock:
+                    self.cursor.execute("""
+                    UPDATE nse_index_metadata
+                    SET last_scraped = datetime('now'), last_scrape_status = 'SUCCESS'
+                    WHERE index_code = ?
+                    """, (index_code,))
+                    self.conn.commit()
+                return None
             logger.error(f"❌ CSV download failed for {index_code}, skipping index")
             return None
         
-        # Step 2: Scrape HTML (optional enhancement)
-        time.sleep(1)  # Rate limiting between requests
+        # Step 2: Scrape HTML (optional enhancement, rate limited by the shared client)
         html_df = self.scrape_html_metadata(index_code, config['html_url'])
         
         # Step 3: Merge data
@@ -339,24 +388,48 @@ class NSEIndexScraper:
         
         # Update metadata
         duration = time.time() - scrape_start
-        self.cursor.execute("""
-        UPDATE nse_index_metadata
-        SET constituent_count = ?,
-            last_scraped = datetime('now'),
-            last_scrape_status = 'SUCCESS',
-            scrape_error_message = NULL,
-            updated_at = datetime('now')
-        WHERE index_code = ?
-        """, (len(enriched_df), index_code))
-        self.conn.commit()
-        
-        self.stats['merged_success'] += 1
+        with self._db_lock:
+            self.cursor.execute("""
+            UPDATE nse_index_metadata
+            SET constituent_count = ?,
+                last_scraped = datetime('now'),
+                last_scrape_status = 'SUCCESS',
+                scrape_error_message = NULL,
+                updated_at = datetime('now')
+            WHERE index_code = ?
+            """, (len(enriched_df), index_code))
+            self.conn.commit()
+            self.stats['merged_success'] += 1
         logger.info(f"✅ {index_code} completed in {duration:.2f}s")
         
         return enriched_df
     
-    def scrape_all_indices(self):
-        """Scrape all 18 indices"""
+    def commit_validators(self, index_codes: Optional[List[str]] = None):
+        """
+        Store ETag/Last-Modified for indices whose data has been written
+        (all pending ones by default). Until then later runs re-download them.
+        """
+        with self._db_lock:
+            codes = list(self.pending_validators) if index_codes is None else index_codes
+            pending = [self.pending_validators.pop(code) for code in codes if code in self.pending_validators]
+        for csv_url, response in pending:
+            self.http.remember(HTTP_CONSUMER, csv_url, response)
+    
+    def scrape_all_indices(self, max_workers: int = NSE_MAX_WORKERS,
+                           conditional: bool = True,
+                           commit_validators: bool = True) -> Dict[str, pd.DataFrame]:
+        """
+        Scrape all 18 indices concurrently
+        
+        Args:
+            max_workers: Parallel downloads (the shared rate limiter still caps req/s)
+            conditional: Skip indices whose CSV is unchanged since the last run
+            commit_validators: Store validators for the indices saved here; pass
+                False when a later step (classification) must succeed first
+        
+        Returns:
+            {index_code: enriched DataFrame} for indices that changed
+        """
         logger.info("=" * 70)
         logger.info("NSE INDEX SCRAPER - SCRAPING ALL 18 INDICES")
         logger.info("=" * 70)
@@ -364,20 +437,32 @@ class NSEIndexScraper:
         indices = self.get_all_indices()
         self.stats['total_indices'] = len(indices)
         
-        logger.info(f"\nFound {len(indices)} indices to scrape")
+        logger.info(f"\nFound {len(indices)} indices to scrape ({max_workers} workers)")
         logger.info(f"Output directory: {DATA_DIR}")
         logger.info("")
         
-        for i, index_code in enumerate(indices, 1):
-            logger.info(f"\n[{i}/{len(indices)}] Processing {index_code}...")
-            
-            self.scrape_index(index_code)
-            
-            # Rate limiting between indices
-            if i < len(indices):
-                time.sleep(2)
+        results: Dict[str, pd.DataFrame] = {}
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="nse-scrape") as pool:
+            futures = {
+                pool.submit(self.scrape_index, index_code, conditional): index_code
+                for index_code in indices
+            }
+            for future in as_completed(futures):
+                index_code = futures[future]
+                try:
+                    df = future.result()
+                except Exception as e:
+                    logger.error(f"❌ {index_code} failed: {e}")
+                    self.stats['errors'].append(f"{index_code}: {e}")
+                    continue
+                if df is not None:
+                    results[index_code] = df
+        
+        if commit_validators:
+            self.commit_validators(list(results))
         
         self.print_summary()
+        return results
     
     def print_summary(self):
         """Print scraping summary"""
@@ -388,6 +473,7 @@ class NSEIndexScraper:
         logger.info(f"CSV success:        {self.stats['csv_success']}")
         logger.info(f"HTML success:       {self.stats['html_success']}")
         logger.info(f"Merged success:     {self.stats['merged_success']}")
+        logger.info(f"Not modified (304): {self.stats['not_modified']}")
         logger.info(f"Errors:             {len(self.stats['errors'])}")
         
         if self.stats['errors']:
@@ -417,10 +503,15 @@ class NSEIndexScraper:
 
 def main():
     """CLI entry point"""
+    import argparse
+    parser = argparse.ArgumentParser(description="Scrape NSE index constituents")
+    parser.add_argument("--force", action="store_true", help="Ignore ETag/Last-Modified and re-download all CSVs")
+    args = parser.parse_args()
+    
     scraper = NSEIndexScraper()
     
     try:
-        scraper.scrape_all_indices()
+        scraper.scrape_all_indices(conditional=not args.force)
         
         logger.info("\n✅ Scraping completed successfully!")
         logger.info("\nNext steps:")
@@ -2,18 +2,28 @@
 """
 NSE Indices ETL Pipeline
 Fetches all NSE indices data (Broad, Sectoral, Thematic) and populates database
+CSVs are downloaded concurrently via the shared NSE client; unchanged CSVs (304)
+are skipped entirely.
 """
 
-import requests
+import os
+import sys
 import csv
 import sqlite3
 import logging
-import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import io
 
+import requests
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from backend.data.etl.nse_http import get_nse_client, NSE_MAX_WORKERS
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(levelname)s - %(message)s"
@@ -21,38 +31,36 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 DB_PATH = Path(__file__).parent.parent.parent / "market_data.db"
-
-# NSE requires proper headers
-NSE_HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
-    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-    "Accept-Language": "en-US,en;q=0.5",
-    "Accept-Encoding": "gzip, deflate",
-    "Connection": "keep-alive",
-}
+HTTP_CONSUMER = "nse_indices_fetcher"  # Key for this fetcher's ETag/Last-Modified validators
 
 
 class NSEIndicesFetcher:
     """Fetch and populate NSE indices data"""
     
-    def __init__(self, db_path=DB_PATH):
+    def __init__(self, db_path=DB_PATH, conditional: bool = True):
         self.db_path = db_path
-        self.session = requests.Session()
-        self.session.headers.update(NSE_HEADERS)
+        self.http = get_nse_client(db_path)
+        self.session = self.http.session
+        self.conditional = conditional
+        # index_code -> (url, 200 response) whose validators wait for the insert to commit
+        self._fresh: Dict[str, Tuple[str, requests.Response]] = {}
         self.stats = {
             "indices_processed": 0,
+            "indices_unchanged": 0,
             "constituents_inserted": 0,
             "constituents_updated": 0,
             "sectors_created": 0,
             "errors": 0
         }
     
-    def fetch_csv(self, url: str, index_code: str) -> List[Dict]:
-        """Download and parse CSV from NSE"""
+    def fetch_csv(self, url: str, index_code: str) -> Optional[List[Dict]]:
+        """Download and parse CSV from NSE (None if unchanged since last fetch)"""
         try:
             logger.info(f"Fetching {index_code} from NSE...")
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
+            response = self.http.get(url, consumer=HTTP_CONSUMER if self.conditional else None)
+            if response.status_code == 304:
+                logger.info(f"⏭️  {index_code} unchanged (304)")
+                return None
             
             # Parse CSV
             content = response.content.decode('utf-8')
@@ -66,6 +74,7 @@ class NSEIndicesFetcher:
                     data.append(cleaned_row)
             
             logger.info(f"✅ Fetched {len(data)} constituents for {index_code}")
+            self._fresh[index_code] = (url, response)
             return data
             
         except Exception as e:
@@ -186,24 +195,31 @@ class NSEIndicesFetcher:
         
         logger.info(f"Found {len(indices)} indices to fetch\n")
         
-        for index_code, index_name, category, csv_url in indices:
-            logger.info(f"📊 Processing: {index_name} ({category})")
-            
-            # Fetch CSV data
-            data = self.fetch_csv(csv_url, index_code)
-            
-            if data:
-                # Insert constituents
-                inserted, updated = self.insert_constituents(index_code, data)
-                self.stats["indices_processed"] += 1
-                self.stats["constituents_inserted"] += inserted
-                self.stats["constituents_updated"] += updated
+        # Downloads run in parallel (shared rate limiter keeps NSE happy);
+        # inserts stay on this thread as each CSV arrives.
+        with ThreadPoolExecutor(max_workers=NSE_MAX_WORKERS, thread_name_prefix="nse-fetch") as pool:
+            futures = {
+                pool.submit(self.fetch_csv, csv_url, index_code): (index_code, index_name, category)
+                for index_code, index_name, category, csv_url in indices
+            }
+            for future in as_completed(futures):
+                index_code, index_name, category = futures[future]
+                data = future.result()
+                logger.info(f"📊 Processing: {index_name} ({category})")
                 
-                logger.info(f"   ✓ {inserted} inserted, {updated} updated")
-            
-            # Be nice to NSE servers
-            time.sleep(2)
-            logger.info("")
+                if data is None:
+                    self.stats["indices_unchanged"] += 1
+                elif data:
+                    # Insert constituents
+                    inserted, updated = self.insert_constituents(index_code, data)
+                    # Constituents are committed: later runs may now skip this CSV on 304
+                    url, response = self._fresh.pop(index_code)
+                    self.http.remember(HTTP_CONSUMER, url, response)
+                    self.stats["indices_processed"] += 1
+                    self.stats["constituents_inserted"] += inserted
+                    self.stats["constituents_updated"] += updated
+                    
+                    logger.info(f"   ✓ {inserted} inserted, {updated} updated")
         
         self._print_summary()
     
@@ -213,6 +229,7 @@ class NSEIndicesFetcher:
         logger.info("EXECUTION SUMMARY")
         logger.info("=" * 70)
         logger.info(f"Indices processed:      {self.stats['indices_processed']}")
+        logger.info(f"Indices unchanged:      {self.stats['indices_unchanged']}")
         logger.info(f"Constituents inserted:  {self.stats['constituents_inserted']}")
         logger.info(f"Constituents updated:   {self.stats['constituents_updated']}")
         logger.info(f"Sectors created:        {self.stats['sectors_created']}")
@@ -269,7 +286,12 @@ class NSEIndicesFetcher:
 
 def main():
     """Main execution"""
-    fetcher = NSEIndicesFetcher()
+    import argparse
+    parser = argparse.ArgumentParser(description="Fetch NSE index constituents")
+    parser.add_argument("--force", action="store_true", help="Re-download all CSVs even if unchanged")
+    args = parser.parse_args()
+    
+    fetcher = NSEIndicesFetcher(conditional=not args.force)
     fetcher.fetch_all_indices()
     
     logger.info("\n✅ NSE Indices ETL completed successfully!")
@@ -6,6 +6,8 @@ Features:
 - Fetches "Monthly" expiry option chain.
 - Flattens nested JSON (Call/Put) to Wide Schema.
 - Stores in `optionchain_intrday_schema`.
+- Mirrors each cycle into epoch-keyed snapshots + summaries (see chain_snapshots.py).
+- Runs the batch chain analytics (max-pain, PCR, OI buildup, IV skew) after each cycle.
 - Handles Rate Limits & Market Hours.
 
 Usage:
@@ -19,14 +21,19 @@ import logging
 import os
 import sys
 import random
+import time
 from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta, time as dt_time
+from datetime import datetime, timedelta
 from urllib.parse import quote
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
 
 from backend.utils.auth.manager import AuthManager
+from backend.data.etl.poller_scheduler import PollerJob, PollerScheduler
+from backend.utils.helpers.serialization import loads
+from backend.data.database.chain_snapshots import ChainSnapshotStore
+from backend.core.analytics.chain_analytics import ChainAnalyticsEngine
 
 # Configuration
 DB_PATH = "market_data.db"
@@ -50,14 +57,8 @@ class OptionChainPoller:
     def __init__(self):
         self.auth_manager = AuthManager(db_path=DB_PATH)
         self.base_url = "https://api.upstox.com/v2/option/chain"
-
-    def is_market_open(self) -> bool:
-        """Check if market is open (09:15 - 15:30 IST)"""
-        now = datetime.now()
-        if now.weekday() >= 5: return False
-        
-        current_time = now.time()
-        return dt_time(9, 15) <= current_time <= dt_time(15, 30)
+        self.snapshot_schema_ready = False
+        self.analytics = ChainAnalyticsEngine(DB_PATH)
 
     def get_monthly_expiry(self) -> str:
         """
@@ -127,7 +128,7 @@ class OptionChainPoller:
             
             async with session.get(self.base_url, params=params, headers=headers) as response:
                 if response.status == 200:
-                    data = await response.json()
+                    data = loads(await response.read())
                     # Return the list of strikes
                     return data.get('data', [])
                 elif response.status == 400:
@@ -146,16 +147,25 @@ class OptionChainPoller:
             logger.error(f"Error fetching {symbol}: {e}")
             return None
 
-    def flatten_and_save(self, underlying_key: str, expiry: str, chain_data: List[Dict]):
-        """Flatten nested JSON and save to DB."""
+    def _init_snapshot_schema(self):
+        conn = sqlite3.connect(DB_PATH)
+        ChainSnapshotStore.init_schema(conn)
+        conn.close()
+
+    def flatten_and_save(self, underlying_key: str, expiry: str, chain_data: List[Dict],
+                         ts: Optional[int] = None):
+        """Flatten nested JSON and save to DB (wide rows + as-of snapshot)."""
         if not chain_data: return
 
         try:
             conn = sqlite3.connect(DB_PATH)
             conn.execute("PRAGMA journal_mode=WAL;")
             
-            timestamp = datetime.now().isoformat()
+            ts = ts or int(time.time())
+            timestamp = datetime.fromtimestamp(ts).isoformat()
             data_to_insert = []
+            snapshot_rows = []
+            spot = None
             
             for strike in chain_data:
                 # API Structure:
@@ -189,6 +199,12 @@ class OptionChainPoller:
                     pe_greeks.get('theta'), pe_greeks.get('vega'), pe_greeks.get('rho')
                 )
                 data_to_insert.append(row)
+                snapshot_rows.append((
+                    s_price,
+                    ce_md.get('ltp'), ce_md.get('oi'), ce_md.get('volume'), ce_greeks.get('iv'), ce_greeks.get('delta'),
+                    pe_md.get('ltp'), pe_md.get('oi'), pe_md.get('volume'), pe_greeks.get('iv'), pe_greeks.get('delta'),
+                ))
+                spot = spot or strike.get('underlying_spot_price')
             
             conn.executemany("""
                 INSERT OR IGNORE INTO optionchain_intrday_schema (
@@ -199,6 +215,7 @@ class OptionChainPoller:
                     pe_iv, pe_delta, pe_gamma, pe_theta, pe_vega, pe_rho
                 ) VALUES (?,?,?,?,?,  ?,?,?,?,?,?,?,?,?,?,?,  ?,?,?,?,?,?,?,?,?,?,?,?)
             """, data_to_insert)
+            ChainSnapshotStore.save_snapshot(conn, underlying_key, expiry, ts, snapshot_rows, spot=spot)
             
             conn.commit()
             conn.close()
@@ -206,17 +223,24 @@ class OptionChainPoller:
             logger.error(f"DB Save Error: {e}")
 
     async def run_poll_cycle(self):
-        token = self.auth_manager.get_valid_token()
+        token = await asyncio.to_thread(self.auth_manager.get_valid_token)
         if not token: return
         
         headers = {'Authorization': f'Bearer {token}', 'Accept': 'application/json'}
         expiry = self.get_monthly_expiry()
-        instruments = self.get_target_instruments()
+        instruments = await asyncio.to_thread(self.get_target_instruments)
         
         logger.info(f"Starting Poll: {len(instruments)} instruments. Expiry: {expiry}")
         
         # Limit for safety
         if len(instruments) > 250: instruments = instruments[:250]
+
+        if not self.snapshot_schema_ready:
+            await asyncio.to_thread(self._init_snapshot_schema)
+            self.snapshot_schema_ready = True
+
+        # One timestamp per cycle so every underlying's snapshot lines up
+        cycle_ts = int(time.time())
         
         async with aiohttp.ClientSession() as session:
             sem = asyncio.Semaphore(CONCURRENT_REQUESTS)
@@ -225,28 +249,23 @@ class OptionChainPoller:
                 async with sem:
                     data = await self.fetch_chain(session, sym, key, expiry, headers)
                     if data:
-                        self.flatten_and_save(key, expiry, data)
+                        await asyncio.to_thread(self.flatten_and_save, key, expiry, data, cycle_ts)
             
             tasks = [process(sym, key) for sym, key in instruments]
             await asyncio.gather(*tasks)
+
+        try:
+            await asyncio.to_thread(self.analytics.run, cycle_ts)
+        except Exception as e:
+            logger.error(f"Chain analytics failed: {e}")
             
         logger.info("Cycle Complete.")
 
     async def start(self):
+        """Poll on the 5-minute wall-clock grid during market sessions (poller_scheduler.py)"""
         logger.info(f"Option Chain Poller Started. Target Expiry: {self.get_monthly_expiry()}")
-        while True:
-            if not self.is_market_open() and not os.getenv("FORCE_RUN"):
-                logger.info("Market Closed. Sleeping...")
-                await asyncio.sleep(300)
-                continue
-                
-            start_ts = datetime.now()
-            await self.run_poll_cycle()
-            
-            elapsed = (datetime.now() - start_ts).total_seconds()
-            sleep_time = max(0, POLL_INTERVAL - elapsed)
-            logger.info(f"Sleeping {sleep_time:.1f}s")
-            await asyncio.sleep(sleep_time)
+        await PollerScheduler([PollerJob("option_chain", self.run_poll_cycle, interval=POLL_INTERVAL)]).run()
+
 
 if __name__ == "__main__":
     import argparse
@@ -0,0 +1,291 @@
+"""
+Poller Scheduler
+----------------
+Runs the ETL pollers as jobs on one asyncio event loop instead of one
+`while True` process each.
+Features:
+- Wall-clock aligned: a job with interval 300 and offset 5 runs at 09:20:05,
+  09:25:05, ... (5 s after each 5-minute bar closes). The next due time is
+  derived from time.time() every cycle, so a slow cycle never shifts later ones.
+- Staggered: the default jobs start STAGGER seconds apart after the bar
+  close, so they don't all hit the Upstox rate limit in the same second.
+- Market-aware: only bars inside an NSE session (market_calendar.py) are
+  polled; between sessions a job sleeps until the first bar of the next one.
+- Metrics: due time, lag, duration and in-session cycles skipped because a run
+  overran are kept per job (PollerScheduler.metrics()) and in poller_runs.
+
+Usage:
+    python backend/data/etl/poller_scheduler.py                          # every poller
+    python backend/data/etl/poller_scheduler.py --jobs intraday_candles option_chain
+    FORCE_RUN=1 python backend/data/etl/poller_scheduler.py              # ignore market hours
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from backend.services.market_data.market_calendar import (
+    CALENDAR_MAX_AGE,
+    get_market_calendar,
+    refresh_market_calendar,
+)
+
+# Configuration
+DB_PATH = "market_data.db"
+METRICS_DB_PATH = os.getenv("POLLER_METRICS_DB_PATH", "logs/poller_metrics.db")
+SCHEMA_PATH = Path(__file__).parent.parent.parent / "database" / "schema" / "poller_scheduler_schema.sql"
+POLL_INTERVAL = 300       # 5-minute bars
+BAR_CLOSE_DELAY = 5       # Seconds after a bar closes before the first job runs
+STAGGER = 15              # Seconds between the default jobs' start offsets
+
+logger = logging.getLogger("PollerScheduler")
+
+
+@dataclass
+class PollerJob:
+    """One poller cycle on a wall-clock grid: due at k * interval + offset (epoch seconds)"""
+
+    name: str
+    run: Callable[[], Awaitable[Any]]
+    interval: float = POLL_INTERVAL
+    offset: float = BAR_CLOSE_DELAY
+    market_hours: bool = True
+
+    runs: int = 0
+    failures: int = 0
+    skipped: int = 0
+    last_due: Optional[float] = None
+    last_lag: float = 0.0
+    max_lag: float = 0.0
+    last_duration: float = 0.0
+    total_duration: float = 0.0
+    last_error: Optional[str] = None
+    next_due_at: Optional[float] = field(default=None, repr=False)
+
+    def next_due(self, now: float) -> float:
+        """First due time strictly after now"""
+        return ((now - self.offset) // self.interval + 1) * self.interval + self.offset
+
+    def bar_in_session(self, due: float) -> bool:
+        """Whether the bar ending at this due time's boundary falls inside a session"""
+        if not self.market_hours or os.getenv("FORCE_RUN"):
+            return True
+        return get_market_calendar(DB_PATH).is_open(due - self.offset - 1)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "interval": self.interval,
+            "offset": self.offset,
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "last_due": self.last_due,
+            "next_due": self.next_due_at,
+            "last_lag": round(self.last_lag, 3),
+            "max_lag": round(self.max_lag, 3),
+            "last_duration": round(self.last_duration, 3),
+            "avg_duration": round(self.total_duration / self.runs, 3) if self.runs else 0.0,
+            "last_error": self.last_error,
+        }
+
+
+class PollerScheduler:
+    """Runs PollerJobs concurrently on the current event loop"""
+
+    def __init__(self, jobs: Sequence[PollerJob], metrics_db_path: Optional[str] = METRICS_DB_PATH):
+        self.jobs = list(jobs)
+        self.metrics_db_path = metrics_db_path
+        self._stopping = asyncio.Event()
+        if metrics_db_path:
+            os.makedirs(os.path.dirname(metrics_db_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(metrics_db_path)
+            with open(SCHEMA_PATH, "r") as f:
+                conn.executescript(f.read())
+            conn.close()
+
+    def _session_due(self, job: PollerJob, due: float) -> float:
+        """Push a due time forward to the first bar inside a session"""
+        calendar = get_market_calendar(DB_PATH)
+        while not job.bar_in_session(due):
+            next_open = calendar.next_open(due - job.offset)
+            if next_open is None:
+                return due + CALENDAR_MAX_AGE
+            due = job.next_due(next_open + job.offset)
+        return due
+
+    async def _wait_until(self, job: PollerJob, due: float) -> float:
+        """Sleep to the job's next in-session due time; long waits re-check the calendar"""
+        while True:
+            due = self._session_due(job, due)
+            job.next_due_at = due
+            wait = due - time.time()
+            if wait <= 0:
+                return due
+            if wait > 3 * job.interval:
+                logger.info(f"💤 {job.name}: market closed, next run in {wait / 3600:.1f}h")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=min(wait, CALENDAR_MAX_AGE))
+                return due
+            except asyncio.TimeoutError:
+                if wait <= CALENDAR_MAX_AGE:
+                    return due
+
+    def _record(self, job: PollerJob, due: float, started: float, duration: float,
+                skipped: int, error: Optional[str]):
+        lag = started - due
+        job.runs += 1
+        job.skipped += skipped
+        job.last_due = due
+        job.last_lag = lag
+        job.max_lag = max(job.max_lag, lag)
+        job.last_duration = duration
+        job.total_duration += duration
+        if error:
+            job.failures += 1
+            job.last_error = error
+
+        logger.info(
+            f"⏱️ {job.name}: {duration:.1f}s, lag {lag:.2f}s"
+            + (f", skipped {skipped} cycle(s)" if skipped else "")
+            + (f", failed: {error}" if error else "")
+        )
+        if not self.metrics_db_path:
+            return
+        try:
+            conn = sqlite3.connect(self.metrics_db_path)
+            with conn:
+                conn.execute(
+                    "INSERT INTO poller_runs (job, due_at, started_at, duration, lag, skipped, error) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (job.name, due, started, duration, lag, skipped, error),
+                )
+            conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not record {job.name} run: {e}")
+
+    async def _run_job(self, job: PollerJob):
+        due = job.next_due(time.time())
+        while not self._stopping.is_set():
+            due = await self._wait_until(job, due)
+            if self._stopping.is_set():
+                break
+
+            started = time.time()
+            error = None
+            try:
+                await job.run()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                error = str(e) or type(e).__name__
+                logger.error(f"❌ {job.name} cycle failed: {e}", exc_info=True)
+            finished = time.time()
+
+            # Grid points that passed while this run was still going
+            next_due = job.next_due(finished)
+            missed = int(round((next_due - due) / job.interval)) - 1
+            skipped = sum(job.bar_in_session(due + k * job.interval) for k in range(1, missed + 1))
+            self._record(job, due, started, finished - started, skipped, error)
+            due = next_due
+
+    async def run(self):
+        """Run every job until stop() (or cancellation)"""
+        if any(job.market_hours for job in self.jobs):
+            await asyncio.to_thread(refresh_market_calendar, DB_PATH)
+        for job in self.jobs:
+            logger.info(f"📅 {job.name}: every {job.interval}s at +{job.offset:g}s")
+        await asyncio.gather(*(self._run_job(job) for job in self.jobs))
+
+    def stop(self):
+        """Let every job finish its current cycle and return"""
+        self._stopping.set()
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        return {job.name: job.metrics() for job in self.jobs}
+
+
+def load_poller_metrics(metrics_db_path: str = METRICS_DB_PATH, since: Optional[float] = None) -> Dict[str, Any]:
+    """Per-job run counts, duration, lag and skipped cycles from poller_runs"""
+    if not os.path.exists(metrics_db_path):
+        return {}
+    since = time.time() - 86400 if since is None else since
+    conn = sqlite3.connect(metrics_db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        rows = conn.execute(
+            """
+            SELECT job, COUNT(*) AS runs, SUM(error IS NOT NULL) AS failures,
+                   SUM(skipped) AS skipped, AVG(duration) AS avg_duration,
+                   MAX(duration) AS max_duration, AVG(lag) AS avg_lag, MAX(lag) AS max_lag,
+                   MAX(started_at) AS last_run
+            FROM poller_runs WHERE due_at >= ?
+            GROUP BY job ORDER BY job
+            """,
+            (since,),
+        ).fetchall()
+        last_errors = dict(conn.execute(
+            """
+            SELECT job, error FROM poller_runs
+            WHERE id IN (SELECT MAX(id) FROM poller_runs WHERE error IS NOT NULL AND due_at >= ? GROUP BY job)
+            """,
+            (since,),
+        ).fetchall())
+    except sqlite3.Error:
+        return {}
+    finally:
+        conn.close()
+    return {
+        row["job"]: {**{k: row[k] for k in row.keys() if k != "job"}, "last_error": last_errors.get(row["job"])}
+        for row in rows
+    }
+
+
+def build_default_jobs(names: Optional[Sequence[str]] = None) -> List[PollerJob]:
+    """The five ETL pollers, staggered STAGGER seconds apart after each bar close"""
+    from backend.data.etl.fo_quote_poller import FOQuotePoller
+    from backend.data.etl.intraday_candle_poller import IntradayPoller
+    from backend.data.etl.nse500_quote_poller import NSE500QuotePoller
+    from backend.data.etl.option_chain_poller import OptionChainPoller
+    from backend.data.etl.sme_quote_poller import SMEQuotePoller
+
+    pollers = [
+        ("intraday_candles", IntradayPoller),   # First: needs the bar that just closed
+        ("option_chain", OptionChainPoller),
+        ("fo_quotes", FOQuotePoller),
+        ("nse500_quotes", NSE500QuotePoller),
+        ("sme_quotes", SMEQuotePoller),
+    ]
+    if names:
+        unknown = set(names) - {name for name, _ in pollers}
+        if unknown:
+            raise ValueError(f"Unknown poller job(s): {', '.join(sorted(unknown))}")
+        pollers = [(name, cls) for name, cls in pollers if name in names]
+
+    return [
+        PollerJob(name, cls().run_poll_cycle, offset=BAR_CLOSE_DELAY + i * STAGGER)
+        for i, (name, cls) in enumerate(pollers)
+    ]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", nargs="*", help="Poller jobs to run (default: all)")
+    args = parser.parse_args()
+
+    scheduler = PollerScheduler(build_default_jobs(args.jobs))
+    try:
+        asyncio.run(scheduler.run())
+    except KeyboardInterrupt:
+        logger.info(f"Scheduler stopped. Metrics: {scheduler.metrics()}")
@@ -20,13 +20,15 @@ import os
 import sys
 import random
 from typing import List, Dict, Any, Optional
-from datetime import datetime, time as dt_time
+from datetime import datetime
 from urllib.parse import quote
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
 
 from backend.utils.auth.manager import AuthManager
+from backend.data.etl.poller_scheduler import PollerJob, PollerScheduler
+from backend.utils.helpers.serialization import loads
 
 # Configuration
 DB_PATH = "market_data.db"
@@ -51,14 +53,6 @@ class SMEQuotePoller:
         self.auth_manager = AuthManager(db_path=DB_PATH)
         self.base_url = "https://api.upstox.com/v2/market-quote/quotes"
 
-    def is_market_open(self) -> bool:
-        """Check if market is open (09:15 - 15:30 IST)"""
-        now = datetime.now()
-        if now.weekday() >= 5: return False
-        
-        current_time = now.time()
-        return dt_time(9, 15) <= current_time <= dt_time(15, 30)
-
     def get_sme_instruments(self) -> List[str]:
         """Fetch active SME instrument keys from DB using Suffix logic."""
         try:
@@ -130,7 +124,7 @@ class SMEQuotePoller:
             params = {'instrument_key': keys_str}
             async with session.get(self.base_url, params=params, headers=headers) as response:
                 if response.status == 200:
-                    data = await response.json()
+                    data = loads(await response.read())
                     return data.get('data', {})
                 elif response.status == 429:
                     logger.warning("Rate limit hit")
@@ -221,36 +215,26 @@ class SMEQuotePoller:
             logger.error(f"DB Save Error: {e}")
 
     async def run_poll_cycle(self):
-        token = self.auth_manager.get_valid_token()
+        token = await asyncio.to_thread(self.auth_manager.get_valid_token)
         if not token: return
         
         headers = {'Authorization': f'Bearer {token}', 'Accept': 'application/json'}
-        all_keys = self.get_sme_instruments()
+        all_keys = await asyncio.to_thread(self.get_sme_instruments)
         
         async with aiohttp.ClientSession() as session:
             for i in range(0, len(all_keys), BATCH_SIZE):
                 batch_keys = all_keys[i:i+BATCH_SIZE]
                 quotes = await self.fetch_quotes_batch(session, batch_keys, headers)
-                self.save_batch(quotes)
+                await asyncio.to_thread(self.save_batch, quotes)
                 await asyncio.sleep(0.2)
                 
         logger.info(f"Polled {len(all_keys)} instruments.")
 
     async def start(self):
+        """Poll on the 5-minute wall-clock grid during market sessions (poller_scheduler.py)"""
         logger.info("SME Poller Started.")
-        while True:
-            if not self.is_market_open() and not os.getenv("FORCE_RUN"):
-                logger.info("Market Closed. Sleeping...")
-                await asyncio.sleep(300)
-                continue
-                
-            start_ts = datetime.now()
-            await self.run_poll_cycle()
-            
-            elapsed = (datetime.now() - start_ts).total_seconds()
-            sleep_time = max(0, POLL_INTERVAL - elapsed)
-            logger.info(f"Sleeping {sleep_time:.1f}s")
-            await asyncio.sleep(sleep_time)
+        await PollerScheduler([PollerJob("sme_quotes", self.run_poll_cycle, interval=POLL_INTERVAL)]).run()
+
 
 if __name__ == "__main__":
     import argparse
@@ -0,0 +1,26 @@
+-- Table C: Multi-timeframe candles derived locally from stored base bars
+-- Written by backend/data/database/candle_resampler.py from
+-- option_equity_intraday_ohlcv (5m) and candles_new (1m); ts is the bucket
+-- start in epoch seconds, intraday buckets aligned to the 09:15 IST open
+
+CREATE TABLE IF NOT EXISTS candles_resampled (
+    source TEXT NOT NULL,               -- 'intraday' or 'candles'
+    instrument_key TEXT NOT NULL,
+    timeframe TEXT NOT NULL,            -- '15m', '30m', '1h', '1d', '1w', ...
+    ts INTEGER NOT NULL,                -- Bucket start (epoch seconds)
+    open REAL,
+    high REAL,
+    low REAL,
+    close REAL,
+    volume INTEGER,
+    bars INTEGER,                       -- Base bars folded into this candle
+
+    PRIMARY KEY (source, instrument_key, timeframe, ts)
+) WITHOUT ROWID;
+
+-- Incremental watermark: highest base-table id already folded in
+CREATE TABLE IF NOT EXISTS candle_resample_state (
+    source TEXT PRIMARY KEY,
+    last_id INTEGER NOT NULL,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
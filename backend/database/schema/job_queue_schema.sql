@@ -0,0 +1,35 @@
+-- Background job queue (backend/services/jobs/job_queue.py)
+-- Lives in its own database (JOBS_DATABASE_PATH) so progress updates never
+-- wait on a long market_data.db write transaction held by the job itself.
+
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,                       -- handler name, e.g. download_stocks
+    lane TEXT NOT NULL DEFAULT 'interactive', -- interactive | bulk
+    priority INTEGER NOT NULL DEFAULT 0,      -- higher runs first within a lane
+    status TEXT NOT NULL DEFAULT 'queued',    -- queued | running | succeeded | failed | cancelled
+    params TEXT NOT NULL DEFAULT '{}',        -- JSON keyword arguments for the handler
+    progress REAL NOT NULL DEFAULT 0,         -- 0.0 - 1.0
+    message TEXT,
+    result TEXT,                              -- JSON
+    error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    heartbeat_at REAL
+);
+
+CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs(status, lane, priority DESC, id);
+CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs(created_at);
+
+-- Partial results, appended while a job runs and read incrementally (seq > since)
+CREATE TABLE IF NOT EXISTS job_partials (
+    job_id INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    payload TEXT NOT NULL,                    -- JSON
+    created_at REAL NOT NULL,
+    PRIMARY KEY (job_id, seq)
+) WITHOUT ROWID;
@@ -0,0 +1,67 @@
+-- Table S: Option chain snapshots for as-of queries
+-- Written by backend/data/etl/option_chain_poller.py alongside the wide
+-- optionchain_intrday_schema rows; read by backend/data/database/chain_snapshots.py
+-- ts is the poll cycle start in epoch seconds, shared by every underlying in a cycle
+
+-- Per-strike values, clustered by (underlying, expiry, ts) so one snapshot is
+-- a single contiguous range of the primary key
+CREATE TABLE IF NOT EXISTS optionchain_snapshot (
+    underlying_key TEXT NOT NULL,
+    expiry_date DATE NOT NULL,
+    ts INTEGER NOT NULL,                -- Epoch seconds
+    strike_price REAL NOT NULL,
+
+    ce_ltp REAL, ce_oi INTEGER, ce_volume INTEGER, ce_iv REAL, ce_delta REAL,
+    pe_ltp REAL, pe_oi INTEGER, pe_volume INTEGER, pe_iv REAL, pe_delta REAL,
+
+    PRIMARY KEY (underlying_key, expiry_date, ts, strike_price)
+) WITHOUT ROWID;
+
+-- One row per snapshot with aggregates computed at write time
+CREATE TABLE IF NOT EXISTS optionchain_snapshot_summary (
+    underlying_key TEXT NOT NULL,
+    expiry_date DATE NOT NULL,
+    ts INTEGER NOT NULL,
+    spot REAL,                          -- Underlying spot reported with the chain
+    strikes INTEGER,
+    total_ce_oi INTEGER,
+    total_pe_oi INTEGER,
+    total_ce_volume INTEGER,
+    total_pe_volume INTEGER,
+    pcr_oi REAL,                        -- total PE OI / total CE OI
+    pcr_volume REAL,
+    max_pain REAL,                      -- Strike minimising option writers' payout
+
+    PRIMARY KEY (underlying_key, expiry_date, ts)
+) WITHOUT ROWID;
+
+-- Latest snapshot across expiries / cross-underlying scans per cycle
+CREATE INDEX IF NOT EXISTS idx_chain_summary_ts
+ON optionchain_snapshot_summary(ts);
+
+-- Per-cycle analytics for every underlying, computed in one vectorized pass
+-- after each poll (backend/core/analytics/chain_analytics.py). Read by the
+-- MCP server, AI assistant and option chain page.
+CREATE TABLE IF NOT EXISTS optionchain_analytics (
+    underlying_key TEXT NOT NULL,
+    expiry_date DATE NOT NULL,
+    ts INTEGER NOT NULL,                -- Poll cycle, epoch seconds
+    spot REAL,
+    strikes INTEGER,
+    pcr_oi REAL,
+    pcr_volume REAL,
+    max_pain REAL,
+    max_pain_distance_pct REAL,         -- (max_pain - spot) / spot * 100
+    atm_strike REAL,
+    atm_iv REAL,                        -- Mean of ATM call/put IV
+    iv_skew REAL,                       -- IV(25-delta put) - IV(25-delta call)
+    ce_oi_change INTEGER,               -- vs the previous cycle
+    pe_oi_change INTEGER,
+    ce_buildup TEXT,                    -- long_buildup / short_buildup / short_covering / long_unwinding
+    pe_buildup TEXT,
+
+    PRIMARY KEY (underlying_key, expiry_date, ts)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_chain_analytics_ts
+ON optionchain_analytics(ts);
@@ -0,0 +1,17 @@
+-- Poller scheduler run metrics (backend/data/etl/poller_scheduler.py)
+-- Lives in its own database (POLLER_METRICS_DB_PATH) so recording a run never
+-- waits on the pollers' own market_data.db writes.
+
+CREATE TABLE IF NOT EXISTS poller_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job TEXT NOT NULL,              -- e.g. intraday_candles, option_chain
+    due_at REAL NOT NULL,           -- bar close + job offset (epoch seconds)
+    started_at REAL NOT NULL,
+    duration REAL NOT NULL,         -- seconds
+    lag REAL NOT NULL,              -- started_at - due_at
+    skipped INTEGER NOT NULL DEFAULT 0,  -- in-session cycles missed because this run overran
+    error TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_poller_runs_job ON poller_runs(job, due_at);
+CREATE INDEX IF NOT EXISTS idx_poller_runs_due ON poller_runs(due_at);
@@ -0,0 +1,49 @@
+-- Table R: Rollups for aged-out 5-minute snapshots
+-- Written by backend/data/database/retention_manager.py before raw rows
+-- are moved into the per-month archive databases (archive/market_data_YYYY_MM.db)
+
+-- Quote snapshots (market_quota_fo_data / nse500 / sme) downsampled to OHLC+OI
+CREATE TABLE IF NOT EXISTS market_quota_rollup (
+    source_table TEXT NOT NULL,         -- market_quota_fo_data, market_quota_nse500_data, ...
+    instrument_key TEXT NOT NULL,
+    interval TEXT NOT NULL,             -- '15m' or '1d'
+    bucket DATETIME NOT NULL,           -- Bucket start (YYYY-MM-DD HH:MM:00)
+    open REAL,                          -- First last_price in bucket
+    high REAL,
+    low REAL,
+    close REAL,                         -- Last last_price in bucket
+    volume INTEGER,                     -- Cumulative day volume at bucket close
+    oi REAL,                            -- Open interest at bucket close
+    samples INTEGER,                    -- Raw snapshots folded into this row
+
+    PRIMARY KEY (source_table, instrument_key, interval, bucket)
+) WITHOUT ROWID;
+
+-- Option chain snapshots downsampled per strike (CE/PE premium OHLC + OI)
+CREATE TABLE IF NOT EXISTS optionchain_rollup (
+    underlying_key TEXT NOT NULL,
+    expiry_date DATE NOT NULL,
+    strike_price REAL NOT NULL,
+    interval TEXT NOT NULL,             -- '15m' or '1d'
+    bucket DATETIME NOT NULL,
+
+    ce_open REAL, ce_high REAL, ce_low REAL, ce_close REAL,
+    ce_volume INTEGER, ce_oi INTEGER, ce_oi_change INTEGER,
+    pe_open REAL, pe_high REAL, pe_low REAL, pe_close REAL,
+    pe_volume INTEGER, pe_oi INTEGER, pe_oi_change INTEGER,
+    samples INTEGER,
+
+    PRIMARY KEY (underlying_key, expiry_date, interval, bucket, strike_price)
+) WITHOUT ROWID;
+
+-- Bookkeeping for each retention run
+CREATE TABLE IF NOT EXISTS retention_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name TEXT NOT NULL,
+    cutoff DATETIME NOT NULL,
+    rows_rolled_up INTEGER DEFAULT 0,
+    rows_archived INTEGER DEFAULT 0,
+    archive_files TEXT,                 -- Comma-separated archive file names touched
+    duration_ms INTEGER,
+    run_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
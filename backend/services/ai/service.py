@@ -1,25 +1,28 @@
+from __future__ import annotations
+
 import os
-import sys
 import json
+import time
 import logging
+import threading
 import traceback
-from pathlib import Path
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any, Optional, Union
 
-# Use OpenAI client for Groq and OpenRouter
-from openai import OpenAI
 from dotenv import load_dotenv
 
-# Ensure project root is in path
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
 from backend.services.upstox.live_api import get_upstox_api
 from frontend.services.movers import MarketMoversService
 from backend.services.upstox.portfolio import PortfolioServicesV3 as PortfolioService
 from backend.utils.auth.manager import AuthManager
+from backend.core.analytics.chain_analytics import ChainAnalyticsEngine
+from backend.utils.helpers.lazy_import import lazy_import
+from backend.utils.helpers.serialization import dumps
+
+# OpenAI client for Groq and OpenRouter (imported on first AIService())
+openai = lazy_import("openai")
 
-# Setup Logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Load Environment
@@ -29,6 +32,24 @@ load_dotenv()
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
 
+# Tool result memoization (seconds); tools not listed are never cached
+TOOL_CACHE_TTL_SECONDS = {
+    "lookup_instrument_key": 3600,  # Instrument master changes daily
+    "get_recent_news": 120,
+    "get_market_movers": 30,
+    "get_portfolio_holdings": 15,
+    "get_account_balance": 15,
+    "get_stock_quote": 5,  # Same as QuotesService real-time quote TTL
+    "get_option_analytics": 60,  # Recomputed once per 5-minute chain poll
+}
+TOOL_CACHE_MAX_ENTRIES = 512  # LRU bound on memoized tool results
+TOOL_SYMBOL_ARGS = {"symbol", "search_query"}  # Case-insensitive args (upper-cased in cache keys)
+TOOL_MAX_WORKERS = 6
+
+# Provider failover ordering
+PROVIDER_LATENCY_ALPHA = 0.3  # EWMA weight of the newest sample
+PROVIDER_COOLDOWN_SECONDS = 60  # Failed providers drop to the back for this long
+
 
 class AIService:
     """
@@ -37,23 +58,33 @@ class AIService:
     Integrates with Upstox data sources via Function Calling.
     """
 
-    def __init__(self):
+    def __init__(self, clients: Optional[List[Dict[str, Any]]] = None):
         self.upstox_api = get_upstox_api()
         self.movers_service = MarketMoversService()
         self.auth_manager = AuthManager()
+        self.chain_analytics = ChainAnalyticsEngine()
 
         # Initialize Portfolio Service
         self.portfolio_service = PortfolioService()
 
+        # -- Tool execution --
+        self._tool_pool = ThreadPoolExecutor(
+            max_workers=TOOL_MAX_WORKERS, thread_name_prefix="ai-tool"
+        )
+        self._tool_cache: "OrderedDict[tuple, tuple]" = OrderedDict()  # (tool, args) -> (json, timestamp), LRU order
+        self._tool_cache_lock = threading.Lock()
+
         # -- AI Clients --
-        self.clients = []
+        self.clients = list(clients) if clients is not None else []
+        self.provider_stats: Dict[str, Dict[str, float]] = {}
+        self._stats_lock = threading.Lock()
 
         # 1. Groq (Fastest, Preferred)
-        if GROQ_API_KEY:
+        if clients is None and GROQ_API_KEY:
             self.clients.append(
                 {
                     "provider": "Groq",
-                    "client": OpenAI(
+                    "client": openai.OpenAI(
                         base_url="https://api.groq.com/openai/v1", api_key=GROQ_API_KEY
                     ),
                     "model": "llama-3.3-70b-versatile",
@@ -61,11 +92,11 @@ class AIService:
             )
 
         # 2. OpenRouter (Backup)
-        if OPENROUTER_API_KEY:
+        if clients is None and OPENROUTER_API_KEY:
             self.clients.append(
                 {
                     "provider": "OpenRouter",
-                    "client": OpenAI(
+                    "client": openai.OpenAI(
                         base_url="https://openrouter.ai/api/v1",
                         api_key=OPENROUTER_API_KEY,
                     ),
@@ -146,6 +177,23 @@ class AIService:
                     },
                 },
             },
+            {
+                "type": "function",
+                "function": {
+                    "name": "get_option_analytics",
+                    "description": "Get the latest option chain analytics for an F&O underlying: put-call ratio, max pain, ATM IV, IV skew and call/put OI buildup (long/short buildup, short covering, long unwinding).",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "symbol": {
+                                "type": "string",
+                                "description": "Underlying symbol (e.g. 'NIFTY', 'BANKNIFTY', 'RELIANCE').",
+                            }
+                        },
+                        "required": ["symbol"],
+                    },
+                },
+            },
             {
                 "type": "function",
                 "function": {
@@ -205,22 +253,25 @@ class AIService:
             {"role": "user", "content": user_message},
         ]
 
-        # Try each client in order
-        for client_cfg in self.clients:
+        # Try fastest healthy provider first
+        for client_cfg in self._ordered_clients():
             provider = client_cfg["provider"]
             client = client_cfg["client"]
             model = client_cfg["model"]
+            history = list(messages)  # Failed attempts must not leak into the next provider
 
             try:
                 logger.info(f"Attempting generation with {provider} ({model})...")
 
                 # 1. First Call
+                started = time.monotonic()
                 response = client.chat.completions.create(
                     model=model,
-                    messages=messages,
+                    messages=history,
                     tools=self.tools_schema,
                     tool_choice="auto",
                 )
+                self._record_provider(provider, time.monotonic() - started)
 
                 response_msg = response.choices[0].message
                 tool_calls = response_msg.tool_calls
@@ -230,28 +281,14 @@ class AIService:
                     logger.info(f"{provider} requested {len(tool_calls)} tool calls.")
 
                     # Add the assistant's request to history
-                    messages.append(response_msg)
-
-                    for tool_call in tool_calls:
-                        func_name = tool_call.function.name
-                        args_json = tool_call.function.arguments
-                        call_id = tool_call.id
-
-                        # Execute Tool
-                        tool_result_str = self._execute_tool(func_name, args_json)
-
-                        # Append result
-                        messages.append(
-                            {
-                                "role": "tool",
-                                "tool_call_id": call_id,
-                                "content": tool_result_str,
-                            }
-                        )
+                    history.append(response_msg)
+
+                    # Execute independent tools concurrently, results in call order
+                    history.extend(self._execute_tool_calls(tool_calls))
 
                     # 3. Final Answer Generation (with tool outputs)
                     final_response = client.chat.completions.create(
-                        model=model, messages=messages
+                        model=model, messages=history
                     )
                     return final_response.choices[0].message.content
 
@@ -261,12 +298,143 @@ class AIService:
 
             except Exception as e:
                 logger.error(f"{provider} Failed: {e}")
+                self._record_provider(provider, failed=True)
                 continue  # Try next provider
 
         return "Sorry, I am unable to process your request at the moment (All AI providers failed)."
 
+    # =========================================================================
+    # PROVIDER SELECTION
+    # =========================================================================
+
+    def _record_provider(
+        self, provider: str, latency: Optional[float] = None, failed: bool = False
+    ):
+        """Update latency EWMA / failure state for a provider"""
+        with self._stats_lock:
+            stats = self.provider_stats.setdefault(
+                provider, {"latency": None, "failures": 0, "last_failure": 0.0}
+            )
+            if failed:
+                stats["failures"] += 1
+                stats["last_failure"] = time.monotonic()
+                return
+            stats["failures"] = 0
+            if stats["latency"] is None:
+                stats["latency"] = latency
+            else:
+                stats["latency"] = (
+                    PROVIDER_LATENCY_ALPHA * latency
+                    + (1 - PROVIDER_LATENCY_ALPHA) * stats["latency"]
+                )
+
+    def _ordered_clients(self) -> List[Dict[str, Any]]:
+        """
+        Healthy providers by measured latency (unmeasured ones keep their
+        configured priority after measured ones), recently failed ones last
+        """
+        now = time.monotonic()
+        with self._stats_lock:
+            stats = {p: dict(s) for p, s in self.provider_stats.items()}
+
+        def sort_key(item):
+            position, cfg = item
+            st = stats.get(cfg["provider"])
+            if not st:
+                return (0, 1, 0.0, position)
+            cooling = st["failures"] > 0 and now - st["last_failure"] < PROVIDER_COOLDOWN_SECONDS
+            if st["latency"] is None:
+                return (int(cooling), 1, 0.0, position)
+            return (int(cooling), 0, st["latency"], position)
+
+        return [cfg for _, cfg in sorted(enumerate(self.clients), key=sort_key)]
+
+    # =========================================================================
+    # TOOL EXECUTION (Parallel + Cached)
+    # =========================================================================
+
+    def _execute_tool_calls(self, tool_calls) -> List[Dict[str, Any]]:
+        """Run a turn's tool calls concurrently; returns tool messages in call order"""
+        unique: Dict[tuple, tuple] = {}
+        for tool_call in tool_calls:
+            key = self._tool_cache_key(tool_call.function.name, tool_call.function.arguments)
+            unique.setdefault(key, (tool_call.function.name, tool_call.function.arguments))
+
+        if len(unique) == 1:
+            results = {key: self._execute_tool(*call) for key, call in unique.items()}
+        else:
+            futures = {
+                key: self._tool_pool.submit(self._execute_tool, *call)
+                for key, call in unique.items()
+            }
+            results = {key: future.result() for key, future in futures.items()}
+
+        return [
+            {
+                "role": "tool",
+                "tool_call_id": tool_call.id,
+                "content": results[
+                    self._tool_cache_key(tool_call.function.name, tool_call.function.arguments)
+                ],
+            }
+            for tool_call in tool_calls
+        ]
+
+    @staticmethod
+    def _tool_cache_key(func_name: str, args_json: str) -> tuple:
+        """(tool, normalized args): trimmed strings, upper-cased symbols, sorted keys"""
+        try:
+            args = json.loads(args_json or "{}")
+        except (TypeError, ValueError):
+            return (func_name, str(args_json))
+        if not isinstance(args, dict):
+            return (func_name, dumps(args, sort_keys=True))
+        normalized = {}
+        for k, v in args.items():
+            if isinstance(v, str):
+                v = v.strip().upper() if k in TOOL_SYMBOL_ARGS else v.strip()
+            if v not in (None, ""):
+                normalized[k] = v
+        return (func_name, dumps(normalized, sort_keys=True))
+
     def _execute_tool(self, func_name: str, args_json: str) -> str:
-        """Execute the mapped Python method and return JSON string"""
+        """Execute a tool, serving fresh results from the per-tool TTL cache"""
+        ttl = TOOL_CACHE_TTL_SECONDS.get(func_name)
+        key = self._tool_cache_key(func_name, args_json)
+
+        if ttl:
+            with self._tool_cache_lock:
+                cached = self._tool_cache.get(key)
+                if cached:
+                    self._tool_cache.move_to_end(key)
+            if cached and time.monotonic() - cached[1] < ttl:
+                logger.info(f"CACHE HIT: {func_name} | Args: {key[1]}")
+                return cached[0]
+
+        result_str, ok = self._run_tool(func_name, args_json)
+
+        if ttl and ok:
+            self._cache_tool_result(key, result_str)
+        return result_str
+
+    def _cache_tool_result(self, key: tuple, result_str: str):
+        """Insert a result, dropping expired entries and then the least recently used"""
+        now = time.monotonic()
+        with self._tool_cache_lock:
+            self._tool_cache[key] = (result_str, now)
+            self._tool_cache.move_to_end(key)
+            if len(self._tool_cache) > TOOL_CACHE_MAX_ENTRIES:
+                expired = [
+                    k for k, (_, stored) in self._tool_cache.items()
+                    if now - stored >= TOOL_CACHE_TTL_SECONDS.get(k[0], 0)
+                ]
+                for k in expired:
+                    del self._tool_cache[k]
+            while len(self._tool_cache) > TOOL_CACHE_MAX_ENTRIES:
+                self._tool_cache.popitem(last=False)
+
+    def _run_tool(self, func_name: str, args_json: str):
+        """Execute the mapped Python method; returns (JSON string, cacheable)"""
         try:
             args = json.loads(args_json)
             logger.info(f"EXEC TOOL: {func_name} | Args: {args}")
@@ -281,15 +449,27 @@ class AIService:
                 result = self.get_account_balance()
             elif func_name == "get_stock_quote":
                 result = self.get_stock_quote(args.get("symbol"))
+            elif func_name == "get_option_analytics":
+                result = self.get_option_analytics(args.get("symbol"))
             elif func_name == "get_recent_news":
                 result = self.get_recent_news(args.get("query"))
             else:
                 result = {"error": "Unknown function"}
 
-            return json.dumps(result, default=str)
+            # NumPy/pandas/datetime values serialize natively; str() only for unknown types
+            return dumps(result, default=str), not self._is_error(result)
         except Exception as e:
             logger.error(f"Tool Execution Failed: {e}")
-            return json.dumps({"error": str(e)})
+            return dumps({"error": str(e)}), False
+
+    @staticmethod
+    def _is_error(result: Any) -> bool:
+        """Tools report failures as {'error': ...} (or a list holding one)"""
+        if isinstance(result, dict):
+            return "error" in result
+        if isinstance(result, list) and len(result) == 1 and isinstance(result[0], dict):
+            return "error" in result[0]
+        return False
 
     # =========================================================================
     # TOOL IMPLEMENTATIONS (Backend Logic)
@@ -394,6 +574,16 @@ class AIService:
         except Exception as e:
             return {"error": str(e)}
 
+    def get_option_analytics(self, symbol: str) -> Any:
+        """Latest per-cycle chain analytics from the poller's summary table"""
+        try:
+            rows = self.chain_analytics.for_symbol(symbol)
+            if not rows:
+                return {"status": f"No option analytics for {symbol} (not polled yet)"}
+            return rows
+        except Exception as e:
+            return {"error": str(e)}
+
     def get_recent_news(self, query: str = "") -> List[Dict[str, Any]]:
         """Fetch recent news from DB"""
         try:
@@ -422,6 +612,7 @@ class AIService:
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     # Self-test
     service = AIService()
     print("Testing Groq/OpenRouter connection...")
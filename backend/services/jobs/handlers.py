@@ -0,0 +1,110 @@
+"""
+Job Handlers
+------------
+Long-running work run by the job queue instead of inside a request.
+Each handler gets a JobContext plus the job's JSON params and returns a
+JSON-serialisable result; raising marks the job failed.
+
+Kinds:
+- download_stocks:        StockDownloader pipeline, one partial result per symbol
+- backtest_strategy:      iron condor / bull call spread replayed on expired option candles
+- backtest_multi_expiry:  calendar / diagonal spread with auto-rolling
+"""
+
+import os
+import logging
+from typing import List, Optional
+
+from backend.services.jobs.job_queue import JobContext, job_handler
+
+logger = logging.getLogger("JobHandlers")
+
+DB_PATH = os.getenv("DATABASE_PATH", "market_data.db")
+
+
+@job_handler("download_stocks")
+def download_stocks(ctx: JobContext, symbols: List[str], start_date: str, end_date: str,
+                    interval: str = "1d", save_db: bool = True,
+                    export_format: Optional[str] = "parquet"):
+    from backend.services.market_data.downloader import StockDownloader
+
+    done = 0
+
+    def on_symbol(symbol: str, rows: int):
+        nonlocal done
+        done += 1
+        ctx.partial({"symbol": symbol, "rows": rows})
+        ctx.progress(done / len(symbols), f"{symbol}: {rows} rows ({done}/{len(symbols)})")
+
+    ctx.progress(0.0, f"Downloading {len(symbols)} symbols")
+    result = StockDownloader(db_path=DB_PATH).download_and_process(
+        symbols=symbols,
+        start_date=start_date,
+        end_date=end_date,
+        interval=interval,
+        save_db=save_db,
+        export_format=export_format,
+        keep_data=False,
+        on_symbol=on_symbol,
+    )
+    return {
+        "rows": result["rows"],
+        "filepath": result["filepath"],
+        "gaps": result["gaps"],
+        "validation_errors": result["validation_errors"],
+    }
+
+
+@job_handler("backtest_strategy")
+def backtest_strategy(ctx: JobContext, strategy: str, entry_date: str, exit_date: str,
+                      underlying: str = "NIFTY", **rules):
+    from backend.core.analytics.option_replay import STRATEGIES, OptionReplay
+
+    name, legs = STRATEGIES[strategy]
+    result = OptionReplay(db_path=DB_PATH).run(
+        underlying, legs, entry_date, exit_date, strategy_name=name, progress=ctx.progress, **rules
+    )
+    if "error" in result:
+        raise ValueError(result["error"])
+    return result
+
+
+@job_handler("backtest_multi_expiry")
+def backtest_multi_expiry(ctx: JobContext, strategy_type: str, start_date: str, end_date: str,
+                          underlying_price: float, auto_roll: bool = True, roll_days_before: int = 3,
+                          **strategy_params):
+    import numpy as np
+    import pandas as pd
+    from backend.core.trading.multi_expiry_strategies import (
+        MultiExpiryBacktester, create_calendar_spread, create_diagonal_spread,
+    )
+
+    ctx.progress(0.1, f"Building {strategy_type}")
+    if strategy_type == "calendar_spread":
+        strategy = create_calendar_spread(
+            underlying_price=underlying_price,
+            strike=strategy_params.get("strike", underlying_price),
+            near_expiry=strategy_params.get("near_expiry", "2026-02-06"),
+            far_expiry=strategy_params.get("far_expiry", "2026-02-27"),
+            option_type=strategy_params.get("option_type", "CALL"),
+        )
+    else:
+        strategy = create_diagonal_spread(
+            underlying_price=underlying_price,
+            near_strike=strategy_params.get("near_strike", underlying_price),
+            far_strike=strategy_params.get("far_strike", underlying_price + 200),
+            near_expiry=strategy_params.get("near_expiry", "2026-02-06"),
+            far_expiry=strategy_params.get("far_expiry", "2026-02-27"),
+            option_type=strategy_params.get("option_type", "CALL"),
+        )
+
+    # Mock historical data
+    dates = pd.date_range(start_date, end_date, freq="D")
+    prices = underlying_price + np.cumsum(np.random.randn(len(dates)) * 20)
+    historical_data = pd.DataFrame({"date": dates.strftime("%Y-%m-%d"), "close": prices})
+
+    ctx.progress(0.3, f"Simulating {len(dates)} days")
+    return MultiExpiryBacktester().backtest_with_rolling(
+        strategy, historical_data, start_date, end_date,
+        auto_roll=auto_roll, roll_days_before=roll_days_before,
+    )
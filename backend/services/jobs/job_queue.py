@@ -0,0 +1,461 @@
+"""
+Background Job Queue
+--------------------
+SQLite-backed jobs (no external broker) for work that outlives an HTTP
+request: multi-symbol downloads and backtests.
+
+- submit() stores a queued job and returns its id immediately
+- JobWorkerPool threads claim jobs atomically (BEGIN IMMEDIATE), so pools
+  in several gunicorn workers and standalone worker processes share one
+  queue without running a job twice
+- Two lanes: 'interactive' and 'bulk'. Every worker takes interactive jobs
+  first and INTERACTIVE_RESERVED workers never take bulk ones, so a backlog
+  of bulk downloads cannot starve a single-symbol request
+- Handlers report progress and partial results through JobContext;
+  cancel() drops queued jobs at once and stops running ones at their next
+  progress() / check_cancelled() checkpoint
+- Running jobs heartbeat; jobs of a worker that died are requeued (up to
+  MAX_ATTEMPTS) by any live pool
+- Under gunicorn (or a gevent-patched process) the pool embedded in the API
+  is off by default: jobs run in the standalone worker process
+  (deploy/upstox-jobs.service) instead of once per web worker, where the
+  worker threads would also block the gevent hub. JOB_WORKERS=<n> overrides.
+
+Usage:
+    from backend.services.jobs.job_queue import get_job_queue, job_handler
+
+    @job_handler("download_stocks")
+    def download_stocks(ctx, symbols, start_date, end_date):
+        for i, symbol in enumerate(symbols, 1):
+            ...
+            ctx.partial({"symbol": symbol, "rows": rows})
+            ctx.progress(i / len(symbols), f"{symbol} done")
+        return {"rows": total}
+
+    jobs = get_job_queue()
+    job_id = jobs.submit("download_stocks", {"symbols": [...]}, lane="bulk")
+    jobs.get(job_id, since=0)        # status, progress, partial results after seq 0
+    jobs.cancel(job_id)
+
+    python -m backend.services.jobs.job_queue --workers 4    # standalone worker process
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import sqlite3
+import logging
+import threading
+from importlib import import_module
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger("JobQueue")
+
+
+def _embedded_workers_default() -> int:
+    """Embedded pool size when JOB_WORKERS is unset: 0 under gunicorn or gevent"""
+    if "gunicorn" in sys.modules or "gunicorn" in os.getenv("SERVER_SOFTWARE", ""):
+        return 0
+    monkey = sys.modules.get("gevent.monkey")
+    if monkey is not None and monkey.is_module_patched("threading"):
+        return 0
+    return 3
+
+
+# Configuration
+JOBS_DB_PATH = os.getenv("JOBS_DATABASE_PATH", "logs/jobs.db")
+SCHEMA_PATH = Path(__file__).parent.parent.parent / "database" / "schema" / "job_queue_schema.sql"
+
+LANES = ("interactive", "bulk")        # Claim order
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", _embedded_workers_default()))  # 0 disables the pool embedded in the API
+INTERACTIVE_RESERVED = 1               # Workers that never take bulk jobs
+POLL_INTERVAL = 0.5                    # Idle worker re-check (other processes' submits)
+PROGRESS_INTERVAL = 0.5                # Min seconds between progress writes per job
+HEARTBEAT_INTERVAL = 10
+STALE_AFTER = 60                       # Running job without heartbeat -> worker died
+MAX_ATTEMPTS = 2
+RETENTION_DAYS = 7                     # Finished jobs kept this long
+
+TERMINAL = ("succeeded", "failed", "cancelled")
+
+# Handler modules imported by a pool before it claims anything
+HANDLER_MODULES = ("backend.services.jobs.handlers",)
+
+HANDLERS: Dict[str, Callable[..., Any]] = {}
+
+
+def job_handler(kind: str):
+    """Register fn(ctx, **params) as the handler for jobs of `kind`"""
+    def register(fn):
+        HANDLERS[kind] = fn
+        return fn
+    return register
+
+
+class JobCancelled(Exception):
+    """Raised at a checkpoint once cancellation was requested"""
+
+
+class JobQueue:
+    """Job records, claims and partial results in one SQLite database"""
+
+    def __init__(self, db_path: str = JOBS_DB_PATH):
+        self.db_path = db_path
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._pool: Optional["JobWorkerPool"] = None
+        self._pool_pid = None
+        self._lock = threading.Lock()
+        conn = self.connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with open(SCHEMA_PATH, "r") as f:
+                conn.executescript(f.read())
+        finally:
+            conn.close()
+
+    def connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    # ------------------------------------------------------------------
+    # Producer / observer API
+    # ------------------------------------------------------------------
+
+    def submit(self, kind: str, params: Optional[Dict] = None, lane: str = "interactive",
+               priority: int = 0) -> int:
+        if lane not in LANES:
+            raise ValueError(f"lane must be one of {LANES}")
+        conn = self.connect()
+        try:
+            job_id = conn.execute(
+                "INSERT INTO jobs (kind, lane, priority, params, created_at) VALUES (?, ?, ?, ?, ?)",
+                (kind, lane, priority, json.dumps(params or {}), time.time()),
+            ).lastrowid
+        finally:
+            conn.close()
+        logger.info(f"📥 Job {job_id} queued: {kind} ({lane})")
+        if self._pool is not None:
+            self._pool.wake()
+        return job_id
+
+    def get(self, job_id: int, since: int = 0) -> Optional[Dict]:
+        """Job state plus partial results with seq > since"""
+        conn = self.connect()
+        try:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            partials = conn.execute(
+                "SELECT seq, payload FROM job_partials WHERE job_id = ? AND seq > ? ORDER BY seq",
+                (job_id, since),
+            ).fetchall()
+        finally:
+            conn.close()
+        job = self._to_dict(row)
+        job["partials"] = [{"seq": seq, **json.loads(payload)} for seq, payload in partials]
+        job["next_since"] = job["partials"][-1]["seq"] if job["partials"] else since
+        return job
+
+    def list_jobs(self, status: Optional[str] = None, kind: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        query, params = "SELECT * FROM jobs WHERE 1=1", []
+        if status:
+            query += " AND status = ?"
+            params.append(status)
+        if kind:
+            query += " AND kind = ?"
+            params.append(kind)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        conn = self.connect()
+        try:
+            return [self._to_dict(r, with_result=False) for r in conn.execute(query, params).fetchall()]
+        finally:
+            conn.close()
+
+    def cancel(self, job_id: int) -> Optional[str]:
+        """Cancel a queued job now, or flag a running one; returns the resulting status"""
+        now = time.time()
+        conn = self.connect()
+        try:
+            conn.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ?, message = 'Cancelled before start' "
+                "WHERE id = ? AND status = 'queued'", (now, job_id))
+            conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'", (job_id,))
+            row = conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        finally:
+            conn.close()
+        return row[0] if row else None
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row, with_result: bool = True) -> Dict:
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        result = job.pop("result")
+        if with_result:
+            job["result"] = json.loads(result) if result else None
+        return job
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+
+    def claim(self, conn: sqlite3.Connection, worker: str, lanes: Sequence[str]) -> Optional[Dict]:
+        """Atomically move the next queued job (lane order, then priority, then age) to running"""
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = None
+            for lane in lanes:
+                row = conn.execute(
+                    "SELECT id, kind, params FROM jobs WHERE status = 'queued' AND lane = ? "
+                    "ORDER BY priority DESC, id LIMIT 1", (lane,)).fetchone()
+                if row is not None:
+                    break
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', worker = ?, started_at = ?, heartbeat_at = ?, "
+                    "attempts = attempts + 1 WHERE id = ?", (worker, now, now, row["id"]))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return {"id": row["id"], "kind": row["kind"], "params": json.loads(row["params"])} if row else None
+
+    def finish(self, conn: sqlite3.Connection, job_id: int, worker: str, status: str,
+               result: Any = None, error: Optional[str] = None, message: Optional[str] = None):
+        conn.execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, message = COALESCE(?, message), "
+            "progress = CASE WHEN ? = 'succeeded' THEN 1.0 ELSE progress END, finished_at = ? "
+            "WHERE id = ? AND worker = ? AND status = 'running'",
+            (status, json.dumps(result, default=str) if result is not None else None, error, message,
+             status, time.time(), job_id, worker),
+        )
+
+    def heartbeat(self, conn: sqlite3.Connection, job_ids: Sequence[int]):
+        if job_ids:
+            conn.execute(
+                f"UPDATE jobs SET heartbeat_at = ? WHERE id IN ({','.join('?' * len(job_ids))})",
+                (time.time(), *job_ids))
+
+    def requeue_stale(self, conn: sqlite3.Connection) -> int:
+        """Running jobs whose worker stopped heartbeating: retry, or fail after MAX_ATTEMPTS"""
+        now = time.time()
+        cur = conn.execute(
+            """
+            UPDATE jobs SET
+                status = CASE WHEN cancel_requested THEN 'cancelled'
+                              WHEN attempts >= ? THEN 'failed' ELSE 'queued' END,
+                error = 'Worker stopped while running', worker = NULL,
+                finished_at = CASE WHEN cancel_requested OR attempts >= ? THEN ? END
+            WHERE status = 'running' AND heartbeat_at < ?
+            """, (MAX_ATTEMPTS, MAX_ATTEMPTS, now, now - STALE_AFTER))
+        if cur.rowcount:
+            logger.warning(f"⚠️ Recovered {cur.rowcount} job(s) from dead workers")
+        return cur.rowcount
+
+    def prune(self, conn: sqlite3.Connection, days: int = RETENTION_DAYS) -> int:
+        cutoff = time.time() - days * 86400
+        conn.execute(
+            "DELETE FROM job_partials WHERE job_id IN "
+            "(SELECT id FROM jobs WHERE finished_at < ? AND status IN ('succeeded', 'failed', 'cancelled'))",
+            (cutoff,))
+        return conn.execute(
+            "DELETE FROM jobs WHERE finished_at < ? AND status IN ('succeeded', 'failed', 'cancelled')",
+            (cutoff,)).rowcount
+
+    # ------------------------------------------------------------------
+    # Embedded pool
+    # ------------------------------------------------------------------
+
+    def ensure_workers(self, workers: int = JOB_WORKERS) -> Optional["JobWorkerPool"]:
+        """Start this process's worker pool once (again after a fork)"""
+        if workers <= 0:
+            return None
+        if self._pool is not None and self._pool_pid == os.getpid():
+            return self._pool
+        with self._lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = JobWorkerPool(self, workers=workers)
+                self._pool.start()
+                self._pool_pid = os.getpid()
+        return self._pool
+
+
+class JobContext:
+    """Handed to handlers: progress, partial results and cancellation checkpoints"""
+
+    def __init__(self, queue: JobQueue, conn: sqlite3.Connection, job_id: int):
+        self.queue = queue
+        self.conn = conn
+        self.job_id = job_id
+        self._seq = conn.execute(
+            "SELECT COALESCE(MAX(seq), 0) FROM job_partials WHERE job_id = ?", (job_id,)).fetchone()[0]
+        self._last_write = 0.0
+
+    @property
+    def cancelled(self) -> bool:
+        row = self.conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (self.job_id,)).fetchone()
+        return bool(row and row[0])
+
+    def check_cancelled(self):
+        if self.cancelled:
+            raise JobCancelled()
+
+    def progress(self, fraction: float, message: Optional[str] = None):
+        """Record progress (throttled to PROGRESS_INTERVAL) and honour cancellation"""
+        now = time.monotonic()
+        if now - self._last_write < PROGRESS_INTERVAL and fraction < 1:
+            return
+        self._last_write = now
+        self.conn.execute(
+            "UPDATE jobs SET progress = ?, message = COALESCE(?, message), heartbeat_at = ? WHERE id = ?",
+            (max(0.0, min(float(fraction), 1.0)), message, time.time(), self.job_id))
+        self.check_cancelled()
+
+    def partial(self, payload: Dict):
+        """Append one partial result, visible to observers immediately"""
+        self._seq += 1
+        self.conn.execute(
+            "INSERT INTO job_partials (job_id, seq, payload, created_at) VALUES (?, ?, ?, ?)",
+            (self.job_id, self._seq, json.dumps(payload, default=str), time.time()))
+
+
+class JobWorkerPool:
+    """Worker threads claiming from a JobQueue, plus one heartbeat/reaper thread"""
+
+    def __init__(self, queue: JobQueue, workers: int = JOB_WORKERS,
+                 interactive_reserved: int = INTERACTIVE_RESERVED):
+        self.queue = queue
+        self.workers = max(1, workers)
+        self.interactive_reserved = min(interactive_reserved, self.workers - 1) if self.workers > 1 else 0
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self.completed = 0
+        self._running: Dict[str, int] = {}
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def lanes_for(self, index: int) -> Sequence[str]:
+        return LANES[:1] if index < self.interactive_reserved else LANES
+
+    def start(self):
+        for module in HANDLER_MODULES:
+            import_module(module)
+        for i in range(self.workers):
+            worker = f"{self.name}:w{i}"
+            thread = threading.Thread(target=self._work, args=(worker, self.lanes_for(i)),
+                                      name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        thread = threading.Thread(target=self._maintain, name="job-heartbeat", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+        logger.info(f"⚙️ Job pool started: {self.workers} workers "
+                    f"({self.interactive_reserved} interactive-only) on {self.queue.db_path}")
+
+    def wake(self):
+        self._wake.set()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _work(self, worker: str, lanes: Sequence[str]):
+        conn = self.queue.connect()
+        try:
+            while not self._stop.is_set():
+                try:
+                    job = self.queue.claim(conn, worker, lanes)
+                except sqlite3.OperationalError as e:
+                    logger.warning(f"Job claim failed: {e}")
+                    job = None
+                if job is None:
+                    self._wake.wait(POLL_INTERVAL)
+                    self._wake.clear()
+                    continue
+                self._run(conn, worker, job)
+        finally:
+            conn.close()
+
+    def _run(self, conn: sqlite3.Connection, worker: str, job: Dict):
+        job_id, kind = job["id"], job["kind"]
+        handler = HANDLERS.get(kind)
+        self._running[worker] = job_id
+        start = time.perf_counter()
+        try:
+            if handler is None:
+                raise ValueError(f"No handler registered for job kind '{kind}'")
+            ctx = JobContext(self.queue, conn, job_id)
+            result = handler(ctx, **job["params"])
+            self.queue.finish(conn, job_id, worker, "succeeded", result=result, message="Done")
+            logger.info(f"✅ Job {job_id} ({kind}) finished in {time.perf_counter() - start:.1f}s")
+        except JobCancelled:
+            self.queue.finish(conn, job_id, worker, "cancelled", message="Cancelled")
+            logger.info(f"🛑 Job {job_id} ({kind}) cancelled")
+        except Exception as e:
+            logger.error(f"❌ Job {job_id} ({kind}) failed: {e}", exc_info=True)
+            self.queue.finish(conn, job_id, worker, "failed", error=str(e))
+        finally:
+            self._running.pop(worker, None)
+            self.completed += 1
+
+    def _maintain(self):
+        conn = self.queue.connect()
+        last_prune = 0.0
+        try:
+            while not self._stop.wait(HEARTBEAT_INTERVAL):
+                try:
+                    self.queue.heartbeat(conn, list(self._running.values()))
+                    self.queue.requeue_stale(conn)
+                    if time.time() - last_prune > 3600:
+                        self.queue.prune(conn)
+                        last_prune = time.time()
+                except sqlite3.OperationalError as e:
+                    logger.warning(f"Job heartbeat failed: {e}")
+        finally:
+            conn.close()
+
+
+# Singleton instance
+_queue_instance: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue(db_path: str = JOBS_DB_PATH) -> JobQueue:
+    """Process-wide job queue"""
+    global _queue_instance
+    with _queue_lock:
+        if _queue_instance is None:
+            _queue_instance = JobQueue(db_path)
+    return _queue_instance
+
+
+if __name__ == "__main__":
+    import argparse
+
+    sys.path.append(str(Path(__file__).parent.parent.parent.parent))
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    parser = argparse.ArgumentParser(description="Run background job workers")
+    parser.add_argument("--workers", type=int, default=max(JOB_WORKERS, 3))
+    parser.add_argument("--db", default=JOBS_DB_PATH)
+    args = parser.parse_args()
+
+    # Handlers register into the importable module, not this __main__ copy
+    from backend.services.jobs import job_queue
+
+    pool = job_queue.JobWorkerPool(job_queue.JobQueue(args.db), workers=args.workers)
+    pool.start()
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        pool.stop()
@@ -0,0 +1,407 @@
+"""
+Download Directory Watcher
+--------------------------
+Change feed for the downloads/ directory, plus tail reads for the download
+log. Replaces per-tab polling, where every open Downloads page listed and
+stat()ed every file once a second and re-read the whole log file.
+
+- DirectoryIndex keeps an in-memory index of the directory, newest first.
+  It is updated from inotify on Linux, with a polling fallback elsewhere.
+  A bounded change log lets subscribers ask for everything since version N.
+  Versions are per process, so event ids carry an instance token (pid and
+  start time); an id from another gunicorn worker or an older process
+  parses to None and the subscriber gets a fresh snapshot.
+- tail_lines() reads the last N lines by seeking backwards from the end.
+- read_new_lines() returns the complete lines appended after a byte offset.
+
+Usage:
+    index = get_download_index()
+    index.snapshot()                        # {"version": 12, "files": [...]}
+    index.changes_since(12, timeout=25)     # blocks until something changes
+    # -> {"version": 13, "added": [{...}], "removed": ["old.csv"]}
+    index.event_id(13)                      # "4242-18f3a0c1d2e.13"
+    index.parse_event_id("4242-18f3a0c1d2e.13")   # 13 here, None in any other process
+
+    lines, offset = tail_lines("logs/data_downloader.log", 100)
+    more, offset = read_new_lines("logs/data_downloader.log", offset)
+"""
+
+import bisect
+import ctypes
+import ctypes.util
+import io
+import logging
+import os
+import select
+import struct
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DOWNLOADS_DIR = os.getenv("DOWNLOADS_DIR", "downloads")
+DOWNLOAD_LOG_PATH = "logs/data_downloader.log"
+POLL_INTERVAL = 2.0        # Fallback rescan period when inotify is unavailable
+COALESCE_INTERVAL = 0.5    # Writes to a growing export are batched into one change
+GROWING_WINDOW = 60        # Polling fallback re-stats files modified this recently
+CHANGE_LOG_SIZE = 1000     # Changes kept for since= resumes; older cursors get a snapshot
+TAIL_BLOCK_SIZE = 8192
+MAX_FOLLOW_BYTES = 1 << 20  # read_new_lines() never returns more than this at once
+
+# inotify(7)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE \
+    | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+RESCAN_MASK = IN_Q_OVERFLOW | IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+def _inotify_watch(path: Path) -> Optional[int]:
+    """Non-blocking inotify fd watching path, or None where inotify is unavailable"""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    if libc.inotify_add_watch(fd, os.fsencode(str(path)), WATCH_MASK) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+def _parse_events(data: bytes) -> Iterator[Tuple[int, str]]:
+    offset = 0
+    while offset < len(data):
+        _, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+        offset += EVENT_HEADER.size
+        name = data[offset:offset + length].rstrip(b"\0")
+        offset += length
+        yield mask, os.fsdecode(name)
+
+
+def _entry(name: str, st: os.stat_result) -> Dict:
+    return {
+        "filename": name,
+        "size": st.st_size,
+        "created_at": datetime.fromtimestamp(st.st_ctime).isoformat(),
+        "format": Path(name).suffix.lstrip("."),
+    }
+
+
+class DirectoryIndex:
+    """
+    In-memory, newest-first index of the regular files in one directory.
+
+    Every batch of changes bumps ``version`` and is kept in a bounded change
+    log, so a subscriber that last saw version N receives only the files
+    added or removed since then (or a full snapshot if N fell off the log).
+    """
+
+    def __init__(self, path: str = DOWNLOADS_DIR, poll_interval: float = POLL_INTERVAL,
+                 use_inotify: bool = True):
+        self.path = Path(path)
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.version = 0
+        self.mode: Optional[str] = None  # inotify | polling once started
+        self.instance: Optional[str] = None  # "<pid>-<start ms, hex>" once started
+        self._files: Dict[str, Dict] = {}
+        self._mtimes: Dict[str, float] = {}
+        self._keys: Dict[str, Tuple[float, str]] = {}
+        self._order: List[Tuple[float, str]] = []  # (-ctime, name), sorted
+        self._log: deque = deque(maxlen=CHANGE_LOG_SIZE)  # (version, added, removed)
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._dir_mtime: Optional[int] = None
+
+    # ------------------------------------------------------------------
+    # Readers
+    # ------------------------------------------------------------------
+
+    def snapshot(self, limit: Optional[int] = None) -> Dict:
+        self.start()
+        with self._cond:
+            names = self._order if limit is None else self._order[:limit]
+            return {"version": self.version, "files": [self._files[name] for _, name in names]}
+
+    def changes_since(self, since: int, timeout: float = 0) -> Dict:
+        """
+        Files added (or rewritten) and removed after version ``since``.
+
+        Waits up to ``timeout`` seconds for a change when there is none yet.
+        A cursor that is unknown or too old gets ``{"reset": True, "files": [...]}``.
+        """
+        self.start()
+        with self._cond:
+            if since == self.version and timeout > 0:
+                self._cond.wait_for(lambda: self.version != since or self._stop.is_set(), timeout)
+            if since == self.version:
+                return {"version": self.version, "added": [], "removed": []}
+            if since > self.version or not self._log or since < self._log[0][0] - 1:
+                files = [self._files[name] for _, name in self._order]
+                return {"version": self.version, "reset": True, "files": files}
+
+            added: Dict[str, Dict] = {}
+            removed = set()
+            for version, batch_added, batch_removed in self._log:
+                if version <= since:
+                    continue
+                for entry in batch_added:
+                    added[entry["filename"]] = entry
+                    removed.discard(entry["filename"])
+                for name in batch_removed:
+                    added.pop(name, None)
+                    removed.add(name)
+            return {"version": self.version, "added": list(added.values()), "removed": sorted(removed)}
+
+    def event_id(self, version: int) -> str:
+        """Cursor for ``version`` that only this process's index accepts back"""
+        self.start()
+        return f"{self.instance}.{version}"
+
+    def parse_event_id(self, event_id: Optional[str]) -> Optional[int]:
+        """Version from an event_id() of this process, else None (other worker, restart, junk)"""
+        self.start()
+        instance, _, version = (event_id or "").rpartition(".")
+        if instance != self.instance or not version.isdigit():
+            return None
+        return int(version)
+
+    # ------------------------------------------------------------------
+    # Index maintenance
+    # ------------------------------------------------------------------
+
+    def _apply(self, updates: Dict[str, Optional[os.stat_result]]):
+        """Upsert (stat result) or remove (None) files; one version per batch"""
+        added, removed = [], []
+        with self._cond:
+            for name, st in updates.items():
+                old = self._files.get(name)
+                if st is None:
+                    if old is None:
+                        continue
+                    self._remove(name)
+                    removed.append(name)
+                    continue
+                self._mtimes[name] = st.st_mtime
+                entry = _entry(name, st)
+                if entry == old:
+                    continue
+                if old is not None:
+                    self._remove(name)
+                self._files[name] = entry
+                self._keys[name] = (-st.st_ctime, name)
+                bisect.insort(self._order, self._keys[name])
+                added.append(entry)
+
+            if added or removed:
+                self.version += 1
+                self._log.append((self.version, added, removed))
+                self._cond.notify_all()
+
+    def _remove(self, name: str):
+        del self._files[name]
+        self._mtimes.pop(name, None)
+        del self._order[bisect.bisect_left(self._order, self._keys.pop(name))]
+
+    def _stat(self, name: str) -> Optional[os.stat_result]:
+        try:
+            st = (self.path / name).stat()
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        return st if (st.st_mode & 0o170000) == 0o100000 else None
+
+    def _rescan(self, growing_only: bool = False):
+        """
+        Bring the index in line with the directory. With growing_only, only
+        files modified in the last GROWING_WINDOW seconds are re-stat'ed.
+        """
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            self._dir_mtime = None
+            self._apply({name: None for name in list(self._files)})
+            return
+
+        if growing_only and st.st_mtime_ns == self._dir_mtime:
+            cutoff = time.time() - GROWING_WINDOW
+            with self._cond:
+                recent = [name for name, mtime in self._mtimes.items() if mtime >= cutoff]
+            self._apply({name: self._stat(name) for name in recent})
+            return
+
+        self._dir_mtime = st.st_mtime_ns
+        updates: Dict[str, Optional[os.stat_result]] = {}
+        with os.scandir(self.path) as it:
+            for item in it:
+                if item.is_file(follow_symlinks=False):
+                    try:
+                        updates[item.name] = item.stat(follow_symlinks=False)
+                    except FileNotFoundError:
+                        pass
+        with self._cond:
+            gone = set(self._files) - set(updates)
+        updates.update({name: None for name in gone})
+        self._apply(updates)
+
+    # ------------------------------------------------------------------
+    # Watcher thread
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Build the index and start watching (once per process)"""
+        if self._pid == os.getpid():
+            return
+        with self._cond:
+            if self._pid == os.getpid():
+                return
+            self.path.mkdir(parents=True, exist_ok=True)
+            self._stop.clear()
+            self._rescan()
+            fd = _inotify_watch(self.path) if self.use_inotify else None
+            self.mode = "inotify" if fd is not None else "polling"
+            target, args = (self._watch_inotify, (fd,)) if fd is not None else (self._watch_polling, ())
+            self._thread = threading.Thread(target=target, args=args, name="download-watcher", daemon=True)
+            self._thread.start()
+            self.instance = f"{os.getpid()}-{int(time.time() * 1000):x}"
+            self._pid = os.getpid()
+        logger.info(f"👀 Watching {self.path}/ ({self.mode}), {len(self._files)} files indexed")
+
+    def stop(self):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._pid = None
+
+    def _watch_inotify(self, fd: int):
+        dirty = set()
+        flush_at = 0.0
+        try:
+            while not self._stop.is_set():
+                timeout = max(0.0, flush_at - time.monotonic()) if dirty else 1.0
+                ready, _, _ = select.select([fd], [], [], timeout)
+                if ready:
+                    try:
+                        data = os.read(fd, 64 * 1024)
+                    except BlockingIOError:
+                        continue
+                    rescan = False
+                    for mask, name in _parse_events(data):
+                        if mask & RESCAN_MASK:
+                            rescan = True
+                        elif name:
+                            if not dirty:
+                                flush_at = time.monotonic() + COALESCE_INTERVAL
+                            dirty.add(name)
+                    if rescan:
+                        logger.warning(f"⚠️ inotify watch on {self.path} lost; falling back to polling")
+                        break
+                if dirty and time.monotonic() >= flush_at:
+                    self._apply({name: self._stat(name) for name in dirty})
+                    dirty.clear()
+        except Exception as e:
+            logger.error(f"❌ Download watcher failed, falling back to polling: {e}")
+        finally:
+            os.close(fd)
+        if not self._stop.is_set():
+            self.mode = "polling"
+            self._rescan()
+            self._watch_polling()
+
+    def _watch_polling(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self._rescan(growing_only=True)
+            except Exception as e:
+                logger.error(f"❌ Download directory scan failed: {e}")
+
+
+# ============================================================================
+# Log tail readers
+# ============================================================================
+
+
+def _decode_lines(data: bytes) -> List[str]:
+    # Same line splitting as text-mode readlines()
+    return io.StringIO(data.decode("utf-8", errors="replace"), newline=None).readlines()
+
+
+def tail_lines(path: str, n: int = 100, block_size: int = TAIL_BLOCK_SIZE) -> Tuple[List[str], int]:
+    """
+    Last n complete lines of a text file, reading blocks backwards from the
+    end, so the cost depends on n rather than on the size of the file.
+
+    Returns (lines, offset); pass offset to read_new_lines() to follow. A
+    trailing line still being written is left for read_new_lines().
+    """
+    with open(path, "rb") as f:
+        end = f.seek(0, os.SEEK_END)
+        if n <= 0:
+            return [], end
+        pos, chunks, newlines = end, [], 0
+        while pos > 0 and newlines <= n:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            chunk = f.read(step)
+            chunks.append(chunk)
+            newlines += chunk.count(b"\n")
+    data = b"".join(reversed(chunks))
+    complete = data.rfind(b"\n") + 1
+    return _decode_lines(data[:complete])[-n:], end - (len(data) - complete)
+
+
+def read_new_lines(path: str, offset: int, max_bytes: int = MAX_FOLLOW_BYTES) -> Tuple[List[str], int]:
+    """
+    Complete lines appended after byte offset, and the offset to resume from.
+
+    A file shorter than offset was rotated or truncated and is read from the
+    start. A trailing partial line is left for the next call.
+    """
+    with open(path, "rb") as f:
+        end = f.seek(0, os.SEEK_END)
+        if end < offset:
+            offset = 0
+        f.seek(max(offset, end - max_bytes))
+        if end - offset > max_bytes:  # too far behind: skip ahead to a line start
+            f.readline()
+        offset = f.tell()
+        data = f.read(end - offset)
+    complete = data.rfind(b"\n") + 1
+    return _decode_lines(data[:complete]), offset + complete
+
+
+_index: Optional[DirectoryIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_download_index() -> DirectoryIndex:
+    """Process-wide index of the downloads directory"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = DirectoryIndex()
+    return _index
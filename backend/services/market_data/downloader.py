@@ -4,30 +4,39 @@ Supports: Stocks, Options, Futures from Upstox API
 Output: Parquet files + SQLite database
 """
 
+from __future__ import annotations
+
 import logging
 import sqlite3
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Optional, Literal
-import pandas as pd
-import numpy as np
-import sys
-from pathlib import Path
+from typing import Callable, Iterator, List, Dict, Optional, Literal, Tuple
 
-# Add project root to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
 from backend.utils.auth.manager import AuthManager
 from backend.services.upstox.live_api import UpstoxLiveAPI
+from backend.utils.helpers.rate_limiter import RateLimiter
+from backend.utils.helpers.lazy_import import lazy_import
+
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
 
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[logging.FileHandler("logs/data_downloader.log"), logging.StreamHandler()],
-)
 logger = logging.getLogger(__name__)
 
+# Historical candle API budget shared by all fetch workers
+UPSTOX_HISTORY_REQUESTS_PER_SECOND = 10.0
+DOWNLOAD_MAX_WORKERS = 8
+
+OHLC_COLUMNS = ["symbol", "datetime", "open", "high", "low", "close", "volume"]
+
+GAP_FREQUENCIES = {
+    "1D": timedelta(days=1),
+    "1H": timedelta(hours=1),
+    "15m": timedelta(minutes=15),
+}
+
 
 class DataQualityError(Exception):
     """Raised when data quality checks fail"""
@@ -61,24 +70,25 @@ class BaseDownloader:
         logger.debug(f"Validating {len(df)} rows of OHLC data")
         original_len = len(df)
 
-        # Check constraints
-        invalid_high_low = df[df["high"] < df["low"]]
-        if len(invalid_high_low) > 0:
-            logger.warning(f"Found {len(invalid_high_low)} rows with high < low")
-            df = df[df["high"] >= df["low"]]
-
-        invalid_close = df[(df["close"] > df["high"]) | (df["close"] < df["low"])]
-        if len(invalid_close) > 0:
+        # Check constraints (one combined mask)
+        bad_high_low = (df["high"] < df["low"]).to_numpy()
+        bad_close = ((df["close"] > df["high"]) | (df["close"] < df["low"])).to_numpy()
+        if bad_high_low.any():
+            logger.warning(f"Found {int(bad_high_low.sum())} rows with high < low")
+        bad_close = bad_close & ~bad_high_low
+        if bad_close.any():
             logger.warning(
-                f"Found {len(invalid_close)} rows with close outside high/low"
+                f"Found {int(bad_close.sum())} rows with close outside high/low"
             )
-            df = df[(df["close"] <= df["high"]) & (df["close"] >= df["low"])]
+        invalid = bad_high_low | bad_close
+        if invalid.any():
+            df = df[~invalid]
 
         # Remove duplicates
         df = df.drop_duplicates(subset=["datetime", "symbol"], keep="last")
 
         # Sort by datetime
-        df = df.sort_values("datetime")
+        df = df.sort_values("datetime", kind="stable")
 
         cleaned_len = len(df)
         logger.info(
@@ -91,39 +101,46 @@ class BaseDownloader:
         self, df: pd.DataFrame, expected_interval: str = "1D"
     ) -> List[Dict]:
         """
-        Detect missing dates/candles in time series
+        Detect missing dates/candles in time series (per symbol)
         Returns list of gap periods
         """
         logger.debug(f"Detecting gaps with interval={expected_interval}")
-        gaps = []
 
         if len(df) < 2:
-            return gaps
-
-        df = df.sort_values("datetime")
-        datetimes = pd.to_datetime(df["datetime"])
-
-        # Calculate expected frequency
-        if expected_interval == "1D":
-            freq = pd.Timedelta(days=1)
-        elif expected_interval == "1H":
-            freq = pd.Timedelta(hours=1)
-        elif expected_interval == "15m":
-            freq = pd.Timedelta(minutes=15)
+            return []
+
+        freq = pd.Timedelta(GAP_FREQUENCIES.get(expected_interval, timedelta(days=1)))
+
+        frame = pd.DataFrame({"datetime": pd.to_datetime(df["datetime"]).to_numpy()})
+        if "symbol" in df.columns:
+            frame["symbol"] = df["symbol"].to_numpy()
+            frame = frame.sort_values(["symbol", "datetime"], kind="stable")
+            previous = frame.groupby("symbol", sort=False)["datetime"].shift()
         else:
-            freq = pd.Timedelta(days=1)
-
-        # Find gaps
-        for i in range(len(datetimes) - 1):
-            diff = datetimes.iloc[i + 1] - datetimes.iloc[i]
-            if diff > freq * 2:  # Allow for weekends/holidays
-                gap = {
-                    "start": datetimes.iloc[i].isoformat(),
-                    "end": datetimes.iloc[i + 1].isoformat(),
-                    "missing_periods": int(diff / freq) - 1,
-                }
-                gaps.append(gap)
-                logger.warning(f"Gap detected: {gap}")
+            frame = frame.sort_values("datetime", kind="stable")
+            previous = frame["datetime"].shift()
+
+        diff = frame["datetime"] - previous
+        mask = (diff > freq * 2).to_numpy()  # Allow for weekends/holidays
+        if not mask.any():
+            return []
+
+        starts = previous[mask]
+        ends = frame["datetime"][mask]
+        missing = (diff[mask] // freq).astype(int) - 1
+        symbols = frame["symbol"][mask] if "symbol" in frame else [None] * int(mask.sum())
+
+        gaps = []
+        for symbol, start, end, periods in zip(symbols, starts, ends, missing):
+            gap = {
+                "start": start.isoformat(),
+                "end": end.isoformat(),
+                "missing_periods": int(periods),
+            }
+            if symbol is not None:
+                gap["symbol"] = symbol
+            gaps.append(gap)
+        logger.warning(f"Detected {len(gaps)} gaps")
 
         return gaps
 
@@ -142,6 +159,67 @@ class BaseDownloader:
         return str(filepath)
 
 
+class StreamingExporter:
+    """
+    Append-only Parquet/CSV writer fed one symbol chunk at a time, so export
+    memory stays at one chunk regardless of how many symbols are downloaded.
+    Parquet chunks become row groups of a single file (requires pyarrow).
+    """
+
+    def __init__(self, downloads_dir: Path, basename: str, export_format: str):
+        self.parquet_path = None
+        self.csv_path = None
+        if export_format in ("parquet", "both"):
+            self.parquet_path = downloads_dir / f"{basename}.parquet"
+        if export_format in ("csv", "both"):
+            self.csv_path = downloads_dir / f"{basename}.csv"
+        self._parquet_writer = None
+        self._schema = None
+        self._csv_header = True
+        self.rows = 0
+
+    def write(self, df: pd.DataFrame):
+        if df.empty:
+            return
+        if self.parquet_path is not None:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            if self._parquet_writer is None:
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                self._schema = table.schema
+                self._parquet_writer = pq.ParquetWriter(
+                    self.parquet_path, self._schema, compression="snappy"
+                )
+            else:
+                table = pa.Table.from_pandas(
+                    df, schema=self._schema, preserve_index=False
+                )
+            self._parquet_writer.write_table(table)
+        if self.csv_path is not None:
+            df.to_csv(
+                self.csv_path,
+                mode="w" if self._csv_header else "a",
+                header=self._csv_header,
+                index=False,
+            )
+            self._csv_header = False
+        self.rows += len(df)
+
+    def close(self) -> Optional[str]:
+        """Finish files; returns the primary path (parquet preferred)"""
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+        written = self.rows > 0
+        for path in (self.parquet_path, self.csv_path):
+            if path is not None and written:
+                logger.info(f"Exported {self.rows} rows to {path}")
+        if not written:
+            return None
+        return str(self.parquet_path or self.csv_path)
+
+
 class StockDownloader(BaseDownloader):
     """Download stock OHLC data from Upstox API V3"""
 
@@ -173,10 +251,26 @@ class StockDownloader(BaseDownloader):
         "AXISBANK": "NSE_EQ|INE238A01034",
     }
 
-    def __init__(self, db_path: str = "market_data.db"):
+    def __init__(
+        self,
+        db_path: str = "market_data.db",
+        max_workers: int = DOWNLOAD_MAX_WORKERS,
+        requests_per_second: float = UPSTOX_HISTORY_REQUESTS_PER_SECOND,
+    ):
         super().__init__(db_path)
         self.auth_manager = AuthManager(db_path=db_path)
         self.base_url = "https://api.upstox.com/v2"  # Use V2 API
+        self.max_workers = max_workers
+        self.limiter = RateLimiter(rate=requests_per_second, burst=max_workers)
+        self._api: Optional[UpstoxLiveAPI] = None
+        self._api_lock = threading.Lock()
+
+    def get_api(self) -> UpstoxLiveAPI:
+        """Shared UpstoxLiveAPI (one session/token lookup for all workers)"""
+        with self._api_lock:
+            if self._api is None:
+                self._api = UpstoxLiveAPI()
+            return self._api
 
     def get_instrument_key(self, symbol: str) -> str:
         """
@@ -240,8 +334,8 @@ class StockDownloader(BaseDownloader):
         )
 
         try:
-            # Initialize API Wrapper
-            api = UpstoxLiveAPI()
+            # Shared API Wrapper
+            api = self.get_api()
 
             # Get instrument key
             instrument_key = self.get_instrument_key(symbol)
@@ -271,46 +365,19 @@ class StockDownloader(BaseDownloader):
 
             # Use the verified backend function
             # Endpoint: /v2/historical-candle/{instrumentKey}/{interval}/{toDate}/{fromDate}
-            candles = api.get_historical_candles(
-                instrument_key=instrument_key_encoded,
-                interval=api_interval,
-                to_date=end_date,
-                from_date=start_date,
-            )
+            with self.limiter:
+                candles = api.get_historical_candles(
+                    instrument_key=instrument_key_encoded,
+                    interval=api_interval,
+                    to_date=end_date,
+                    from_date=start_date,
+                )
 
             if not candles:
                 logger.warning(f"No data returned for {symbol}")
                 return pd.DataFrame()
 
-            # Parse candles: [timestamp, open, high, low, close, volume, oi]
-            records = []
-            for candle in candles:
-                timestamp_str, open_p, high, low, close, volume, oi = candle
-                # Convert ISO timestamp to datetime
-                try:
-                    dt = datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
-                except ValueError:
-                    # Fallback for different formats
-                    dt = datetime.now()
-
-                records.append(
-                    {
-                        "datetime": dt.strftime("%Y-%m-%d %H:%M:%S"),
-                        "open": float(open_p),
-                        "high": float(high),
-                        "low": float(low),
-                        "close": float(close),
-                        "volume": int(volume),
-                        "open_interest": int(oi) if oi else 0,
-                        "symbol": (
-                            symbol.upper().split("|")[-1]
-                            if "|" in symbol
-                            else symbol.upper()
-                        ),
-                    }
-                )
-
-            df = pd.DataFrame(records)
+            df = self.candles_to_frame(candles, symbol)
             logger.info(f"Fetched {len(df)} rows for {symbol} from Upstox")
             return df
 
@@ -320,6 +387,34 @@ class StockDownloader(BaseDownloader):
             )
             return self._generate_mock_data(symbol, start_date, end_date)
 
+    @staticmethod
+    def candles_to_frame(candles: List[List], symbol: str) -> pd.DataFrame:
+        """
+        Parse Upstox candles [timestamp, open, high, low, close, volume, oi]
+        column-wise; timestamps keep their exchange wall-clock time
+        """
+        raw = pd.DataFrame(
+            candles,
+            columns=["timestamp", "open", "high", "low", "close", "volume", "oi"],
+        )
+        stamps = raw["timestamp"].astype(str).str.slice(0, 19).str.replace("T", " ", regex=False)
+        parsed = pd.to_datetime(stamps, format="%Y-%m-%d %H:%M:%S", errors="coerce")
+        # Fallback for different formats
+        parsed = parsed.fillna(pd.Timestamp(datetime.now().replace(microsecond=0)))
+
+        return pd.DataFrame(
+            {
+                "datetime": parsed.dt.strftime("%Y-%m-%d %H:%M:%S"),
+                "open": raw["open"].astype(float),
+                "high": raw["high"].astype(float),
+                "low": raw["low"].astype(float),
+                "close": raw["close"].astype(float),
+                "volume": raw["volume"].astype("int64"),
+                "open_interest": pd.to_numeric(raw["oi"], errors="coerce").fillna(0).astype("int64"),
+                "symbol": symbol.upper().split("|")[-1] if "|" in symbol else symbol.upper(),
+            }
+        )
+
     def _generate_mock_data(
         self, symbol: str, start_date: str, end_date: str
     ) -> pd.DataFrame:
@@ -376,24 +471,53 @@ class StockDownloader(BaseDownloader):
         logger.info(f"Generated {len(df)} mock records for {symbol}")
         return df
 
+    def iter_symbols(
+        self, symbols: List[str], start_date: str, end_date: str, interval: str = "1d"
+    ) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """
+        Fetch symbols concurrently (max_workers threads under the shared rate
+        limiter) and yield (symbol, DataFrame) as each download completes
+        """
+        if len(symbols) <= 1 or self.max_workers <= 1:
+            for symbol in symbols:
+                try:
+                    yield symbol, self.fetch_from_upstox(symbol, start_date, end_date, interval)
+                except Exception as e:
+                    logger.error(f"Failed to fetch {symbol}: {e}")
+            return
+
+        pool = ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(symbols)),
+            thread_name_prefix="ohlc-fetch",
+        )
+        try:
+            futures = {
+                pool.submit(self.fetch_from_upstox, symbol, start_date, end_date, interval): symbol
+                for symbol in symbols
+            }
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    yield symbol, future.result()
+                except Exception as e:
+                    logger.error(f"Failed to fetch {symbol}: {e}")
+        finally:
+            # Consumer stopped early (e.g. job cancelled): drop fetches not yet started
+            pool.shutdown(wait=True, cancel_futures=True)
+
     def fetch_multiple(
         self, symbols: List[str], start_date: str, end_date: str, interval: str = "1d"
     ) -> pd.DataFrame:
         """
-        Fetch multiple symbols from Upstox
+        Fetch multiple symbols from Upstox concurrently
         Returns combined DataFrame
         """
         logger.info(f"Bulk fetching {len(symbols)} symbols from Upstox")
-        all_data = []
-
-        for symbol in symbols:
-            try:
-                df = self.fetch_from_upstox(symbol, start_date, end_date, interval)
-                if not df.empty:
-                    all_data.append(df)
-            except Exception as e:
-                logger.error(f"Failed to fetch {symbol}: {e}")
-                continue
+        all_data = [
+            df
+            for _, df in self.iter_symbols(symbols, start_date, end_date, interval)
+            if not df.empty
+        ]
 
         if not all_data:
             return pd.DataFrame()
@@ -402,9 +526,28 @@ class StockDownloader(BaseDownloader):
         logger.info(f"Bulk fetch complete: {len(combined)} total rows")
         return combined
 
-    def save_to_db(self, df: pd.DataFrame, table: str = "ohlc_data") -> int:
+    def _insert_rows(self, conn: sqlite3.Connection, df: pd.DataFrame, table: str) -> int:
+        """Column-array executemany (no per-row Python work besides zip)"""
+        columns = [df[column].tolist() for column in OHLC_COLUMNS]
+        conn.executemany(
+            f"""
+            INSERT OR REPLACE INTO {table}
+            ({", ".join(OHLC_COLUMNS)})
+            VALUES ({", ".join("?" * len(OHLC_COLUMNS))})
+        """,
+            zip(*columns),
+        )
+        return len(df)
+
+    def save_to_db(
+        self,
+        df: pd.DataFrame,
+        table: str = "ohlc_data",
+        conn: Optional[sqlite3.Connection] = None,
+    ) -> int:
         """
-        Save OHLC data to database
+        Save OHLC data to database in a single transaction
+        Pass ``conn`` to batch several chunks into the caller's transaction.
         Returns number of rows inserted
         """
         if df.empty:
@@ -413,36 +556,18 @@ class StockDownloader(BaseDownloader):
 
         logger.info(f"Saving {len(df)} rows to {table}")
 
-        conn = self.get_db_connection()
-        cursor = conn.cursor()
-
-        # Insert or replace to handle duplicates
-        inserted = 0
-        for _, row in df.iterrows():
-            try:
-                cursor.execute(
-                    f"""
-                    INSERT OR REPLACE INTO {table}
-                    (symbol, datetime, open, high, low, close, volume)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """,
-                    (
-                        row["symbol"],
-                        row["datetime"],
-                        row["open"],
-                        row["high"],
-                        row["low"],
-                        row["close"],
-                        row["volume"],
-                    ),
-                )
-                inserted += 1
-            except Exception as e:
-                logger.error(f"Error inserting row: {e}")
-                continue
+        if conn is not None:
+            return self._insert_rows(conn, df, table)
 
-        conn.commit()
-        conn.close()
+        conn = self.get_db_connection()
+        try:
+            with conn:
+                inserted = self._insert_rows(conn, df, table)
+        except sqlite3.Error as e:
+            logger.error(f"Error inserting rows into {table}: {e}")
+            inserted = 0
+        finally:
+            conn.close()
 
         logger.info(f"Saved {inserted} rows to database")
         return inserted
@@ -455,11 +580,18 @@ class StockDownloader(BaseDownloader):
         interval: str = "1d",
         save_db: bool = True,
         export_format: Optional[Literal["parquet", "csv", "both"]] = "parquet",
+        keep_data: bool = True,
+        on_symbol: Optional[Callable[[str, int], None]] = None,
     ) -> Dict:
         """
         Complete download pipeline
+        Each symbol is validated, saved and appended to the export as soon as
+        its fetch completes; with ``keep_data=False`` nothing is accumulated,
+        so memory stays flat for large symbol lists.
+        ``on_symbol(symbol, rows)`` is called after each symbol is processed;
+        an exception raised from it aborts the run and rolls back the save.
         Returns: {
-            'data': DataFrame,
+            'data': DataFrame (empty when keep_data=False),
             'filepath': str or None,
             'rows': int,
             'gaps': List[Dict],
@@ -468,58 +600,79 @@ class StockDownloader(BaseDownloader):
         """
         logger.info(f"Starting download pipeline for {symbols}")
 
-        # Fetch data from Upstox API
-        if len(symbols) == 1:
-            df = self.fetch_from_upstox(symbols[0], start_date, end_date, interval)
-        else:
-            df = self.fetch_multiple(symbols, start_date, end_date, interval)
-
-        if df.empty:
-            logger.warning("No data fetched")
-            return {
-                "data": df,
-                "filepath": None,
-                "rows": 0,
-                "gaps": [],
-                "validation_errors": 0,
-            }
-
-        # Validate data
-        original_len = len(df)
-        df = self.validate_ohlc(df)
-        validation_errors = original_len - len(df)
-
-        # Detect gaps
-        gaps = self.detect_gaps(df, interval)
-
-        # Save to database
-        if save_db:
-            self.save_to_db(df)
-
-        # Export file
-        filepath = None
+        exporter = None
         if export_format:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             symbols_str = (
                 "_".join(symbols) if len(symbols) <= 3 else f"{len(symbols)}_stocks"
             )
+            exporter = StreamingExporter(
+                self.downloads_dir, f"{symbols_str}_{interval}_{timestamp}", export_format
+            )
 
-            if export_format == "parquet" or export_format == "both":
-                filepath = self.export_parquet(
-                    df, f"{symbols_str}_{interval}_{timestamp}.parquet"
-                )
+        conn = self.get_db_connection() if save_db else None
+        filepath = None
+        chunks = []
+        gaps = []
+        rows = 0
+        validation_errors = 0
+        saved = 0
+        fetched = self.iter_symbols(symbols, start_date, end_date, interval)
 
-            if export_format == "csv" or export_format == "both":
-                csv_path = self.export_csv(
-                    df, f"{symbols_str}_{interval}_{timestamp}.csv"
-                )
-                if not filepath:
-                    filepath = csv_path
+        try:
+            for symbol, df in fetched:
+                if df.empty:
+                    if on_symbol is not None:
+                        on_symbol(symbol, 0)
+                    continue
+
+                # Validate data
+                original_len = len(df)
+                df = self.validate_ohlc(df)
+                validation_errors += original_len - len(df)
+                rows += len(df)
+
+                # Detect gaps
+                gaps.extend(self.detect_gaps(df, interval))
+
+                # Save to database (one transaction for the whole run)
+                if conn is not None:
+                    try:
+                        saved += self.save_to_db(df, conn=conn)
+                    except sqlite3.Error as e:
+                        logger.error(f"Error saving {symbol}: {e}")
+
+                # Export file
+                if exporter is not None:
+                    exporter.write(df)
+
+                if keep_data:
+                    chunks.append(df)
+
+                if on_symbol is not None:
+                    on_symbol(symbol, len(df))
+
+            if conn is not None:
+                conn.commit()
+                logger.info(f"Saved {saved} rows to database")
+        finally:
+            fetched.close()
+            if conn is not None:
+                conn.close()
+            if exporter is not None:
+                filepath = exporter.close()
+
+        if rows == 0:
+            logger.warning("No data fetched")
+
+        data = pd.DataFrame()
+        if chunks:
+            data = pd.concat(chunks, ignore_index=True).sort_values("datetime", kind="stable")
 
         return {
-            "data": df,
+            "data": data,
             "filepath": filepath,
-            "rows": len(df),
+            "rows": rows,
             "gaps": gaps,
             "validation_errors": validation_errors,
         }
@@ -588,5 +741,11 @@ if __name__ == "__main__":
     Path("logs").mkdir(exist_ok=True)
     Path("cache").mkdir(exist_ok=True)
 
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        handlers=[logging.FileHandler("logs/data_downloader.log"), logging.StreamHandler()],
+    )
+
     # Run test
     test_stock_download()
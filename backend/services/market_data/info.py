@@ -128,6 +128,22 @@ class MarketInfoService:
             """
             )
 
+            # Exchange windows on holiday dates (muhurat / special sessions)
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS market_special_sessions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    date DATE NOT NULL,
+                    exchange TEXT NOT NULL,
+                    start_ts INTEGER NOT NULL,
+                    end_ts INTEGER NOT NULL,
+                    description TEXT,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE(date, exchange, start_ts)
+                )
+            """
+            )
+
             # Market timings table
             conn.execute(
                 """
@@ -226,18 +242,10 @@ class MarketInfoService:
         return status.get("is_open", False)
 
     def _is_trading_hours(self) -> bool:
-        """Fallback: Check if current time is within trading hours"""
-        now = datetime.now().time()
-
-        # NSE regular trading: 9:15 AM - 3:30 PM
-        market_open = datetime.strptime("09:15", "%H:%M").time()
-        market_close = datetime.strptime("15:30", "%H:%M").time()
+        """Fallback: Check the cached session calendar (holidays, special sessions)"""
+        from backend.services.market_data.market_calendar import get_market_calendar
 
-        # Check if today is weekend
-        if datetime.now().weekday() >= 5:  # Saturday=5, Sunday=6
-            return False
-
-        return market_open <= now <= market_close
+        return get_market_calendar(self.db_path).is_open()
 
     @with_retry(max_attempts=3, use_cache=True)
     def get_market_holidays(
@@ -427,23 +435,51 @@ class MarketInfoService:
             return {}
 
     def _save_holidays(self, holidays: List[Dict], exchange: Optional[str]):
-        """Save holidays to database"""
+        """
+        Save holidays to database.
+
+        Upstox lists the exchanges a holiday closes (closed_exchanges) and any
+        exchange windows still open that day (open_exchanges, e.g. muhurat
+        trading, epoch ms); the latter go to market_special_sessions.
+        """
         try:
             with self.db_pool.get_connection() as conn:
                 for holiday in holidays:
-                    conn.execute(
-                        """
-                        INSERT OR REPLACE INTO market_holidays 
-                        (date, holiday_name, exchange, segment)
-                        VALUES (?, ?, ?, ?)
-                    """,
-                        (
-                            holiday.get("date"),
-                            holiday.get("name"),
-                            exchange or holiday.get("exchange"),
-                            holiday.get("segment"),
-                        ),
-                    )
+                    name = holiday.get("name") or holiday.get("description")
+                    closed = holiday.get("closed_exchanges")
+                    if closed is None:
+                        closed = [exchange or holiday.get("exchange")]
+
+                    for closed_exchange in closed:
+                        conn.execute(
+                            """
+                            INSERT OR REPLACE INTO market_holidays 
+                            (date, holiday_name, exchange, segment)
+                            VALUES (?, ?, ?, ?)
+                        """,
+                            (
+                                holiday.get("date"),
+                                name,
+                                closed_exchange,
+                                holiday.get("segment"),
+                            ),
+                        )
+
+                    for window in holiday.get("open_exchanges") or []:
+                        conn.execute(
+                            """
+                            INSERT OR REPLACE INTO market_special_sessions
+                            (date, exchange, start_ts, end_ts, description)
+                            VALUES (?, ?, ?, ?, ?)
+                        """,
+                            (
+                                holiday.get("date"),
+                                window.get("exchange"),
+                                int(window["start_time"]) // 1000,
+                                int(window["end_time"]) // 1000,
+                                name,
+                            ),
+                        )
 
         except Exception as e:
             logger.error(f"Failed to save holidays: {e}")
@@ -0,0 +1,275 @@
+"""
+Market Calendar
+Precomputed NSE trading sessions shared by every poller and market-status check
+
+The session table is built once from the MarketInfoService caches:
+- market_holidays          -> weekdays without a regular session
+- market_special_sessions  -> muhurat / special-day windows; on those dates
+                              they replace the regular session
+- market_timings           -> regular hours (default 09:15-15:30 IST)
+
+Sessions are (open_ts, close_ts) epoch seconds, half-open, so answers don't
+depend on the host timezone. Every calendar day maps straight to its slice of
+the table, so is_open / next_open / sessions_between are a couple of list
+lookups instead of date arithmetic.
+
+Usage:
+    from backend.services.market_data.market_calendar import get_market_calendar
+
+    cal = get_market_calendar()
+    cal.is_open()                          # now
+    cal.next_open()                        # epoch seconds of the next session
+    cal.sessions_between(start_ts, end_ts) # [(open_ts, close_ts), ...]
+
+Pollers don't wait on the calendar themselves: PollerScheduler
+(backend/data/etl/poller_scheduler.py) asks is_open() for each bar close,
+runs jobs only on in-session bars and sleeps straight to the first bar of
+the next session.
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable, List, Optional, Tuple
+
+from backend.core.trading.expiry_calendar import load_cached_holidays, reset_expiry_calendar
+
+logger = logging.getLogger("market_calendar")
+
+DB_PATH = "market_data.db"
+EXCHANGE = "NSE"
+REGULAR_OPEN = "09:15"
+REGULAR_CLOSE = "15:30"
+YEARS_AROUND = 5              # Session table spans this many years either side of today
+CALENDAR_MAX_AGE = 6 * 3600   # Rebuild from the caches (and re-check while sleeping) this often
+
+IST = timezone(timedelta(hours=5, minutes=30))
+IST_OFFSET = 19800            # Seconds east of UTC
+DAY = 86400
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+Session = Tuple[int, int]
+
+
+def _day_of(value) -> int:
+    """'YYYY-MM-DD' / date -> days since epoch"""
+    if isinstance(value, str):
+        value = date.fromisoformat(value[:10])
+    return value.toordinal() - _EPOCH_ORDINAL
+
+
+def _seconds(hhmm: str) -> int:
+    """'HH:MM[:SS]' -> seconds after midnight"""
+    parts = [int(p) for p in str(hhmm).split(":")]
+    return parts[0] * 3600 + parts[1] * 60 + (parts[2] if len(parts) > 2 else 0)
+
+
+def load_special_sessions(db_path: str = DB_PATH, exchange: str = EXCHANGE) -> List[Session]:
+    """Muhurat / special-day windows cached by MarketInfoService.get_market_holidays()"""
+    try:
+        conn = sqlite3.connect(db_path)
+        try:
+            rows = conn.execute(
+                "SELECT start_ts, end_ts FROM market_special_sessions WHERE exchange = ?",
+                (exchange,),
+            ).fetchall()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return []
+    return [(int(start), int(end)) for start, end in rows]
+
+
+def load_regular_hours(db_path: str = DB_PATH, exchange: str = EXCHANGE) -> Tuple[str, str]:
+    """Regular open/close from the market_timings cache, else 09:15-15:30"""
+    try:
+        conn = sqlite3.connect(db_path)
+        try:
+            row = conn.execute(
+                "SELECT open_time, close_time FROM market_timings WHERE exchange = ? "
+                "ORDER BY segment = 'EQ' DESC LIMIT 1",
+                (exchange,),
+            ).fetchone()
+        finally:
+            conn.close()
+        if row and all(row) and _seconds(row[0]) < _seconds(row[1]):
+            return row[0], row[1]
+    except (sqlite3.Error, ValueError, IndexError):
+        pass
+    return REGULAR_OPEN, REGULAR_CLOSE
+
+
+class MarketCalendar:
+    """Sorted session table with a per-day index into it"""
+
+    def __init__(
+        self,
+        holidays: Iterable = (),
+        special_sessions: Iterable[Session] = (),
+        open_time: str = REGULAR_OPEN,
+        close_time: str = REGULAR_CLOSE,
+        first_year: Optional[int] = None,
+        last_year: Optional[int] = None,
+    ):
+        this_year = datetime.now(IST).year
+        self.first_day = _day_of(date((first_year or this_year - YEARS_AROUND), 1, 1))
+        self.last_day = _day_of(date((last_year or this_year + YEARS_AROUND), 12, 31))
+        self.holidays = {_day_of(h) for h in holidays}
+        self.holiday_years = {(date.fromordinal(d + _EPOCH_ORDINAL)).year for d in self.holidays}
+
+        special = {}
+        for start, end in special_sessions:
+            special.setdefault((start + IST_OFFSET) // DAY, []).append((start, end))
+
+        open_s, close_s = _seconds(open_time), _seconds(close_time)
+        self.opens: List[int] = []
+        self.closes: List[int] = []
+        self._day_index: List[int] = []  # First session index of each day, plus an end sentinel
+
+        for day in range(self.first_day, self.last_day + 1):
+            self._day_index.append(len(self.opens))
+            if day in special:
+                windows = sorted(special[day])
+            elif (day + 3) % 7 < 5 and day not in self.holidays:  # 1970-01-01 was a Thursday
+                midnight = day * DAY - IST_OFFSET
+                windows = [(midnight + open_s, midnight + close_s)]
+            else:
+                continue
+            for start, end in windows:
+                self.opens.append(start)
+                self.closes.append(end)
+        self._day_index.append(len(self.opens))
+
+        self.built_at = time.time()
+
+    def _day_slice(self, ts: float) -> Tuple[int, int]:
+        k = (int(ts) + IST_OFFSET) // DAY - self.first_day
+        if k < 0:
+            return 0, 0
+        if k >= len(self._day_index) - 1:
+            return len(self.opens), len(self.opens)
+        return self._day_index[k], self._day_index[k + 1]
+
+    def _first_closing_after(self, ts: float) -> int:
+        start, end = self._day_slice(ts)
+        for i in range(start, end):
+            if self.closes[i] > ts:
+                return i
+        return end
+
+    def _first_opening_from(self, ts: float) -> int:
+        start, end = self._day_slice(ts)
+        for i in range(start, end):
+            if self.opens[i] >= ts:
+                return i
+        return end
+
+    def current_session(self, ts: Optional[float] = None) -> Optional[Session]:
+        ts = time.time() if ts is None else ts
+        i = self._first_closing_after(ts)
+        if i < len(self.opens) and self.opens[i] <= ts:
+            return self.opens[i], self.closes[i]
+        return None
+
+    def is_open(self, ts: Optional[float] = None) -> bool:
+        return self.current_session(ts) is not None
+
+    def next_open(self, ts: Optional[float] = None) -> Optional[int]:
+        """Open of the first session starting at or after ts (None past the table)"""
+        ts = time.time() if ts is None else ts
+        i = self._first_opening_from(ts)
+        return self.opens[i] if i < len(self.opens) else None
+
+    def next_close(self, ts: Optional[float] = None) -> Optional[int]:
+        """Close of the current session, or of the next one if closed"""
+        ts = time.time() if ts is None else ts
+        i = self._first_closing_after(ts)
+        return self.closes[i] if i < len(self.closes) else None
+
+    def seconds_until_open(self, ts: Optional[float] = None) -> Optional[float]:
+        ts = time.time() if ts is None else ts
+        if self.is_open(ts):
+            return 0.0
+        next_open = self.next_open(ts)
+        return None if next_open is None else next_open - ts
+
+    def sessions_between(self, start_ts: float, end_ts: float) -> List[Session]:
+        """Sessions overlapping [start_ts, end_ts)"""
+        i = self._first_closing_after(start_ts)
+        j = self._first_opening_from(end_ts)
+        return list(zip(self.opens[i:j], self.closes[i:j]))
+
+    def is_trading_day(self, day) -> bool:
+        k = _day_of(day) - self.first_day
+        if not 0 <= k < len(self._day_index) - 1:
+            return False
+        return self._day_index[k + 1] > self._day_index[k]
+
+    @classmethod
+    def from_db(cls, db_path: str = DB_PATH, exchange: str = EXCHANGE, **kwargs) -> "MarketCalendar":
+        holidays = load_cached_holidays(db_path, exchange)
+        special = load_special_sessions(db_path, exchange)
+        open_time, close_time = load_regular_hours(db_path, exchange)
+        calendar = cls(holidays, special, open_time, close_time, **kwargs)
+        logger.info(
+            f"📅 Market calendar: {len(calendar.opens)} {exchange} sessions, "
+            f"{len(holidays)} holidays, {len(special)} special sessions"
+        )
+        return calendar
+
+
+_calendar: Optional[MarketCalendar] = None
+_calendar_db: Optional[str] = None
+_calendar_lock = threading.Lock()
+
+
+def get_market_calendar(db_path: str = DB_PATH) -> MarketCalendar:
+    """Process-wide calendar, rebuilt from the caches every CALENDAR_MAX_AGE"""
+    global _calendar, _calendar_db
+    calendar = _calendar
+    if calendar is None or _calendar_db != db_path or time.time() - calendar.built_at > CALENDAR_MAX_AGE:
+        with _calendar_lock:
+            calendar = _calendar
+            if calendar is None or _calendar_db != db_path or time.time() - calendar.built_at > CALENDAR_MAX_AGE:
+                calendar = _calendar = MarketCalendar.from_db(db_path)
+                _calendar_db = db_path
+    return calendar
+
+
+def reset_market_calendar():
+    """Drop the cached calendar so the next call re-reads the holiday caches"""
+    global _calendar
+    with _calendar_lock:
+        _calendar = None
+
+
+def refresh_market_calendar(db_path: str = DB_PATH) -> MarketCalendar:
+    """
+    Fetch this year's holidays through MarketInfoService when the cache has
+    none, then rebuild. Failures fall back to the weekday-only table.
+    """
+    calendar = get_market_calendar(db_path)
+    year = datetime.now(IST).year
+    if year in calendar.holiday_years:
+        return calendar
+    try:
+        from backend.services.market_data.info import MarketInfoService
+
+        MarketInfoService(db_path=db_path).get_market_holidays(year=year)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not refresh market holidays: {e}")
+        return calendar
+    reset_market_calendar()
+    reset_expiry_calendar()
+    return get_market_calendar(db_path)
+
+
+def describe_next_open(calendar: MarketCalendar, ts: Optional[float] = None) -> str:
+    next_open = calendar.next_open(ts)
+    if next_open is None:
+        return "no session scheduled"
+    return datetime.fromtimestamp(next_open, IST).strftime("%a %d %b %H:%M IST")
@@ -7,13 +7,16 @@ import logging
 import requests
 import sys
 import os
-from datetime import datetime, timedelta, time as dt_time
+from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Any
 from pathlib import Path
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from backend.utils.auth.manager import AuthManager
 from backend.utils.auth.headers import build_bearer_headers
+from backend.utils.helpers.serialization import parse_response
+from backend.core.analytics.chain_analytics import ChainAnalyticsEngine
+from backend.services.market_data.market_calendar import describe_next_open, get_market_calendar
 
 # Configure logging
 logging.basicConfig(
@@ -34,6 +37,7 @@ class OptionsChainService:
         self.db_path = db_path
         self.base_url = "https://api.upstox.com/v2"
         self.auth_manager = AuthManager(db_path=db_path)
+        self.chain_analytics = ChainAnalyticsEngine(db_path)
         logger.info(f"Initialized OptionsChainService with db={db_path}")
 
     def get_expiry_dates(self, instrument_key: str) -> List[str]:
@@ -376,7 +380,7 @@ class OptionsChainService:
 
             response = requests.get(url, headers=headers, params=params, timeout=5)
             if response.status_code == 200:
-                data = response.json().get("data", {})
+                data = parse_response(response).get("data", {})
                 return data
             else:
                 logger.error(
@@ -390,38 +394,17 @@ class OptionsChainService:
     def is_market_open(self) -> Tuple[bool, str]:
         """
         Check if Indian stock market is currently open
-        NSE: Mon-Fri 9:15 AM - 3:30 PM IST
+        Uses the shared session calendar (holidays, muhurat / special sessions)
         Returns: (is_open, message)
         """
-        now = datetime.now()
-        current_time = now.time()
-        weekday = now.weekday()  # 0 = Monday, 6 = Sunday
-
-        # Market closed on weekends
-        if weekday >= 5:  # Saturday or Sunday
-            logger.debug("Market closed: Weekend")
-            return False, "Market is closed on weekends"
-
-        # Market hours: 9:15 AM - 3:30 PM IST
-        market_open = dt_time(9, 15)
-        market_close = dt_time(15, 30)
-
-        if current_time < market_open:
-            logger.debug(f"Market closed: Before opening (current: {current_time})")
-            return (
-                False,
-                f"Market opens at 9:15 AM (current time: {current_time.strftime('%H:%M')})",
-            )
-
-        if current_time > market_close:
-            logger.debug(f"Market closed: After closing (current: {current_time})")
-            return (
-                False,
-                f"Market closed at 3:30 PM (current time: {current_time.strftime('%H:%M')})",
-            )
+        calendar = get_market_calendar(self.db_path)
+        if calendar.is_open():
+            logger.debug("Market is open")
+            return True, "Market is open"
 
-        logger.debug("Market is open")
-        return True, "Market is open"
+        message = f"Market is closed (next session {describe_next_open(calendar)})"
+        logger.debug(message)
+        return False, message
 
     def get_option_chain(self, symbol: str, expiry_date: Optional[str] = None) -> Dict:
         """
@@ -497,7 +480,7 @@ class OptionsChainService:
             )
 
             if response.status_code == 200:
-                data = response.json()
+                data = parse_response(response)
                 # Parse
                 return self._process_upstox_response(data, symbol, market_open)
 
@@ -575,6 +558,16 @@ class OptionsChainService:
             return self._mock_option_chain(symbol, expiry_date, market_open)
         """
 
+    def get_chain_analytics(self, symbol: str, expiry_date: Optional[str] = None) -> Optional[Dict]:
+        """
+        Latest poller analytics (PCR, max-pain, IV skew, OI buildup) for symbol.
+        Returns the row for expiry_date, else the nearest polled expiry, or None.
+        """
+        rows = self.chain_analytics.for_symbol(symbol)
+        if expiry_date:
+            rows = [r for r in rows if r["expiry_date"] == expiry_date] or rows
+        return rows[0] if rows else None
+
     def _get_instrument_key(self, symbol: str) -> str:
         """
         Convert symbol to Upstox instrument key by searching the database.
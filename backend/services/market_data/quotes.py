@@ -8,7 +8,7 @@ New v3 Endpoint:
 
 Features:
   - v3 API with improved performance
-  - Multi-level caching (memory + database)
+  - Multi-level caching (shared-memory quote board + memory + database)
   - Batch optimization
   - Rate limit handling
   - Quote staleness detection
@@ -38,6 +38,7 @@ from backend.utils.auth.manager import AuthManager
 from backend.utils.logging.error_handler import with_retry, RateLimitError
 from backend.data.database.database_pool import get_db_pool
 from backend.utils.auth.mixins import OptionalAuthHeadersMixin
+from backend.services.streaming.quote_board import get_quote_board
 import requests
 
 logger = logging.getLogger(__name__)
@@ -271,8 +272,25 @@ class MarketQuoteV3(OptionalAuthHeadersMixin):
             logger.error(f"❌ Batch fetch failed: {e}", exc_info=True)
             return {}
 
+    def _get_from_quote_board(self, instrument_key: str) -> Optional[Dict[str, Any]]:
+        """Live fields a feed process published to the shared-memory board"""
+        board = get_quote_board()
+        if board is None:
+            return None
+        quote = board.read(instrument_key, max_age=self.QUOTE_CACHE_TTL_SECONDS)
+        if quote is None:
+            return None
+        return {
+            "ltp": quote.ltp,
+            "volume": quote.volume,
+            "oi": quote.oi,
+            "bid_price": quote.bid,
+            "ask_price": quote.ask,
+        }
+
     def _get_from_memory_cache(self, instrument_key: str) -> Optional[Dict[str, Any]]:
-        """Get quote from memory cache"""
+        """Get quote from memory cache, then DB cache, with live fields from the shared board"""
+        cached = None
         if instrument_key in self._memory_cache:
             quote, cached_time = self._memory_cache[instrument_key]
 
@@ -280,13 +298,22 @@ class MarketQuoteV3(OptionalAuthHeadersMixin):
             age = (datetime.now() - cached_time).total_seconds()
             if age < self.QUOTE_CACHE_TTL_SECONDS:
                 logger.debug(f"Memory cache hit: {instrument_key} (age: {age:.1f}s)")
-                return quote
+                cached = quote
             else:
                 # Stale, remove
                 del self._memory_cache[instrument_key]
 
-        # Try database cache (longer TTL)
-        return self._get_from_db_cache(instrument_key)
+        if cached is None:
+            # Try database cache (longer TTL)
+            cached = self._get_from_db_cache(instrument_key)
+        if cached is None:
+            return None
+
+        # The board only carries prices; keep OHLC, depth and circuits from the full record
+        live = self._get_from_quote_board(instrument_key)
+        if live:
+            return {**cached, **live}
+        return cached
 
     def _get_from_db_cache(self, instrument_key: str) -> Optional[Dict[str, Any]]:
         """Get quote from database cache"""
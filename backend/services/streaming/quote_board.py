@@ -0,0 +1,289 @@
+"""
+Shared-Memory Quote Board
+-------------------------
+One copy of the live quotes for every process on the host (API workers,
+NiceGUI dashboard, pollers) instead of a dict per process.
+Features:
+- Fixed layout in a multiprocessing.shared_memory segment: a header, an
+  append-only directory of instrument keys and one 64-byte slot per
+  instrument holding (ltp, bid, ask, close, volume, oi, ts).
+- Single writer (the feed process that created the board), any number of
+  readers. Readers never lock: each slot carries a sequence number the
+  writer makes odd while it writes (seqlock), and a reader retries if the
+  number was odd or changed under it.
+- Reading a quote is a dict lookup plus two struct reads from shared memory;
+  no HTTP, SQL or IPC round trip.
+
+Usage:
+    # Feed process
+    board = QuoteBoard.create()
+    board.write("NSE_EQ|INE009A01021", ltp=1510.5, bid=1510.4, ask=1510.6, volume=120000)
+
+    # Any other process
+    board = get_quote_board()        # None until a feed has created the board
+    if board:
+        quote = board.read("NSE_EQ|INE009A01021", max_age=5)
+"""
+
+import logging
+import os
+import struct
+import sys
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+BOARD_NAME = os.getenv("QUOTE_BOARD_NAME", "upstox_quote_board")
+CAPACITY = int(os.getenv("QUOTE_BOARD_CAPACITY", "20000"))  # Instruments
+REATTACH_INTERVAL = 5.0   # Seconds between attach attempts while no board exists
+READ_RETRIES = 100        # Seqlock retries before a read gives up
+
+MAGIC = b"QBOARD01"
+HEADER = struct.Struct("<8sQQQd")   # magic, capacity, count, closed, created_at
+KEY_SIZE = 64                        # UTF-8 instrument key, NUL padded
+SLOT = struct.Struct("<QdddddQd")    # seq, ltp, bid, ask, close, volume, oi, ts (64 bytes)
+SEQ = struct.Struct("<Q")
+_COUNT_OFFSET = 16
+_CLOSED_OFFSET = 24
+
+# Guards the resource_tracker.register swap in QuoteBoard.attach (Python < 3.13)
+_register_lock = threading.Lock()
+
+
+class Quote(NamedTuple):
+    ltp: float
+    bid: float
+    ask: float
+    close: float      # Previous session close
+    volume: float
+    oi: int
+    ts: float         # Epoch seconds of the tick
+
+
+class QuoteBoard:
+    """Fixed-layout quote slots in shared memory, indexed by instrument key"""
+
+    def __init__(self, shm: shared_memory.SharedMemory, writer: bool):
+        self._shm = shm
+        self._buf = shm.buf
+        self._writer = writer
+        magic, self.capacity, _, _, self.created_at = HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Shared memory '{shm.name}' is not a quote board")
+        self._keys_offset = HEADER.size
+        self._slots_offset = self._keys_offset + self.capacity * KEY_SIZE
+        self._slots: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def size_for(capacity: int) -> int:
+        return HEADER.size + capacity * (KEY_SIZE + SLOT.size)
+
+    @classmethod
+    def create(cls, name: str = BOARD_NAME, capacity: int = CAPACITY) -> "QuoteBoard":
+        """Create the board as its only writer, replacing one a crashed feed left behind"""
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=cls.size_for(capacity))
+        except FileExistsError:
+            stale = shared_memory.SharedMemory(name=name)
+            stale.buf[_CLOSED_OFFSET:_CLOSED_OFFSET + 8] = SEQ.pack(1)  # Readers re-attach
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=name, create=True, size=cls.size_for(capacity))
+        HEADER.pack_into(shm.buf, 0, MAGIC, capacity, 0, 0, time.time())
+        logger.info(f"✅ Quote board '{name}' created ({capacity} slots, {cls.size_for(capacity) / 2**20:.1f} MB)")
+        return cls(shm, writer=True)
+
+    @classmethod
+    def attach(cls, name: str = BOARD_NAME) -> "QuoteBoard":
+        """Open an existing board read-only; FileNotFoundError if no feed created it"""
+        # Readers must not register the segment: the resource tracker would
+        # unlink it when they exit (bpo-39959)
+        if sys.version_info >= (3, 13):
+            return cls(shared_memory.SharedMemory(name=name, track=False), writer=False)
+        with _register_lock:
+            register = resource_tracker.register
+            resource_tracker.register = lambda name, rtype: None
+            try:
+                shm = shared_memory.SharedMemory(name=name)
+            finally:
+                resource_tracker.register = register
+        return cls(shm, writer=False)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def closed(self) -> bool:
+        """Set when the writer closed or replaced this board"""
+        return SEQ.unpack_from(self._buf, _CLOSED_OFFSET)[0] != 0
+
+    def __len__(self) -> int:
+        return SEQ.unpack_from(self._buf, _COUNT_OFFSET)[0]
+
+    # ------------------------------------------------------------------ directory
+
+    def _load_keys(self):
+        """Pick up keys the writer appended since the last look"""
+        with self._lock:
+            count = len(self)
+            for i in range(len(self._slots), count):
+                start = self._keys_offset + i * KEY_SIZE
+                key = bytes(self._buf[start:start + KEY_SIZE]).rstrip(b"\0").decode()
+                self._slots[key] = i
+
+    def slot_of(self, key: str) -> Optional[int]:
+        slot = self._slots.get(key)
+        if slot is None and len(self._slots) < len(self):
+            self._load_keys()
+            slot = self._slots.get(key)
+        return slot
+
+    def keys(self) -> List[str]:
+        self._load_keys()
+        return list(self._slots)
+
+    def _add_key(self, key: str) -> Optional[int]:
+        encoded = key.encode()
+        if len(encoded) > KEY_SIZE:
+            raise ValueError(f"Instrument key longer than {KEY_SIZE} bytes: {key}")
+        slot = len(self)
+        if slot >= self.capacity:
+            logger.warning(f"⚠️ Quote board full ({self.capacity}), dropping {key}")
+            return None
+        start = self._keys_offset + slot * KEY_SIZE
+        self._buf[start:start + len(encoded)] = encoded
+        # Publish the key only after it is written
+        SEQ.pack_into(self._buf, _COUNT_OFFSET, slot + 1)
+        self._slots[key] = slot
+        return slot
+
+    # ------------------------------------------------------------------ quotes
+
+    def write(self, key: str, ltp: float, bid: float = 0.0, ask: float = 0.0, close: float = 0.0,
+              volume: float = 0, oi: int = 0, ts: Optional[float] = None) -> bool:
+        """Publish one quote (writer only)"""
+        if not self._writer:
+            raise PermissionError("Quote board is attached read-only; only the feed process writes")
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._add_key(key)
+            if slot is None:
+                return False
+        offset = self._slots_offset + slot * SLOT.size
+        seq = SEQ.unpack_from(self._buf, offset)[0]
+        SEQ.pack_into(self._buf, offset, seq + 1)   # Odd: write in progress
+        SLOT.pack_into(
+            self._buf, offset, seq + 1,
+            float(ltp or 0), float(bid or 0), float(ask or 0), float(close or 0),
+            float(volume or 0), int(oi or 0), time.time() if ts is None else ts,
+        )
+        SEQ.pack_into(self._buf, offset, seq + 2)   # Even: consistent again
+        return True
+
+    def write_quote(self, key: str, quote: Dict) -> bool:
+        """Publish a feed tick or quote-API dict (ltp/last_price, bid_price, ask_price, close, volume, oi)"""
+        ltp = quote.get("ltp", quote.get("last_price"))
+        close = quote.get("close", quote.get("cp"))
+        if close is None and ltp and quote.get("net_change") is not None:
+            close = ltp - quote["net_change"]  # Quote API: ohlc.close may already be today's
+        return self.write(
+            key,
+            ltp=ltp,
+            bid=quote.get("bid_price"),
+            ask=quote.get("ask_price"),
+            close=close,
+            volume=quote.get("volume"),
+            oi=quote.get("oi"),
+        )
+
+    def read(self, key: str, max_age: Optional[float] = None) -> Optional[Quote]:
+        """Latest quote for an instrument, or None if unknown (or older than max_age seconds)"""
+        slot = self.slot_of(key)
+        if slot is None:
+            return None
+        offset = self._slots_offset + slot * SLOT.size
+        for _ in range(READ_RETRIES):
+            seq, *fields = SLOT.unpack_from(self._buf, offset)
+            if seq & 1 or SEQ.unpack_from(self._buf, offset)[0] != seq:
+                continue  # Writer is mid-update
+            if not seq:
+                return None
+            quote = Quote(*fields)
+            if max_age is not None and time.time() - quote.ts > max_age:
+                return None
+            return quote
+        logger.warning(f"⚠️ Quote board read of {key} kept colliding with the writer")
+        return None
+
+    def read_many(self, keys: Iterable[str], max_age: Optional[float] = None) -> Dict[str, Quote]:
+        quotes = {}
+        for key in keys:
+            quote = self.read(key, max_age)
+            if quote is not None:
+                quotes[key] = quote
+        return quotes
+
+    def snapshot(self, max_age: Optional[float] = None) -> Dict[str, Quote]:
+        return self.read_many(self.keys(), max_age)
+
+    def stats(self) -> Dict:
+        return {
+            "name": self.name,
+            "writer": self._writer,
+            "instruments": len(self),
+            "capacity": self.capacity,
+            "created_at": self.created_at,
+        }
+
+    def close(self):
+        """Detach; the writer also marks the board closed and removes the segment"""
+        if self._writer:
+            SEQ.pack_into(self._buf, _CLOSED_OFFSET, 1)
+        self._buf = None
+        self._shm.close()
+        if self._writer:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+_board: Optional[QuoteBoard] = None
+_board_checked_at = 0.0
+_board_lock = threading.Lock()
+
+
+def get_quote_board(name: str = BOARD_NAME) -> Optional[QuoteBoard]:
+    """Process-wide read-only board; None while no feed process has created one"""
+    global _board, _board_checked_at
+    board = _board
+    if board is not None and not board.closed:
+        return board
+    with _board_lock:
+        if _board is not None and _board.closed:
+            _board.close()
+            _board = None
+        if _board is None and time.time() - _board_checked_at >= REATTACH_INTERVAL:
+            _board_checked_at = time.time()
+            try:
+                _board = QuoteBoard.attach(name)
+                logger.info(f"📡 Attached to quote board '{name}' ({len(_board)} instruments)")
+            except (FileNotFoundError, ValueError):
+                _board = None
+        return _board
+
+
+def reset_quote_board():
+    """Detach from the shared board so the next get_quote_board() attaches again"""
+    global _board, _board_checked_at
+    with _board_lock:
+        if _board is not None:
+            _board.close()
+        _board = None
+        _board_checked_at = 0.0
@@ -0,0 +1,117 @@
+"""
+Quote Room Multiplexer
+----------------------
+Resolves every `quote_<symbol>` room of the Socket.IO server in one pass
+instead of one upstream call per room.
+Features:
+- Symbols resolve to instrument keys once and stay cached.
+- Live quotes come from the shared-memory quote board (quote_board.py) when
+  a v3 market-data feed publishes them: no HTTP at all for those rooms.
+- Everything else is fetched with get_batch_market_quotes (450 keys per
+  request) and mapped back to rooms via the quote's instrument_token.
+- Only quotes whose price changed since the last emit are returned.
+
+Usage:
+    mux = QuoteMultiplexer(get_upstox_api())
+    for symbol, quote in mux.poll(["NIFTY", "INFY"]).items():
+        socketio.emit("quote_update", {...}, room=f"quote_{symbol}")
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from backend.services.streaming.quote_board import Quote, get_quote_board
+
+logger = logging.getLogger(__name__)
+
+BOARD_MAX_AGE = 5         # Seconds; older board quotes fall back to REST
+BATCH_SIZE = 450          # Keys per get_batch_market_quotes request
+
+
+def board_quote(key: str, quote: Quote) -> Dict[str, Any]:
+    """A board slot in the REST quote shape the dashboard already reads"""
+    return {
+        "instrument_token": key,
+        "last_price": quote.ltp,
+        "ltp": quote.ltp,
+        "net_change": quote.ltp - quote.close if quote.close else 0.0,
+        "volume": quote.volume,
+        "oi": quote.oi,
+        "bid_price": quote.bid,
+        "ask_price": quote.ask,
+        "source": "feed",
+    }
+
+
+def _price_of(quote: Dict[str, Any]) -> Optional[float]:
+    return quote.get("last_price", quote.get("ltp"))
+
+
+class QuoteMultiplexer:
+    """Batched quote fetching and change detection for Socket.IO quote rooms"""
+
+    def __init__(self, api, board_max_age: float = BOARD_MAX_AGE):
+        self.api = api
+        self.board_max_age = board_max_age
+        self._keys: Dict[str, Optional[str]] = {}     # symbol -> instrument key (None: unknown)
+        self._last: Dict[str, Optional[float]] = {}   # symbol -> price last emitted
+        self.upstream_calls = 0
+
+    def resolve(self, symbols: Iterable[str]) -> Dict[str, str]:
+        """symbol -> instrument key for the symbols that have one"""
+        resolved = {}
+        for symbol in symbols:
+            if symbol not in self._keys:
+                self._keys[symbol] = self.api._get_instrument_key(symbol)
+                if not self._keys[symbol]:
+                    logger.warning(f"⚠️ No instrument key for quote room {symbol}")
+            if self._keys[symbol]:
+                resolved[symbol] = self._keys[symbol]
+        return resolved
+
+    def fetch(self, symbols: Iterable[str], fetch_missing: bool = True) -> Dict[str, Dict[str, Any]]:
+        """Current quote per symbol: board first, one batched REST lookup for the rest"""
+        keys = self.resolve(symbols)
+        quotes: Dict[str, Dict[str, Any]] = {}
+
+        board = get_quote_board()
+        if board is not None:
+            for symbol, key in keys.items():
+                quote = board.read(key, max_age=self.board_max_age)
+                if quote is not None:
+                    quotes[symbol] = board_quote(key, quote)
+
+        missing: Dict[str, List[str]] = {}
+        for symbol, key in keys.items():
+            if symbol not in quotes:
+                missing.setdefault(key, []).append(symbol)
+        if missing and fetch_missing:
+            self.upstream_calls += -(-len(missing) // BATCH_SIZE)
+            for response_key, quote in (self.api.get_batch_market_quotes(list(missing)) or {}).items():
+                if not quote:
+                    continue
+                # Responses are keyed 'NSE_EQ:SYMBOL'; instrument_token is the requested key
+                for symbol in missing.get(quote.get("instrument_token")) or missing.get(response_key) or []:
+                    quotes[symbol] = quote
+        return quotes
+
+    def poll(self, symbols: Iterable[str], fetch_missing: bool = True) -> Dict[str, Dict[str, Any]]:
+        """Quotes whose price changed since they were last returned"""
+        symbols = set(symbols)
+        for gone in set(self._last) - symbols:
+            self._last.pop(gone, None)
+
+        changed = {}
+        for symbol, quote in self.fetch(symbols, fetch_missing).items():
+            price = _price_of(quote)
+            if symbol not in self._last or self._last[symbol] != price:
+                self._last[symbol] = price
+                changed[symbol] = quote
+        return changed
+
+    def quote(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """One symbol's quote for a new subscriber (always returned, and marked as emitted)"""
+        quote = self.fetch([symbol]).get(symbol)
+        if quote:
+            self._last[symbol] = _price_of(quote)
+        return quote
@@ -29,6 +29,9 @@ Usage:
 
   # Live price display mode
   python scripts/websocket_quote_streamer.py --symbols NIFTY,INFY --live-display --duration 120
+
+  # Share quotes with other processes through the shared-memory quote board
+  python scripts/websocket_quote_streamer.py --symbols NIFTY,INFY --quote-board --duration 3600
 """
 
 import argparse
@@ -50,13 +53,14 @@ class WebsocketQuoteStreamer:
     Handles subscription, reconnection, and data persistence.
     """
 
-    def __init__(self, access_token: str, db_path: str = "market_data.db"):
+    def __init__(self, access_token: str, db_path: str = "market_data.db", quote_board=None):
         """
         Initialize websocket quote streamer.
 
         Args:
             access_token: Upstox API access token
             db_path: Path to SQLite database for storing ticks
+            quote_board: Optional shared-memory QuoteBoard to publish quotes to
         """
         self.access_token = access_token
         self.db_path = db_path
@@ -65,6 +69,7 @@ class WebsocketQuoteStreamer:
         self.subscribed_symbols = set()
         self.callbacks: Dict[str, List[Callable]] = {}
         self.current_quotes: Dict[str, Dict] = {}
+        self.quote_board = quote_board
         self.tick_count = 0
         self.start_time = None
         self.reconnect_attempts = 0
@@ -168,6 +173,8 @@ class WebsocketQuoteStreamer:
             if "ltp" in data:
                 symbol = data.get("symbol", "UNKNOWN")
                 self.current_quotes[symbol] = data
+                if self.quote_board is not None:
+                    self.quote_board.write_quote(data.get("instrument_key", symbol), data)
 
                 # Store in database
                 self._store_tick(data)
@@ -467,6 +474,10 @@ def main():
     parser.add_argument("--query-ticks", type=str, help="Query tick history for symbol")
     parser.add_argument("--limit", type=int, default=10, help="Limit for tick history")
     parser.add_argument("--token", type=str, help="Upstox access token")
+    parser.add_argument(
+        "--quote-board", action="store_true",
+        help="Publish quotes to the shared-memory quote board for other processes",
+    )
 
     args = parser.parse_args()
 
@@ -501,7 +512,12 @@ def main():
         print(f"❌ Authentication error: {e}")
         sys.exit(1)
 
-    streamer = WebsocketQuoteStreamer(token)
+    quote_board = None
+    if args.quote_board:
+        from backend.services.streaming.quote_board import QuoteBoard
+
+        quote_board = QuoteBoard.create()
+    streamer = WebsocketQuoteStreamer(token, quote_board=quote_board)
 
     if args.stats:
         # Show stats only (query database)
@@ -561,6 +577,8 @@ def main():
                     print("\n📴 Stopped")
 
             streamer.disconnect()
+            if quote_board is not None:
+                quote_board.close()
         else:
             print("❌ Failed to connect")
             sys.exit(1)
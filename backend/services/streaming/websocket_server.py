@@ -2,10 +2,16 @@
 """
 WebSocket Server for Real-time Market Data
 Provides live updates for option chains, market quotes, and positions
+
+Quote rooms are multiplexed (quote_multiplexer.py): every subscribed symbol
+is resolved in one pass per cycle, from the shared-memory quote board when a
+v3 feed publishes it and otherwise in get_batch_market_quotes batches, and a
+room only gets an emit when its price changed.
 """
 
 import os
 import sys
+import time
 from pathlib import Path
 from typing import Dict, Set
 from datetime import datetime
@@ -24,6 +30,10 @@ import logging
 
 from backend.services.upstox.live_api import get_upstox_api
 from backend.services.market_data.options_chain import OptionsChainService
+from backend.services.streaming.quote_board import get_quote_board
+from backend.services.streaming.quote_multiplexer import QuoteMultiplexer
+from backend.api.json_provider import install_json_provider
+from backend.utils.helpers.serialization import SocketIOJSON
 
 # Setup logger
 logging.basicConfig(
@@ -33,11 +43,12 @@ logger = logging.getLogger(__name__)
 
 # Flask app
 app = Flask(__name__)
+install_json_provider(app)
 app.config["SECRET_KEY"] = "upstox-trading-platform-secret"
 CORS(app, resources={r"/*": {"origins": "*"}})
 
-# Socket.IO server
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode="threading")
+# Socket.IO server (packets encoded with orjson: large option chains, NumPy values)
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode="threading", json=SocketIOJSON)
 
 # Track active subscriptions
 active_subscriptions: Dict[str, Set[str]] = {
@@ -50,6 +61,11 @@ active_subscriptions: Dict[str, Set[str]] = {
 upstox_api = get_upstox_api()
 # Options Service (for Option Chain)
 options_service = OptionsChainService()
+# All quote rooms resolved per cycle in one batch
+quote_mux = QuoteMultiplexer(upstox_api)
+
+UPDATE_INTERVAL = 5       # Seconds between REST refreshes (options, positions, quotes off the board)
+BOARD_INTERVAL = 1        # Seconds between quote-board passes while a live feed runs
 
 
 # Input validation functions
@@ -179,7 +195,7 @@ def handle_subscribe_quote(data):
     active_subscriptions["quotes"].add(request.sid)
 
     # Send initial quote
-    quote = upstox_api.get_market_quote(symbol)
+    quote = quote_mux.quote(symbol)
     if quote:
         emit(
             "quote_update",
@@ -208,17 +224,23 @@ def handle_subscribe_positions():
 
 def start_background_updates():
     """Background task to push updates to subscribed clients"""
+    last_refresh = 0.0
+    last_positions = None
     while True:
         try:
             # Get rooms safely
             rooms = socketio.server.manager.rooms.get("/") if socketio.server.manager.rooms else None
-            
+
             if not rooms:
-                socketio.sleep(5)
+                socketio.sleep(UPDATE_INTERVAL)
                 continue
-            
+
+            refresh = time.time() - last_refresh >= UPDATE_INTERVAL
+            if refresh:
+                last_refresh = time.time()
+
             # Update options for subscribed symbols
-            for room in rooms:
+            for room in list(rooms) if refresh else []:
                 if room and room.startswith("options_"):
                     symbol = room.replace("options_", "")
                     # Fetch using OptionsChainService
@@ -235,38 +257,36 @@ def start_background_updates():
                             room=room,
                         )
 
-            # Update quotes
-            for room in rooms:
-                if room and room.startswith("quote_"):
-                    symbol = room.replace("quote_", "")
-                    quote = upstox_api.get_market_quote(symbol)
-
-                    if quote:
-                        socketio.emit(
-                            "quote_update",
-                            {
-                                "symbol": symbol,
-                                "data": quote,
-                                "timestamp": datetime.now().isoformat(),
-                            },
-                            room=room,
-                        )
+            # Update quotes: one pass over every quote room, emits only on price change
+            symbols = [room[len("quote_"):] for room in list(rooms) if room and room.startswith("quote_")]
+            for symbol, quote in quote_mux.poll(symbols, fetch_missing=refresh).items():
+                socketio.emit(
+                    "quote_update",
+                    {
+                        "symbol": symbol,
+                        "data": quote,
+                        "timestamp": datetime.now().isoformat(),
+                    },
+                    room=f"quote_{symbol}",
+                )
 
             # Update positions
-            if "positions" in rooms:
+            if refresh and "positions" in rooms:
                 positions = upstox_api.get_positions()
-                socketio.emit(
-                    "positions_update",
-                    {"data": positions, "timestamp": datetime.now().isoformat()},
-                    room="positions",
-                )
+                if positions != last_positions:
+                    last_positions = positions
+                    socketio.emit(
+                        "positions_update",
+                        {"data": positions, "timestamp": datetime.now().isoformat()},
+                        room="positions",
+                    )
 
-            # Wait 5 seconds before next update
-            socketio.sleep(5)
+            # Board passes are memory reads; REST work stays on UPDATE_INTERVAL
+            socketio.sleep(BOARD_INTERVAL if get_quote_board() is not None else UPDATE_INTERVAL)
 
         except Exception as e:
             logger.error(f"Error in background updates: {e}", exc_info=True)
-            socketio.sleep(5)
+            socketio.sleep(UPDATE_INTERVAL)
 
 
 if __name__ == "__main__":
@@ -42,6 +42,7 @@ from backend.utils.auth.manager import AuthManager
 from backend.utils.logging.error_handler import with_retry, UpstoxAPIError
 from backend.data.database.database_pool import get_db_pool
 from backend.utils.auth.mixins import AuthHeadersMixin
+from backend.services.streaming.quote_board import QuoteBoard
 import requests
 
 logger = logging.getLogger(__name__)
@@ -55,17 +56,19 @@ class WebSocketV3Streamer(AuthHeadersMixin):
     BASE_URL = "https://api.upstox.com"
     AUTHORIZE_V3 = "/v3/feed/market-data-feed/authorize"
 
-    def __init__(self, db_path: str = "market_data.db"):
+    def __init__(self, db_path: str = "market_data.db", quote_board: Optional[QuoteBoard] = None):
         """
         Initialize WebSocket V3 Streamer.
 
         Args:
             db_path: Path to SQLite database
+            quote_board: Shared-memory board this feed publishes ticks to (QuoteBoard.create())
         """
         self.auth_manager = AuthManager()
         self.db_path = db_path
         self.db_pool = get_db_pool(db_path)
         self.session = requests.Session()
+        self.quote_board = quote_board
 
         # WebSocket state
         self.ws = None
@@ -401,6 +404,8 @@ class WebSocketV3Streamer(AuthHeadersMixin):
             feeds = data.get("feeds", {})
 
             for instrument_key, tick in feeds.items():
+                if self.quote_board is not None:
+                    self.quote_board.write_quote(instrument_key, tick)
                 self._save_tick(instrument_key, tick)
 
         except Exception as e:
@@ -0,0 +1,159 @@
+"""
+Composite Upstream Requests
+Fan out independent Upstox calls in parallel over one pooled keep-alive
+session, with per-call timeouts and partial results.
+
+A composite returns as soon as every *required* call has finished; optional
+calls that are still in flight at that point are reported as timed out
+instead of holding the response hostage. Endpoint latency therefore tracks
+the slowest required upstream call rather than the sum of all of them.
+
+Usage:
+    result = fetch_composite([
+        UpstreamCall("profile", f"{UPSTOX_API_BASE}/user/profile"),
+        UpstreamCall("funds", f"{UPSTOX_API_BASE}/user/get-funds-and-margin", required=False),
+    ], headers=headers)
+    if result.ok("profile"):
+        profile = result.json("profile")
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+UPSTOX_API_BASE = os.getenv("UPSTOX_API_BASE", "https://api.upstox.com/v2")
+
+UPSTREAM_POOL_SIZE = 32       # Keep-alive connections per host
+UPSTREAM_MAX_WORKERS = 16     # Concurrent upstream calls across all requests
+DEFAULT_CALL_TIMEOUT = 10     # Seconds, per call
+
+
+@dataclass
+class UpstreamCall:
+    """One upstream GET in a composite request"""
+
+    name: str
+    url: str
+    params: Optional[Dict[str, Any]] = None
+    timeout: float = DEFAULT_CALL_TIMEOUT
+    required: bool = True
+
+
+@dataclass
+class CompositeResult:
+    """Per-call responses/errors plus timing; missing pieces are never raised"""
+
+    responses: Dict[str, requests.Response] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    latencies: Dict[str, float] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    def ok(self, name: str) -> bool:
+        response = self.responses.get(name)
+        return response is not None and response.status_code == 200
+
+    def json(self, name: str, default: Any = None) -> Any:
+        """Decoded body of a successful call, else ``default``"""
+        if not self.ok(name):
+            return default
+        try:
+            return self.responses[name].json()
+        except ValueError:
+            return default
+
+    @property
+    def complete(self) -> bool:
+        return not self.errors
+
+
+# Shared session / pool (one per process)
+_session: Optional[requests.Session] = None
+_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def get_upstream_session() -> requests.Session:
+    """Process-wide pooled session for Upstox REST calls"""
+    global _session
+    with _lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=UPSTREAM_POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+    return _session
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=UPSTREAM_MAX_WORKERS, thread_name_prefix="upstream"
+            )
+    return _executor
+
+
+def fetch_composite(
+    calls: List[UpstreamCall],
+    headers: Optional[Dict[str, str]] = None,
+    session: Optional[requests.Session] = None,
+) -> CompositeResult:
+    """
+    Issue ``calls`` concurrently and wait for the required ones.
+    Errors and timeouts land in ``result.errors``; nothing is raised.
+    """
+    session = session or get_upstream_session()
+    executor = _get_executor()
+    result = CompositeResult()
+    started = time.monotonic()
+
+    required_calls = [call for call in calls if call.required] or list(calls)
+    deadline = max((call.timeout for call in required_calls), default=0)
+    deadline_at = started + deadline
+
+    def _run(call: UpstreamCall) -> requests.Response:
+        # A running future cannot be cancelled, so each call bounds itself by
+        # the time left on the composite (queued calls may start late).
+        remaining = deadline_at - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError("composite deadline passed before the call started")
+        t0 = time.monotonic()
+        try:
+            return session.get(call.url, headers=headers, params=call.params,
+                               timeout=min(call.timeout, remaining))
+        finally:
+            result.latencies[call.name] = time.monotonic() - t0
+
+    futures = {executor.submit(_run, call): call for call in calls}
+    required = [f for f, call in futures.items() if call.required] or list(futures)
+
+    # requests' timeout bounds each socket wait, not the whole call; the
+    # deadline keeps a trickling upstream from stalling the composite.
+    wait(required, timeout=deadline + 1)
+
+    for future, call in futures.items():
+        if not future.done():
+            result.errors[call.name] = "timeout"
+            continue
+        try:
+            result.responses[call.name] = future.result()
+        except Exception as e:
+            result.errors[call.name] = str(e)
+
+    result.elapsed = time.monotonic() - started
+    if result.errors:
+        logger.warning(f"⚠️  Composite partial result ({result.elapsed:.2f}s): {result.errors}")
+    else:
+        logger.debug(f"Composite complete in {result.elapsed:.2f}s: {result.latencies}")
+    return result
@@ -16,6 +16,7 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent.parent))
 
 from backend.utils.auth.manager import AuthManager
 from backend.utils.logging.error_handler import with_retry
+from backend.utils.helpers.serialization import parse_response
 
 # Setup logger
 logging.basicConfig(
@@ -229,7 +230,7 @@ class UpstoxLiveAPI:
                     )
 
                     if response.status_code == 200:
-                        data = response.json().get("data", {})
+                        data = parse_response(response).get("data", {})
                         results.update(data)
                     else:
                         logger.error(
@@ -7,6 +7,7 @@ Handles token generation, refresh, encryption, and storage
 import os
 import time
 import sqlite3
+import threading
 import requests
 from typing import Optional, Dict, Tuple
 from datetime import datetime, timedelta
@@ -14,6 +15,8 @@ from cryptography.fernet import Fernet
 from dotenv import load_dotenv
 import logging
 
+from backend.data.database.migration_runner import ensure_schema
+
 # Load environment variables
 load_dotenv()
 
@@ -70,13 +73,15 @@ class AuthManager:
             encryption_key = Fernet.generate_key().decode()
 
         self.cipher = Fernet(encryption_key.encode())
-        self._init_database()
+        self._refresh_lock = threading.Lock()  # Shared instances refresh once
+        ensure_schema(self.db_path, "auth_tokens", self._init_database)
 
         logger.info("✅ AuthManager initialized")
 
-    def _init_database(self):
+    @staticmethod
+    def _init_database(db_path: str):
         """Create auth_tokens table if not exists"""
-        conn = sqlite3.connect(self.db_path)
+        conn = sqlite3.connect(db_path)
         cursor = conn.cursor()
 
         cursor.execute(
@@ -263,8 +268,23 @@ class AuthManager:
 
         # Check if expired (with 5-minute buffer)
         if current_time >= (expires_at - 300):
-            logger.info("🔄 Token expired, refreshing...")
-            return self._refresh_token(user_id, refresh_token_encrypted)
+            with self._refresh_lock:
+                # Another thread may have refreshed while we waited
+                conn = sqlite3.connect(self.db_path)
+                row = conn.execute(
+                    """
+                    SELECT access_token, refresh_token, expires_at FROM auth_tokens
+                    WHERE user_id = ? AND is_active = 1
+                    ORDER BY updated_at DESC LIMIT 1
+                """,
+                    (user_id,),
+                ).fetchone()
+                conn.close()
+                if row:
+                    access_token_encrypted, refresh_token_encrypted, expires_at = row
+                if time.time() >= (expires_at - 300):
+                    logger.info("🔄 Token expired, refreshing...")
+                    return self._refresh_token(user_id, refresh_token_encrypted)
 
         # Decrypt and return
         access_token = self.cipher.decrypt(access_token_encrypted.encode()).decode()
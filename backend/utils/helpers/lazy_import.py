@@ -0,0 +1,76 @@
+"""
+Lazy Imports for Heavy Optional Libraries
+pandas, numpy, vectorbt, openai and friends cost hundreds of milliseconds
+to import. Modules that only need them inside function bodies bind a proxy
+instead; the real import happens on first attribute access.
+
+Pair with ``from __future__ import annotations`` so ``-> pd.DataFrame``
+hints don't trigger the import at definition time.
+
+Usage:
+    from backend.utils.helpers.lazy_import import lazy_import, is_available
+
+    pd = lazy_import("pandas")
+    vbt = lazy_import("vectorbt")
+    VECTORBT_AVAILABLE = is_available("vectorbt")   # no import
+
+    df = pd.DataFrame(rows)                          # pandas imported here
+"""
+
+import sys
+import types
+import importlib
+import importlib.util
+import threading
+from functools import lru_cache
+
+_load_lock = threading.RLock()
+
+
+class LazyModule(types.ModuleType):
+    """Module proxy that imports ``name`` on first attribute access"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with _load_lock:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr: str):
+        try:
+            module = self._load()
+        except ImportError:
+            if attr.startswith("_"):
+                # Introspection (mock, inspect, copy) probing a missing optional module
+                raise AttributeError(attr) from None
+            raise
+        return getattr(module, attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__["_lazy_module"] is not None else "not loaded"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """The module itself if already imported, else a LazyModule proxy"""
+    return sys.modules.get(name) or LazyModule(name)
+
+
+@lru_cache(maxsize=None)
+def is_available(name: str) -> bool:
+    """True if ``name`` is installed (resolved without importing it)"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
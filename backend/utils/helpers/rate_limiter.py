@@ -0,0 +1,56 @@
+"""Thread-safe token-bucket rate limiter shared by concurrent fetchers"""
+
+from __future__ import annotations
+
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Token bucket that lets ``burst`` requests through immediately and then
+    refills at ``rate`` requests per second.
+
+    One instance is meant to be shared by every worker thread talking to the
+    same upstream, so the combined request rate stays polite no matter how
+    many workers run.
+
+    Usage:
+        limiter = RateLimiter(rate=2.0)
+        with limiter:
+            session.get(url)
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self) -> float:
+        """Block until a request may proceed; returns seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def __enter__(self) -> "RateLimiter":
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
@@ -0,0 +1,151 @@
+"""
+Fast JSON Serialization
+Single entry point for JSON in hot paths: Flask responses, Socket.IO packets
+and Upstox response parsing. Uses orjson when installed (several times faster
+than the stdlib on option chains and quote batches) and the stdlib otherwise,
+with the same output types either way.
+
+NumPy arrays and scalars, datetimes/dates (ISO 8601), UUIDs, sets, pandas
+objects and dataclasses serialize natively, so callers no longer need
+``default=str``. Decimal becomes a string, as Flask's default provider did,
+so prices keep their exact digits. NaN/Infinity become null (valid JSON)
+under both backends.
+
+Usage:
+    from backend.utils.helpers.serialization import dumps, dumps_bytes, loads, parse_response
+
+    body = dumps_bytes({"ts": datetime.now(), "iv": np.float64(14.2)})
+    data = parse_response(requests.get(url))        # requests.Response -> dict
+    data = loads(await aiohttp_response.read())     # aiohttp
+"""
+
+import dataclasses
+import datetime as dt
+import enum
+import json
+import math
+from decimal import Decimal
+from pathlib import PurePath
+from typing import Any, Callable, Optional
+from uuid import UUID
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+HAS_ORJSON = orjson is not None
+BACKEND = "orjson" if HAS_ORJSON else "json"
+
+if HAS_ORJSON:
+    _BASE_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any) -> Any:
+    """Types neither backend encodes on its own"""
+    module = type(obj).__module__
+    if module == "numpy":
+        return obj.tolist() if hasattr(obj, "tolist") else obj.item()
+    if module.startswith("pandas"):
+        if hasattr(obj, "isoformat"):
+            return None if obj != obj else obj.isoformat()   # NaT != NaT
+        if hasattr(obj, "to_dict") and hasattr(obj, "columns"):
+            return obj.to_dict("records")
+        if hasattr(obj, "tolist"):
+            return obj.tolist()
+    if isinstance(obj, (dt.datetime, dt.date, dt.time)):
+        return obj.isoformat()
+    if isinstance(obj, (Decimal, UUID)):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, enum.Enum):
+        return obj.value
+    if isinstance(obj, PurePath):
+        return str(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, "__html__"):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _finite(obj: Any) -> Any:
+    """NaN/Infinity -> None throughout containers (stdlib backend; orjson does this itself)"""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(value) for value in obj]
+    return obj
+
+
+def _chain(default: Optional[Callable[[Any], Any]]) -> Callable[[Any], Any]:
+    """_default first, then the caller's fallback for anything else"""
+    if default is None:
+        return _default
+
+    def fallback(obj):
+        try:
+            return _default(obj)
+        except TypeError:
+            return default(obj)
+
+    return fallback
+
+
+def dumps_bytes(obj: Any, *, sort_keys: bool = False, indent: bool = False,
+                default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """Serialize to UTF-8 JSON bytes (compact unless indent)"""
+    if HAS_ORJSON:
+        option = _BASE_OPTIONS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_chain(default), option=option)
+    return dumps(obj, sort_keys=sort_keys, indent=indent, default=default).encode()
+
+
+def dumps(obj: Any, *, sort_keys: bool = False, indent: bool = False,
+          default: Optional[Callable[[Any], Any]] = None) -> str:
+    """Serialize to a JSON string (compact unless indent)"""
+    if HAS_ORJSON:
+        return dumps_bytes(obj, sort_keys=sort_keys, indent=indent, default=default).decode()
+    fallback = _chain(default)
+    return json.dumps(
+        _finite(obj),
+        default=lambda o: _finite(fallback(o)),
+        sort_keys=sort_keys,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=2 if indent else None,
+        separators=None if indent else (",", ":"),
+    )
+
+
+def loads(data: Any) -> Any:
+    """Parse JSON from str, bytes, bytearray or memoryview"""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    if isinstance(data, memoryview):
+        data = bytes(data)
+    return json.loads(data)
+
+
+def parse_response(response) -> Any:
+    """Body of a requests.Response parsed from raw bytes (skips requests' charset sniffing)"""
+    return loads(response.content)
+
+
+class SocketIOJSON:
+    """json-module stand-in for python-socketio / Flask-SocketIO (``SocketIO(app, json=SocketIOJSON)``)"""
+
+    @staticmethod
+    def dumps(obj: Any, *args, **kwargs) -> str:
+        return dumps(obj)
+
+    @staticmethod
+    def loads(data: Any, *args, **kwargs) -> Any:
+        return loads(data)
@@ -0,0 +1,261 @@
+"""
+Batched SQLite Writer for Logs, Errors and the API Cache
+Moves log/error/cache INSERTs off the calling thread and out of
+market_data.db: callers enqueue (sql, params) and a background thread
+commits them in batches to a separate logs database, so logging never
+competes with market-data writes for the same WAL lock.
+
+Also provides LogSampler, which lets a burst of identical records through
+and then counts (instead of writing) repeats until the window rolls over.
+
+Usage:
+    from backend.utils.logging.batch_writer import get_batch_writer
+
+    writer = get_batch_writer()                      # LOGS_DB_PATH
+    writer.submit("INSERT INTO error_logs (...) VALUES (?, ?)", (a, b))
+    writer.flush()                                   # block until written
+"""
+
+import os
+import time
+import queue
+import atexit
+import sqlite3
+import logging
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Hashable, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+LOGS_DB_PATH = os.getenv("LOGS_DATABASE_PATH", "logs/app_logs.db")
+
+WRITER_BATCH_SIZE = 500            # Rows per transaction
+WRITER_FLUSH_INTERVAL = 0.5        # Seconds a partial batch may wait
+WRITER_MAX_QUEUE = 50000           # Beyond this records are dropped, never blocked on
+
+SAMPLER_BURST = 20                 # Identical records written per window
+SAMPLER_WINDOW_SECONDS = 60
+
+
+def utc_timestamp(epoch: Optional[float] = None) -> str:
+    """Event time in SQLite CURRENT_TIMESTAMP format (rows are written later)"""
+    moment = datetime.fromtimestamp(epoch if epoch is not None else time.time(), tz=timezone.utc)
+    return moment.strftime("%Y-%m-%d %H:%M:%S")
+
+
+class SQLiteBatchWriter:
+    """Single background thread draining a queue of statements into one DB"""
+
+    def __init__(
+        self,
+        db_path: str = LOGS_DB_PATH,
+        batch_size: int = WRITER_BATCH_SIZE,
+        flush_interval: float = WRITER_FLUSH_INTERVAL,
+        max_queue: int = WRITER_MAX_QUEUE,
+    ):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue: "queue.Queue" = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+
+    def execute(self, statements: Sequence[str]):
+        """Run DDL synchronously (table setup at construction time)"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            for statement in statements:
+                conn.execute(statement)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _ensure_started(self):
+        # A forked worker inherits the queue but not the thread: start over
+        if self._pid == os.getpid() and self._thread is not None:
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None:
+                return
+            self._queue = queue.Queue(maxsize=self.max_queue)
+            self._pid = os.getpid()
+            self._stopping = False
+            self._thread = threading.Thread(
+                target=self._run, name=f"sqlite-writer:{Path(self.db_path).name}", daemon=True
+            )
+            self._thread.start()
+
+    def submit(self, sql: str, params: Tuple) -> bool:
+        """Enqueue one statement; returns False if it was dropped"""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((sql, params))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Block until everything submitted so far is committed"""
+        if self._thread is None or self._pid != os.getpid():
+            return True
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self):
+        """Flush and stop the writer thread"""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self.flush()
+        self._stopping = True
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+        self._thread = None
+
+    def _run(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        pending = []
+        waiters = []
+
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = False  # interval elapsed: write what we have
+
+            stop = item is None
+            if isinstance(item, threading.Event):
+                waiters.append(item)
+            elif item:
+                pending.append(item)
+
+            # Drain whatever else is ready without waiting
+            while not stop and len(pending) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    pending.append(item)
+
+            if pending:
+                self._write_batch(conn, pending)
+                pending = []
+            for waiter in waiters:
+                waiter.set()
+            waiters = []
+
+            if stop:
+                break
+
+        conn.close()
+
+    def _write_batch(self, conn: sqlite3.Connection, batch):
+        # Group consecutive statements so each runs as one executemany
+        try:
+            with conn:
+                start = 0
+                for i in range(1, len(batch) + 1):
+                    if i == len(batch) or batch[i][0] != batch[start][0]:
+                        conn.executemany(batch[start][0], [params for _, params in batch[start:i]])
+                        start = i
+            self.written += len(batch)
+            self.batches += 1
+        except Exception as e:
+            # Never let logging take the process down. DatabaseLogHandler skips
+            # this module's records, so the report cannot loop back into the queue.
+            self.dropped += len(batch)
+            logger.error(f"❌ Log writer failed to write {len(batch)} rows to {self.db_path}: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "written": self.written,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+        }
+
+
+class LogSampler:
+    """
+    Per-key rate limiter for repetitive records: the first ``burst`` records
+    of a key in each window pass, the rest are counted. The first record of
+    the next window carries the suppressed count.
+    """
+
+    def __init__(self, burst: int = SAMPLER_BURST, window: float = SAMPLER_WINDOW_SECONDS):
+        self.burst = burst
+        self.window = window
+        self._windows: Dict[Hashable, list] = {}  # key -> [window_start, seen, suppressed]
+        self._lock = threading.Lock()
+
+    def allow(self, key: Hashable, now: Optional[float] = None) -> Tuple[bool, int]:
+        """Returns (write this record?, repeats suppressed since the last one written)"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            state = self._windows.get(key)
+            if state is None or now - state[0] >= self.window:
+                suppressed = state[2] if state else 0
+                self._windows[key] = [now, 1, 0]
+                if len(self._windows) > 10000:
+                    self._prune(now)
+                return True, suppressed
+            state[1] += 1
+            if state[1] <= self.burst:
+                return True, 0
+            state[2] += 1
+            return False, state[2]
+
+    def _prune(self, now: float):
+        expired = [k for k, s in self._windows.items() if now - s[0] >= self.window and not s[2]]
+        for key in expired:
+            del self._windows[key]
+
+
+# Singleton instances (one writer per database file)
+_writers: Dict[str, SQLiteBatchWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_batch_writer(db_path: str = LOGS_DB_PATH) -> SQLiteBatchWriter:
+    """Process-wide writer for ``db_path``"""
+    key = os.path.abspath(db_path) if db_path != ":memory:" else db_path
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = SQLiteBatchWriter(db_path)
+            _writers[key] = writer
+    return writer
+
+
+@atexit.register
+def _close_writers():
+    for writer in list(_writers.values()):
+        try:
+            writer.close()
+        except Exception:
+            pass
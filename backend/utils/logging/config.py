@@ -15,6 +15,8 @@ from typing import Dict, Any, Optional
 from datetime import datetime
 from pathlib import Path
 
+from backend.utils.logging.batch_writer import LOGS_DB_PATH, LogSampler, get_batch_writer, utc_timestamp
+
 
 class SystemMetrics:
     """System resource metrics"""
@@ -61,71 +63,73 @@ class SystemMetrics:
 
 
 class DatabaseLogHandler(logging.Handler):
-    """Custom log handler that writes to database"""
+    """
+    Log handler that writes to the logs database.
+
+    emit() only formats the record and enqueues it; a shared background
+    writer commits records in batches. Repetitive records (same call site
+    and level) are sampled: after a burst, repeats are counted and the
+    count is stored in ``extra_data`` of the next record written.
+    """
+
+    # The batch writer's own failure reports would be queued on the failing writer
+    SKIP_LOGGERS = {"backend.utils.logging.batch_writer"}
 
-    def __init__(self, db_path: str = "market_data.db"):
+    INSERT_SQL = """
+        INSERT INTO application_logs
+        (timestamp, level, logger_name, message, module, function, line_number, exception, extra_data)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+
+    def __init__(self, db_path: str = LOGS_DB_PATH, sampler: Optional[LogSampler] = None):
         super().__init__()
         self.db_path = db_path
+        self.writer = get_batch_writer(db_path)
+        self.sampler = sampler or LogSampler()
         self._init_log_table()
 
     def _init_log_table(self):
         """Initialize log table in database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS application_logs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                level TEXT NOT NULL,
-                logger_name TEXT,
-                message TEXT,
-                module TEXT,
-                function TEXT,
-                line_number INTEGER,
-                exception TEXT,
-                extra_data TEXT
-            )
-        """
-        )
-
-        # Create index for faster queries
-        cursor.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_logs_timestamp
-            ON application_logs(timestamp)
-        """
-        )
-
-        cursor.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_logs_level
-            ON application_logs(level)
-        """
+        self.writer.execute(
+            [
+                """
+                CREATE TABLE IF NOT EXISTS application_logs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    level TEXT NOT NULL,
+                    logger_name TEXT,
+                    message TEXT,
+                    module TEXT,
+                    function TEXT,
+                    line_number INTEGER,
+                    exception TEXT,
+                    extra_data TEXT
+                )
+                """,
+                # Create index for faster queries
+                "CREATE INDEX IF NOT EXISTS idx_logs_timestamp ON application_logs(timestamp)",
+                "CREATE INDEX IF NOT EXISTS idx_logs_level ON application_logs(level)",
+            ]
         )
 
-        conn.commit()
-        conn.close()
-
     def emit(self, record: logging.LogRecord):
-        """Emit a log record to database"""
+        """Queue a log record for the batched database writer"""
+        if record.name in self.SKIP_LOGGERS:
+            return
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            allowed, suppressed = self.sampler.allow((record.pathname, record.lineno, record.levelno))
+            if not allowed:
+                return
 
-            # Extract exception info if present
+            # Tracebacks must be rendered now; the record is gone by write time
             exception_text = None
             if record.exc_info:
                 exception_text = self.format(record)
 
-            cursor.execute(
-                """
-                INSERT INTO application_logs
-                (level, logger_name, message, module, function, line_number, exception)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """,
+            self.writer.submit(
+                self.INSERT_SQL,
                 (
+                    utc_timestamp(record.created),
                     record.levelname,
                     record.name,
                     record.getMessage(),
@@ -133,15 +137,16 @@ class DatabaseLogHandler(logging.Handler):
                     record.funcName,
                     record.lineno,
                     exception_text,
+                    json.dumps({"suppressed": suppressed}) if suppressed else None,
                 ),
             )
 
-            conn.commit()
-            conn.close()
-
         except Exception:
             self.handleError(record)
 
+    def flush(self):
+        self.writer.flush()
+
 
 class LoggerConfig:
     """
@@ -159,7 +164,7 @@ class LoggerConfig:
         self,
         app_name: str = "upstox_trading",
         log_dir: str = "logs",
-        db_path: str = "market_data.db",
+        db_path: str = LOGS_DB_PATH,
         console_level: str = "INFO",
         file_level: str = "DEBUG",
         db_level: str = "WARNING",
@@ -219,11 +224,11 @@ class LoggerConfig:
         error_handler.setFormatter(file_formatter)
         logger.addHandler(error_handler)
 
-        # Database handler for warnings and above
-        db_handler = DatabaseLogHandler(self.db_path)
-        db_handler.setLevel(self.db_level)
-        db_handler.setFormatter(file_formatter)
-        logger.addHandler(db_handler)
+        # Database handler for warnings and above (batched, separate logs DB)
+        self.db_handler = DatabaseLogHandler(self.db_path)
+        self.db_handler.setLevel(self.db_level)
+        self.db_handler.setFormatter(file_formatter)
+        logger.addHandler(self.db_handler)
 
         return logger
 
@@ -296,6 +301,7 @@ class LoggerConfig:
 
     def get_recent_logs(self, level: Optional[str] = None, limit: int = 100) -> list:
         """Get recent logs from database"""
+        self.db_handler.flush()
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
 
@@ -325,6 +331,7 @@ class LoggerConfig:
 
     def get_log_statistics(self, hours: int = 24) -> Dict[str, Any]:
         """Get log statistics for the specified time period"""
+        self.db_handler.flush()
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
 
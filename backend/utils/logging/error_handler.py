@@ -7,6 +7,7 @@ Provides robust error handling with exponential backoff, rate limiting, and grac
 import time
 import logging
 import functools
+import threading
 from typing import Callable, Any, Optional, Dict, List
 from datetime import datetime, timedelta
 import sqlite3
@@ -23,12 +24,17 @@ from tenacity import (
 import requests
 from requests.exceptions import Timeout, ConnectionError, HTTPError, RequestException
 
+from backend.utils.logging.batch_writer import LOGS_DB_PATH, LogSampler, get_batch_writer, utc_timestamp
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
 logger = logging.getLogger(__name__)
 
+CACHE_TTL_HOURS = 24                  # api_cache rows older than this are pruned
+CACHE_PRUNE_INTERVAL_SECONDS = 600    # Prune periodically, not on every write
+
 
 class UpstoxAPIError(Exception):
     """Base exception for Upstox API errors"""
@@ -79,39 +85,64 @@ class ErrorHandler:
     - Network error recovery
     - Error logging and tracking
     - Graceful degradation with cached data
+
+    Error rows and cached responses live in the logs database and are
+    written by the shared batch writer, never on the caller's thread. The
+    writer (and the database file) is created on first use, not on import.
     """
 
-    def __init__(self, db_path: str = "market_data.db"):
+    def __init__(self, db_path: str = LOGS_DB_PATH):
         self.db_path = db_path
         self.error_cache: Dict[str, List[Dict]] = {}
         self.rate_limit_reset_time: Optional[datetime] = None
-        self._init_error_tracking_db()
-
-    def _init_error_tracking_db(self):
-        """Initialize database table for error tracking"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS error_logs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                error_type TEXT NOT NULL,
-                error_message TEXT,
-                status_code INTEGER,
-                endpoint TEXT,
-                retry_count INTEGER DEFAULT 0,
-                resolved BOOLEAN DEFAULT 0,
-                resolution_time DATETIME,
-                context TEXT
-            )
-        """
+        self.sampler = LogSampler()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._last_cache_prune = time.monotonic()
+
+    @property
+    def writer(self):
+        """Shared batch writer for db_path, with the tables created on first access"""
+        if self._writer is None:
+            with self._writer_lock:
+                if self._writer is None:
+                    writer = get_batch_writer(self.db_path)
+                    self._init_error_tracking_db(writer)
+                    self._writer = writer
+        return self._writer
+
+    def _init_error_tracking_db(self, writer):
+        """Initialize error tracking and response cache tables"""
+        writer.execute(
+            [
+                """
+                CREATE TABLE IF NOT EXISTS error_logs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    error_type TEXT NOT NULL,
+                    error_message TEXT,
+                    status_code INTEGER,
+                    endpoint TEXT,
+                    retry_count INTEGER DEFAULT 0,
+                    resolved BOOLEAN DEFAULT 0,
+                    resolution_time DATETIME,
+                    context TEXT
+                )
+                """,
+                "CREATE INDEX IF NOT EXISTS idx_error_logs_timestamp ON error_logs(timestamp)",
+                "CREATE INDEX IF NOT EXISTS idx_error_logs_type ON error_logs(error_type)",
+                """
+                CREATE TABLE IF NOT EXISTS api_cache (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    cache_key TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+                """,
+                "CREATE INDEX IF NOT EXISTS idx_api_cache_key ON api_cache(cache_key, timestamp)",
+            ]
         )
 
-        conn.commit()
-        conn.close()
-
     def log_error(
         self,
         error_type: str,
@@ -121,61 +152,62 @@ class ErrorHandler:
         retry_count: int = 0,
         context: Optional[Dict] = None,
     ):
-        """Log error to database for tracking and analysis"""
+        """
+        Log an error and queue it for the database (tracking and analysis).
+        Database rows for repeats of the same error type/endpoint/status are
+        sampled; the next row written records how many were suppressed.
+        """
+        logger.error(
+            f"{error_type}: {error_message} (Status: {status_code}, Endpoint: {endpoint})"
+        )
+
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            allowed, suppressed = self.sampler.allow((error_type, endpoint, status_code))
+            if not allowed:
+                return
 
-            cursor.execute(
+            if suppressed:
+                context = dict(context or {}, suppressed=suppressed)
+
+            self.writer.submit(
                 """
-                INSERT INTO error_logs 
-                (error_type, error_message, status_code, endpoint, retry_count, context)
-                VALUES (?, ?, ?, ?, ?, ?)
+                INSERT INTO error_logs
+                (timestamp, error_type, error_message, status_code, endpoint, retry_count, context)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
             """,
                 (
+                    utc_timestamp(),
                     error_type,
                     error_message,
                     status_code,
                     endpoint,
                     retry_count,
-                    json.dumps(context) if context else None,
+                    json.dumps(context, default=str) if context else None,
                 ),
             )
 
-            conn.commit()
-            conn.close()
-
-            logger.error(
-                f"{error_type}: {error_message} (Status: {status_code}, Endpoint: {endpoint})"
-            )
-
         except Exception as e:
             logger.error(f"Failed to log error to database: {str(e)}")
 
     def mark_error_resolved(self, error_id: int):
         """Mark an error as resolved in the database"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute(
+            self.writer.submit(
                 """
-                UPDATE error_logs 
+                UPDATE error_logs
                 SET resolved = 1, resolution_time = CURRENT_TIMESTAMP
                 WHERE id = ?
             """,
                 (error_id,),
             )
 
-            conn.commit()
-            conn.close()
-
         except Exception as e:
             logger.error(f"Failed to mark error as resolved: {str(e)}")
 
     def get_error_statistics(self, hours: int = 24) -> Dict[str, Any]:
         """Get error statistics for the specified time period"""
         try:
+            self.writer.flush()
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
 
@@ -342,6 +374,7 @@ class ErrorHandler:
         Returns None if no cached data is available.
         """
         try:
+            self.writer.flush()
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
 
@@ -372,40 +405,25 @@ class ErrorHandler:
     def cache_data(self, cache_key: str, data: Any):
         """Cache successful API responses for graceful degradation"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            # Create cache table if it doesn't exist
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS api_cache (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    cache_key TEXT NOT NULL,
-                    data TEXT NOT NULL,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            """
-            )
-
-            # Insert cached data
-            cursor.execute(
+            self.writer.submit(
                 """
-                INSERT INTO api_cache (cache_key, data)
-                VALUES (?, ?)
+                INSERT INTO api_cache (timestamp, cache_key, data)
+                VALUES (?, ?, ?)
             """,
-                (cache_key, json.dumps(data)),
+                (utc_timestamp(), cache_key, json.dumps(data)),
             )
 
-            # Clean old cache entries (older than 24 hours)
-            cursor.execute(
-                """
-                DELETE FROM api_cache
-                WHERE timestamp < datetime('now', '-24 hours')
-            """
-            )
-
-            conn.commit()
-            conn.close()
+            # Clean old cache entries periodically rather than per write
+            now = time.monotonic()
+            if now - self._last_cache_prune >= CACHE_PRUNE_INTERVAL_SECONDS:
+                self._last_cache_prune = now
+                self.writer.submit(
+                    f"""
+                    DELETE FROM api_cache
+                    WHERE timestamp < datetime('now', '-{CACHE_TTL_HOURS} hours')
+                """,
+                    (),
+                )
 
         except Exception as e:
             logger.error(f"Failed to cache data: {str(e)}")
@@ -421,6 +439,7 @@ class ErrorHandler:
             float: Errors per minute
         """
         try:
+            self.writer.flush()
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
 
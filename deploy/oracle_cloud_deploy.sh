@@ -95,6 +95,7 @@ echo "Step 6: Installing systemd services..."
 if [ -f "$APP_DIR/deploy/upstox-api.service" ]; then
     cp "$APP_DIR/deploy/upstox-api.service" /etc/systemd/system/
     cp "$APP_DIR/deploy/upstox-frontend.service" /etc/systemd/system/
+    cp "$APP_DIR/deploy/upstox-jobs.service" /etc/systemd/system/
     systemctl daemon-reload
     print_status "Systemd services installed"
 else
@@ -183,8 +184,10 @@ echo ""
 echo "Step 10: Starting services..."
 systemctl enable upstox-api
 systemctl enable upstox-frontend
+systemctl enable upstox-jobs
 systemctl start upstox-api
 systemctl start upstox-frontend
+systemctl start upstox-jobs
 sleep 5
 
 # Check service status
@@ -200,6 +203,12 @@ else
     print_error "Frontend service failed to start"
 fi
 
+if systemctl is-active --quiet upstox-jobs; then
+    print_status "Job worker service is running"
+else
+    print_error "Job worker service failed to start"
+fi
+
 # Step 11: Display summary
 echo ""
 echo "=========================================="
@@ -209,6 +218,7 @@ echo ""
 echo "📡 Services:"
 echo "   API Server:      systemctl status upstox-api"
 echo "   Frontend:        systemctl status upstox-frontend"
+echo "   Job workers:     systemctl status upstox-jobs"
 echo ""
 echo "🌐 Access:"
 echo "   Frontend:        http://$(hostname -I | awk '{print $1}')"
@@ -222,7 +232,7 @@ echo ""
 echo "🔧 Management:"
 echo "   Restart API:     systemctl restart upstox-api"
 echo "   Restart Frontend: systemctl restart upstox-frontend"
-echo "   Stop All:        systemctl stop upstox-api upstox-frontend"
+echo "   Stop All:        systemctl stop upstox-api upstox-frontend upstox-jobs"
 echo ""
 echo "⚠️  Next Steps:"
 echo "   1. Configure .env file with your Upstox credentials"
@@ -0,0 +1,78 @@
+"""
+Dashboard Page Registry
+Maps page ids to their modules, which are imported on first navigation
+instead of all at dashboard startup.
+
+Usage:
+    from frontend.pages import render_page, load_page
+    render_page("option_chain", state)
+    load_page("home").stats_widget.refresh(state)
+"""
+
+import importlib
+import threading
+from types import ModuleType
+from typing import Dict, Tuple
+
+# page id -> (module in frontend.pages, entry point, entry point takes state)
+PAGES: Dict[str, Tuple[str, str, bool]] = {
+    "dashboard": ("home", "render_page", True),
+    "ai_chat": ("ai_chat", "render_page", True),
+    "live_data": ("live_data", "render_page", True),
+    "downloads": ("downloads", "render_page", True),
+    "historical_options": ("historical_options", "historical_options_page", False),
+    "api_debugger": ("api_debugger", "api_debugger_page", False),
+    "positions": ("positions", "render_page", True),
+    "option_chain": ("option_chain", "render_page", True),
+    "option_greeks": ("option_greeks", "render_page", True),
+    "fno_analysis": ("fno", "render_page", True),
+    "market_guide": ("guide", "render_page", True),
+    "local_guide": ("guide_local", "create_page", False),
+    "health": ("health", "render_page", True),
+    "user_profile": ("user_profile", "render_page", True),
+    "orders_alerts": ("orders_alerts", "render_page", True),
+    "analytics": ("analytics", "render_page", True),
+    "backtest": ("backtest", "render_page", True),
+    "signals": ("signals", "render_page", True),
+    "strategies": ("strategies", "render_page", True),
+    "upstox_live": ("upstox_live", "render_page", True),
+    "live_trading": ("live_trading", "render_page", True),
+    "gtt_orders": ("gtt_orders", "render_page", True),
+    "trade_pnl": ("trade_pnl", "render_page", True),
+    "margins": ("margins", "render_page", True),
+    "market_calendar": ("market_calendar", "render_page", True),
+    "funds": ("funds", "render_page", True),
+    "order_book": ("order_book", "render_page", True),
+    "trade_book": ("trade_book", "render_page", True),
+    "portfolio_summary": ("portfolio_summary", "render_page", True),
+    "charges_calc": ("charges_calc", "render_page", True),
+    "instruments_browser": ("instruments_browser", "render_page", True),
+    "market_explorer": ("market_explorer", "render_page", True),
+    "corporate_announcements": ("corporate_announcements", "render_page", True),
+    "market_quote": ("Market_Quote", "render_page", True),
+}
+
+FALLBACK_MODULE = "wip"
+
+_import_lock = threading.Lock()
+
+
+def load_page(module_name: str) -> ModuleType:
+    """Import ``frontend.pages.<module_name>`` (cached by the import system after first use)"""
+    with _import_lock:
+        return importlib.import_module(f"{__name__}.{module_name}")
+
+
+def render_page(page_id: str, state) -> None:
+    """Render a registered page, or the work-in-progress placeholder"""
+    entry = PAGES.get(page_id)
+    if entry is None:
+        load_page(FALLBACK_MODULE).render_page(page_id)
+        return
+
+    module_name, func_name, takes_state = entry
+    render = getattr(load_page(module_name), func_name)
+    if takes_state:
+        render(state)
+    else:
+        render()
@@ -5,6 +5,7 @@ Run backtests and view historical backtest results
 
 from nicegui import ui, run
 from ..common import Components
+from ..state import async_post, cancel_job, watch_job
 import sys
 from pathlib import Path
 import asyncio
@@ -57,6 +58,12 @@ def render_run_backtest():
             label="Symbol (optional)", placeholder="e.g., NIFTY"
         ).classes("w-full mt-2")
 
+        # Replayed on stored expired option candles, one trade per expiry
+        with ui.row().classes("w-full gap-4 mt-2"):
+            entry_days = ui.number(label="Enter Days Before Expiry", value=3, min=0).classes("flex-1")
+            target_pct = ui.number(label="Profit Target (% of premium)", value=50, min=0).classes("flex-1")
+            stop_pct = ui.number(label="Stop Loss (% of premium)", value=100, min=0).classes("flex-1")
+
         results_container = ui.column().classes("w-full mt-4")
 
         async def load_strategies():
@@ -65,10 +72,11 @@ def render_run_backtest():
                     requests.get, f"{API_BASE}/backtest/strategies"
                 )
                 if response.status_code == 200:
-                    strategies = response.json()
-                    strategy_select.options = strategies.get("strategies", [])
-                    if strategy_select.options:
-                        strategy_select.value = strategy_select.options[0]
+                    strategies = response.json().get("strategies", [])
+                    strategy_select.options = {s["id"]: s["name"] for s in strategies}
+                    strategy_select.update()
+                    if strategies:
+                        strategy_select.value = strategies[0]["id"]
             except Exception as e:
                 ui.notify(f"Error loading strategies: {str(e)}", type="warning")
 
@@ -81,35 +89,49 @@ def render_run_backtest():
             with results_container:
                 ui.spinner("dots", size="lg").classes("mx-auto text-indigo-500")
 
-            try:
-                response = await run.io_bound(
-                    requests.post,
-                    f"{API_BASE}/backtest/run",
-                    json={
-                        "strategy": strategy_select.value,
-                        "start_date": start_date.value,
-                        "end_date": end_date.value,
-                        "symbol": symbol_input.value if symbol_input.value else None,
-                    },
-                )
-
-                results_container.clear()
+            res = await async_post(
+                "/api/backtest/run",
+                {
+                    "strategy": strategy_select.value,
+                    "start_date": start_date.value,
+                    "end_date": end_date.value,
+                    "symbol": symbol_input.value if symbol_input.value else None,
+                    "entry_days_before": int(entry_days.value or 0),
+                    "profit_target": target_pct.value / 100 if target_pct.value else None,
+                    "stop_loss": stop_pct.value / 100 if stop_pct.value else None,
+                },
+            )
+            results_container.clear()
+            if "error" in res:
+                with results_container:
+                    ui.label(f"Error: {res['error']}").classes("text-red-400")
+                return
 
-                if response.status_code == 200:
-                    results = response.json()
-                    with results_container:
-                        render_backtest_results(results)
+            # Runs as a background job: show progress until it finishes
+            job_id = res["job_id"]
+            with results_container:
+                with ui.row().classes("w-full items-center gap-4"):
+                    progress_bar = ui.linear_progress(value=0, show_value=False).classes("flex-1")
+                    ui.button(
+                        "Cancel", icon="stop", on_click=lambda: cancel_job(job_id)
+                    ).props("flat dense color=negative")
+                status = ui.label(f"Job #{job_id} queued").classes("text-xs text-slate-400")
+
+            def on_update(job):
+                progress_bar.value = job.get("progress", 0)
+                status.text = job.get("message") or job.get("status", "")
+
+            job = await watch_job(job_id, on_update)
+            results_container.clear()
+            with results_container:
+                if job.get("status") == "succeeded":
+                    render_backtest_results(job.get("result") or {})
+                elif job.get("status") == "cancelled":
+                    ui.label("Backtest cancelled").classes("text-amber-400")
                 else:
-                    with results_container:
-                        ui.label(
-                            f"Error: {response.json().get('error', 'Unknown error')}"
-                        ).classes("text-red-400")
-            except Exception as e:
-                results_container.clear()
-                with results_container:
-                    ui.label(f"Error running backtest: {str(e)}").classes(
-                        "text-red-400"
-                    )
+                    ui.label(
+                        f"Error running backtest: {job.get('error', 'Unknown error')}"
+                    ).classes("text-red-400")
 
         ui.button("Run Backtest", on_click=run_backtest, icon="play_arrow").props(
             "color=primary"
@@ -170,6 +192,12 @@ def render_backtest_results(results):
                 },
                 {"name": "price", "label": "Price", "field": "price", "align": "right"},
                 {"name": "pnl", "label": "P&L", "field": "pnl", "align": "right"},
+                {
+                    "name": "exit_reason",
+                    "label": "Exit",
+                    "field": "exit_reason",
+                    "align": "left",
+                },
             ]
             ui.table(columns=columns, rows=results["trades"], row_key="date")
 
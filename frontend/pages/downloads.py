@@ -1,7 +1,7 @@
 from nicegui import ui
 from datetime import datetime, timedelta
 from ..common import Components
-from ..state import async_post
+from ..state import async_post, cancel_job, download_feed, watch_job
 import asyncio
 
 
@@ -359,13 +359,46 @@ def render_page(state):
                 if "error" in res:
                     status_label.text = f"❌ Failed: {res['error']}"
                     status_label.classes("text-red-400")
-                else:
-                    status_label.text = f"✅ Success: {res.get('rows', 0)} rows fetched."
+                    return
+
+                # Runs as a background job: observe progress instead of blocking
+                job_id = res["job_id"]
+                status_label.text = f"⏳ Job #{job_id} queued..."
+                with result_area:
+                    with ui.card().classes("w-full bg-slate-900 border border-slate-700"):
+                        with ui.row().classes("justify-between items-center w-full"):
+                            ui.label(f"Download Job #{job_id}").classes("text-lg font-bold")
+                            ui.button(
+                                "Cancel", icon="stop",
+                                on_click=lambda: cancel_job(job_id),
+                            ).props("flat dense color=negative")
+                        progress_bar = ui.linear_progress(value=0, show_value=False).classes("w-full")
+                        symbol_log = ui.column().classes("w-full gap-1 max-h-48 overflow-auto")
+
+                def on_update(job):
+                    progress_bar.value = job.get("progress", 0)
+                    if job.get("message"):
+                        status_label.text = f"⏳ {job['message']}"
+                    with symbol_log:
+                        for item in job.get("partials", []):
+                            ui.label(f"{item['symbol']}: {item['rows']} rows").classes(
+                                "font-mono text-xs text-slate-400"
+                            )
+
+                job = await watch_job(job_id, on_update)
+                result = job.get("result") or {}
+                if job.get("status") == "succeeded":
+                    status_label.text = f"✅ Success: {result.get('rows', 0)} rows fetched."
                     status_label.classes("text-green-400")
-                    if download_local_switch.value and res.get("filepath"):
-                        ui.download(res["filepath"])
+                    if download_local_switch.value and result.get("filepath"):
+                        ui.download(result["filepath"])
                         ui.notify("File download started", type="positive")
-                    await refresh_dl_list()
+                elif job.get("status") == "cancelled":
+                    status_label.text = "🛑 Download cancelled"
+                    status_label.classes("text-amber-400")
+                else:
+                    status_label.text = f"❌ Failed: {job.get('error', 'unknown error')}"
+                    status_label.classes("text-red-400")
 
             # Dynamic Button Label
             btn = ui.button(
@@ -391,15 +424,23 @@ def render_page(state):
             )
             history_list = ui.column().classes("w-full gap-2")
 
-            async def refresh_dl_list():
-                hist = await state.fetch_download_history()
+            shown = None
+
+            def refresh_dl_list():
+                # Pushed by the download feed; redraw only when the visible rows change
+                nonlocal shown
+                files = download_feed.newest(8)
+                visible = [(f["filename"], f["size"]) for f in files]
+                if visible == shown:
+                    return
+                shown = visible
                 history_list.clear()
                 with history_list:
-                    if not hist.get("files"):
+                    if not files:
                         ui.label("No files found").classes(
                             "text-slate-500 italic text-xs"
                         )
-                    for f in hist["files"][:8]:
+                    for f in files:
                         with ui.row().classes(
                             "w-full justify-between items-center bg-slate-800/30 p-2 rounded hover:bg-slate-800/50 transition"
                         ):
@@ -412,4 +453,5 @@ def render_page(state):
                                 "text-[10px] text-slate-500"
                             )
 
-            ui.timer(1.0, refresh_dl_list)
+            unsubscribe = download_feed.subscribe(refresh_dl_list)
+            ui.context.client.on_disconnect(unsubscribe)
@@ -3,14 +3,62 @@ from ..common import Components
 import sys
 from pathlib import Path
 import asyncio
+import logging
 from datetime import datetime
 from ..services.websocket_service import get_websocket_service
+from ..services.option_chain_model import (
+    ATM_WINDOW, CALL_FIELDS, CELL_FIELDS, STYLE_FIELD, OptionChainGridModel, fmt, payload_size,
+)
 
 # Import Service
 sys.path.append(str(Path(__file__).parent.parent.parent))
 from backend.services.market_data.options_chain import OptionsChainService
 
 service = OptionsChainService()
+logger = logging.getLogger(__name__)
+
+# Grid Template:
+# 5 cols (Calls) + 1 col (Strike) + 5 cols (Puts) = 11 columns
+# Delta(50) IV(50) OI(60) Vol(60) LTP(70) | Strike(80) | LTP(70) Vol(60) OI(60) IV(50) Delta(50)
+GRID_COLUMNS = "minmax(50px, 1fr) minmax(50px, 1fr) minmax(60px, 1.2fr) minmax(60px, 1.2fr) minmax(70px, 1.5fr) " \
+               "90px " \
+               "minmax(70px, 1.5fr) minmax(60px, 1.2fr) minmax(60px, 1.2fr) minmax(50px, 1fr) minmax(50px, 1fr)"
+
+CELL_TEXT_CLASSES = {
+    "c_delta": "text-slate-500", "c_iv": "text-amber-200/70", "c_oi": "text-slate-300", "c_vol": "text-slate-400",
+    "p_delta": "text-slate-500", "p_iv": "text-amber-200/70", "p_oi": "text-slate-300", "p_vol": "text-slate-400",
+}
+
+
+def cell_classes(field: str, style) -> str:
+    """Tailwind classes for one grid cell given the row's (call_itm, put_itm, atm) flags"""
+    is_call_itm, is_put_itm, is_atm = style
+    base = "py-2 flex items-center justify-center"
+
+    if field == "strike":
+        # ATM gets specific glow
+        if is_atm:
+            return f"{base} font-bold tracking-wide bg-yellow-500/20 text-yellow-400 border-x-2 border-yellow-500/50"
+        return f"{base} font-bold tracking-wide bg-slate-800 text-slate-200"
+
+    # ITM gets subtle tint
+    is_call = field in CALL_FIELDS
+    if is_call:
+        bg = "bg-green-900/10" if is_call_itm else "bg-slate-900"
+    else:
+        bg = "bg-red-900/10" if is_put_itm else "bg-slate-900"
+    row_hover = "hover:brightness-110" if is_atm else "hover:bg-white/5"
+
+    if field == "c_ltp":
+        # LTP (Green if ITM)
+        color = "text-green-400 font-bold" if is_call_itm else "text-slate-200"
+    elif field == "p_ltp":
+        # LTP (Red if ITM)
+        color = "text-red-400 font-bold" if is_put_itm else "text-slate-200"
+    else:
+        color = CELL_TEXT_CLASSES[field]
+    return f"{base} {bg} {color} {row_hover}"
+
 
 class OptionChainPage:
     def __init__(self):
@@ -25,6 +73,7 @@ class OptionChainPage:
         self.spot_label = None
         self.timestamp_label = None
         self.status_badge = None
+        self.analytics_labels = {}
         self.sector_label = None
         self.index_badge = None
         self.nifty100_badge = None
@@ -43,6 +92,10 @@ class OptionChainPage:
         self.current_data = None
         self.is_connected = False
 
+        # Grid: per-strike model and keyed cell labels ({strike: {field: label}})
+        self.grid_model = OptionChainGridModel()
+        self.grid_cells = {}
+
     async def initialize(self):
         """Initialize page data"""
         # Fetch Available Symbols
@@ -237,6 +290,12 @@ class OptionChainPage:
         )
         self.render_chain_table(data)
 
+        # Poller analytics (refreshed every cycle, no need to follow WS pushes)
+        analytics = await asyncio.to_thread(
+            service.get_chain_analytics, self.selected_symbol, self.selected_expiry
+        )
+        self.update_analytics(analytics)
+
     async def handle_live_update(self, data):
         """Handle incoming WebSocket data"""
         # Only process if matching current symbol
@@ -245,43 +304,93 @@ class OptionChainPage:
             
         if data.get("symbol") != self.selected_symbol:
             return
+
+        chain = data.get("data")
+        patch = self.grid_model.diff(chain)
+        if patch is None:
+            # First data, new strike set or ATM left the window
+            self.render_chain_table(chain)
+            return
+
+        self.update_header(chain)
+        self.apply_patch(patch)
+        stats = self.grid_model.last_stats
+        logger.debug(
+            f"Option chain patch {self.selected_symbol}: {stats['cells_changed']} cells / "
+            f"{stats['rows']} rows, {stats['patch_bytes']} B, {stats['cpu_ms']:.2f} ms CPU"
+        )
+
+    def apply_patch(self, patch):
+        """Update only the labels whose text or styling changed"""
+        for strike, changed in patch.items():
+            cells = self.grid_cells.get(strike)
+            if not cells:
+                continue
+            style = changed.get(STYLE_FIELD)
+            for field, label in cells.items():
+                if field in changed:
+                    label.text = changed[field]
+                if style is not None:
+                    label.classes(replace=cell_classes(field, style))
+
+    def toggle_atm_window(self, e):
+        """Near ATM chip: render the ATM window or every strike"""
+        self.grid_model.window = ATM_WINDOW if e.value else None
+        self.render_chain_table(self.current_data)
+
+    def update_header(self, data):
+        """Update status badge, spot price and timestamp"""
+        if not self.status_badge:
+            return
+
+        if not data or not data.get("strikes"):
+            self.status_badge.text = "NO DATA"
+            self.status_badge.props("color=red text-color=white")
             
-        # Update full table vs partial update?
-        # For now, simplistic re-render is safest to ensure consistency
-        # In a highly optimized version, we'd update individual cells binding to a reactive dict
-        self.render_chain_table(data.get("data"))
+            if self.spot_label:
+                self.spot_label.text = "---"
+                self.timestamp_label.text = "Last Upd: --:--"
+            return
+
+        self.current_data = data
+        if self.status_badge.text != "LIVE":
+            self.status_badge.text = "LIVE"
+            self.status_badge.props("color=green text-color=white")
+        
+        # Update Spot Price
+        spot = data.get("underlying_price", 0)
+        timestamp = data.get("timestamp_str") or datetime.now().strftime("%H:%M:%S")
+        if self.spot_label:
+            self.spot_label.text = f"{spot:,.2f}"
+            self.timestamp_label.text = f"Last Upd: {timestamp}"
+
+    def update_analytics(self, analytics):
+        """PCR / max-pain / IV skew / buildup strip from the poller's analytics table"""
+        if not self.analytics_labels:
+            return
+        a = analytics or {}
+        buildup = lambda v: (v or "-").replace("_", " ").title()
+        texts = {
+            "pcr": fmt(a.get("pcr_oi")),
+            "max_pain": fmt(a.get("max_pain"), 0),
+            "iv_skew": fmt(a.get("iv_skew"), 1),
+            "buildup": f"CE {buildup(a.get('ce_buildup'))} · PE {buildup(a.get('pe_buildup'))}",
+        }
+        for key, text in texts.items():
+            self.analytics_labels[key].text = text
 
     def render_chain_table(self, data):
-        """Render the full option chain table"""
+        """Render the option chain grid (once per symbol/expiry; live ticks are patched)"""
         if not self.chain_container:
             return
             
         self.chain_container.clear()
-        
+        self.grid_cells = {}
+        self.update_header(data)
+
         # Check for empty data
-        is_empty = not data or not data.get("strikes")
-        
-        # Update Header Status
-        if self.status_badge:
-            if is_empty:
-                self.status_badge.text = "NO DATA"
-                self.status_badge.props("color=red text-color=white")
-                
-                if self.spot_label:
-                    self.spot_label.text = "---"
-                    self.timestamp_label.text = "Last Upd: --:--"
-            else:
-                self.status_badge.text = "LIVE"
-                self.status_badge.props("color=green text-color=white")
-                
-                # Update Spot Price
-                spot = data.get("underlying_price", 0)
-                timestamp = data.get("timestamp_str") or datetime.now().strftime("%H:%M:%S")
-                if self.spot_label:
-                    self.spot_label.text = f"{spot:,.2f}"
-                    self.timestamp_label.text = f"Last Upd: {timestamp}"
-
-        if is_empty:
+        if not data or not data.get("strikes"):
+            self.grid_model.load(None)
             with self.chain_container:
                 with ui.column().classes("w-full items-center justify-center py-12"):
                     ui.icon("sentiment_dissatisfied", size="xl").classes("text-slate-600 mb-4")
@@ -289,26 +398,17 @@ class OptionChainPage:
                     ui.label("Please check your API Token or Market Hours").classes("text-slate-600 text-sm")
             return
 
-        strikes = data["strikes"]
-        spot = data.get("underlying_price", 0)
+        # Only the strikes around ATM are materialized (see OptionChainGridModel)
+        rows = self.grid_model.load(data)
 
         # --- THE GRID ---
         # Columns: 
         # [CALLS] Delta | IV | OI | Vol | LTP 
         # [CENTER] STRIKE 
         # [PUTS] LTP | Vol | OI | IV | Delta
-        
-        # Grid Template: 
-        # 5 cols (Calls) + 1 col (Strike) + 5 cols (Puts) = 11 columns
-        # Widths: 
-        # Delta(50) IV(50) OI(60) Vol(60) LTP(70) | Strike(80) | LTP(70) Vol(60) OI(60) IV(50) Delta(50)
-        cols = "minmax(50px, 1fr) minmax(50px, 1fr) minmax(60px, 1.2fr) minmax(60px, 1.2fr) minmax(70px, 1.5fr) " \
-               "90px " \
-               "minmax(70px, 1.5fr) minmax(60px, 1.2fr) minmax(60px, 1.2fr) minmax(50px, 1fr) minmax(50px, 1fr)"
-
         with self.chain_container:
             # Header Row
-            with ui.grid(columns=cols).classes(
+            with ui.grid(columns=GRID_COLUMNS).classes(
                 "w-full gap-[1px] text-center font-mono text-[11px] font-bold tracking-wider "
                 "bg-slate-900 border-b border-slate-700 sticky top-0 z-20 shadow-lg text-slate-400 uppercase"
             ):
@@ -329,84 +429,26 @@ class OptionChainPage:
                 ui.label("IV").classes("py-3")
                 ui.label("Delta").classes("py-3")
 
-            # Data Rows
-            # Use a virtual scroll container if lists get massive, but for 20-30 strikes regular grid is fine
-            with ui.grid(columns=cols).classes(
+            # Data Rows, keyed by strike so live updates can patch single cells
+            with ui.grid(columns=GRID_COLUMNS).classes(
                 "w-full gap-[1px] gap-y-[1px] items-stretch text-center font-mono text-xs bg-slate-900"
             ):
-                for s in strikes:
-                    strike_price = s["strike"]
-                    
-                    # Determine ITM/OTM
-                    # Call ITM: Spot > Strike (Strike < Spot)
-                    is_call_itm = strike_price < spot
-                    # Put ITM: Spot < Strike (Strike > Spot)
-                    is_put_itm = strike_price > spot
-                    
-                    # ATM Highlight (within 0.2%)
-                    is_atm = abs(strike_price - spot) / spot < 0.002
-                    
-                    # Background Colors
-                    # ITM gets subtle tint
-                    # ATM gets specific glow
-                    
-                    call_bg = "bg-green-900/10" if is_call_itm else "bg-slate-900"
-                    put_bg = "bg-red-900/10" if is_put_itm else "bg-slate-900"
-                    
-                    if is_atm:
-                        strike_bg = "bg-yellow-500/20 text-yellow-400 border-x-2 border-yellow-500/50"
-                        row_hover = "hover:brightness-110"
-                    else:
-                        strike_bg = "bg-slate-800 text-slate-200"
-                        row_hover = "hover:bg-white/5"
-
-                    # Data Extraction
-                    c = s.get("call", {})
-                    p = s.get("put", {})
-                    
-                    # Format Helpers
-                    def fmt(val, decimals=2, default="-"):
-                        if val is None: return default
-                        return f"{val:,.{decimals}f}"
-                    
-                    def fmt_int(val):
-                        if not val: return "-"
-                        if val > 100000: return f"{val/100000:.2f}L"
-                        if val > 1000: return f"{val/1000:.1f}k"
-                        return str(val)
-
-                    # --- RENDER CELLS ---
-                    
-                    # CALLS
-                    # Delta
-                    ui.label(fmt(c.get("delta"), 2)).classes(f"py-2 flex items-center justify-center {call_bg} text-slate-500 {row_hover}")
-                    # IV
-                    ui.label(fmt(c.get("iv"), 1)).classes(f"py-2 flex items-center justify-center {call_bg} text-amber-200/70 {row_hover}")
-                    # OI
-                    ui.label(fmt_int(c.get("oi"))).classes(f"py-2 flex items-center justify-center {call_bg} text-slate-300 {row_hover}")
-                    # Vol
-                    ui.label(fmt_int(c.get("volume"))).classes(f"py-2 flex items-center justify-center {call_bg} text-slate-400 {row_hover}")
-                    # LTP (Green if ITM)
-                    ltp_color = "text-green-400 font-bold" if is_call_itm else "text-slate-200"
-                    ui.label(fmt(c.get("ltp"))).classes(f"py-2 flex items-center justify-center {call_bg} {ltp_color} {row_hover}")
-                    
-                    # STRIKE
-                    ui.label(f"{int(strike_price)}").classes(
-                        f"py-2 flex items-center justify-center font-bold tracking-wide {strike_bg}"
-                    )
-                    
-                    # PUTS
-                    # LTP (Red if ITM)
-                    ltp_color = "text-red-400 font-bold" if is_put_itm else "text-slate-200"
-                    ui.label(fmt(p.get("ltp"))).classes(f"py-2 flex items-center justify-center {put_bg} {ltp_color} {row_hover}")
-                    # Vol
-                    ui.label(fmt_int(p.get("volume"))).classes(f"py-2 flex items-center justify-center {put_bg} text-slate-400 {row_hover}")
-                    # OI
-                    ui.label(fmt_int(p.get("oi"))).classes(f"py-2 flex items-center justify-center {put_bg} text-slate-300 {row_hover}")
-                    # IV
-                    ui.label(fmt(p.get("iv"), 1)).classes(f"py-2 flex items-center justify-center {put_bg} text-amber-200/70 {row_hover}")
-                    # Delta
-                    ui.label(fmt(p.get("delta"), 2)).classes(f"py-2 flex items-center justify-center {put_bg} text-slate-500 {row_hover}")
+                for row in rows:
+                    style = row[STYLE_FIELD]
+                    cells = {}
+                    for field in CELL_FIELDS:
+                        cells[field] = ui.label(row[field]).classes(cell_classes(field, style))
+                    self.grid_cells[row["key"]] = cells
+
+        # Bring ATM into view
+        spot = data.get("underlying_price", 0) or 0
+        atm = min(self.grid_cells, key=lambda k: abs(k - spot))
+        ui.run_javascript(f'getHtmlElement({self.grid_cells[atm]["strike"].id})?.scrollIntoView({{block: "center"}})')
+
+        logger.debug(
+            f"Option chain render {self.selected_symbol}: {len(rows)} rows, "
+            f"{len(rows) * len(CELL_FIELDS)} cells, ~{payload_size(rows)} B"
+        )
 
 
     def render(self):
@@ -444,6 +486,13 @@ class OptionChainPage:
                     with ui.row().classes("items-center gap-2"):
                         self.status_badge = ui.badge("LIVE", color="green").props("rounded").classes("text-[10px] px-2")
 
+                ui.separator().props("vertical").classes("h-8 mx-2 bg-slate-700")
+
+                for key, title in (("pcr", "PCR"), ("max_pain", "MAX PAIN"), ("iv_skew", "IV SKEW"), ("buildup", "OI BUILDUP")):
+                    with ui.column().classes("items-start gap-0"):
+                        ui.label(title).classes("text-[10px] tracking-widest text-slate-500 font-bold")
+                        self.analytics_labels[key] = ui.label("-").classes("text-sm font-mono font-bold text-slate-200")
+
 
         # Control Bar
         with ui.row().classes(
@@ -519,9 +568,12 @@ class OptionChainPage:
 
             ui.separator().props("vertical").classes("h-8 mx-2 bg-slate-800")
 
-            # Quick Filters (Visual only for now)
+            # Quick Filters
             with ui.row().classes("gap-2"):
-                ui.chip("Near ATM", icon="center_focus_strong").props("dense outline square color=grey-7")
+                ui.chip(
+                    "Near ATM", icon="center_focus_strong",
+                    selectable=True, selected=True, on_selection_change=self.toggle_atm_window,
+                ).props("dense outline square color=grey-7")
                 ui.chip("High Vol", icon="bolt").props("dense outline square color=grey-7")
 
             ui.space()
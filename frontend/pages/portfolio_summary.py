@@ -3,6 +3,8 @@ Portfolio Summary Page
 Complete overview of holdings, positions, and asset allocation
 """
 
+import asyncio
+
 from nicegui import ui, run
 from ..common import Components
 from ..state import async_get, API_BASE
@@ -28,9 +30,11 @@ def render_page(state):
             ui.spinner("dots", size="lg").classes("mx-auto")
 
         try:
-            # Fetch portfolio and holdings data
-            portfolio_response = await run.io_bound(requests.get, f"{API_BASE}/portfolio")
-            holdings_response = await run.io_bound(requests.get, f"{API_BASE}/upstox/holdings")
+            # Fetch portfolio and holdings data in parallel
+            portfolio_response, holdings_response = await asyncio.gather(
+                run.io_bound(requests.get, f"{API_BASE}/api/portfolio"),
+                run.io_bound(requests.get, f"{API_BASE}/api/upstox/holdings"),
+            )
 
             if portfolio_response.status_code == 200 and holdings_response.status_code == 200:
                 portfolio = portfolio_response.json()
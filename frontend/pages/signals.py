@@ -158,6 +158,66 @@ def render_page(state):
     # Initial load
     ui.timer(0.1, load_signals, once=True)
 
+    # Indicator Screener (same engine as the backtest strategies)
+    with Components.card().classes("mt-6"):
+        ui.label("Indicator Screener").classes("text-xl font-bold mb-4")
+
+        with ui.row().classes("w-full gap-4 items-end"):
+            keys_input = ui.input(
+                label="Instrument Keys", placeholder="NSE_EQ|INE002A01018, NSE_EQ|INE009A01021"
+            ).classes("flex-1")
+            timeframe_select = ui.select(
+                label="Timeframe",
+                options=["5m", "15m", "30m", "1h", "1d", "1w"],
+                value="1d",
+            ).classes("w-32")
+
+        screener_container = ui.column().classes("w-full")
+
+        async def run_screener():
+            if not keys_input.value:
+                ui.notify("Enter at least one instrument key", type="warning")
+                return
+
+            screener_container.clear()
+            with screener_container:
+                ui.spinner("dots", size="lg").classes("mx-auto text-indigo-500")
+
+            try:
+                response = await run.io_bound(
+                    requests.get,
+                    f"{API_BASE}/signals/indicators",
+                    params={"instrument_keys": keys_input.value, "timeframe": timeframe_select.value},
+                )
+                screener_container.clear()
+
+                if response.status_code != 200:
+                    with screener_container:
+                        ui.label(response.json().get("error", "Error running screener")).classes("text-red-400")
+                    return
+
+                rows = response.json().get("indicators", [])
+                with screener_container:
+                    if not rows:
+                        ui.label("No candles stored for these instruments").classes("text-slate-400 italic")
+                        return
+                    fields = [("instrument_key", "Instrument"), ("close", "Close"), ("rsi", "RSI"),
+                              ("sma_fast", "SMA 20"), ("sma_slow", "SMA 50"), ("ema", "EMA 20"),
+                              ("macd_hist", "MACD Hist"), ("atr", "ATR"), ("bb_pct_b", "BB %B"),
+                              ("vwap", "VWAP")]
+                    columns = [
+                        {"name": f, "label": label, "field": f,
+                         "align": "left" if f == "instrument_key" else "right", "sortable": True}
+                        for f, label in fields
+                    ]
+                    ui.table(columns=columns, rows=rows, row_key="instrument_key").classes("w-full")
+            except Exception as e:
+                screener_container.clear()
+                with screener_container:
+                    ui.label(f"Error: {str(e)}").classes("text-red-400")
+
+        ui.button("Screen", on_click=run_screener, icon="insights").props("color=primary")
+
     # NSE Instruments Section
     with Components.card().classes("mt-6"):
         ui.label("NSE Equity Instruments").classes("text-xl font-bold mb-4")
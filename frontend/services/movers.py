@@ -1,5 +1,7 @@
+from __future__ import annotations
+
+import logging
 import sqlite3
-import pandas as pd
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 import threading
@@ -11,6 +13,12 @@ from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent.parent.parent))
 from backend.services.upstox.live_api import get_upstox_api
+from backend.services.streaming.quote_board import get_quote_board
+from backend.utils.helpers.lazy_import import lazy_import
+
+pd = lazy_import("pandas")
+
+logger = logging.getLogger(__name__)
 
 
 class MarketMoversService:
@@ -24,6 +32,8 @@ class MarketMoversService:
 
     # Cache duration (e.g., 2 minutes)
     CACHE_DURATION = 120
+    # Oldest live-feed quote used instead of a REST fetch
+    BOARD_MAX_AGE = 60
 
     def __init__(self):
         self.api = get_upstox_api()
@@ -157,6 +167,22 @@ class MarketMoversService:
             print(f"DB Error in Movers Service: {e}")
             return []
 
+    def _quotes_from_board(self, keys: List[str]) -> Dict[str, Dict]:
+        """Quotes for keys the live feed has published, in the REST quote shape"""
+        board = get_quote_board()
+        if board is None:
+            return {}
+        quotes = {}
+        for key, q in board.read_many(keys, max_age=self.BOARD_MAX_AGE).items():
+            if q.close > 0:  # Change % needs the previous close
+                quotes[key] = {
+                    "instrument_token": key,
+                    "last_price": q.ltp,
+                    "net_change": q.ltp - q.close,
+                    "volume": q.volume,
+                }
+        return quotes
+
     def get_movers(self, category: str = "NSE_MAIN") -> Dict[str, List]:
         """
         Returns {'gainers': [...top 10...], 'losers': [...top 10...]}
@@ -205,8 +231,12 @@ class MarketMoversService:
         # DEBUG: Print first 3 keys
         print(f"[Movers] First 3 keys for {category}: {keys_to_fetch[:3]}")
 
-        # Use existing batch function
-        quotes = self.api.get_batch_market_quotes(keys_to_fetch)
+        # Live quotes from the shared-memory board; REST only for the rest
+        quotes = self._quotes_from_board(keys_to_fetch)
+        missing = [k for k in keys_to_fetch if k not in quotes]
+        logger.debug(f"Quote board: {len(quotes)} live, {len(missing)} to fetch for {category}")
+        if missing:
+            quotes.update(self.api.get_batch_market_quotes(missing) or {})
 
         if not quotes:
             return {"gainers": [], "losers": []}
@@ -0,0 +1,152 @@
+"""
+Option Chain Grid Model
+Keyed, per-strike view model behind the NiceGUI option chain grid.
+
+The page renders the grid once from ``load()`` and afterwards applies the
+``diff()`` of each websocket push: only cells whose formatted text (or
+ITM/ATM styling) changed are patched. Only a window of strikes around ATM
+is materialized; the window is rebuilt when ATM drifts out of it or the
+strike set itself changes.
+
+Usage:
+    model = OptionChainGridModel(window=15)
+    rows = model.load(chain)            # initial render (ATM window)
+    patch = model.diff(next_chain)      # {strike: {field: text}} or None (re-render)
+"""
+
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+# Grid columns, left to right (strike sits in the middle)
+CALL_FIELDS = ["c_delta", "c_iv", "c_oi", "c_vol", "c_ltp"]
+PUT_FIELDS = ["p_ltp", "p_vol", "p_oi", "p_iv", "p_delta"]
+CELL_FIELDS = CALL_FIELDS + ["strike"] + PUT_FIELDS
+
+STYLE_FIELD = "_style"          # (call_itm, put_itm, atm) — drives cell classes
+ATM_WINDOW = 15                 # Strikes rendered on each side of ATM
+ATM_REBUILD_MARGIN = 3          # Re-window when ATM is this close to an edge
+ATM_BAND = 0.002                # |strike - spot| / spot within which a strike is ATM
+
+
+def fmt(val, decimals: int = 2, default: str = "-") -> str:
+    if val is None:
+        return default
+    return f"{val:,.{decimals}f}"
+
+
+def fmt_int(val) -> str:
+    if not val:
+        return "-"
+    if val > 100000:
+        return f"{val/100000:.2f}L"
+    if val > 1000:
+        return f"{val/1000:.1f}k"
+    return str(val)
+
+
+def format_row(s: Dict[str, Any], spot: float) -> Dict[str, Any]:
+    """Display texts for one strike plus its styling flags"""
+    strike = s["strike"]
+    c = s.get("call") or {}
+    p = s.get("put") or {}
+    return {
+        "c_delta": fmt(c.get("delta"), 2),
+        "c_iv": fmt(c.get("iv"), 1),
+        "c_oi": fmt_int(c.get("oi")),
+        "c_vol": fmt_int(c.get("volume")),
+        "c_ltp": fmt(c.get("ltp")),
+        "strike": f"{int(strike)}",
+        "p_ltp": fmt(p.get("ltp")),
+        "p_vol": fmt_int(p.get("volume")),
+        "p_oi": fmt_int(p.get("oi")),
+        "p_iv": fmt(p.get("iv"), 1),
+        "p_delta": fmt(p.get("delta"), 2),
+        STYLE_FIELD: (
+            strike < spot,
+            strike > spot,
+            bool(spot) and abs(strike - spot) / spot < ATM_BAND,
+        ),
+    }
+
+
+class OptionChainGridModel:
+    """Per-strike formatted rows for the visible ATM window, diffed per update"""
+
+    def __init__(self, window: Optional[int] = ATM_WINDOW):
+        self.window = window          # None renders every strike
+        self.rows: Dict[float, Dict[str, Any]] = {}
+        self.strikes: List[float] = []
+        self.last_stats: Dict[str, Any] = {}
+
+    def _visible(self, strikes: List[Dict], spot: float) -> List[Dict]:
+        if self.window is None or len(strikes) <= 2 * self.window + 1:
+            return strikes
+        atm = min(range(len(strikes)), key=lambda i: abs(strikes[i]["strike"] - spot))
+        lo = max(0, min(atm - self.window, len(strikes) - 2 * self.window - 1))
+        return strikes[lo:lo + 2 * self.window + 1]
+
+    def _needs_rewindow(self, strikes: List[Dict], spot: float) -> bool:
+        if self.window is None or not self.strikes:
+            return False
+        all_strikes = sorted(s["strike"] for s in strikes)
+        if len(all_strikes) <= 2 * self.window + 1:
+            return False
+        atm = min(all_strikes, key=lambda k: abs(k - spot))
+        if atm not in self.rows:
+            return True
+        pos = self.strikes.index(atm)
+        at_low_edge = pos < ATM_REBUILD_MARGIN and self.strikes[0] != all_strikes[0]
+        at_high_edge = (
+            pos >= len(self.strikes) - ATM_REBUILD_MARGIN and self.strikes[-1] != all_strikes[-1]
+        )
+        return at_low_edge or at_high_edge
+
+    def load(self, data: Optional[Dict]) -> List[Dict[str, Any]]:
+        """Full (re)build: formatted rows of the visible window, in strike order"""
+        strikes = sorted((data or {}).get("strikes") or [], key=lambda s: s["strike"])
+        spot = (data or {}).get("underlying_price", 0) or 0
+        visible = self._visible(strikes, spot)
+
+        self.rows = {s["strike"]: format_row(s, spot) for s in visible}
+        self.strikes = [s["strike"] for s in visible]
+        return [dict(self.rows[k], key=k) for k in self.strikes]
+
+    def diff(self, data: Optional[Dict]) -> Optional[Dict[float, Dict[str, Any]]]:
+        """
+        Changed cells per visible strike, applied to the model.
+        Returns None when the grid must be re-rendered via ``load()``:
+        nothing rendered yet, empty data, a different strike set or ATM
+        leaving the window.
+        """
+        started = time.process_time()
+        strikes = (data or {}).get("strikes") or []
+        spot = (data or {}).get("underlying_price", 0) or 0
+        if not self.rows or not strikes:
+            return None
+
+        by_strike = {s["strike"]: s for s in strikes}
+        if any(k not in by_strike for k in self.strikes) or self._needs_rewindow(strikes, spot):
+            return None
+
+        patch: Dict[float, Dict[str, Any]] = {}
+        for k in self.strikes:
+            row = self.rows[k]
+            fresh = format_row(by_strike[k], spot)
+            changed = {f: v for f, v in fresh.items() if row[f] != v}
+            if changed:
+                row.update(changed)
+                patch[k] = changed
+
+        self.last_stats = {
+            "rows": len(self.strikes),
+            "cells_changed": sum(len(c) for c in patch.values()),
+            "cpu_ms": (time.process_time() - started) * 1000,
+            "patch_bytes": payload_size(patch),
+        }
+        return patch
+
+
+def payload_size(obj: Any) -> int:
+    """Approximate bytes pushed to the browser for ``obj`` (JSON-encoded)"""
+    return len(json.dumps(obj, default=str, separators=(",", ":")))
@@ -1,12 +1,19 @@
 from nicegui import run
+import asyncio
+import json
 import requests
 import sqlite3
-from typing import Dict, Any, List
+import threading
+import time
+from typing import Callable, Dict, Any, List, Optional
 import os
 
 # Configuration
 API_BASE = os.getenv("API_BASE_URL", "http://localhost:8000")
 
+# One keep-alive session for all dashboard -> API server calls
+_session = requests.Session()
+
 # ============================================================================
 # 📡 Async API Wrappers
 # ============================================================================
@@ -15,7 +22,7 @@ API_BASE = os.getenv("API_BASE_URL", "http://localhost:8000")
 async def async_get(endpoint: str, timeout: int = 5) -> Dict[str, Any]:
     try:
         response = await run.io_bound(
-            requests.get, f"{API_BASE}{endpoint}", timeout=timeout
+            _session.get, f"{API_BASE}{endpoint}", timeout=timeout
         )
         if response.status_code == 200:
             return response.json()
@@ -27,15 +34,122 @@ async def async_get(endpoint: str, timeout: int = 5) -> Dict[str, Any]:
 async def async_post(endpoint: str, data: Dict, timeout: int = 30) -> Dict[str, Any]:
     try:
         response = await run.io_bound(
-            requests.post, f"{API_BASE}{endpoint}", json=data, timeout=timeout
+            _session.post, f"{API_BASE}{endpoint}", json=data, timeout=timeout
         )
-        if response.status_code in [200, 201]:
+        if response.status_code in [200, 201, 202]:
             return response.json()
         return {"error": f"Status {response.status_code}"}
     except Exception as e:
         return {"error": str(e)}
 
 
+async def watch_job(job_id: int, on_update: Callable[[Dict[str, Any]], None],
+                    interval: float = 1.0) -> Dict[str, Any]:
+    """
+    Poll a background job until it finishes. on_update gets every state,
+    with only the partial results that arrived since the previous poll.
+    """
+    since = 0
+    while True:
+        job = await async_get(f"/api/jobs/{job_id}?since={since}")
+        if "error" in job:
+            return job
+        since = job.get("next_since", since)
+        on_update(job)
+        if job.get("done"):
+            return job
+        await asyncio.sleep(interval)
+
+
+async def cancel_job(job_id: int) -> Dict[str, Any]:
+    return await async_post(f"/api/jobs/{job_id}/cancel", {})
+
+
+# ============================================================================
+# 📂 Download Directory Feed
+# ============================================================================
+
+FEED_RETRY_SECONDS = 3
+FEED_READ_TIMEOUT = 60  # Longer than the API's 15s keep-alive
+
+
+class DownloadFeed:
+    """
+    One /api/download/events stream per dashboard process, shared by every
+    open Downloads page. Only additions and removals cross the wire after
+    the first snapshot; subscribers are called on the event loop.
+    """
+
+    def __init__(self):
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.ready = False
+        self._event_id: Optional[str] = None  # SSE id of the last event applied
+        self._subscribers: List[Callable[[], None]] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Call callback now (if loaded) and on every change; returns unsubscribe"""
+        self._subscribers.append(callback)
+        if self._thread is None:
+            self._loop = asyncio.get_event_loop()
+            self._thread = threading.Thread(target=self._run, name="download-feed", daemon=True)
+            self._thread.start()
+        if self.ready:
+            callback()
+
+        def unsubscribe():
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def newest(self, limit: int) -> List[Dict[str, Any]]:
+        return sorted(self.files.values(), key=lambda f: f["created_at"], reverse=True)[:limit]
+
+    def _run(self):
+        while True:
+            headers = {} if self._event_id is None else {"Last-Event-ID": self._event_id}
+            try:
+                with requests.get(f"{API_BASE}/api/download/events", headers=headers,
+                                  stream=True, timeout=(5, FEED_READ_TIMEOUT)) as response:
+                    response.raise_for_status()
+                    event, event_id, data = None, None, []
+                    for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+                        if line.startswith("id:"):
+                            event_id = line[3:].strip()
+                        elif line.startswith("event:"):
+                            event = line[6:].strip()
+                        elif line.startswith("data:"):
+                            data.append(line[5:].strip())
+                        elif not line and data:
+                            payload = json.loads("\n".join(data))
+                            self._event_id = event_id
+                            self._loop.call_soon_threadsafe(self._apply, event, payload)
+                            event, event_id, data = None, None, []
+            except Exception as e:
+                print(f"Download feed disconnected: {e}")
+            time.sleep(FEED_RETRY_SECONDS)
+
+    def _apply(self, event: Optional[str], payload: Dict[str, Any]):
+        if event == "snapshot" or payload.get("reset"):
+            self.files = {f["filename"]: f for f in payload["files"]}
+        else:
+            for name in payload["removed"]:
+                self.files.pop(name, None)
+            for f in payload["added"]:
+                self.files[f["filename"]] = f
+        self.ready = True
+        for callback in list(self._subscribers):
+            try:
+                callback()
+            except Exception as e:
+                print(f"Download feed subscriber failed: {e}")
+
+
+download_feed = DownloadFeed()
+
+
 # ============================================================================
 # 🧠 Application State
 # ============================================================================
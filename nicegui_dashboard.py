@@ -49,43 +49,8 @@ logging.getLogger().setLevel(logging.INFO)
 
 from frontend.state import DashboardState
 from frontend.common import Theme, Components
-from frontend.pages import (
-    home,
-    downloads,
-    positions,
-    fno,
-    guide,
-    guide_local,
-    wip,
-    live_data,
-    ai_chat,
-    option_chain,
-    option_greeks,
-    historical_options,
-    api_debugger,
-    health,
-    user_profile,
-    orders_alerts,
-    analytics,
-    backtest,
-    signals,
-    strategies,
-    upstox_live,
-    live_trading,
-    gtt_orders,
-    trade_pnl,
-    margins,
-    market_calendar,
-    funds,
-    order_book,
-    trade_book,
-    portfolio_summary,
-    charges_calc,
-    instruments_browser,
-    market_explorer,
-    corporate_announcements,
-    market_quote,
-)
+# Page modules are imported on first navigation (see frontend/pages/__init__.py)
+from frontend.pages import load_page, render_page
 
 # Configuration
 REFRESH_INTERVAL = 30000  # 30 seconds
@@ -384,76 +349,7 @@ def main_dashboard(page: str = None):
     def content_area():
         # Pages wrap content in a consistent padding container
         with ui.column().classes("w-full h-full max-w-7xl mx-auto animate-fade-in"):
-            if state.current_page == "dashboard":
-                home.render_page(state)
-            elif state.current_page == "ai_chat":
-                ai_chat.render_page(state)
-            elif state.current_page == "live_data":
-                live_data.render_page(state)
-            elif state.current_page == "downloads":
-                downloads.render_page(state)
-            elif state.current_page == "historical_options":
-                historical_options.historical_options_page()
-            elif state.current_page == "api_debugger":
-                api_debugger.api_debugger_page()
-            elif state.current_page == "positions":
-                positions.render_page(state)
-            elif state.current_page == "option_chain":
-                option_chain.render_page(state)
-            elif state.current_page == "option_greeks":
-                option_greeks.render_page(state)
-            elif state.current_page == "fno_analysis":
-                fno.render_page(state)
-            elif state.current_page == "market_guide":
-                guide.render_page(state)
-            elif state.current_page == "local_guide":
-                guide_local.create_page()
-            elif state.current_page == "health":
-                health.render_page(state)
-            elif state.current_page == "user_profile":
-                user_profile.render_page(state)
-            elif state.current_page == "orders_alerts":
-                orders_alerts.render_page(state)
-            elif state.current_page == "analytics":
-                analytics.render_page(state)
-            elif state.current_page == "backtest":
-                backtest.render_page(state)
-            elif state.current_page == "signals":
-                signals.render_page(state)
-            elif state.current_page == "strategies":
-                strategies.render_page(state)
-            elif state.current_page == "upstox_live":
-                upstox_live.render_page(state)
-            elif state.current_page == "live_trading":
-                live_trading.render_page(state)
-            elif state.current_page == "gtt_orders":
-                gtt_orders.render_page(state)
-            elif state.current_page == "trade_pnl":
-                trade_pnl.render_page(state)
-            elif state.current_page == "margins":
-                margins.render_page(state)
-            elif state.current_page == "market_calendar":
-                market_calendar.render_page(state)
-            elif state.current_page == "funds":
-                funds.render_page(state)
-            elif state.current_page == "order_book":
-                order_book.render_page(state)
-            elif state.current_page == "trade_book":
-                trade_book.render_page(state)
-            elif state.current_page == "portfolio_summary":
-                portfolio_summary.render_page(state)
-            elif state.current_page == "charges_calc":
-                charges_calc.render_page(state)
-            elif state.current_page == "instruments_browser":
-                instruments_browser.render_page(state)
-            elif state.current_page == "market_explorer":
-                market_explorer.render_page(state)
-            elif state.current_page == "corporate_announcements":
-                corporate_announcements.render_page(state)
-            elif state.current_page == "market_quote":
-                market_quote.render_page(state)
-            else:
-                wip.render_page(state.current_page)
+            render_page(state.current_page, state)
 
     # --- Data Cycle ---
     async def refresh_all_data():
@@ -484,7 +380,7 @@ def main_dashboard(page: str = None):
 
             auth_controls.refresh()  # Update auth badge/button
             if state.current_page == "dashboard":
-                home.stats_widget.refresh(state)
+                load_page("home").stats_widget.refresh(state)
             elif state.current_page == "positions":
                 content_area.refresh()
             ui.notify(
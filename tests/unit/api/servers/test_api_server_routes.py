@@ -77,8 +77,8 @@ class TestAPIRoutes:
     """Test API Server Endpoints"""
 
     @patch('backend.utils.auth.manager.AuthManager')
-    @patch('backend.api.servers.api_server.requests.get')
-    def test_get_portfolio_authenticated(self, mock_get, mock_auth_cls, client):
+    @patch('backend.api.servers.api_server.get_upstream_session')
+    def test_get_portfolio_authenticated(self, mock_session, mock_auth_cls, client):
         """Test portfolio endpoint with valid Upstox token"""
         # Mock Auth
         mock_auth = mock_auth_cls.return_value
@@ -98,7 +98,15 @@ class TestAPIRoutes:
             "data": {"equity": {"available_margin": 50000, "used_margin": 10000}}
         }
         
-        mock_get.side_effect = [mock_profile, mock_holdings, mock_funds]
+        # Upstream calls run concurrently, so route by URL rather than call order
+        responses = {
+            '/user/profile': mock_profile,
+            '/portfolio/short-term-positions': mock_holdings,
+            '/user/get-funds-and-margin': mock_funds,
+        }
+        mock_session.return_value.get.side_effect = (
+            lambda url, **kwargs: next(r for path, r in responses.items() if url.endswith(path))
+        )
         
         response = client.get('/api/portfolio')
         data = response.get_json()
@@ -181,3 +189,36 @@ class TestAPIRoutes:
         assert response.status_code == 200
         assert data['total_trades'] == 100
         assert data['win_rate'] == 60.5
+
+    def test_candles_reject_timeframes_the_source_cannot_build(self, client):
+        """3m cannot be folded from 5m intraday bars; 2h is folded from stored 1h candles"""
+        resp = client.get('/api/candles?instrument_key=NSE_EQ|A&timeframe=3m&source=intraday')
+        assert resp.status_code == 400
+        assert '2h' in resp.get_json()['supported']
+
+        resp = client.get('/api/candles?instrument_key=NSE_EQ|A&timeframe=2h&source=intraday')
+        assert resp.status_code == 200
+        assert resp.get_json()['candles'] == []
+
+    def test_indicator_screen_rejects_timeframes_the_source_cannot_build(self, client):
+        resp = client.get('/api/signals/indicators?instrument_keys=NSE_EQ|A&timeframe=3m&source=intraday')
+        assert resp.status_code == 400
+        assert '10m' in resp.get_json()['error']
+
+    @patch('backend.api.servers.api_server.submit_job')
+    def test_backtests_reject_unknown_lanes(self, mock_submit, client):
+        """A bad lane is a client error, never a 500 from JobQueue.submit"""
+        resp = client.post('/api/backtest/run', json={
+            'strategy': 'iron_condor', 'entry_date': '2026-01-05', 'exit_date': '2026-01-30', 'lane': 'urgent'})
+        assert resp.status_code == 400 and 'lane' in resp.get_json()['error']
+
+        resp = client.post('/api/backtest/multi-expiry', json={
+            'strategy_type': 'calendar_spread', 'start_date': '2026-01-05', 'end_date': '2026-03-31',
+            'underlying_price': 24000, 'lane': 'urgent'})
+        assert resp.status_code == 400 and 'lane' in resp.get_json()['error']
+        mock_submit.assert_not_called()
+
+        mock_submit.return_value = 7
+        resp = client.post('/api/backtest/run', json={
+            'strategy': 'iron_condor', 'entry_date': '2026-01-05', 'exit_date': '2026-01-30', 'lane': 'bulk'})
+        assert resp.status_code == 202 and mock_submit.call_args.kwargs['lane'] == 'bulk'
@@ -0,0 +1,111 @@
+"""
+Unit tests for startup migrations and the API service registry
+"""
+
+import sqlite3
+import statistics
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent))
+
+from backend.api.service_registry import ServiceRegistry
+from backend.core.trading.paper_trading import PaperTradingSystem
+from backend.data.database.migration_runner import MIGRATIONS, applied_versions, run_migrations
+
+
+def _tables(db_path):
+    conn = sqlite3.connect(db_path)
+    names = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    conn.close()
+    return names
+
+
+class TestMigrationRunner:
+
+    def test_run_migrations_applies_each_version_once(self, tmp_path):
+        db_path = str(tmp_path / "market_data.db")
+
+        assert run_migrations(db_path) == [v for v, _, _ in MIGRATIONS]
+        assert run_migrations(db_path) == []
+        assert applied_versions(db_path) == [v for v, _, _ in MIGRATIONS]
+        assert {"auth_tokens", "risk_configs", "trade_journal", "validation_rules",
+                "paper_orders", "schema_migrations"} <= _tables(db_path)
+
+    def test_constructors_skip_ddl_on_migrated_db(self, tmp_path):
+        db_path = str(tmp_path / "market_data.db")
+        run_migrations(db_path)
+
+        with patch.object(PaperTradingSystem, "_init_paper_trading_db") as ddl:
+            PaperTradingSystem(db_path=db_path)
+        ddl.assert_not_called()
+
+        fresh = str(tmp_path / "fresh.db")
+        PaperTradingSystem(db_path=fresh)
+        assert "paper_orders" in _tables(fresh)
+
+
+class TestServiceRegistry:
+
+    def test_one_instance_per_factory_and_kwargs(self):
+        registry = ServiceRegistry()
+        built = []
+
+        def factory(db_path="a.db"):
+            built.append(db_path)
+            return object()
+
+        first = registry.get(factory, db_path="a.db")
+        assert registry.get(factory, db_path="a.db") is first
+        assert registry.get(factory, db_path="b.db") is not first
+        assert built == ["a.db", "b.db"]
+
+
+def _latencies(client, method, path, n, **kwargs):
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        response = getattr(client, method)(path, **kwargs)
+        samples.append((time.perf_counter() - start) * 1000)
+        assert response.status_code in (200, 201)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99) - 1]
+
+
+@pytest.mark.slow
+def test_benchmark_portfolio_and_orders_latency(tmp_path):
+    """p50/p99 of /api/portfolio and POST /api/orders: per-request construction vs registry"""
+    from backend.api.servers import api_server
+
+    api_server.app.config["TESTING"] = True
+    api_server.app.config["WTF_CSRF_ENABLED"] = False
+    order = {"symbol": "TCS", "side": "SELL", "quantity": 1, "order_type": "LIMIT", "price": 100}
+    results = {}
+
+    def per_request(factory, **kwargs):
+        return factory(**kwargs)
+
+    for mode in ("before", "after"):
+        db_path = str(tmp_path / f"{mode}.db")
+        with patch("backend.utils.auth.manager.AuthManager") as auth_cls, \
+                patch.object(api_server, "DB_PATH", db_path):
+            auth_cls.return_value.get_valid_token.return_value = None
+            if mode == "before":
+                patcher = patch.object(api_server, "get_service", per_request)
+            else:
+                run_migrations(db_path)
+                patcher = patch.object(api_server, "get_service", ServiceRegistry().get)
+            with patcher, api_server.app.test_client() as client:
+                results[mode] = {
+                    "/api/portfolio": _latencies(client, "get", "/api/portfolio", 100),
+                    "/api/orders": _latencies(client, "post", "/api/orders", 100, json=order),
+                }
+
+    for route in ("/api/portfolio", "/api/orders"):
+        (b50, b99), (a50, a99) = results["before"][route], results["after"][route]
+        print(f"{route}: p50 {b50:.2f}ms -> {a50:.2f}ms, p99 {b99:.2f}ms -> {a99:.2f}ms")
+        assert a50 < b50
@@ -84,6 +84,20 @@ class TestStrategies:
         for s in unique_signals:
             assert s in [-1, 0, 1]
 
+    def test_rsi_strategy_keeps_rolling_mean_rsi_unless_wilder(self, sample_ohlcv):
+        """Default RSI is the rolling-mean formula; Wilder smoothing is opt-in"""
+        close = sample_ohlcv['close']
+        delta = close.diff()
+        gain = delta.where(delta > 0, 0).rolling(window=14).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+        expected = 100 - (100 / (1 + gain / loss))
+        
+        default = RSIStrategy(params={"rsi_period": 14}).generate_signals(sample_ohlcv)
+        wilder = RSIStrategy(params={"rsi_period": 14, "wilder_smoothing": True}).generate_signals(sample_ohlcv)
+        
+        pd.testing.assert_series_equal(default['rsi'], expected, check_names=False)
+        assert not np.allclose(wilder['rsi'].to_numpy()[20:], expected.to_numpy()[20:])
+
 class TestBacktestEngine:
     """Test Backtest Engine Flow (Mocking vectorbt)"""
 
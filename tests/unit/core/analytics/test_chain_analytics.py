@@ -0,0 +1,133 @@
+"""
+Unit tests for the batch option chain analytics engine
+"""
+
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent))
+
+from backend.core.analytics.chain_analytics import ChainAnalyticsEngine
+from backend.data.database.chain_snapshots import ChainSnapshotStore, chain_aggregates, max_pain
+
+EXPIRY = "2026-02-26"
+T0 = 1770695100
+T1 = T0 + 300
+
+
+def _chain(n_strikes, base, oi_shift=0, ltp_shift=0.0):
+    """SNAPSHOT_COLUMNS rows around base; deltas fall from ~0.9 to ~0.1 across the chain"""
+    rows = []
+    for i in range(n_strikes):
+        delta = 0.9 - 0.8 * i / max(n_strikes - 1, 1)
+        rows.append((
+            base + 50 * (i - n_strikes // 2),
+            100.0 - 5 * i + ltp_shift, 1000 + 100 * i + oi_shift, 500, 15.0 + i * 0.1, delta,
+            10.0 + 5 * i - ltp_shift, 3000 - 100 * i + oi_shift, 700, 18.0 + i * 0.1, delta - 1.0,
+        ))
+    return rows
+
+
+def _db(tmp_path, cycles):
+    """cycles: {ts: {underlying_key: (rows, spot)}}"""
+    db_path = str(tmp_path / "market_data.db")
+    store = ChainSnapshotStore(db_path)
+    conn = store.connect()
+    store.init_schema(conn)
+    for ts, chains in cycles.items():
+        for key, (rows, spot) in chains.items():
+            store.save_snapshot(conn, key, EXPIRY, ts, rows, spot=spot)
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+class TestChainAnalyticsEngine:
+
+    def test_metrics_match_per_underlying_reference(self, tmp_path):
+        nifty, reliance = _chain(21, 22000), _chain(9, 1300)
+        db_path = _db(tmp_path, {
+            T0: {"NSE_INDEX|Nifty 50": (nifty, 22010.0), "NSE_EQ|RELIANCE": (reliance, 1290.0)},
+        })
+        engine = ChainAnalyticsEngine(db_path)
+
+        stats = engine.run(T0)
+        rows = {r["underlying_key"]: r for r in engine.latest()}
+
+        assert stats["underlyings"] == 2
+        for key, chain, spot in (("NSE_INDEX|Nifty 50", nifty, 22010.0), ("NSE_EQ|RELIANCE", reliance, 1290.0)):
+            row = rows[key]
+            strikes = [r[0] for r in chain]
+            assert row["max_pain"] == max_pain(strikes, [r[2] for r in chain], [r[7] for r in chain])
+            assert row["pcr_oi"] == round(sum(r[7] for r in chain) / sum(r[2] for r in chain), 4)
+            assert row["atm_strike"] == min(strikes, key=lambda k: abs(k - spot))
+            assert row["strikes"] == len(chain)
+            assert row["ce_buildup"] is None and row["ce_oi_change"] is None  # no previous cycle
+
+    def test_buildup_against_previous_cycle(self, tmp_path):
+        db_path = _db(tmp_path, {
+            T0: {"A": (_chain(5, 100), 100.0), "B": (_chain(5, 100), 100.0)},
+            # A: calls up + OI up (long buildup), puts down + OI up (short buildup)
+            # B: calls up + OI down (short covering), puts down + OI down (long unwinding)
+            T1: {"A": (_chain(5, 100, oi_shift=50, ltp_shift=2.0), 100.0),
+                 "B": (_chain(5, 100, oi_shift=-50, ltp_shift=2.0), 100.0)},
+        })
+        engine = ChainAnalyticsEngine(db_path)
+
+        stats = engine.run()
+        a, b = engine.latest("A")[0], engine.latest("B")[0]
+
+        assert (stats["ts"], stats["prev_ts"]) == (T1, T0)
+        assert (a["ce_buildup"], a["pe_buildup"]) == ("long_buildup", "short_buildup")
+        assert (b["ce_buildup"], b["pe_buildup"]) == ("short_covering", "long_unwinding")
+        assert (a["ce_oi_change"], b["pe_oi_change"]) == (250, -250)
+
+    def test_iv_skew_and_symbol_lookup(self, tmp_path):
+        chain = _chain(9, 22000)
+        db_path = _db(tmp_path, {T0: {"NSE_INDEX|Nifty 50": (chain, 22000.0)}})
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE instrument_master (instrument_key TEXT, trading_symbol TEXT, name TEXT, segment TEXT)")
+        conn.execute("INSERT INTO instrument_master VALUES ('NSE_INDEX|Nifty 50', 'Nifty 50', 'Nifty 50', 'NSE_INDEX')")
+        conn.commit()
+        conn.close()
+        engine = ChainAnalyticsEngine(db_path)
+        engine.run(T0)
+
+        row = engine.for_symbol("NIFTY")[0]
+
+        call_wing = min(chain, key=lambda r: abs(r[5] - 0.25))
+        put_wing = min(chain, key=lambda r: abs(r[10] + 0.25))
+        assert row["iv_skew"] == round(put_wing[9] - call_wing[4], 4)
+        assert engine.for_symbol("UNKNOWN") == []
+        assert ChainAnalyticsEngine(str(tmp_path / "missing.db")).latest() == []
+
+
+@pytest.mark.slow
+def test_benchmark_cycle_analytics(tmp_path):
+    """212 underlyings x 150 strikes: one vectorized pass vs a per-underlying loop"""
+    keys = [f"NSE_EQ|SYM{i:03d}" for i in range(212)]
+    db_path = _db(tmp_path, {
+        T0: {k: (_chain(150, 1000 + i), 1000.0 + i) for i, k in enumerate(keys)},
+        T1: {k: (_chain(150, 1000 + i, oi_shift=i - 100, ltp_shift=1.0), 1001.0 + i) for i, k in enumerate(keys)},
+    })
+    engine = ChainAnalyticsEngine(db_path)
+
+    # Per-underlying loop over the snapshot store (chain, OI change, aggregates)
+    store = ChainSnapshotStore(db_path)
+    start = time.perf_counter()
+    for key in keys:
+        chain = store.chain_as_of(key, EXPIRY, T1)["chain"]
+        store.oi_change(key, EXPIRY, T0, T1)
+        chain_aggregates([tuple(r.values()) for r in chain])
+    loop_ms = (time.perf_counter() - start) * 1000
+
+    stats = engine.run(T1)
+
+    print(f"cycle analytics: per-underlying loop {loop_ms:.0f}ms -> "
+          f"batch {stats['duration_ms']:.0f}ms (load {stats['load_ms']:.0f}ms, compute {stats['compute_ms']:.0f}ms)")
+    assert stats["underlyings"] == 212
+    assert stats["duration_ms"] < 5000  # vs a 300s poll interval
@@ -0,0 +1,223 @@
+"""
+Unit tests for the expired-contract option strategy replay
+"""
+
+import sqlite3
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent))
+
+from backend.core.analytics.option_replay import STRATEGIES, IST, LegSpec, OptionReplay
+
+IRON_CONDOR = STRATEGIES["iron_condor"][1]
+STEP = {"1minute": 1, "5minute": 5}
+
+
+def _build(db_path, n_expiries=6, strikes=range(23000, 24001, 50), interval="5minute",
+           drop=0.0, seed=1):
+    """Weekly NIFTY expiries whose option prices follow C - P = S - K exactly"""
+    rng = np.random.default_rng(seed)
+    step = STEP[interval]
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE expired_options (
+            id INTEGER PRIMARY KEY, underlying_symbol TEXT, option_type TEXT, strike_price REAL,
+            expiry_date TEXT, tradingsymbol TEXT, exchange_token TEXT, exchange TEXT,
+            last_trading_price REAL, settlement_price REAL, open_interest INTEGER,
+            last_volume INTEGER, fetch_timestamp INTEGER,
+            UNIQUE(underlying_symbol, strike_price, option_type, expiry_date))
+    """)
+    conn.execute("""
+        CREATE TABLE expired_candles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, instrument_key TEXT, interval TEXT, timestamp DATETIME,
+            open REAL, high REAL, low REAL, close REAL, volume INTEGER, oi INTEGER,
+            UNIQUE(instrument_key, interval, timestamp))
+    """)
+    model, token = {}, 1000
+    for n in range(n_expiries):
+        expiry = date(2025, 1, 2) + timedelta(weeks=n)
+        days = [expiry - timedelta(days=d) for d in range(6, -1, -1) if (expiry - timedelta(days=d)).weekday() < 5]
+        times = [datetime.combine(day, datetime.min.time()).replace(hour=9, minute=15, tzinfo=IST)
+                 + timedelta(minutes=step * i) for day in days for i in range(375 // step)]
+        stamps = [t.isoformat() for t in times]
+        spot = 23500 + np.cumsum(rng.normal(0, 6 * np.sqrt(step), len(times)))
+        decay = 150 * np.sqrt(np.linspace(1, 0, len(times)))
+        model[expiry.isoformat()] = (stamps, spot)
+        for k in strikes:
+            time_value = decay * np.exp(-np.abs(k - spot) / 250)
+            for option_type in ("CE", "PE"):
+                token += 1
+                conn.execute(
+                    "INSERT INTO expired_options (underlying_symbol, option_type, strike_price, expiry_date, "
+                    "tradingsymbol, exchange_token, exchange, fetch_timestamp) VALUES (?, ?, ?, ?, ?, ?, 'NSE', 0)",
+                    ("NIFTY", option_type, k, expiry.isoformat(), f"NIFTY{k}{option_type}", str(token)))
+                intrinsic = np.maximum(spot - k, 0) if option_type == "CE" else np.maximum(k - spot, 0)
+                close = np.round(intrinsic + time_value, 2)
+                keep = rng.random(len(times)) >= drop
+                keep[0] = True
+                key = f"NSE_FO|{token}|{expiry:%d-%m-%Y}"
+                conn.executemany(
+                    "INSERT INTO expired_candles (instrument_key, interval, timestamp, open, high, low, close, "
+                    "volume, oi) VALUES (?, ?, ?, ?, ?, ?, ?, 100, 1000)",
+                    [(key, interval, stamps[i], close[i], close[i], close[i], close[i])
+                     for i in np.flatnonzero(keep)])
+    conn.commit()
+    conn.close()
+    return model
+
+
+def _reference(db_path, trade, legs, interval, profit_target=None, stop_loss=None, cut=None):
+    """Per-bar loop over the replay's chosen strikes: union of bars, last price carried forward"""
+    conn = sqlite3.connect(db_path)
+    strikes = [float(s[:-2]) for s in trade["symbol"].split("/")]
+    entry_at = datetime.strptime(trade["date"], "%Y-%m-%d %H:%M").replace(tzinfo=IST)
+    paths = []
+    for leg, strike in zip(legs, strikes):
+        token, = conn.execute(
+            "SELECT exchange_token FROM expired_options WHERE expiry_date = ? AND strike_price = ? "
+            "AND option_type = ?", (trade["expiry"], strike, leg.option_type)).fetchone()
+        key = f"NSE_FO|{token}|{date.fromisoformat(trade['expiry']):%d-%m-%Y}"
+        rows = conn.execute("SELECT timestamp, close FROM expired_candles WHERE instrument_key = ? "
+                            "AND interval = ? ORDER BY timestamp", (key, interval)).fetchall()
+        paths.append({datetime.fromisoformat(t): c for t, c in rows if datetime.fromisoformat(t) > entry_at})
+        paths[-1][entry_at] = [c for t, c in rows if datetime.fromisoformat(t) >= entry_at][0]
+    conn.close()
+
+    bars = sorted(set().union(*paths))
+    entry = [p[entry_at] for p in paths]
+    premium = abs(sum(-leg.weight * e for leg, e in zip(legs, entry)))
+    last = list(entry)
+    for i, t in enumerate(bars):
+        last = [p.get(t, prev) for p, prev in zip(paths, last)]
+        pnl = sum(leg.weight * (c - e) for leg, c, e in zip(legs, last, entry))
+        if i == 0:
+            continue
+        if stop_loss is not None and pnl <= -stop_loss * premium:
+            return pnl, t, "stop_loss"
+        if profit_target is not None and pnl >= profit_target * premium:
+            return pnl, t, "profit_target"
+        if cut is not None and t >= cut(trade["expiry"]):
+            return pnl, t, "time_exit"
+    return pnl, bars[-1], "expiry"
+
+
+class TestOptionReplay:
+
+    def test_matches_per_bar_reference_with_exit_rules(self, tmp_path):
+        db_path = str(tmp_path / "market_data.db")
+        model = _build(db_path, n_expiries=8, drop=0.15)
+
+        result = OptionReplay(db_path).run("NIFTY", IRON_CONDOR, "2025-01-01", "2025-03-31",
+                                           entry_days_before=3, profit_target=0.3, stop_loss=0.6,
+                                           exit_time="14:00", strategy_name="Iron Condor")
+
+        def cut(expiry):
+            return datetime.fromisoformat(f"{expiry}T14:00:00+05:30")
+
+        assert result["total_trades"] == 8 and result["skipped"] == [] and result["interval"] == "5minute"
+        assert {t["exit_reason"] for t in result["trades"]} >= {"profit_target", "stop_loss"}
+        for trade in result["trades"]:
+            pnl, exit_at, reason = _reference(db_path, trade, IRON_CONDOR, "5minute", 0.3, 0.6, cut)
+            assert trade["pnl"] == pytest.approx(pnl, abs=1e-6)
+            assert trade["exit_time"] == exit_at.strftime("%Y-%m-%d %H:%M")
+            assert trade["exit_reason"] == reason
+
+            # Entry on the Monday open; parity spot is the model's spot when the ATM pair traded
+            stamps, spot = model[trade["expiry"]]
+            i = stamps.index(datetime.strptime(trade["date"], "%Y-%m-%d %H:%M").replace(tzinfo=IST).isoformat())
+            assert trade["date"].endswith("09:20")
+            assert min(abs(trade["spot"] - s) for s in spot[i:i + 4]) < 0.05
+            assert abs(trade["atm"] - trade["spot"]) <= 25 + 0.05
+
+        assert result["total_pnl"] == pytest.approx(sum(t["pnl"] for t in result["trades"]), abs=0.05)
+        assert result["equity_curve"][-1] == pytest.approx(result["total_pnl"], abs=0.05)
+
+    def test_hold_to_expiry_and_slippage(self, tmp_path):
+        db_path = str(tmp_path / "market_data.db")
+        _build(db_path, n_expiries=3)
+        replay = OptionReplay(db_path)
+
+        held = replay.run("NIFTY", STRATEGIES["bull_call_spread"][1], "2025-01-01", "2025-01-31")
+        slipped = replay.run("NIFTY", STRATEGIES["bull_call_spread"][1], "2025-01-01", "2025-01-31",
+                             slippage=0.5)
+
+        for trade, with_cost in zip(held["trades"], slipped["trades"]):
+            pnl, exit_at, reason = _reference(db_path, trade, STRATEGIES["bull_call_spread"][1], "5minute")
+            assert reason == trade["exit_reason"] == "expiry" and trade["exit_time"].endswith("15:25")
+            assert trade["pnl"] == pytest.approx(pnl, abs=1e-6)
+            assert trade["side"] == "DEBIT"
+            assert with_cost["pnl"] == pytest.approx(trade["pnl"] - 2 * 0.5 * 100)
+
+    def test_missing_data_is_skipped_or_reported(self, tmp_path):
+        db_path = str(tmp_path / "market_data.db")
+        _build(db_path, n_expiries=2)
+        conn = sqlite3.connect(db_path)
+        conn.execute("DELETE FROM expired_candles WHERE instrument_key LIKE '%|09-01-2025'")
+        conn.commit()
+        conn.close()
+        replay = OptionReplay(db_path)
+
+        result = replay.run("NIFTY", IRON_CONDOR, "2025-01-01", "2025-01-31")
+        assert [t["expiry"] for t in result["trades"]] == ["2025-01-02"]
+        assert result["skipped"] == [{"expiry": "2025-01-09", "reason": "no candles at entry"}]
+
+        wide = [LegSpec("PE", "BUY", -1000), LegSpec("CE", "BUY", 1000)]
+        assert "No expiry had prices" in replay.run("NIFTY", wide, "2025-01-01", "2025-01-31")["error"]
+        assert "No expired BANKNIFTY" in replay.run("BANKNIFTY", wide, "2025-01-01", "2025-01-31")["error"]
+
+    def test_backtest_job_handler_runs_replay(self, tmp_path, monkeypatch):
+        from backend.services.jobs import handlers
+
+        db_path = str(tmp_path / "market_data.db")
+        _build(db_path, n_expiries=2)
+        monkeypatch.setattr(handlers, "DB_PATH", db_path)
+        updates = []
+
+        class Ctx:
+            def progress(self, fraction, message=None):
+                updates.append(fraction)
+
+        result = handlers.backtest_strategy(Ctx(), "iron_condor", "2025-01-01", "2025-01-31",
+                                            underlying="NIFTY", profit_target=0.5)
+        assert result["strategy_name"] == "Iron Condor" and result["total_trades"] == 2
+        assert updates == sorted(updates) and updates
+        with pytest.raises(ValueError):
+            handlers.backtest_strategy(Ctx(), "iron_condor", "2024-01-01", "2024-01-31")
+
+
+@pytest.mark.slow
+def test_benchmark_year_of_weekly_condors(tmp_path):
+    """52 weekly NIFTY expiries of 1-minute candles: per-expiry full-chain pandas load vs replay"""
+    import pandas as pd
+
+    db_path = str(tmp_path / "market_data.db")
+    _build(db_path, n_expiries=52, strikes=range(23000, 24001, 100), interval="1minute")
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT COUNT(*) FROM expired_candles").fetchone()[0]
+
+    # Naive: read each expiry's whole chain into pandas and pivot it
+    start = time.perf_counter()
+    for expiry, in conn.execute("SELECT DISTINCT expiry_date FROM expired_options").fetchall():
+        keys = [f"NSE_FO|{token}|{date.fromisoformat(expiry):%d-%m-%Y}" for token, in conn.execute(
+            "SELECT exchange_token FROM expired_options WHERE expiry_date = ?", (expiry,))]
+        df = pd.read_sql(f"SELECT instrument_key, timestamp, close FROM expired_candles "
+                         f"WHERE instrument_key IN ({','.join('?' * len(keys))})", conn, params=keys)
+        df.pivot(index="timestamp", columns="instrument_key", values="close").ffill()
+    naive_s = time.perf_counter() - start
+    conn.close()
+
+    start = time.perf_counter()
+    result = OptionReplay(db_path).run("NIFTY", IRON_CONDOR, "2025-01-01", "2025-12-31",
+                                       profit_target=0.5, stop_loss=1.0, exit_time="15:15")
+    replay_s = time.perf_counter() - start
+
+    print(f"{rows:,} stored candles, 52 expiries: naive chain load {naive_s:.2f}s -> "
+          f"replay {replay_s:.2f}s ({result['total_trades']} trades, "
+          f"{4 * sum(t['bars_held'] for t in result['trades']):,} leg-bars marked)")
+    assert result["total_trades"] + len(result["skipped"]) == 52 and replay_s < naive_s
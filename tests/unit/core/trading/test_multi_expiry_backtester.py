@@ -0,0 +1,182 @@
+"""
+Unit tests for the expiry calendar and the vectorized multi-expiry backtester
+"""
+
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent))
+
+from backend.core.trading import multi_expiry_strategies as mes
+from backend.core.trading.expiry_calendar import ExpiryCalendar, from_day, to_day
+from backend.core.trading.multi_expiry_strategies import (
+    MultiExpiryBacktester,
+    MultiExpiryStrategy,
+    create_calendar_spread,
+    create_double_calendar,
+)
+
+HOLIDAYS = ["2025-10-21", "2025-12-25", "2026-01-26", "2026-03-31"]  # Tue, Thu, Mon, Tue
+
+
+@pytest.fixture
+def calendar():
+    return ExpiryCalendar(HOLIDAYS)
+
+
+def price_history(start="2025-09-01", end="2026-08-31", seed=7):
+    dates = pd.bdate_range(start, end)
+    rng = np.random.default_rng(seed)
+    close = 24000 + np.cumsum(rng.normal(0, 60, len(dates)))
+    return pd.DataFrame({"date": dates.strftime("%Y-%m-%d"), "close": close})
+
+
+def reference_backtest(strategy, data, calendar, roll_days_before=3):
+    """Row-by-row loop over the scalar leg methods, rolling via ExpiryRoller"""
+    backtester = MultiExpiryBacktester(calendar)
+    legs = list(strategy.legs)
+    pnls = []
+    for _, row in data.iterrows():
+        current_date, price = row["date"], row["close"]
+        for i, leg in enumerate(legs):
+            if backtester.roller.should_roll(leg, current_date, roll_days_before):
+                next_expiry = from_day(calendar.next_expiry(to_day(current_date), after=roll_days_before))
+                legs[i], _ = backtester.roller.roll_position(leg, next_expiry, price, current_date)
+        pnls.append(MultiExpiryStrategy(strategy.name, legs, price).calculate_pnl(price, current_date))
+    return pnls, backtester.roller.roll_history
+
+
+class TestExpiryCalendar:
+
+    def test_weekly_expiry_moves_back_over_holidays(self, calendar):
+        assert from_day(calendar.next_expiry(to_day("2025-10-15"))) == "2025-10-20"
+        assert from_day(calendar.next_expiry(to_day("2025-12-22"))) == "2025-12-23"
+        assert from_day(calendar.next_expiry(to_day("2026-01-19"))) == "2026-01-20"
+        # Strictly after: on expiry day the next one is a week out
+        assert from_day(calendar.next_expiry(to_day("2026-01-20"))) == "2026-01-27"
+
+    def test_monthly_is_last_expiry_of_month(self, calendar):
+        assert from_day(calendar.next_expiry(to_day("2026-01-05"), "monthly")) == "2026-01-27"
+        assert from_day(calendar.next_expiry(to_day("2026-03-02"), "monthly")) == "2026-03-30"
+        assert calendar.weekly.dtype == np.int64 and np.all(np.diff(calendar.monthly) > 0)
+
+    def test_expiry_weekday_moves_from_thursday_to_tuesday(self, calendar):
+        # Last Thursday expiries before 1 Sep 2025, Tuesdays from then on
+        assert from_day(calendar.next_expiry(to_day("2025-08-25"))) == "2025-08-28"
+        assert from_day(calendar.next_expiry(to_day("2025-08-28"))) == "2025-09-02"
+        assert from_day(calendar.next_expiry(to_day("2025-08-01"), "monthly")) == "2025-08-28"
+        assert from_day(calendar.next_expiry(to_day("2025-08-28"), "monthly")) == "2025-09-30"
+        assert from_day(calendar.next_expiry(to_day("2024-06-03"))) == "2024-06-06"
+
+        thursdays = ExpiryCalendar(HOLIDAYS, weekdays=(("2000-01-01", 3),))
+        assert from_day(thursdays.next_expiry(to_day("2026-01-19"))) == "2026-01-22"
+
+    def test_vectorized_lookup_with_offset(self, calendar):
+        days = to_day(["2026-01-05", "2026-01-06", "2026-01-07"])
+        assert [from_day(d) for d in calendar.next_expiry(days, after=3)] == [
+            "2026-01-13", "2026-01-13", "2026-01-13"]
+        with pytest.raises(ValueError):
+            calendar.next_expiry(to_day("2051-01-01"))
+
+    def test_holidays_loaded_from_market_info_cache(self, tmp_path):
+        db = tmp_path / "market_data.db"
+        conn = sqlite3.connect(db)
+        conn.execute("CREATE TABLE market_holidays (id INTEGER PRIMARY KEY, date DATE, "
+                     "holiday_name TEXT, exchange TEXT, segment TEXT)")
+        conn.executemany("INSERT INTO market_holidays (date, holiday_name, exchange) VALUES (?, ?, ?)",
+                         [("2025-10-02", "Gandhi Jayanti", "NSE"), ("2025-12-25", "Christmas", None),
+                          ("2026-01-27", "BSE only", "BSE")])
+        conn.commit()
+        conn.close()
+
+        cal = ExpiryCalendar.from_db(str(db))
+        assert [from_day(d) for d in cal.holidays] == ["2025-10-02", "2025-12-25"]
+        assert from_day(cal.next_expiry(to_day("2026-01-23"))) == "2026-01-27"
+        assert len(ExpiryCalendar.from_db(str(tmp_path / "missing.db")).holidays) == 0
+
+
+class TestMultiExpiryBacktester:
+
+    def test_matches_row_by_row_rolling(self, calendar):
+        data = price_history()
+        strategy = create_double_calendar(24000, "2025-09-11", "2025-09-25")
+
+        result = MultiExpiryBacktester(calendar).backtest_with_rolling(
+            strategy, data, "2025-09-01", "2026-08-31")
+        expected_pnls, expected_rolls = reference_backtest(strategy, data, calendar)
+
+        assert [r["date"] for r in result["daily_results"]] == data["date"].tolist()
+        np.testing.assert_allclose([r["pnl"] for r in result["daily_results"]], expected_pnls, rtol=1e-9)
+        assert len(result["roll_history"]) == len(expected_rolls) > 100
+        for got, want in zip(result["roll_history"], expected_rolls):
+            assert got.keys() == want.keys()
+            assert {k: got[k] for k in ("roll_date", "old_expiry", "new_expiry")} == \
+                   {k: want[k] for k in ("roll_date", "old_expiry", "new_expiry")}
+            np.testing.assert_allclose([got["exit_pnl"], got["new_premium"], got["roll_cost"]],
+                                       [want["exit_pnl"], want["new_premium"], want["roll_cost"]])
+
+        summary = result["summary"]
+        assert summary["num_rolls"] == len(expected_rolls)
+        assert summary["total_pnl"] == pytest.approx(sum(expected_pnls))
+        assert summary["total_roll_cost"] == pytest.approx(sum(r["roll_cost"] for r in expected_rolls))
+        # Rolled legs land on holiday-adjusted expiries more than 3 days away
+        assert {r["new_expiry"] for r in result["roll_history"]} >= {"2025-10-20", "2026-03-30"}
+        assert all((to_day(r["new_expiry"]) - to_day(r["roll_date"])) > 3 for r in result["roll_history"])
+
+    def test_without_rolling_matches_strategy_pnl(self, calendar):
+        data = price_history(end="2025-10-31")
+        strategy = create_calendar_spread(24000, 24000, "2025-09-25", "2025-10-30")
+
+        result = MultiExpiryBacktester(calendar).backtest_with_rolling(
+            strategy, data, "2025-09-15", "2025-10-31", auto_roll=False)
+
+        window = data[data["date"] >= "2025-09-15"]
+        expected = [strategy.calculate_pnl(p, d) for d, p in zip(window["date"], window["close"])]
+        np.testing.assert_allclose([r["pnl"] for r in result["daily_results"]], expected, rtol=1e-12)
+        assert result["roll_history"] == [] and result["summary"]["num_rolls"] == 0
+
+    def test_greeks_are_as_of_each_row(self, calendar, monkeypatch):
+        data = price_history(end="2025-09-20")
+        strategy = create_calendar_spread(24000, 24000, "2025-10-30", "2025-11-27")
+        result = MultiExpiryBacktester(calendar).backtest_with_rolling(
+            strategy, data, "2025-09-01", "2025-09-20")
+
+        for row in result["daily_results"][::4]:
+            class FrozenDatetime(datetime):
+                @classmethod
+                def now(cls, tz=None):
+                    return datetime.strptime(row["date"], "%Y-%m-%d")
+
+            monkeypatch.setattr(mes, "datetime", FrozenDatetime)
+            expected = strategy.get_portfolio_greeks(row["underlying_price"])
+            for greek in ("delta", "gamma", "vega", "theta"):
+                assert row[greek] == pytest.approx(expected[greek])
+
+
+@pytest.mark.slow
+def test_benchmark_backtest_with_rolling(calendar):
+    """Five years of daily rows, four legs: per-row strptime loop vs arrays"""
+    data = price_history("2021-01-01", "2025-12-31")
+    strategy = create_double_calendar(24000, "2021-01-07", "2021-01-28")
+
+    start = time.perf_counter()
+    expected_pnls, _ = reference_backtest(strategy, data, calendar)
+    for _, row in data.iterrows():
+        strategy.get_portfolio_greeks(row["close"])
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = MultiExpiryBacktester(calendar).backtest_with_rolling(strategy, data, "2021-01-01", "2025-12-31")
+    vector_time = time.perf_counter() - start
+
+    print(f"backtest_with_rolling ({len(data)} days x 4 legs, {result['summary']['num_rolls']} rolls): "
+          f"iterrows {loop_time * 1000:.0f}ms -> arrays {vector_time * 1000:.1f}ms")
+    np.testing.assert_allclose([r["pnl"] for r in result["daily_results"]], expected_pnls, rtol=1e-9)
+    assert vector_time < loop_time
@@ -0,0 +1,153 @@
+"""
+Unit tests for the session-aligned candle resampler
+"""
+
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent))
+
+from backend.data.database.candle_resampler import IST, CandleResampler, bucket_start
+
+SCHEMA_DIR = Path(__file__).parent.parent.parent.parent.parent / "backend" / "database" / "schema"
+
+MONDAY = datetime(2026, 2, 9, tzinfo=IST)
+
+
+def _epoch(day, hh, mm):
+    return int((MONDAY + timedelta(days=day, hours=hh, minutes=mm)).timestamp())
+
+
+def _bars(key, days, offset=0.0):
+    """75 five-minute session bars per day plus a pre-open bar that must be ignored"""
+    rows = []
+    for day in days:
+        start = MONDAY + timedelta(days=day, hours=9, minutes=15)
+        rows.append((key, (start - timedelta(minutes=15)).isoformat(), 1.0, 1e6, 0.0, 1.0, 10 ** 9))
+        for i in range(75):
+            ts = start + timedelta(minutes=5 * i)
+            price = 100 + offset + day * 3 + (i % 17) - (i % 5) * 0.5
+            rows.append((key, ts.isoformat(), price, price + 1 + i % 3, price - 1 - i % 4, price + 0.25, 100 + i))
+    return rows
+
+
+def _insert(db_path, rows):
+    conn = sqlite3.connect(db_path)
+    conn.executescript((SCHEMA_DIR / "option_equity_schema.sql").read_text())
+    conn.executemany(
+        "INSERT INTO option_equity_intraday_ohlcv (instrument_key, timestamp, open, high, low, close, volume) "
+        "VALUES (?,?,?,?,?,?,?)", rows)
+    conn.commit()
+    conn.close()
+
+
+def _reference(rows, rule):
+    """pandas resample of the session bars in IST, buckets anchored at 09:15"""
+    df = pd.DataFrame(rows, columns=["key", "ts", "open", "high", "low", "close", "volume"])
+    df["ts"] = pd.to_datetime(df["ts"])
+    df = df[df["ts"].dt.strftime("%H:%M").between("09:15", "15:29")].set_index("ts")
+    kwargs = {"origin": "start_day", "offset": "9h15min"} if rule not in ("1D", "W-MON") else {}
+    if rule == "W-MON":
+        kwargs = {"label": "left", "closed": "left"}
+    out = df.groupby("key").resample(rule, **kwargs).agg(
+        {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+    ).dropna()
+    return [(int(ts.timestamp()), *vals) for (_, ts), vals in zip(out.index, out.itertuples(index=False))]
+
+
+class TestBucketAlignment:
+
+    def test_intraday_buckets_anchor_at_session_open(self):
+        assert bucket_start(_epoch(0, 10, 14), "1h") == _epoch(0, 9, 15)
+        assert bucket_start(_epoch(0, 15, 25), "1h") == _epoch(0, 15, 15)
+        assert bucket_start(_epoch(0, 9, 44), "15m") == _epoch(0, 9, 30)
+        assert bucket_start(_epoch(2, 14, 0), "1d") == _epoch(2, 0, 0)
+        assert bucket_start(_epoch(4, 11, 0), "1w") == _epoch(0, 0, 0)
+
+
+class TestCandleResampler:
+
+    def test_matches_pandas_reference(self, tmp_path):
+        db_path = str(tmp_path / "market_data.db")
+        rows = _bars("NSE_EQ|A", range(5)) + _bars("NSE_EQ|B", range(5), offset=50)
+        _insert(db_path, rows)
+        resampler = CandleResampler(db_path)
+
+        stats = resampler.refresh("intraday")
+
+        assert stats["instruments"] == 2
+        for timeframe, rule in (("15m", "15min"), ("1h", "60min"), ("1d", "1D"), ("1w", "W-MON")):
+            got = resampler.get_candles("NSE_EQ|A", timeframe) + resampler.get_candles("NSE_EQ|B", timeframe)
+            assert got == pytest.approx(_reference(rows, rule)), timeframe
+        assert len(resampler.get_candles("NSE_EQ|A", "1h")) == 5 * 7  # 09:15 ... 15:15
+        assert len(resampler.get_candles("NSE_EQ|A", "5m")) == 5 * 76   # base bars read as stored
+
+    def test_unmaterialized_timeframes_fold_on_read(self, tmp_path):
+        db_path = str(tmp_path / "market_data.db")
+        rows = _bars("NSE_EQ|A", range(3))
+        _insert(db_path, rows)
+        resampler = CandleResampler(db_path)
+        resampler.refresh("intraday")
+
+        for timeframe, rule in (("10m", "10min"), ("2h", "120min")):
+            assert resampler.get_candles("NSE_EQ|A", timeframe) == pytest.approx(_reference(rows, rule)), timeframe
+        assert resampler.get_candles("NSE_EQ|A", "2h", start=_epoch(1, 10, 0), end=_epoch(1, 23, 0)) == \
+            pytest.approx([c for c in _reference(rows, "120min") if _epoch(1, 10, 0) <= c[0] <= _epoch(1, 23, 0)])
+
+        assert "3m" not in resampler.supported_timeframes("intraday")
+        assert "3m" in resampler.supported_timeframes("candles")
+        with pytest.raises(ValueError):
+            resampler.get_candles("NSE_EQ|A", "3m")
+
+    def test_incremental_refresh_equals_rebuild(self, tmp_path):
+        db_path = str(tmp_path / "market_data.db")
+        rows = _bars("NSE_EQ|A", range(3))
+        resampler = CandleResampler(db_path)
+
+        _insert(db_path, rows[:100])
+        resampler.refresh("intraday")
+        for lo in range(100, len(rows), 7):  # poll-sized increments, mid-bucket
+            _insert(db_path, rows[lo:lo + 7])
+            resampler.refresh("intraday")
+        incremental = {tf: resampler.get_candles("NSE_EQ|A", tf) for tf in ("15m", "30m", "1h", "1d", "1w")}
+
+        assert not resampler.has_new_bars("intraday")
+        assert resampler.refresh("intraday")["new_bars"] == 0
+        resampler.rebuild("intraday")
+        for tf, candles in incremental.items():
+            assert candles == resampler.get_candles("NSE_EQ|A", tf), tf
+
+    def test_candles_source_builds_from_1m(self, tmp_path):
+        db_path = str(tmp_path / "market_data.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute("""
+            CREATE TABLE candles_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, symbol TEXT, instrument_key TEXT, timeframe TEXT,
+                timestamp INTEGER, open REAL, high REAL, low REAL, close REAL, volume INTEGER,
+                UNIQUE(instrument_key, timeframe, timestamp))
+        """)
+        start = _epoch(0, 9, 15)
+        conn.executemany(
+            "INSERT INTO candles_new (symbol, instrument_key, timeframe, timestamp, open, high, low, close, volume) "
+            "VALUES ('INFY', 'NSE_EQ|INFY', '1m', ?, ?, ?, ?, ?, 10)",
+            [(start + 60 * i, 100 + i, 101 + i, 99 + i, 100.5 + i) for i in range(375)])
+        conn.commit()
+        conn.close()
+        resampler = CandleResampler(db_path)
+        assert not resampler.has_new_bars("intraday")  # Table missing
+
+        assert resampler.has_new_bars("candles")
+        resampler.refresh("candles")
+        assert not resampler.has_new_bars("candles")
+
+        five = resampler.get_candles("NSE_EQ|INFY", "5m", source="candles")
+        assert len(five) == 75 and five[0] == (start, 100, 105, 99, 104.5, 50)
+        assert resampler.get_candles("NSE_EQ|INFY", "1d", source="candles") == [
+            (_epoch(0, 0, 0), 100, 475, 99, 474.5, 3750)]
+        three = resampler.get_candles("NSE_EQ|INFY", "3m", source="candles")
+        assert len(three) == 125 and three[0] == (start, 100, 103, 99, 102.5, 30)
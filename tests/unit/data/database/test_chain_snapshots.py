@@ -0,0 +1,170 @@
+"""
+Unit tests for the epoch-keyed option chain snapshot store
+"""
+
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent))
+
+from backend.data.database.chain_snapshots import ChainSnapshotStore, chain_aggregates, max_pain, to_epoch
+
+SCHEMA_DIR = Path(__file__).parent.parent.parent.parent.parent / "backend" / "database" / "schema"
+
+KEY = "NSE_INDEX|Nifty 50"
+EXPIRY = "2026-02-26"
+DAY_START = to_epoch("2026-02-10T09:15:00")
+
+
+def _rows(step, n_strikes=5):
+    """Snapshot rows (SNAPSHOT_COLUMNS layout) whose OI grows by step per snapshot"""
+    return [
+        (22000.0 + 50 * i,
+         100.0 - i, 1000 + 10 * step * (i + 1), 50 * step, 12.0, 0.5,
+         20.0 + i, 2000 + 5 * step * (i + 1), 40 * step, 13.0, -0.5)
+        for i in range(n_strikes)
+    ]
+
+
+def _fill(store, snapshots, n_strikes=5):
+    conn = store.connect()
+    store.init_schema(conn)
+    for step in range(snapshots):
+        store.save_snapshot(conn, KEY, EXPIRY, DAY_START + 300 * step, _rows(step, n_strikes), spot=22100.0)
+    conn.commit()
+    conn.close()
+
+
+class TestAggregates:
+
+    def test_max_pain_matches_brute_force(self):
+        strikes = [100.0, 110.0, 120.0, 130.0]
+        ce_oi = [10, 40, 80, 5]
+        pe_oi = [90, 30, 10, 2]
+
+        def payout(s):
+            return sum(c * max(s - k, 0) + p * max(k - s, 0) for k, c, p in zip(strikes, ce_oi, pe_oi))
+
+        assert max_pain(strikes, ce_oi, pe_oi) == min(strikes, key=payout)
+        assert max_pain([], [], []) is None
+
+    def test_totals_and_pcr_tolerate_missing_values(self):
+        rows = [(100.0, 1.0, 200, 10, None, None, 2.0, 300, 20, None, None),
+                (110.0, 1.0, None, None, None, None, 2.0, 100, 5, None, None)]
+
+        agg = chain_aggregates(rows)
+
+        assert (agg["total_ce_oi"], agg["total_pe_oi"], agg["strikes"]) == (200, 400, 2)
+        assert agg["pcr_oi"] == 2.0
+        assert agg["pcr_volume"] == 2.5
+
+
+class TestChainSnapshotStore:
+
+    def test_chain_as_of_returns_latest_snapshot_at_or_before(self, tmp_path):
+        store = ChainSnapshotStore(str(tmp_path / "market_data.db"))
+        _fill(store, snapshots=4)
+
+        chain = store.chain_as_of(KEY, EXPIRY, DAY_START + 300 * 2 + 299)
+
+        assert chain["ts"] == DAY_START + 600
+        assert [r["strike_price"] for r in chain["chain"]] == [22000.0 + 50 * i for i in range(5)]
+        assert chain["chain"][0]["ce_oi"] == 1020
+        assert chain["total_ce_oi"] == sum(r["ce_oi"] for r in chain["chain"])
+        assert chain["spot"] == 22100.0
+        assert store.chain_as_of(KEY, EXPIRY, DAY_START - 1) is None
+
+    def test_oi_change_between_snapshots(self, tmp_path):
+        store = ChainSnapshotStore(str(tmp_path / "market_data.db"))
+        _fill(store, snapshots=4)
+
+        change = store.oi_change(KEY, EXPIRY, datetime.fromtimestamp(DAY_START), DAY_START + 900)
+
+        assert (change["from_ts"], change["to_ts"]) == (DAY_START, DAY_START + 900)
+        first = change["strikes"][0]
+        assert (first["ce_oi_change"], first["pe_oi_change"]) == (30, 15)
+        assert first["ce_ltp_change"] == 0
+
+    def test_summary_series_and_prune(self, tmp_path):
+        store = ChainSnapshotStore(str(tmp_path / "market_data.db"))
+        _fill(store, snapshots=4)
+
+        series = store.summary_series(KEY, EXPIRY, DAY_START, DAY_START + 900)
+        assert [s["ts"] for s in series] == store.snapshot_times(KEY, EXPIRY)
+        assert all(s["pcr_oi"] > 0 and s["max_pain"] is not None for s in series)
+
+        assert store.prune(DAY_START + 600) == 10
+        assert store.chain_as_of(KEY, EXPIRY, DAY_START)["chain"] == []
+        assert len(store.snapshot_times(KEY, EXPIRY)) == 4
+
+
+def _wide_as_of(db_path, at_iso):
+    """The previous access path: string timestamps scanned in the wide table"""
+    conn = sqlite3.connect(db_path)
+    try:
+        ts = conn.execute(
+            "SELECT MAX(timestamp) FROM optionchain_intrday_schema "
+            "WHERE underlying_key = ? AND expiry_date = ? AND timestamp <= ?", (KEY, EXPIRY, at_iso)
+        ).fetchone()[0]
+        return conn.execute(
+            "SELECT strike_price, ce_oi, pe_oi FROM optionchain_intrday_schema "
+            "WHERE underlying_key = ? AND expiry_date = ? AND timestamp = ? ORDER BY strike_price",
+            (KEY, EXPIRY, ts),
+        ).fetchall()
+    finally:
+        conn.close()
+
+
+@pytest.mark.slow
+def test_benchmark_full_day_as_of_and_oi_change(tmp_path):
+    """75 five-minute snapshots x 150 strikes x 50 underlyings: as-of and OI change latency"""
+    db_path = str(tmp_path / "market_data.db")
+    store = ChainSnapshotStore(db_path)
+    conn = store.connect()
+    conn.executescript((SCHEMA_DIR / "option_chain_schema.sql").read_text())
+    store.init_schema(conn)
+
+    underlyings = [KEY] + [f"NSE_EQ|SYM{i}" for i in range(49)]
+    for step in range(75):
+        ts = DAY_START + 300 * step
+        iso = datetime.fromtimestamp(ts).isoformat()
+        for key in underlyings:
+            rows = [(20000.0 + 50 * i, 10.0, 1000 + step, 10, 12.0, 0.5, 10.0, 900 + step, 10, 12.0, -0.5)
+                    for i in range(150)]
+            conn.executemany(
+                "INSERT INTO optionchain_intrday_schema (underlying_key, expiry_date, timestamp, strike_price, "
+                "ce_ltp, ce_oi, pe_ltp, pe_oi) VALUES (?,?,?,?,?,?,?,?)",
+                [(key, EXPIRY, iso, r[0], r[1], r[2], r[6], r[7]) for r in rows])
+            store.save_snapshot(conn, key, EXPIRY, ts, rows, spot=23700.0)
+    conn.commit()
+    conn.close()
+
+    at = DAY_START + 300 * 60 + 17
+    runs = 20
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        old = _wide_as_of(db_path, datetime.fromtimestamp(at).isoformat())
+    wide_ms = (time.perf_counter() - start) * 1000 / runs
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        chain = store.chain_as_of(KEY, EXPIRY, at)
+    as_of_ms = (time.perf_counter() - start) * 1000 / runs
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        change = store.oi_change(KEY, EXPIRY, DAY_START, at)
+    change_ms = (time.perf_counter() - start) * 1000 / runs
+
+    print(f"chain as of T: {wide_ms:.2f}ms (wide table) -> {as_of_ms:.2f}ms (snapshot store)")
+    print(f"OI change T1..T2: {change_ms:.2f}ms")
+    assert len(chain["chain"]) == len(old) == 150
+    assert change["strikes"][0]["ce_oi_change"] == 60
+    assert as_of_ms < wide_ms
+    assert change_ms < 50
@@ -0,0 +1,104 @@
+"""
+Unit tests for the snapshot retention / rollup manager
+"""
+
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent))
+
+from backend.data.database.retention_manager import RetentionManager, archive_path
+
+SCHEMA_DIR = Path(__file__).parent.parent.parent.parent.parent / "backend" / "database" / "schema"
+
+
+@pytest.fixture
+def manager(tmp_path):
+    db_path = tmp_path / "market_data.db"
+    conn = sqlite3.connect(db_path)
+    conn.executescript((SCHEMA_DIR / "fo_quote_schema.sql").read_text())
+    conn.executescript((SCHEMA_DIR / "option_chain_schema.sql").read_text())
+
+    # Two old days (Jan) and one recent day (Feb) of 5-minute snapshots
+    quotes = []
+    chain = []
+    for day in ("2026-01-29", "2026-01-30", "2026-02-10"):
+        for i, minute in enumerate((15, 20, 25, 30)):
+            ts = f"{day}T09:{minute:02d}:00.123456"
+            quotes.append(("NSE_EQ|A", ts, 100.0, 110.0, 90.0, 100.0 + i, 1000 * (i + 1), 50.0 + i))
+            chain.append(("NSE_INDEX|Nifty 50", "2026-02-26", ts, 22000.0,
+                          10.0 + i, 500 + 10 * i, 20.0 - i, 700 - 10 * i))
+    conn.executemany(
+        "INSERT INTO market_quota_fo_data (instrument_key, timestamp, open, high, low, close, volume, oi) "
+        "VALUES (?,?,?,?,?,?,?,?)", quotes)
+    conn.executemany(
+        "INSERT INTO optionchain_intrday_schema (underlying_key, expiry_date, timestamp, strike_price, "
+        "ce_ltp, ce_oi, pe_ltp, pe_oi) VALUES (?,?,?,?,?,?,?,?)", chain)
+    conn.commit()
+    conn.close()
+
+    return RetentionManager(db_path=str(db_path), archive_dir=str(tmp_path / "archive"), retention_days=7)
+
+
+class TestRetentionManager:
+
+    def test_run_rolls_up_and_archives_old_rows(self, manager):
+        summary = manager.run(now=datetime(2026, 2, 12))
+        assert summary["cutoff"] == "2026-02-05"
+
+        conn = sqlite3.connect(manager.db_path)
+        # Only the recent day stays hot
+        assert conn.execute("SELECT COUNT(*) FROM market_quota_fo_data").fetchone()[0] == 4
+        assert conn.execute("SELECT COUNT(*) FROM optionchain_intrday_schema").fetchone()[0] == 4
+
+        # 09:15 bucket holds 09:15/09:20/09:25, 09:30 starts a new one
+        rows = conn.execute("""
+            SELECT bucket, open, high, low, close, volume, oi, samples FROM market_quota_rollup
+            WHERE interval = '15m' AND bucket LIKE '2026-01-29%' ORDER BY bucket
+        """).fetchall()
+        assert rows == [
+            ("2026-01-29 09:15:00", 100.0, 102.0, 100.0, 102.0, 3000, 52.0, 3),
+            ("2026-01-29 09:30:00", 103.0, 103.0, 103.0, 103.0, 4000, 53.0, 1),
+        ]
+
+        daily = conn.execute("""
+            SELECT bucket, open, high, low, close FROM market_quota_rollup
+            WHERE interval = '1d' ORDER BY bucket
+        """).fetchall()
+        assert daily == [("2026-01-29", 100.0, 110.0, 90.0, 103.0), ("2026-01-30", 100.0, 110.0, 90.0, 103.0)]
+
+        ce_close, ce_oi_change, pe_oi_change = conn.execute("""
+            SELECT ce_close, ce_oi_change, pe_oi_change FROM optionchain_rollup
+            WHERE interval = '1d' AND bucket = '2026-01-30'
+        """).fetchone()
+        assert (ce_close, ce_oi_change, pe_oi_change) == (13.0, 30, -30)
+        conn.close()
+
+        archive = sqlite3.connect(archive_path("2026-01", manager.archive_dir))
+        assert archive.execute("SELECT COUNT(*) FROM market_quota_fo_data").fetchone()[0] == 8
+        assert archive.execute("SELECT COUNT(*) FROM optionchain_intrday_schema").fetchone()[0] == 8
+        archive.close()
+
+    def test_query_snapshots_spans_archive_and_hot_table(self, manager):
+        manager.run(now=datetime(2026, 2, 12))
+
+        rows = manager.query_snapshots(
+            "market_quota_fo_data", "2026-01-30", "2026-02-11",
+            where="instrument_key = ?", params=("NSE_EQ|A",),
+        )
+        assert len(rows) == 8
+        assert rows[0]["timestamp"].startswith("2026-01-30")
+        assert rows[-1]["timestamp"].startswith("2026-02-10")
+
+    def test_rerun_is_idempotent(self, manager):
+        manager.run(now=datetime(2026, 2, 12))
+        second = manager.run(now=datetime(2026, 2, 12))
+
+        assert second["tables"]["market_quota_fo_data"]["archived"] == 0
+        conn = sqlite3.connect(manager.db_path)
+        assert conn.execute("SELECT COUNT(*) FROM market_quota_rollup").fetchone()[0] == 6
+        conn.close()
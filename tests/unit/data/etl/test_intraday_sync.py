@@ -0,0 +1,173 @@
+"""
+Unit tests for the incremental intraday candle sync state
+"""
+
+import json
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent))
+
+from backend.data.etl.intraday_sync import BAR_SECONDS, IntradaySyncState
+from backend.services.market_data.market_calendar import IST, MarketCalendar
+
+KEY = "NSE_EQ|INE002A01018"
+
+
+def ist(text):
+    return datetime.strptime(text, "%Y-%m-%d %H:%M:%S").replace(tzinfo=IST).timestamp()
+
+
+def bars(day, start="09:15:00", end="15:30:00", skip=()):
+    """Newest-first Upstox candles for [start, end) of a day"""
+    t, stop = ist(f"{day} {start}"), ist(f"{day} {end}")
+    out = []
+    while t < stop:
+        stamp = datetime.fromtimestamp(t, IST).isoformat()
+        if stamp not in skip:
+            out.append([stamp, 100.0, 101.0, 99.5, 100.5, 1200, 0])
+        t += BAR_SECONDS
+    return out[::-1]
+
+
+@pytest.fixture
+def calendar():
+    return MarketCalendar(["2026-01-26"], first_year=2025, last_year=2027)
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = str(tmp_path / "market_data.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE option_equity_intraday_ohlcv (instrument_key TEXT, timestamp TEXT, open REAL, "
+        "high REAL, low REAL, close REAL, volume INTEGER, UNIQUE(instrument_key, timestamp))"
+    )
+    conn.close()
+    return path
+
+
+def store(db, key, candles):
+    conn = sqlite3.connect(db)
+    with conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO option_equity_intraday_ohlcv VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(key, *c[:6]) for c in candles],
+        )
+    conn.close()
+
+
+class TestLiveLane:
+
+    def test_only_bars_after_the_stored_one_and_never_the_forming_bar(self, db, calendar):
+        store(db, KEY, bars("2026-01-05", end="10:00:00"))
+        sync = IntradaySyncState(db, calendar)
+        now = ist("2026-01-05 10:17:30")
+        sync.seed([KEY], now)
+        assert sync.last_bar[KEY] == "2026-01-05T09:55:00+05:30"
+
+        cutoff = sync.closed_cutoff(now)
+        assert cutoff == "2026-01-05T10:10:00+05:30"
+        assert sync.needs_update(KEY, cutoff)
+
+        response = bars("2026-01-05", end="10:20:00")  # Includes the 10:15 bar still forming
+        new = sync.merge_intraday(KEY, response, cutoff)
+        assert [c[0][11:16] for c in new] == ["10:10", "10:05", "10:00"]
+        assert sync.last_bar[KEY] == cutoff and not sync.needs_update(KEY, cutoff)
+        assert sync.day_counts[(KEY, "2026-01-05")] == 12
+
+        # Same response next time: nothing new
+        assert sync.merge_intraday(KEY, response, cutoff) == []
+
+    def test_holes_earlier_today_are_filled_from_the_response(self, db, calendar):
+        hole = {"2026-01-05T09:30:00+05:30", "2026-01-05T09:35:00+05:30"}
+        store(db, KEY, bars("2026-01-05", end="10:00:00", skip=hole))
+        sync = IntradaySyncState(db, calendar)
+        now = ist("2026-01-05 10:05:10")
+        sync.seed([KEY], now)
+
+        new = sync.merge_intraday(KEY, bars("2026-01-05", end="10:05:00"), sync.closed_cutoff(now))
+        assert hole <= {c[0] for c in new}
+        store(db, KEY, new)
+        assert sync.day_counts[(KEY, "2026-01-05")] == 10
+
+    def test_unknown_instrument_takes_the_whole_day(self, db, calendar):
+        sync = IntradaySyncState(db, calendar)
+        now = ist("2026-01-05 09:31:00")
+        sync.seed([KEY], now)
+        new = sync.merge_intraday(KEY, bars("2026-01-05", end="09:35:00"), sync.closed_cutoff(now))
+        assert len(new) == 3 and sync.last_bar[KEY] == "2026-01-05T09:25:00+05:30"
+
+
+class TestBackfillLane:
+
+    def test_expected_bars_follow_the_session(self, calendar):
+        sync = IntradaySyncState(":memory:", calendar)
+        assert sync.expected_bars("2026-01-05", ist("2026-01-06 12:00:00")) == 75
+        assert sync.expected_bars("2026-01-05", ist("2026-01-05 09:31:00")) == 3
+        assert sync.expected_bars("2026-01-26", ist("2026-01-27 12:00:00")) == 0   # Holiday
+        assert sync.trading_days(2, ist("2026-01-27 10:00:00")) == ["2026-01-22", "2026-01-23"]
+
+    def test_incomplete_days_are_queued_once(self, db, calendar):
+        store(db, KEY, bars("2026-01-22") + bars("2026-01-23", end="12:00:00"))
+        full = "NSE_EQ|FULL"
+        for day in ("2026-01-19", "2026-01-20", "2026-01-21", "2026-01-22", "2026-01-23"):
+            store(db, full, bars(day))
+        sync = IntradaySyncState(db, calendar)
+        now = ist("2026-01-27 10:00:00")   # Monday the 26th is a holiday
+        sync.seed([KEY, full], now)
+
+        assert sync.trading_days(5, now) == ["2026-01-19", "2026-01-20", "2026-01-21", "2026-01-22", "2026-01-23"]
+        assert sync.plan_backfill([KEY, full], now) == 1
+        assert sync.plan_backfill([KEY, full], now) == 0
+        assert sync.next_backfill(10) == [(KEY, "2026-01-19", "2026-01-23")]
+
+        history = [c for day in ("2026-01-19", "2026-01-20", "2026-01-21", "2026-01-22", "2026-01-23")
+                   for c in bars(day)]
+        rows = sync.merge_backfill(KEY, history)
+        assert len(rows) == 375
+        assert sync.day_counts[(KEY, "2026-01-23")] == 75
+        assert sync.last_bar[KEY] == "2026-01-23T15:25:00+05:30"
+
+
+@pytest.mark.slow
+def test_benchmark_bytes_and_parse_per_cycle(calendar):
+    """Old cycle: 2-day history for every instrument, keep [:3]. New: today only, early-stop merge."""
+    keys = [f"NSE_EQ|K{i:03d}" for i in range(200)]
+    previous = bars("2026-01-06") + bars("2026-01-05")  # from_date = today - 2 days
+    old_bytes = new_bytes = 0
+    old_time = new_time = 0.0
+
+    sync = IntradaySyncState(":memory:", calendar)
+    for key in keys:
+        sync.last_bar[key] = previous[0][0]
+
+    for minute in range(9 * 60 + 20, 15 * 60 + 31, 5):  # Every cycle of a session
+        now = ist(f"2026-01-07 {minute // 60:02d}:{minute % 60:02d}:05")
+        today = bars("2026-01-07", end=datetime.fromtimestamp(now, IST).strftime("%H:%M:%S"))
+        old_payload = json.dumps({"status": "success", "data": {"candles": today + previous}}).encode()
+        new_payload = json.dumps({"status": "success", "data": {"candles": today}}).encode()
+        cutoff = sync.closed_cutoff(now)
+
+        start = time.perf_counter()
+        for _ in keys:
+            json.loads(old_payload)["data"]["candles"][:3]
+        old_time += time.perf_counter() - start
+        old_bytes += len(old_payload) * len(keys)
+
+        start = time.perf_counter()
+        for key in keys:
+            if sync.needs_update(key, cutoff):
+                sync.merge_intraday(key, json.loads(new_payload)["data"]["candles"], cutoff)
+        new_time += time.perf_counter() - start
+        new_bytes += len(new_payload) * len(keys)
+
+    print(f"per session, {len(keys)} instruments: {old_bytes / 2**20:.1f} MB -> {new_bytes / 2**20:.1f} MB, "
+          f"parse {old_time:.2f}s -> {new_time:.2f}s")
+    assert new_bytes * 4 < old_bytes
+    assert new_time * 2 < old_time
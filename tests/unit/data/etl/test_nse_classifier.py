@@ -0,0 +1,137 @@
+"""
+Unit tests for NSE Index Classifier
+"""
+
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent))
+
+from backend.data.database.schema_indices import create_index_constituents_v2_table
+from backend.data.etl.nse_index_classifier import NSEIndexClassifier
+
+
+def _create_tier1(conn: sqlite3.Connection, n: int):
+    conn.execute("""
+    CREATE TABLE instruments_tier1 (
+        instrument_key TEXT PRIMARY KEY,
+        symbol TEXT, isin TEXT, exchange TEXT, is_active INTEGER,
+        sector TEXT, industry TEXT, index_memberships TEXT,
+        is_nifty50 INTEGER DEFAULT 0, is_nifty100 INTEGER DEFAULT 0,
+        is_nifty200 INTEGER DEFAULT 0, is_nifty500 INTEGER DEFAULT 0,
+        is_niftynext50 INTEGER DEFAULT 0, is_midcap INTEGER DEFAULT 0,
+        is_smallcap INTEGER DEFAULT 0,
+        weight_nifty50 REAL, weight_nifty100 REAL, weight_nifty500 REAL,
+        last_updated TIMESTAMP
+    )
+    """)
+    conn.executemany(
+        "INSERT INTO instruments_tier1 (instrument_key, symbol, isin, exchange, is_active, sector) "
+        "VALUES (?, ?, ?, 'NSE', 1, ?)",
+        [(f"NSE_EQ|INE{i:06d}", f"SYM{i}", f"INE{i:06d}", "Old Sector") for i in range(n)],
+    )
+    create_index_constituents_v2_table(conn)
+    conn.commit()
+
+
+@pytest.fixture
+def classifier(tmp_path):
+    db_path = tmp_path / "market_data.db"
+    conn = sqlite3.connect(db_path)
+    _create_tier1(conn, 10)
+    conn.close()
+
+    clf = NSEIndexClassifier(db_path=db_path)
+    yield clf
+    clf.close()
+
+
+class TestNSEIndexClassifier:
+
+    def test_match_by_symbol_then_isin(self, classifier):
+        df = pd.DataFrame({
+            'symbol': [' SYM1 ', 'RENAMED', 'MISSING'],
+            'isin': ['INE000001', 'INE000002', 'INE999999'],
+        })
+
+        matched = classifier.match_to_instruments(df)
+
+        assert matched['instrument_key'].tolist() == ['NSE_EQ|INE000001', 'NSE_EQ|INE000002', None]
+        assert classifier.stats['constituents_matched'] == 2
+        assert classifier.stats['unmatched_symbols'] == ['MISSING']
+
+    def test_classify_dataframe_applies_flags_weights_memberships(self, classifier):
+        df = pd.DataFrame({
+            'symbol': ['SYM0', 'SYM1', 'SYM2'],
+            'company_name': ['A', 'B', 'C'],
+            'isin': ['INE000000', 'INE000001', 'INE000002'],
+            'weight': [10.5, None, 2.0],
+            'sector': ['Energy', None, 'IT'],
+            'industry': [None, None, 'Software'],
+        })
+
+        classifier.classify_dataframe('NIFTY50', df.copy())
+        classifier.classify_dataframe('NIFTY100', df.copy())
+        classifier.classify_dataframe('NIFTY50', df.copy())  # rerun must not duplicate
+
+        rows = {
+            r[0]: r[1:] for r in classifier.conn.execute("""
+                SELECT symbol, is_nifty50, is_nifty100, weight_nifty50, index_memberships, sector, industry
+                FROM instruments_tier1 ORDER BY symbol
+            """)
+        }
+        assert rows['SYM0'] == (1, 1, 10.5, 'NIFTY100,NIFTY50', 'Energy', None)
+        assert rows['SYM1'] == (1, 1, None, 'NIFTY100,NIFTY50', 'Old Sector', None)
+        assert rows['SYM2'] == (1, 1, 2.0, 'NIFTY100,NIFTY50', 'IT', 'Software')
+        assert rows['SYM3'] == (0, 0, None, None, 'Old Sector', None)
+
+        count = classifier.conn.execute(
+            "SELECT COUNT(*) FROM index_constituents_v2 WHERE index_code = 'NIFTY50'"
+        ).fetchone()[0]
+        assert count == 3
+
+    def test_direct_updates_restage_every_frame(self, classifier):
+        assert classifier._staged is None and classifier._staged_rows == 0
+        first = classifier.match_to_instruments(pd.DataFrame({'symbol': ['SYM0'], 'isin': ['INE000000']}))
+        second = classifier.match_to_instruments(pd.DataFrame({'symbol': ['SYM5'], 'isin': ['INE000005']}))
+
+        classifier.update_tier1_flags('NIFTY50', first)
+        classifier.update_tier1_flags('NIFTY50', second)
+
+        flagged = [r[0] for r in classifier.conn.execute(
+            "SELECT symbol FROM instruments_tier1 WHERE is_nifty50 = 1 ORDER BY symbol")]
+        assert flagged == ['SYM0', 'SYM5']
+
+    @pytest.mark.slow
+    def test_classify_18_indices_under_a_second(self, tmp_path):
+        db_path = tmp_path / "bench.db"
+        conn = sqlite3.connect(db_path)
+        _create_tier1(conn, 2500)
+        conn.close()
+
+        frames = {
+            f"IDX{i}": pd.DataFrame({
+                'symbol': [f"SYM{j}" for j in range(i * 100, i * 100 + 500)],
+                'company_name': 'X',
+                'isin': [f"INE{j:06d}" for j in range(i * 100, i * 100 + 500)],
+                'weight': 0.2,
+                'sector': 'Sector',
+                'industry': 'Industry',
+            })
+            for i in range(18)
+        }
+        frames['NIFTY50'] = frames.pop('IDX0')
+
+        clf = NSEIndexClassifier(db_path=db_path)
+        start = time.perf_counter()
+        for index_code, df in frames.items():
+            clf.classify_dataframe(index_code, df)
+        elapsed = time.perf_counter() - start
+        clf.close()
+
+        assert elapsed < 1.0, f"Classifying 18 indices took {elapsed:.2f}s"
@@ -116,3 +116,80 @@ class TestNSEIndexScraper:
         assert merged.iloc[0]['industry'] == "Refining"
         assert merged.iloc[0]['sector'] == "Energy"
         assert 'sector' in merged.columns
+
+    def test_download_csv_not_modified(self, scraper):
+        """304 on a conditional request skips the index without logging a scrape"""
+        mock_response = Mock()
+        mock_response.status_code = 304
+        scraper.session = Mock()
+        scraper.session.get.return_value = mock_response
+        scraper.http = Mock()
+        scraper.http.conditional_headers.return_value = {'If-None-Match': '"abc"'}
+        scraper.http.limiter = MagicMock()
+        
+        df = scraper.download_csv("NIFTY50", "http://url", conditional=True)
+        
+        assert df is None
+        assert "NIFTY50" in scraper.unchanged
+        assert scraper.stats['not_modified'] == 1
+        scraper.session.get.assert_called_once_with(
+            "http://url", headers={'If-None-Match': '"abc"'}, timeout=30
+        )
+        scraper.cursor.execute.assert_not_called()
+
+    def test_scrape_all_indices_returns_changed_frames(self, scraper):
+        """Concurrent scrape returns only indices whose data changed"""
+        frames = {'NIFTY50': pd.DataFrame({'symbol': ['TCS']}), 'NIFTY100': None}
+        
+        with patch.object(scraper, 'get_all_indices', return_value=list(frames)), \
+             patch.object(scraper, 'scrape_index', side_effect=lambda code, conditional: frames[code]), \
+             patch.object(scraper, 'print_summary'):
+            result = scraper.scrape_all_indices(max_workers=2)
+        
+        assert list(result) == ['NIFTY50']
+        assert scraper.stats['total_indices'] == 2
+
+    def test_validators_wait_for_commit(self, scraper):
+        """A fresh CSV's ETag is only stored once its data has been written"""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.text = "Symbol,Company Name,Industry,ISIN Code\nTCS,Tata Consultancy,IT,INE467B01029\n"
+        scraper.session = Mock()
+        scraper.session.get.return_value = mock_response
+        scraper.http = Mock()
+        scraper.http.conditional_headers.return_value = {}
+        scraper.http.limiter = MagicMock()
+        
+        assert scraper.download_csv("NIFTY50", "http://url", conditional=True) is not None
+        scraper.http.remember.assert_not_called()
+        
+        scraper.commit_validators(["NIFTY100"])
+        scraper.http.remember.assert_not_called()
+        scraper.commit_validators(["NIFTY50"])
+        scraper.http.remember.assert_called_once_with("nse_index_scraper", "http://url", mock_response)
+        assert scraper.pending_validators == {}
+
+
+class TestNSEHttpClient:
+    
+    def test_validators_are_per_consumer_and_never_stored_by_get(self, tmp_path):
+        from backend.data.etl.nse_http import NSEHttpClient
+        
+        client = NSEHttpClient(db_path=tmp_path / "cache.db")
+        response = Mock()
+        response.status_code = 200
+        response.headers = {"ETag": '"v1"'}
+        client.session = Mock()
+        client.session.get.return_value = response
+        
+        assert client.get("http://csv", consumer="fetcher") is response
+        assert client.conditional_headers("fetcher", "http://csv") == {}
+        
+        client.remember("fetcher", "http://csv", response)
+        assert client.conditional_headers("fetcher", "http://csv") == {"If-None-Match": '"v1"'}
+        assert client.conditional_headers("scraper", "http://csv") == {}
+        
+        # Persisted per consumer
+        reloaded = NSEHttpClient(db_path=tmp_path / "cache.db")
+        assert reloaded.conditional_headers("fetcher", "http://csv") == {"If-None-Match": '"v1"'}
+        assert reloaded.conditional_headers("scraper", "http://csv") == {}
@@ -0,0 +1,133 @@
+"""
+Unit tests for the wall-clock aligned poller scheduler
+"""
+
+import asyncio
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent))
+
+from backend.data.etl import poller_scheduler
+from backend.data.etl.poller_scheduler import PollerJob, PollerScheduler, load_poller_metrics
+from backend.services.market_data.market_calendar import IST, MarketCalendar
+
+
+def ist(text):
+    return datetime.strptime(text, "%Y-%m-%d %H:%M:%S").replace(tzinfo=IST).timestamp()
+
+
+@pytest.fixture
+def calendar(monkeypatch):
+    cal = MarketCalendar(["2026-01-26"], first_year=2025, last_year=2027)
+    monkeypatch.setattr(poller_scheduler, "get_market_calendar", lambda db_path=None: cal)
+    monkeypatch.delenv("FORCE_RUN", raising=False)
+    return cal
+
+
+async def noop():
+    pass
+
+
+def run_for(scheduler, seconds):
+    async def main():
+        task = asyncio.create_task(scheduler.run())
+        await asyncio.sleep(seconds)
+        scheduler.stop()
+        await task
+
+    asyncio.run(main())
+
+
+class TestGrid:
+
+    def test_due_times_follow_bar_closes(self):
+        job = PollerJob("intraday_candles", noop, interval=300, offset=5)
+        assert job.next_due(ist("2026-01-05 09:20:04")) == ist("2026-01-05 09:20:05")
+        assert job.next_due(ist("2026-01-05 09:20:05")) == ist("2026-01-05 09:25:05")
+        assert job.next_due(ist("2026-01-05 09:24:59")) == ist("2026-01-05 09:25:05")
+
+    def test_only_in_session_bars_are_polled(self, calendar):
+        scheduler = PollerScheduler([], metrics_db_path=None)
+        job = PollerJob("fo_quotes", noop, interval=300, offset=35)
+
+        # Bar 15:25-15:30 is the last one of the session
+        assert scheduler._session_due(job, ist("2026-01-05 15:30:35")) == ist("2026-01-05 15:30:35")
+        assert scheduler._session_due(job, ist("2026-01-05 15:35:35")) == ist("2026-01-06 09:20:35")
+        assert scheduler._session_due(job, ist("2026-01-05 09:15:35")) == ist("2026-01-05 09:20:35")
+        # Friday close -> Monday holiday -> Tuesday's first bar
+        assert scheduler._session_due(job, ist("2026-01-23 15:35:35")) == ist("2026-01-27 09:20:35")
+
+
+class TestScheduler:
+
+    def test_jobs_start_on_their_staggered_grid(self, tmp_path):
+        starts = {"a": [], "b": []}
+
+        def job(name):
+            async def run():
+                starts[name].append(time.time())
+                await asyncio.sleep(0.05)
+            return PollerJob(name, run, interval=0.4, offset=0.1 if name == "a" else 0.25, market_hours=False)
+
+        db = str(tmp_path / "poller_metrics.db")
+        scheduler = PollerScheduler([job("a"), job("b")], metrics_db_path=db)
+        run_for(scheduler, 1.9)
+
+        for name, offset in (("a", 0.1), ("b", 0.25)):
+            assert len(starts[name]) >= 3
+            for ts in starts[name]:
+                phase = (ts - offset) % 0.4
+                assert min(phase, 0.4 - phase) < 0.1
+        metrics = scheduler.metrics()
+        assert metrics["a"]["runs"] == len(starts["a"]) and metrics["a"]["skipped"] == 0
+        assert 0 <= metrics["a"]["max_lag"] < 0.1 and metrics["a"]["avg_duration"] >= 0.05
+
+        stored = load_poller_metrics(db, since=0)
+        assert stored["a"]["runs"] == len(starts["a"]) and stored["b"]["runs"] == len(starts["b"])
+
+    def test_overrun_skips_cycles_and_failures_are_recorded(self, tmp_path):
+        calls = []
+
+        async def slow():
+            calls.append(time.time())
+            await asyncio.sleep(0.9)
+
+        async def broken():
+            raise RuntimeError("rate limited")
+
+        db = str(tmp_path / "poller_metrics.db")
+        scheduler = PollerScheduler([
+            PollerJob("slow", slow, interval=0.4, offset=0.0, market_hours=False),
+            PollerJob("broken", broken, interval=0.4, offset=0.2, market_hours=False),
+        ], metrics_db_path=db)
+        run_for(scheduler, 2.0)
+
+        slow_metrics = scheduler.metrics()["slow"]
+        assert slow_metrics["runs"] >= 2 and slow_metrics["skipped"] >= 2 * (slow_metrics["runs"] - 1)
+        # Still on the grid after overrunning
+        assert all(min(ts % 0.4, 0.4 - ts % 0.4) < 0.1 for ts in calls)
+
+        stored = load_poller_metrics(db, since=0)
+        assert stored["broken"]["failures"] == stored["broken"]["runs"] >= 3
+        assert stored["broken"]["last_error"] == "rate limited"
+
+
+def test_poller_metrics_endpoint(tmp_path, monkeypatch):
+    from backend.api.servers import api_server
+
+    db = str(tmp_path / "poller_metrics.db")
+    scheduler = PollerScheduler([], metrics_db_path=db)
+    job = PollerJob("option_chain", noop)
+    scheduler._record(job, time.time() - 1, time.time(), 2.5, 1, None)
+    monkeypatch.setattr(api_server, "load_poller_metrics",
+                        lambda since=None: load_poller_metrics(db, since=since))
+
+    body = api_server.app.test_client().get("/api/pollers/metrics?hours=1").get_json()
+    assert body["jobs"]["option_chain"]["runs"] == 1
+    assert body["jobs"]["option_chain"]["skipped"] == 1
+    assert body["jobs"]["option_chain"]["avg_duration"] == 2.5
@@ -0,0 +1,105 @@
+"""
+Unit tests for the option chain grid model (windowing and cell diffs)
+"""
+
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from frontend.services.option_chain_model import (
+    STYLE_FIELD, OptionChainGridModel, format_row, payload_size,
+)
+
+
+def _chain(spot, n=150, step=50, seed=0):
+    rng = random.Random(seed)
+    first = round(spot / step) * step - (n // 2) * step
+    strikes = []
+    for i in range(n):
+        strike = float(first + i * step)
+        strikes.append({
+            "strike": strike,
+            "call": {"ltp": max(spot - strike, 0) + 20, "oi": 150000 + i, "volume": 5000, "iv": 14.2, "delta": 0.5},
+            "put": {"ltp": max(strike - spot, 0) + 20, "oi": 120000 + i, "volume": 4000, "iv": 15.1, "delta": -0.5},
+        })
+    rng.shuffle(strikes)
+    return {"underlying_price": spot, "strikes": strikes}
+
+
+class TestOptionChainGridModel:
+
+    def test_load_renders_window_around_atm(self):
+        model = OptionChainGridModel(window=15)
+        rows = model.load(_chain(22010))
+
+        assert len(rows) == 31
+        assert rows[15]["key"] == 22000.0
+        assert [r["key"] for r in rows] == sorted(r["key"] for r in rows)
+
+    def test_diff_patches_only_changed_cells(self):
+        model = OptionChainGridModel(window=15)
+        chain = _chain(22010)
+        model.load(chain)
+
+        assert model.diff(chain) == {}
+
+        for s in chain["strikes"]:
+            if s["strike"] == 22100.0:
+                s["call"]["ltp"] = 99.5
+        assert model.diff(chain) == {22100.0: {"c_ltp": "99.50"}}
+
+        # Spot crossing a strike restyles that row only
+        chain["underlying_price"] = 22060
+        patch = model.diff(chain)
+        assert 22050.0 in patch and STYLE_FIELD in patch[22050.0]
+        assert patch[22050.0][STYLE_FIELD] == (True, False, True)
+
+    def test_atm_leaving_window_requires_render(self):
+        model = OptionChainGridModel(window=15)
+        model.load(_chain(22010))
+
+        assert model.diff(_chain(22010, seed=1)) is not None
+        moved = _chain(22010)
+        moved["underlying_price"] = 22010 + 14 * 50
+        assert model.diff(moved) is None
+        assert model.diff({"strikes": []}) is None
+
+
+@pytest.mark.slow
+def test_benchmark_update_cpu_and_payload():
+    """Per-update CPU and payload: full 150-strike rebuild vs windowed cell patch"""
+    rng = random.Random(42)
+    base = _chain(22010)
+    ticks = []
+    for _ in range(200):
+        for s in base["strikes"]:
+            if rng.random() < 0.2:
+                s["call"]["ltp"] = round(s["call"]["ltp"] + rng.uniform(-1, 1), 2)
+                s["put"]["oi"] += rng.randint(0, 500)
+        ticks.append({"underlying_price": base["underlying_price"],
+                      "strikes": [dict(s, call=dict(s["call"]), put=dict(s["put"])) for s in base["strikes"]]})
+
+    full_cpu, full_bytes = [], []
+    for tick in ticks:
+        start = time.process_time()
+        rows = [format_row(s, tick["underlying_price"]) for s in sorted(tick["strikes"], key=lambda s: s["strike"])]
+        full_bytes.append(payload_size(rows))
+        full_cpu.append((time.process_time() - start) * 1000)
+
+    model = OptionChainGridModel()
+    model.load(ticks[0])
+    patch_cpu, patch_bytes = [], []
+    for tick in ticks[1:]:
+        assert model.diff(tick) is not None
+        patch_cpu.append(model.last_stats["cpu_ms"])
+        patch_bytes.append(model.last_stats["patch_bytes"])
+
+    print(f"CPU/update: {statistics.mean(full_cpu):.2f}ms -> {statistics.mean(patch_cpu):.2f}ms")
+    print(f"payload/update: {statistics.mean(full_bytes):.0f}B -> {statistics.mean(patch_bytes):.0f}B")
+    assert statistics.mean(patch_bytes) < statistics.mean(full_bytes) / 4
@@ -0,0 +1,132 @@
+"""
+Unit tests for AIService tool execution and provider failover
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent))
+
+from backend.services.ai.service import AIService
+
+
+def _tool_call(call_id, name, arguments):
+    return SimpleNamespace(id=call_id, function=SimpleNamespace(name=name, arguments=arguments))
+
+
+def _response(content=None, tool_calls=None):
+    message = SimpleNamespace(role="assistant", content=content, tool_calls=tool_calls)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class FakeOpenAI:
+    """Minimal OpenAI-compatible client: client.chat.completions.create(...)"""
+
+    def __init__(self, tool_calls=None, fail=False, delay=0.0):
+        self.tool_calls = tool_calls
+        self.fail = fail
+        self.delay = delay
+        self.requests = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, model, messages, **kwargs):
+        self.requests.append(list(messages))
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("provider down")
+        if "tools" in kwargs and self.tool_calls:
+            return _response(tool_calls=self.tool_calls)
+        tool_outputs = [m["content"] for m in messages if isinstance(m, dict) and m.get("role") == "tool"]
+        return _response(content=f"answer from {model}: {len(tool_outputs)} tool results")
+
+
+@pytest.fixture
+def service(monkeypatch):
+    svc = AIService(clients=[])
+    calls = []
+    lock = threading.Lock()
+
+    def slow_quote(symbol):
+        with lock:
+            calls.append(("quote", symbol))
+        time.sleep(0.2)
+        return {"symbol": symbol, "ltp": 100}
+
+    def slow_news(query=""):
+        with lock:
+            calls.append(("news", query))
+        time.sleep(0.2)
+        return [{"headline": f"{query} news"}]
+
+    monkeypatch.setattr(svc, "get_stock_quote", slow_quote)
+    monkeypatch.setattr(svc, "get_recent_news", slow_news)
+    svc.calls = calls
+    return svc
+
+
+class TestAIService:
+
+    def test_tool_calls_run_concurrently_and_keep_order(self, service):
+        service.clients = [{
+            "provider": "Fake", "model": "m1",
+            "client": FakeOpenAI(tool_calls=[
+                _tool_call("a", "get_stock_quote", '{"symbol": "TCS"}'),
+                _tool_call("b", "get_stock_quote", '{"symbol": "INFY"}'),
+                _tool_call("c", "get_recent_news", '{"query": "IT"}'),
+            ]),
+        }]
+
+        start = time.perf_counter()
+        answer = service.send_message("compare TCS and INFY")
+        elapsed = time.perf_counter() - start
+
+        assert answer == "answer from m1: 3 tool results"
+        assert elapsed < 0.5, f"tools ran serially ({elapsed:.2f}s)"
+
+        final_messages = service.clients[0]["client"].requests[-1]
+        tool_messages = [m for m in final_messages if isinstance(m, dict) and m.get("role") == "tool"]
+        assert [m["tool_call_id"] for m in tool_messages] == ["a", "b", "c"]
+        assert '"TCS"' in tool_messages[0]["content"]
+
+    def test_results_cached_by_normalized_arguments(self, service):
+        first = service._execute_tool("get_stock_quote", '{"symbol": "tcs"}')
+        second = service._execute_tool("get_stock_quote", '{ "symbol": " TCS " }')
+
+        assert first == second
+        assert service.calls == [("quote", "tcs")]
+
+        # Free-text arguments keep their case
+        service._execute_tool("get_recent_news", '{"query": "Apple results"}')
+        service._execute_tool("get_recent_news", '{"query": "APPLE RESULTS"}')
+        assert service.calls[1:] == [("news", "Apple results"), ("news", "APPLE RESULTS")]
+
+    def test_tool_cache_is_bounded_lru(self, service, monkeypatch):
+        from backend.services.ai import service as service_module
+
+        monkeypatch.setattr(service_module, "TOOL_CACHE_MAX_ENTRIES", 2)
+        for symbol in ("A", "B", "A", "C"):
+            service._execute_tool("get_stock_quote", f'{{"symbol": "{symbol}"}}')
+
+        assert [key[1] for key in service._tool_cache] == ['{"symbol":"A"}', '{"symbol":"C"}']
+
+    def test_failover_prefers_fastest_healthy_provider(self, service):
+        down = FakeOpenAI(fail=True)
+        slow = FakeOpenAI(delay=0.05)
+        fast = FakeOpenAI()
+        service.clients = [
+            {"provider": "Down", "model": "down", "client": down},
+            {"provider": "Slow", "model": "slow", "client": slow},
+            {"provider": "Fast", "model": "fast", "client": fast},
+        ]
+
+        assert service.send_message("hi") == "answer from slow: 0 tool results"
+        service._record_provider("Fast", 0.01)
+
+        assert [c["provider"] for c in service._ordered_clients()] == ["Fast", "Slow", "Down"]
+        assert service.send_message("hi") == "answer from fast: 0 tool results"
+        assert len(down.requests) == 1
@@ -0,0 +1,188 @@
+"""
+Unit tests for the SQLite background job queue
+"""
+
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent))
+
+from backend.services.jobs import handlers, job_queue
+from backend.services.jobs.job_queue import MAX_ATTEMPTS, TERMINAL, JobQueue, job_handler
+from backend.services.market_data.downloader import StockDownloader
+
+RELEASE = {}
+
+
+@job_handler("test_count")
+def _count(ctx, n, fail_at=None):
+    for i in range(n):
+        ctx.partial({"i": i})
+        ctx.progress((i + 1) / n, f"{i + 1}/{n}")
+        if i == fail_at:
+            raise RuntimeError("boom")
+    return {"total": n}
+
+
+@job_handler("test_block")
+def _block(ctx, name):
+    while not RELEASE[name].wait(0.01):
+        ctx.check_cancelled()
+    return {"name": name}
+
+
+def _wait(jobs, job_id, statuses=TERMINAL, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = jobs.get(job_id)
+        if job["status"] in statuses:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} stuck in {jobs.get(job_id)['status']}")
+
+
+@pytest.fixture
+def jobs(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    yield queue
+    if queue._pool is not None:
+        for event in RELEASE.values():
+            event.set()
+        queue._pool.stop()
+    RELEASE.clear()
+
+
+class TestJobQueue:
+
+    def test_progress_partials_and_result(self, jobs):
+        jobs.ensure_workers(workers=2)
+
+        job_id = jobs.submit("test_count", {"n": 5})
+        job = _wait(jobs, job_id)
+
+        assert job["status"] == "succeeded" and job["result"] == {"total": 5}
+        assert job["progress"] == 1.0 and job["attempts"] == 1
+        assert [p["i"] for p in job["partials"]] == [0, 1, 2, 3, 4]
+        assert [p["i"] for p in jobs.get(job_id, since=3)["partials"]] == [3, 4]
+
+        failed = _wait(jobs, jobs.submit("test_count", {"n": 5, "fail_at": 2}))
+        assert failed["status"] == "failed" and failed["error"] == "boom"
+        assert len(failed["partials"]) == 3
+        assert "No handler" in _wait(jobs, jobs.submit("no_such_kind"))["error"]
+
+    def test_bulk_backlog_does_not_starve_interactive(self, jobs):
+        jobs.ensure_workers(workers=2)  # one worker reserved for the interactive lane
+        bulk = []
+        for i in range(3):
+            RELEASE[f"bulk{i}"] = threading.Event()
+            bulk.append(jobs.submit("test_block", {"name": f"bulk{i}"}, lane="bulk"))
+        _wait(jobs, bulk[0], statuses=("running",))
+
+        quick = _wait(jobs, jobs.submit("test_count", {"n": 2}))
+
+        assert quick["status"] == "succeeded"
+        assert [jobs.get(j)["status"] for j in bulk] == ["running", "queued", "queued"]
+        for event in RELEASE.values():
+            event.set()
+        assert all(_wait(jobs, j)["status"] == "succeeded" for j in bulk)
+
+    def test_cancel_queued_and_running(self, jobs):
+        queued = jobs.submit("test_count", {"n": 1})
+        assert jobs.cancel(queued) == "cancelled"
+        assert jobs.cancel(999) is None
+
+        jobs.ensure_workers(workers=1)
+        RELEASE["slow"] = threading.Event()
+        running = jobs.submit("test_block", {"name": "slow"})
+        _wait(jobs, running, statuses=("running",))
+
+        assert jobs.cancel(running) == "running"
+        assert _wait(jobs, running)["status"] == "cancelled"
+        assert jobs.get(queued)["started_at"] is None
+
+    def test_claims_are_exclusive_across_connections(self, jobs):
+        for i in range(200):
+            jobs.submit("test_count", {"n": 0}, lane="bulk" if i % 3 else "interactive")
+        claimed = []
+
+        def claim_all(worker):
+            conn = jobs.connect()
+            while True:
+                job = jobs.claim(conn, worker, ("interactive", "bulk"))
+                if job is None:
+                    break
+                claimed.append(job["id"])
+            conn.close()
+
+        threads = [threading.Thread(target=claim_all, args=(f"w{i}",)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert sorted(claimed) == list(range(1, 201))
+
+    def test_stale_running_jobs_are_requeued_then_failed(self, jobs):
+        conn = jobs.connect()
+        retry, exhausted = jobs.submit("test_count", {"n": 1}), jobs.submit("test_count", {"n": 1})
+        conn.execute("UPDATE jobs SET status = 'running', heartbeat_at = 0, attempts = 1 WHERE id = ?", (retry,))
+        conn.execute("UPDATE jobs SET status = 'running', heartbeat_at = 0, attempts = ? WHERE id = ?",
+                     (MAX_ATTEMPTS, exhausted))
+
+        assert jobs.requeue_stale(conn) == 2
+        assert jobs.get(retry)["status"] == "queued"
+        assert jobs.get(exhausted)["status"] == "failed"
+        conn.close()
+
+    def test_download_handler_reports_each_symbol(self, jobs, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        db_path = str(tmp_path / "market_data.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute("""
+            CREATE TABLE ohlc_data (
+                symbol TEXT, datetime TEXT, open REAL, high REAL, low REAL, close REAL, volume INTEGER,
+                PRIMARY KEY (symbol, datetime))
+        """)
+        conn.commit()
+        conn.close()
+        candles = [["2025-01-01T00:00:00+05:30", 100, 110, 90, 105, 1000, 0],
+                   ["2025-01-02T00:00:00+05:30", 105, 112, 101, 111, 1200, 0]]
+        monkeypatch.setattr(handlers, "DB_PATH", db_path)
+        monkeypatch.setattr(StockDownloader, "fetch_from_upstox",
+                            lambda self, symbol, *a: StockDownloader.candles_to_frame(candles, symbol))
+        jobs.ensure_workers(workers=1)
+
+        job = _wait(jobs, jobs.submit("download_stocks", {
+            "symbols": ["AAA", "BBB", "CCC"], "start_date": "2025-01-01", "end_date": "2025-01-31",
+            "export_format": None}))
+
+        assert job["status"] == "succeeded" and job["result"]["rows"] == 6
+        assert sorted(p["symbol"] for p in job["partials"]) == ["AAA", "BBB", "CCC"]
+
+
+class TestEmbeddedPoolDefault:
+
+    def test_off_under_gunicorn_or_gevent(self, monkeypatch):
+        monkeypatch.delenv("SERVER_SOFTWARE", raising=False)
+        monkeypatch.delitem(sys.modules, "gunicorn", raising=False)
+        monkeypatch.delitem(sys.modules, "gevent.monkey", raising=False)
+        assert job_queue._embedded_workers_default() == 3
+
+        monkeypatch.setenv("SERVER_SOFTWARE", "gunicorn/23.0.0")
+        assert job_queue._embedded_workers_default() == 0
+        monkeypatch.delenv("SERVER_SOFTWARE")
+
+        patched = type(sys)("gevent.monkey")
+        patched.is_module_patched = lambda name: name == "threading"
+        monkeypatch.setitem(sys.modules, "gevent.monkey", patched)
+        assert job_queue._embedded_workers_default() == 0
+
+    def test_disabled_pool_leaves_jobs_queued(self, jobs):
+        assert jobs.ensure_workers(workers=0) is None
+        job_id = jobs.submit("test_count", {"n": 1})
+        assert jobs.get(job_id)["status"] == "queued"
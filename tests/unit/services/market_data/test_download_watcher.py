@@ -0,0 +1,184 @@
+"""
+Unit tests for the downloads directory change feed and log tail readers
+"""
+
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent))
+
+from backend.services.market_data import download_watcher
+from backend.services.market_data.download_watcher import DirectoryIndex, read_new_lines, tail_lines
+
+
+@pytest.fixture(params=[True, False], ids=["inotify", "polling"])
+def index(request, tmp_path):
+    idx = DirectoryIndex(str(tmp_path / "downloads"), poll_interval=0.05, use_inotify=request.param)
+    yield idx
+    idx.stop()
+
+
+class TestDirectoryIndex:
+
+    def test_changes_since_returns_only_additions_and_removals(self, index):
+        index.path.mkdir()
+        (index.path / "old.csv").write_text("a")
+        first = index.snapshot()
+        assert [f["filename"] for f in first["files"]] == ["old.csv"]
+
+        time.sleep(0.02)
+        (index.path / "new.parquet").write_text("bb")
+        added = index.changes_since(first["version"], timeout=5)
+        assert [f["filename"] for f in added["added"]] == ["new.parquet"] and added["removed"] == []
+        assert added["added"][0]["size"] == 2 and added["added"][0]["format"] == "parquet"
+
+        (index.path / "old.csv").unlink()
+        removed = index.changes_since(added["version"], timeout=5)
+        assert removed["added"] == [] and removed["removed"] == ["old.csv"]
+        assert [f["filename"] for f in index.snapshot()["files"]] == ["new.parquet"]
+
+        # No change: waits out the timeout and reports the same version
+        assert index.changes_since(removed["version"], timeout=0.1) == {
+            "version": removed["version"], "added": [], "removed": []}
+
+    def test_growing_file_is_reported_with_its_new_size(self, index):
+        index.path.mkdir()
+        export = index.path / "RELIANCE_1d.csv"
+        export.write_text("header\n")
+        version = index.snapshot()["version"]
+
+        with open(export, "a") as f:
+            f.write("row\n" * 100)
+        changes = index.changes_since(version, timeout=5)
+        while changes["added"] and changes["added"][0]["size"] < 407:
+            changes = index.changes_since(changes["version"], timeout=5)
+
+        assert index.snapshot()["files"][0]["size"] == 407
+
+    def test_stale_cursor_gets_a_snapshot(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(download_watcher, "CHANGE_LOG_SIZE", 3)
+        idx = DirectoryIndex(str(tmp_path), use_inotify=False)
+        idx.snapshot()
+        for i in range(5):
+            (tmp_path / f"f{i}.csv").write_text("x")
+            idx._rescan()
+
+        assert idx.changes_since(1)["reset"] is True
+        assert len(idx.changes_since(1)["files"]) == 5
+        assert [f["filename"] for f in idx.changes_since(idx.version - 2)["added"]] == ["f3.csv", "f4.csv"]
+        assert idx.changes_since(idx.version + 10)["reset"] is True
+        idx.stop()
+
+
+class TestLogTail:
+
+    def test_tail_matches_readlines(self, tmp_path):
+        log = tmp_path / "data_downloader.log"
+        log.write_bytes(b"".join(f"2026-01-01 INFO line {i} \xe2\x9c\x85\n".encode() for i in range(5000)))
+
+        for n in (1, 100, 4999, 5000, 6000):
+            lines, offset = tail_lines(str(log), n, block_size=512)
+            assert lines == open(log, encoding="utf-8").readlines()[-n:]
+            assert offset == log.stat().st_size
+
+    def test_follow_appends_partial_lines_and_rotation(self, tmp_path):
+        log = tmp_path / "data_downloader.log"
+        log.write_text("one\ntwo\nthr")
+
+        lines, offset = tail_lines(str(log), 10)
+        assert lines == ["one\n", "two\n"]
+
+        with open(log, "a") as f:
+            f.write("ee\nfour\n")
+        lines, offset = read_new_lines(str(log), offset)
+        assert lines == ["three\n", "four\n"]
+        assert read_new_lines(str(log), offset) == ([], offset)
+
+        log.write_text("rotated\n")
+        assert read_new_lines(str(log), offset) == (["rotated\n"], 8)
+
+
+def test_download_events_stream(tmp_path, monkeypatch):
+    from backend.api.servers import api_server
+
+    idx = DirectoryIndex(str(tmp_path), use_inotify=False)
+    (tmp_path / "a.csv").write_text("x")
+    monkeypatch.setattr(api_server, "get_download_index", lambda: idx)
+    monkeypatch.setattr(api_server, "DOWNLOAD_EVENTS_KEEPALIVE", 0.05)
+    client = api_server.app.test_client()
+
+    history = client.get("/api/download/history").get_json()
+    assert history["total"] == 1 and history["version"] == idx.version
+
+    response = client.get("/api/download/events", buffered=False)
+    assert response.mimetype == "text/event-stream"
+    stream = iter(response.response)
+    snapshot = next(stream).decode()
+    assert "event: snapshot" in snapshot and '"a.csv"' in snapshot
+    assert next(stream) == b": keep-alive\n\n"
+
+    (tmp_path / "a.csv").unlink()
+    idx._rescan()
+    change = next(stream).decode()
+    assert change.startswith(f"id: {idx.event_id(idx.version)}\nevent: change\n")
+    assert json.loads(change.split("data: ", 1)[1])["removed"] == ["a.csv"]
+    response.close()
+
+    # Resume on this process: changes only; a cursor from another worker: reset snapshot
+    (tmp_path / "b.csv").write_text("y")
+    idx._rescan()
+    resumed = client.get("/api/download/events", buffered=False,
+                         headers={"Last-Event-ID": idx.event_id(idx.version - 1)})
+    event = next(iter(resumed.response)).decode()
+    assert "event: change" in event and '"b.csv"' in event
+    resumed.close()
+
+    foreign = client.get("/api/download/events", buffered=False,
+                         headers={"Last-Event-ID": f"1-0.{idx.version}"})
+    event = next(iter(foreign.response)).decode()
+    payload = json.loads(event.split("data: ", 1)[1])
+    assert "event: snapshot" in event and payload["reset"] is True
+    assert [f["filename"] for f in payload["files"]] == ["b.csv"]
+    foreign.close()
+    idx.stop()
+
+
+@pytest.mark.slow
+def test_benchmark_history_and_log_tail(tmp_path):
+    """Per-request cost: iterdir + stat + sort vs the watched index; readlines vs backwards tail"""
+    downloads = tmp_path / "downloads"
+    downloads.mkdir()
+    for i in range(2000):
+        (downloads / f"SYM{i}_1d_20260101.csv").write_text("x" * (i % 50))
+    log = tmp_path / "data_downloader.log"
+    log.write_text("".join(f"2026-01-01 12:00:00 - INFO - downloaded chunk {i}\n" for i in range(500_000)))
+
+    def list_dir():
+        files = []
+        for file in downloads.iterdir():
+            if file.is_file():
+                stat = file.stat()
+                files.append({"filename": file.name, "size": stat.st_size, "created_at": stat.st_ctime})
+        return sorted(files, key=lambda x: x["created_at"], reverse=True)
+
+    idx = DirectoryIndex(str(downloads))
+    idx.snapshot()
+    timings = {}
+    for name, fn in (("iterdir", list_dir), ("index", lambda: idx.snapshot()),
+                     ("readlines", lambda: open(log).readlines()[-100:]),
+                     ("tail", lambda: tail_lines(str(log), 100))):
+        start = time.perf_counter()
+        for _ in range(20):
+            fn()
+        timings[name] = (time.perf_counter() - start) / 20 * 1000
+    idx.stop()
+
+    print(f"history (2000 files): iterdir+stat {timings['iterdir']:.2f}ms -> index {timings['index']:.3f}ms")
+    print(f"logs (500k lines, {os.path.getsize(log) / 1e6:.0f}MB): readlines {timings['readlines']:.1f}ms "
+          f"-> tail {timings['tail']:.3f}ms")
+    assert timings["index"] < timings["iterdir"] and timings["tail"] < timings["readlines"]
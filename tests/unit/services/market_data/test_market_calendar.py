@@ -0,0 +1,119 @@
+"""
+Unit tests for the shared NSE trading-session calendar
+"""
+
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent))
+
+from backend.services.market_data.market_calendar import IST, MarketCalendar
+
+HOLIDAYS = ["2025-10-02", "2025-10-21", "2026-01-26"]
+
+
+def ist(text):
+    return int(datetime.strptime(text, "%Y-%m-%d %H:%M").replace(tzinfo=IST).timestamp())
+
+
+MUHURAT = (ist("2025-10-21 13:45"), ist("2025-10-21 14:45"))
+BUDGET_SATURDAY = (ist("2025-02-01 09:15"), ist("2025-02-01 15:30"))
+
+
+@pytest.fixture
+def calendar():
+    return MarketCalendar(HOLIDAYS, [MUHURAT, BUDGET_SATURDAY], first_year=2024, last_year=2027)
+
+
+class TestMarketCalendar:
+
+    def test_regular_session_is_half_open(self, calendar):
+        assert not calendar.is_open(ist("2026-01-05 09:14"))
+        assert calendar.is_open(ist("2026-01-05 09:15"))
+        assert calendar.current_session(ist("2026-01-05 12:00")) == (ist("2026-01-05 09:15"), ist("2026-01-05 15:30"))
+        assert not calendar.is_open(ist("2026-01-05 15:30"))
+        assert not calendar.is_open(ist("2026-01-10 11:00"))  # Saturday
+
+    def test_holiday_long_weekend_skips_to_next_session(self, calendar):
+        friday_close = ist("2026-01-23 15:30")
+        assert not calendar.is_open(ist("2026-01-26 11:00"))
+        assert calendar.next_open(friday_close) == ist("2026-01-27 09:15")
+        assert calendar.seconds_until_open(friday_close) == 3 * 86400 + 17 * 3600 + 45 * 60
+        assert calendar.next_close(ist("2026-01-23 10:00")) == friday_close
+        assert not calendar.is_trading_day("2026-01-26") and calendar.is_trading_day("2026-01-27")
+
+    def test_special_sessions_replace_the_day(self, calendar):
+        assert not calendar.is_open(ist("2025-10-21 10:00"))
+        assert calendar.next_open(ist("2025-10-21 10:00")) == MUHURAT[0]
+        assert calendar.is_open(ist("2025-10-21 14:00"))
+        assert calendar.next_open(MUHURAT[1]) == ist("2025-10-22 09:15")
+        assert calendar.is_open(ist("2025-02-01 10:00")) and calendar.is_trading_day("2025-02-01")
+
+    def test_sessions_between(self, calendar):
+        week = calendar.sessions_between(ist("2025-10-20 12:00"), ist("2025-10-25 00:00"))
+        assert week[0] == (ist("2025-10-20 09:15"), ist("2025-10-20 15:30"))
+        assert week[1] == MUHURAT and len(week) == 5
+        assert calendar.sessions_between(ist("2026-01-24 00:00"), ist("2026-01-27 00:00")) == []
+
+    def test_matches_brute_force_scan(self, calendar):
+        sessions = list(zip(calendar.opens, calendar.closes))
+        rng = random.Random(3)
+        for _ in range(2000):
+            ts = rng.randrange(ist("2024-01-01 00:00"), ist("2027-12-31 00:00"))
+            assert calendar.is_open(ts) == any(o <= ts < c for o, c in sessions)
+            assert calendar.next_open(ts) == min((o for o, _ in sessions if o >= ts), default=None)
+
+    def test_built_from_market_info_caches(self, tmp_path):
+        from backend.services.market_data.info import MarketInfoService
+
+        db = str(tmp_path / "market_data.db")
+        with patch("backend.services.market_data.info.AuthManager"):
+            info = MarketInfoService(db_path=db)
+        info._save_holidays([
+            {"date": "2026-01-26", "description": "Republic Day", "holiday_type": "TRADING_HOLIDAY",
+             "closed_exchanges": ["NSE", "NFO", "BSE"], "open_exchanges": []},
+            {"date": "2025-10-21", "description": "Diwali Laxmi Pujan", "holiday_type": "SPECIAL_TIMING",
+             "closed_exchanges": [], "open_exchanges": [
+                 {"exchange": "NSE", "start_time": MUHURAT[0] * 1000, "end_time": MUHURAT[1] * 1000},
+                 {"exchange": "MCX", "start_time": MUHURAT[0] * 1000, "end_time": ist("2025-10-21 23:55") * 1000}]},
+            {"date": "2026-02-19", "description": "Settlement only", "closed_exchanges": []},
+        ], None)
+
+        cal = MarketCalendar.from_db(db, first_year=2025, last_year=2026)
+        assert not cal.is_open(ist("2026-01-26 11:00"))
+        assert cal.is_open(ist("2026-02-19 11:00"))
+        assert not cal.is_open(ist("2025-10-21 11:00")) and cal.is_open(ist("2025-10-21 14:00"))
+        assert not cal.is_open(ist("2025-10-21 15:00"))
+        assert cal.holiday_years == {2026}
+
+
+@pytest.mark.slow
+def test_benchmark_is_open():
+    """Per-call cost of the session lookup vs the old datetime.now() weekday/time check"""
+    from datetime import time as dt_time
+
+    cal = MarketCalendar(HOLIDAYS)
+
+    def old_is_open():
+        now = datetime.now()
+        if now.weekday() >= 5:
+            return False
+        return dt_time(9, 15) <= now.time() <= dt_time(15, 30)
+
+    timings = {}
+    for name, fn in (("datetime", old_is_open), ("calendar", cal.is_open),
+                     ("next_open", cal.next_open)):
+        start = time.perf_counter()
+        for _ in range(100_000):
+            fn()
+        timings[name] = (time.perf_counter() - start) / 100_000 * 1e6
+
+    print(f"is_open: datetime check {timings['datetime']:.2f}us -> calendar {timings['calendar']:.2f}us "
+          f"(next_open {timings['next_open']:.2f}us, {len(cal.opens)} sessions)")
+    assert timings["calendar"] < 20
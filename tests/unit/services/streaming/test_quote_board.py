@@ -0,0 +1,185 @@
+"""
+Unit tests for the shared-memory quote board
+"""
+
+import multiprocessing
+import sqlite3
+import sys
+import time
+import uuid
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent))
+
+from backend.services.streaming import quote_board
+from backend.services.streaming.quote_board import QuoteBoard
+
+INFY = "NSE_EQ|INE009A01021"
+TCS = "NSE_EQ|INE467B01029"
+
+
+@pytest.fixture
+def board_name():
+    return f"test_board_{uuid.uuid4().hex[:12]}"
+
+
+@pytest.fixture
+def board(board_name):
+    board = QuoteBoard.create(board_name, capacity=64)
+    yield board
+    board.close()
+
+
+class TestQuoteBoard:
+
+    def test_reader_sees_writes_and_new_keys(self, board, board_name):
+        board.write(INFY, ltp=1510.5, bid=1510.4, ask=1510.6, close=1500.0, volume=120000, ts=1000.0)
+        reader = QuoteBoard.attach(board_name)
+        try:
+            quote = reader.read(INFY)
+            assert quote.ltp == 1510.5 and quote.bid == 1510.4 and quote.close == 1500.0
+            assert quote.volume == 120000 and quote.ts == 1000.0
+            assert reader.read(TCS) is None
+
+            # Key appended after the reader attached
+            board.write_quote(TCS, {"last_price": 3900.0, "net_change": -20.0, "volume": 5, "oi": 0})
+            assert reader.read(TCS).close == 3920.0
+            assert reader.keys() == [INFY, TCS] and len(reader) == 2
+            assert reader.read(INFY, max_age=5) is None   # ts=1000 is long gone
+        finally:
+            reader.close()
+
+    def test_readers_cannot_write_and_full_board_drops(self, board, board_name):
+        reader = QuoteBoard.attach(board_name)
+        with pytest.raises(PermissionError):
+            reader.write(INFY, ltp=1.0)
+        reader.close()
+
+        for i in range(64):
+            assert board.write(f"NSE_EQ|K{i}", ltp=float(i))
+        assert not board.write("NSE_EQ|ONE_TOO_MANY", ltp=1.0)
+
+    def test_process_singleton_reattaches_to_a_replaced_board(self, board_name, monkeypatch):
+        monkeypatch.setattr(quote_board, "REATTACH_INTERVAL", 0)
+        quote_board.reset_quote_board()
+        assert quote_board.get_quote_board(board_name) is None
+
+        first = QuoteBoard.create(board_name, capacity=8)
+        first.write(INFY, ltp=1.0)
+        assert quote_board.get_quote_board(board_name).read(INFY).ltp == 1.0
+
+        # Feed restarts without a clean shutdown
+        second = QuoteBoard.create(board_name, capacity=8)
+        second.write(INFY, ltp=2.0)
+        assert quote_board.get_quote_board(board_name).read(INFY).ltp == 2.0
+
+        quote_board.reset_quote_board()
+        first._shm.close()
+        second.close()
+
+
+def _feed(name, ready, n):
+    board = QuoteBoard.create(name, capacity=8)
+    ready.set()
+    for i in range(1, n + 1):
+        board.write(INFY, ltp=i, bid=i, ask=i, close=i, volume=i, oi=i, ts=i)
+    ready.clear()
+    time.sleep(0.5)
+    board.close()
+
+
+def test_reads_are_never_torn_across_processes(board_name):
+    """A feed process rewrites one slot as fast as it can; every read must be one consistent write"""
+    ctx = multiprocessing.get_context("fork")
+    ready = ctx.Event()
+    feed = ctx.Process(target=_feed, args=(board_name, ready, 300_000))
+    feed.start()
+    assert ready.wait(10)
+
+    reader = QuoteBoard.attach(board_name)
+    reads = 0
+    last = 0
+    while ready.is_set():
+        quote = reader.read(INFY)
+        if quote is None:
+            continue
+        assert quote.ltp == quote.bid == quote.ask == quote.close == quote.volume == quote.oi == quote.ts
+        assert quote.ltp >= last
+        last = quote.ltp
+        reads += 1
+    reader.close()
+    feed.join(10)
+    assert feed.exitcode == 0 and reads > 100
+
+
+def test_market_quote_refreshes_cached_records_from_the_board(board, board_name, tmp_path):
+    from backend.services.market_data import quotes
+
+    full = {
+        "last_price": 1500.0, "ltp": 1500.0, "volume": 100000, "oi": 0,
+        "ohlc": {"open": 1495.0, "high": 1512.0, "low": 1490.0, "close": 1500.0},
+        "depth": {"buy": [{"price": 1499.9, "quantity": 10}], "sell": [{"price": 1500.1, "quantity": 7}]},
+        "upper_circuit_limit": 1650.0, "lower_circuit_limit": 1350.0,
+    }
+    board.write(INFY, ltp=1510.5, bid=1510.4, ask=1510.6, close=1500.0, volume=120000)
+    board.write(TCS, ltp=3900.0)
+    reader = QuoteBoard.attach(board_name)
+    with patch.object(quotes, "AuthManager"), patch.object(quotes, "get_quote_board", lambda: reader):
+        mq = quotes.MarketQuoteV3(db_path=str(tmp_path / "market_data.db"))
+        mq._save_to_cache(INFY, full)
+        with patch.object(mq, "_fetch_batch", return_value={}) as fetch:
+            result = mq.get_batch_quotes([INFY, TCS])
+
+            # Live price on top of the full record
+            assert result[INFY]["ltp"] == 1510.5 and result[INFY]["bid_price"] == 1510.4
+            assert result[INFY]["volume"] == 120000
+            assert result[INFY]["ohlc"] == full["ohlc"] and result[INFY]["depth"] == full["depth"]
+            assert result[INFY]["upper_circuit_limit"] == 1650.0
+
+            # Board alone is not a full quote: fetch it
+            fetch.assert_called_once_with([TCS])
+
+        # Memory entry expired: the DB record is the base
+        mq._memory_cache.clear()
+        quote = mq.get_quote(INFY)
+        assert quote["ltp"] == 1510.5 and quote["high"] == 1512.0 and quote["upper_circuit"] == 1650.0
+    reader.close()
+
+
+@pytest.mark.slow
+def test_benchmark_board_read_vs_sqlite_cache(board, board_name, tmp_path):
+    """Per-quote cost: shared-memory read vs the quote_cache_v3 lookup another process would do"""
+    keys = [f"NSE_EQ|K{i:03d}" for i in range(50)]
+    for i, key in enumerate(keys):
+        board.write(key, ltp=100.0 + i, bid=99.9 + i, ask=100.1 + i, close=99.0, volume=1000)
+
+    db = str(tmp_path / "market_data.db")
+    conn = sqlite3.connect(db)
+    conn.execute("CREATE TABLE quote_cache_v3 (instrument_key TEXT PRIMARY KEY, ltp REAL, bid_price REAL, "
+                 "ask_price REAL, volume INTEGER, cached_at DATETIME DEFAULT CURRENT_TIMESTAMP)")
+    conn.executemany("INSERT INTO quote_cache_v3 (instrument_key, ltp, bid_price, ask_price, volume) "
+                     "VALUES (?, ?, ?, ?, ?)", [(k, 100.0, 99.9, 100.1, 1000) for k in keys])
+    conn.commit()
+    conn.close()
+
+    reader = QuoteBoard.attach(board_name)
+    n = 20_000
+    start = time.perf_counter()
+    for i in range(n):
+        reader.read(keys[i % 50], max_age=5)
+    board_us = (time.perf_counter() - start) / n * 1e6
+
+    start = time.perf_counter()
+    for i in range(n // 10):
+        conn = sqlite3.connect(db)
+        conn.execute("SELECT * FROM quote_cache_v3 WHERE instrument_key = ? "
+                     "AND cached_at >= datetime('now', '-60 seconds')", (keys[i % 50],)).fetchone()
+        conn.close()
+    sqlite_us = (time.perf_counter() - start) / (n // 10) * 1e6
+    reader.close()
+
+    print(f"quote read: sqlite cache {sqlite_us:.1f}us -> shared board {board_us:.2f}us")
+    assert board_us * 10 < sqlite_us
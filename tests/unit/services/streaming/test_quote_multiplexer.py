@@ -0,0 +1,124 @@
+"""
+Unit tests for Socket.IO quote room multiplexing
+"""
+
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent))
+
+from backend.services.streaming import quote_multiplexer
+from backend.services.streaming.quote_board import QuoteBoard
+from backend.services.streaming.quote_multiplexer import QuoteMultiplexer
+
+LATENCY = 0.002   # Simulated upstream round trip
+
+
+class FakeApi:
+    """Upstox API stand-in: responses keyed 'NSE_EQ:SYMBOL' like the real batch endpoint"""
+
+    def __init__(self, n):
+        self.prices = {f"S{i}": 100.0 + i for i in range(n)}
+        self.lookups = 0
+        self.calls = 0
+
+    def _get_instrument_key(self, symbol):
+        self.lookups += 1
+        return f"NSE_EQ|{symbol}" if symbol in self.prices else None
+
+    def _quote(self, symbol):
+        return {"instrument_token": f"NSE_EQ|{symbol}", "last_price": self.prices[symbol], "volume": 10}
+
+    def get_market_quote(self, symbol):
+        self.calls += 1
+        time.sleep(LATENCY)
+        return self._quote(symbol)
+
+    def get_batch_market_quotes(self, keys):
+        self.calls += -(-len(keys) // 450)
+        time.sleep(LATENCY)
+        return {f"NSE_EQ:{key.split('|')[1]}": self._quote(key.split("|")[1]) for key in keys}
+
+
+@pytest.fixture(autouse=True)
+def no_board(monkeypatch):
+    monkeypatch.setattr(quote_multiplexer, "get_quote_board", lambda: None)
+
+
+class TestQuoteMultiplexer:
+
+    def test_all_rooms_in_one_batch_and_only_changed_prices(self):
+        api = FakeApi(200)
+        mux = QuoteMultiplexer(api)
+        symbols = list(api.prices) + ["UNKNOWN"]
+
+        first = mux.poll(symbols)
+        assert len(first) == 200 and api.calls == 1
+        assert first["S7"]["last_price"] == 107.0
+
+        api.prices["S7"] = 108.5
+        second = mux.poll(symbols)
+        assert list(second) == ["S7"] and api.calls == 2
+        # Symbols are resolved once
+        assert api.lookups == 201
+
+    def test_unsubscribed_rooms_are_forgotten(self):
+        api = FakeApi(3)
+        mux = QuoteMultiplexer(api)
+        mux.poll(["S0", "S1"])
+        mux.poll(["S1"])
+        assert list(mux.poll(["S0", "S1"])) == ["S0"]
+
+    def test_new_subscriber_gets_a_quote_without_a_duplicate_emit(self):
+        api = FakeApi(3)
+        mux = QuoteMultiplexer(api)
+        assert mux.quote("S2")["last_price"] == 102.0
+        assert mux.poll(["S2"]) == {}
+
+    def test_feed_quotes_skip_rest(self, monkeypatch):
+        board = QuoteBoard.create(f"test_board_{uuid.uuid4().hex[:12]}", capacity=8)
+        try:
+            board.write("NSE_EQ|S0", ltp=101.5, close=100.0, volume=42)
+            monkeypatch.setattr(quote_multiplexer, "get_quote_board", lambda: board)
+            api = FakeApi(2)
+            mux = QuoteMultiplexer(api)
+
+            quotes = mux.poll(["S0", "S1"])
+            assert quotes["S0"]["ltp"] == 101.5 and quotes["S0"]["net_change"] == 1.5
+            assert quotes["S1"]["last_price"] == 101.0
+            assert api.calls == 1
+
+            # Between REST refreshes only the board is read
+            board.write("NSE_EQ|S0", ltp=102.0, close=100.0, volume=43)
+            assert list(mux.poll(["S0", "S1"], fetch_missing=False)) == ["S0"]
+            assert api.calls == 1
+        finally:
+            board.close()
+
+
+@pytest.mark.slow
+def test_benchmark_cycle_for_200_rooms():
+    """Old loop: get_market_quote per room, emit every quote. New: one batch, emit on change."""
+    api = FakeApi(200)
+    symbols = list(api.prices)
+
+    start = time.perf_counter()
+    old_emits = sum(1 for symbol in symbols if api.get_market_quote(symbol))
+    old_time, old_calls = time.perf_counter() - start, api.calls
+
+    api.calls = 0
+    mux = QuoteMultiplexer(api)
+    mux.poll(symbols)  # Warm: resolve + first emit
+    for symbol in symbols[:10]:
+        api.prices[symbol] += 0.05
+    start = time.perf_counter()
+    new_emits = len(mux.poll(symbols))
+    new_time = time.perf_counter() - start
+
+    print(f"200 quote rooms per cycle: {old_calls} upstream calls / {old_emits} emits / {old_time * 1000:.0f}ms "
+          f"-> 1 call / {new_emits} emits / {new_time * 1000:.1f}ms")
+    assert new_emits == 10 and new_time * 20 < old_time
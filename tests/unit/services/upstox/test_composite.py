@@ -0,0 +1,72 @@
+"""
+Unit tests for composite (fan-out) upstream requests
+"""
+
+import sys
+import time
+from pathlib import Path
+from unittest.mock import Mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent))
+
+from backend.services.upstox.composite import UpstreamCall, fetch_composite
+
+
+class FakeSession:
+    """Answers each URL after a fixed delay; ``boom`` raises"""
+
+    def __init__(self, delays):
+        self.delays = delays
+        self.timeouts = {}
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        self.timeouts[url] = timeout
+        time.sleep(self.delays[url])
+        if url == "boom":
+            raise ConnectionError("connection reset")
+        response = Mock(status_code=200)
+        response.json.return_value = {"data": url}
+        return response
+
+
+class TestFetchComposite:
+
+    def test_latency_is_max_not_sum(self):
+        session = FakeSession({"a": 0.2, "b": 0.2, "c": 0.2})
+        calls = [UpstreamCall(name, name) for name in "abc"]
+
+        result = fetch_composite(calls, session=session)
+
+        assert result.complete
+        assert result.json("b") == {"data": "b"}
+        assert result.elapsed < 0.35, f"calls ran serially ({result.elapsed:.2f}s)"
+
+    def test_partial_results_on_error_and_slow_optional(self):
+        session = FakeSession({"fast": 0.05, "boom": 0.0, "slow": 1.0})
+        calls = [
+            UpstreamCall("fast", "fast"),
+            UpstreamCall("boom", "boom"),
+            UpstreamCall("slow", "slow", required=False),
+        ]
+
+        start = time.perf_counter()
+        result = fetch_composite(calls, session=session)
+
+        assert time.perf_counter() - start < 0.5
+        assert result.ok("fast")
+        assert not result.ok("boom") and "connection reset" in result.errors["boom"]
+        assert result.errors["slow"] == "timeout"
+        assert result.json("slow", default={}) == {}
+
+    def test_calls_never_outlive_the_composite_deadline(self):
+        session = FakeSession({"quote": 0.0, "news": 0.0})
+        calls = [
+            UpstreamCall("quote", "quote", timeout=2),
+            UpstreamCall("news", "news", timeout=30, required=False),
+        ]
+
+        result = fetch_composite(calls, session=session)
+
+        assert result.complete
+        assert session.timeouts["quote"] <= 2
+        assert session.timeouts["news"] <= 2
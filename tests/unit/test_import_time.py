@@ -0,0 +1,74 @@
+"""
+Cold-start import guards (python -X importtime)
+
+Each check imports an entry module in a fresh interpreter, asserts that no
+heavy library is pulled in eagerly, and keeps the cumulative import time
+under a generous budget.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+HEAVY_MODULES = {"pandas", "numpy", "scipy", "vectorbt", "yfinance", "openai", "nselib", "matplotlib"}
+
+# (module, budget ms) — roughly 3-5x the locally measured cold import
+IMPORT_BUDGETS = [
+    ("backend.api.servers.api_server", 1500),
+    ("backend.services.ai.service", 1000),
+    ("backend.core.analytics.backtest_engine", 500),
+    ("backend.core.analytics.portfolio", 500),
+    ("frontend.pages", 100),
+]
+
+
+def import_profile(module: str):
+    """(cumulative import time in ms, top-level package names imported)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    cumulative_us, packages = None, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue  # header row
+        name = name.strip()
+        packages.add(name.split(".")[0])
+        if name == module:
+            cumulative_us = int(cumulative)
+    return cumulative_us / 1000, packages
+
+
+@pytest.mark.parametrize("module, budget_ms", IMPORT_BUDGETS)
+def test_cold_import_is_light(module, budget_ms):
+    elapsed_ms, packages = import_profile(module)
+    print(f"{module}: {elapsed_ms:.0f}ms")
+
+    assert not packages & HEAVY_MODULES, f"{module} eagerly imports {sorted(packages & HEAVY_MODULES)}"
+    assert elapsed_ms < budget_ms
+
+
+def test_page_registry_defers_page_modules():
+    sys.path.insert(0, str(PROJECT_ROOT))
+    from frontend.pages import PAGES, FALLBACK_MODULE
+
+    pages_dir = PROJECT_ROOT / "frontend" / "pages"
+    for page_id, (module_name, func_name, _) in PAGES.items():
+        source = (pages_dir / f"{module_name}.py").read_text()
+        assert f"def {func_name}(" in source, page_id
+    assert (pages_dir / f"{FALLBACK_MODULE}.py").exists()
+
+    _, packages = import_profile("frontend.pages")
+    assert "nicegui" not in packages
@@ -0,0 +1,182 @@
+"""
+Unit tests for the batched logs-database writer, DatabaseLogHandler and ErrorHandler
+"""
+
+import logging
+import sqlite3
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from backend.utils.logging.batch_writer import LogSampler
+from backend.utils.logging.config import DatabaseLogHandler
+from backend.utils.logging.error_handler import ErrorHandler
+
+
+def _count(db_path, table):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _logger(name, handler):
+    logger = logging.getLogger(name)
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    return logger
+
+
+class TestLogSampler:
+
+    def test_burst_then_suppress_then_report(self):
+        sampler = LogSampler(burst=2, window=10)
+
+        assert [sampler.allow("k", now=0)[0] for _ in range(5)] == [True, True, False, False, False]
+        assert sampler.allow("other", now=1) == (True, 0)
+        assert sampler.allow("k", now=10) == (True, 3)
+
+
+class TestDatabaseLogHandler:
+
+    def test_records_batched_and_sampled(self, tmp_path):
+        db_path = str(tmp_path / "logs.db")
+        handler = DatabaseLogHandler(db_path, sampler=LogSampler(burst=3))
+        logger = _logger("batch_writer_test", handler)
+
+        for i in range(10):
+            logger.warning(f"tick {i}")  # same call site: sampled
+        logger.error("distinct")
+        handler.flush()
+
+        assert _count(db_path, "application_logs") == 4
+        assert handler.writer.batches <= 2
+
+
+class TestErrorHandler:
+
+    def test_cache_roundtrip_and_periodic_prune(self, tmp_path):
+        handler = ErrorHandler(db_path=str(tmp_path / "logs.db"))
+        submitted = []
+        original_submit = handler.writer.submit
+        handler.writer.submit = lambda sql, params: submitted.append(sql) or original_submit(sql, params)
+
+        for _ in range(5):
+            handler.cache_data("quotes:INFY", {"ltp": 1500})
+
+        assert handler.get_cached_data("quotes:INFY") == {"ltp": 1500}
+        assert not any("DELETE" in sql for sql in submitted)
+
+        handler._last_cache_prune -= 3600
+        handler.cache_data("quotes:INFY", {"ltp": 1501})
+        assert sum("DELETE" in sql for sql in submitted) == 1
+
+    def test_log_error_is_queued_off_thread(self, tmp_path):
+        handler = ErrorHandler(db_path=str(tmp_path / "logs.db"))
+
+        handler.log_error("ConnectionError", "reset", endpoint="get_quote", retry_count=1)
+
+        assert handler.get_error_statistics(hours=1)["total_errors"] == 1
+
+
+    def test_every_error_is_logged_and_nothing_is_created_on_construction(self, tmp_path, caplog):
+        db_path = tmp_path / "logs.db"
+        handler = ErrorHandler(db_path=str(db_path))
+        handler.sampler = LogSampler(burst=1)
+        assert not db_path.exists()
+
+        with caplog.at_level(logging.ERROR, logger="backend.utils.logging.error_handler"):
+            for _ in range(3):
+                handler.log_error("Timeout", "read timed out", endpoint="get_quote")
+
+        assert len([r for r in caplog.records if "read timed out" in r.getMessage()]) == 3
+        assert handler.get_error_statistics(hours=1)["total_errors"] == 1
+
+
+def _per_record_insert(db_path, message):
+    """The previous DatabaseLogHandler.emit: connect, INSERT, commit per record"""
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute(
+        "INSERT INTO application_logs (level, logger_name, message) VALUES (?, ?, ?)",
+        ("WARNING", "bench", message),
+    )
+    conn.commit()
+    conn.close()
+
+
+def _poller_write_latencies(market_db, n, interval=0.002):
+    samples = []
+    for i in range(n):
+        start = time.perf_counter()
+        conn = sqlite3.connect(market_db, timeout=30)
+        conn.execute("INSERT INTO quotes (symbol, ltp) VALUES (?, ?)", ("INFY", 1500 + i))
+        conn.commit()
+        conn.close()
+        samples.append((time.perf_counter() - start) * 1000)
+        time.sleep(interval)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99) - 1]
+
+
+@pytest.mark.slow
+def test_benchmark_log_throughput_and_poller_latency(tmp_path):
+    """Records/s of the logging path, and poller write latency while logs are being written"""
+    n_records = 3000
+    results = {}
+
+    for mode in ("before", "after"):
+        market_db = str(tmp_path / f"{mode}_market.db")
+        conn = sqlite3.connect(market_db)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE quotes (symbol TEXT, ltp REAL)")
+        conn.commit()
+        conn.close()
+
+        if mode == "before":
+            # Logs share market_data.db and commit per record
+            DatabaseLogHandler(market_db).flush()
+            emit = lambda i: _per_record_insert(market_db, f"tick {i}")
+            finish = lambda: None
+        else:
+            handler = DatabaseLogHandler(str(tmp_path / "logs.db"), sampler=LogSampler(burst=n_records))
+            logger = _logger(f"bench_{mode}", handler)
+            emit = lambda i: logger.warning(f"tick {i}")
+            finish = handler.flush
+
+        stop = threading.Event()
+
+        def background_logging():
+            # Same offered load in both modes (~1k records/s)
+            i = 0
+            while not stop.is_set():
+                emit(i)
+                i += 1
+                time.sleep(0.001)
+
+        start = time.perf_counter()
+        for i in range(n_records):
+            emit(i)
+        finish()
+        throughput = n_records / (time.perf_counter() - start)
+
+        noise = threading.Thread(target=background_logging, daemon=True)
+        noise.start()
+        p50, p99 = _poller_write_latencies(market_db, 200)
+        stop.set()
+        noise.join()
+        finish()
+
+        results[mode] = (throughput, p50, p99)
+
+    (b_rps, b50, b99), (a_rps, a50, a99) = results["before"], results["after"]
+    print(f"log throughput: {b_rps:.0f} -> {a_rps:.0f} records/s")
+    print(f"poller write under logging load: p50 {b50:.2f}ms -> {a50:.2f}ms, p99 {b99:.2f}ms -> {a99:.2f}ms")
+    assert a_rps > b_rps
@@ -0,0 +1,190 @@
+"""
+Unit tests for the fast JSON serialization layer
+"""
+
+import datetime as dt
+import json
+import random
+import sys
+import time
+import uuid
+from decimal import Decimal
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from backend.utils.helpers import serialization
+from backend.utils.helpers.serialization import SocketIOJSON, dumps, dumps_bytes, loads
+
+PAYLOAD = {
+    "strikes": np.array([21900.0, 22000.0]),
+    "iv": np.float32(14.5),
+    "oi": np.int64(125000),
+    "ts": dt.datetime(2026, 1, 5, 9, 15),
+    "expiry": dt.date(2026, 1, 8),
+    "bar": pd.Timestamp("2026-01-05 09:20"),
+    "missing": pd.NaT,
+    "gaps": [float("nan"), np.float64("inf"), np.array([np.nan, 1.0])],
+    "lot": Decimal("75"),
+    "order_id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "tags": {"weekly"},
+}
+EXPECTED = {
+    "strikes": [21900.0, 22000.0],
+    "iv": 14.5,
+    "oi": 125000,
+    "ts": "2026-01-05T09:15:00",
+    "expiry": "2026-01-08",
+    "bar": "2026-01-05T09:20:00",
+    "missing": None,
+    "gaps": [None, None, [None, 1.0]],
+    "lot": "75",
+    "order_id": "12345678-1234-5678-1234-567812345678",
+    "tags": ["weekly"],
+}
+
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request, monkeypatch):
+    if request.param == "json":
+        monkeypatch.setattr(serialization, "HAS_ORJSON", False)
+    elif not serialization.HAS_ORJSON:
+        pytest.skip("orjson not installed")
+    return request.param
+
+
+class TestSerialization:
+
+    def test_numpy_pandas_and_datetime_without_default_str(self, backend):
+        assert loads(dumps(PAYLOAD)) == EXPECTED
+        assert loads(dumps_bytes(PAYLOAD)) == EXPECTED
+        assert dumps({"b": 1, "a": 2}, sort_keys=True) == '{"a":2,"b":1}'
+        assert loads(memoryview(b'{"a": [1, 2]}')) == {"a": [1, 2]}
+
+    def test_unknown_types_fail_unless_a_fallback_is_given(self, backend):
+        with pytest.raises(TypeError):
+            dumps({"x": object()})
+        assert loads(dumps({"x": Path("a")}, default=repr)) == {"x": "a"}
+        assert dumps({"x": ...}, default=lambda o: "...") == '{"x":"..."}'
+
+    def test_flask_jsonify_uses_the_provider(self, backend):
+        from flask import Flask, jsonify, request
+        from backend.api.json_provider import install_json_provider
+
+        app = install_json_provider(Flask(__name__))
+
+        @app.route("/chain", methods=["POST"])
+        def chain():
+            return jsonify({**PAYLOAD, "echo": request.get_json()})
+
+        response = app.test_client().post("/chain", json={"symbol": "NIFTY"})
+        assert response.status_code == 200 and response.mimetype == "application/json"
+        assert response.get_json() == {**EXPECTED, "echo": {"symbol": "NIFTY"}}
+
+    def test_socketio_packets_encode_numpy(self, backend):
+        from socketio import packet
+
+        pkt = packet.Packet(packet.EVENT, data=["options_update", {"iv": np.float64(12.5), "ts": PAYLOAD["ts"]}])
+        pkt.json = SocketIOJSON
+        encoded = pkt.encode()
+        decoded = packet.Packet(encoded_packet=encoded)
+        decoded.json = SocketIOJSON
+        assert decoded.data == ["options_update", {"iv": 12.5, "ts": "2026-01-05T09:15:00"}]
+
+
+def _option_chain(strikes=150):
+    """Upstox /option/chain response for one expiry"""
+    rng = random.Random(7)
+
+    def side(strike, kind):
+        return {
+            "instrument_key": f"NSE_FO|{kind}{strike}",
+            "market_data": {
+                "ltp": round(rng.uniform(1, 500), 2), "volume": rng.randint(0, 10**7),
+                "oi": float(rng.randint(0, 10**7)), "close_price": round(rng.uniform(1, 500), 2),
+                "bid_price": round(rng.uniform(1, 500), 2), "bid_qty": rng.randint(0, 5000),
+                "ask_price": round(rng.uniform(1, 500), 2), "ask_qty": rng.randint(0, 5000),
+                "prev_oi": float(rng.randint(0, 10**7)),
+            },
+            "option_greeks": {
+                "vega": rng.random(), "theta": -rng.random() * 10, "gamma": rng.random() / 100,
+                "delta": rng.random(), "iv": rng.uniform(8, 40), "pop": rng.uniform(0, 100),
+            },
+        }
+
+    return {"status": "success", "data": [
+        {
+            "expiry": "2026-01-08", "pcr": rng.random() * 2, "strike_price": 20000.0 + 50 * i,
+            "underlying_key": "NSE_INDEX|Nifty 50", "underlying_spot_price": 23500.5,
+            "call_options": side(i, "CE"), "put_options": side(i, "PE"),
+        }
+        for i in range(strikes)
+    ]}
+
+
+def _quote_batch(n=450):
+    """Upstox /market-quote/quotes response for one 450-key batch"""
+    rng = random.Random(11)
+    return {"status": "success", "data": {
+        f"NSE_EQ:SYM{i}": {
+            "ohlc": {"open": 100.0, "high": 105.0, "low": 98.0, "close": 101.0},
+            "depth": {side: [{"quantity": rng.randint(1, 999), "price": rng.uniform(90, 110), "orders": 3}
+                             for _ in range(5)] for side in ("buy", "sell")},
+            "timestamp": "2026-01-05T10:15:00.000+05:30", "instrument_token": f"NSE_EQ|INE{i:06d}",
+            "symbol": f"SYM{i}", "last_price": rng.uniform(90, 110), "volume": rng.randint(0, 10**7),
+            "average_price": 100.2, "oi": 0.0, "net_change": rng.uniform(-5, 5),
+            "total_buy_quantity": 1200.0, "total_sell_quantity": 900.0,
+            "lower_circuit_limit": 80.0, "upper_circuit_limit": 120.0,
+            "last_trade_time": "1767588300000", "oi_day_high": 0.0, "oi_day_low": 0.0,
+        }
+        for i in range(n)
+    }}
+
+
+def _timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+@pytest.mark.slow
+def test_benchmark_chain_and_quote_payloads():
+    """stdlib json (parse, dumps(default=str)) vs the serialization layer on real-size payloads"""
+    if not serialization.HAS_ORJSON:
+        pytest.skip("orjson not installed")
+
+    chain, quotes = _option_chain(), _quote_batch()
+    chain_raw, quotes_raw = json.dumps(chain).encode(), json.dumps(quotes).encode()
+
+    # Processed chain as the API/Socket.IO emit it: NumPy columns, timestamps
+    processed = {
+        "symbol": "NIFTY", "timestamp": dt.datetime.now(),
+        "strikes": [
+            {"strike": np.float64(row["strike_price"]), "ce_oi": np.int64(row["call_options"]["market_data"]["oi"]),
+             "pe_oi": np.int64(row["put_options"]["market_data"]["oi"]),
+             "ce_iv": np.float64(row["call_options"]["option_greeks"]["iv"]),
+             "pe_iv": np.float64(row["put_options"]["option_greeks"]["iv"]),
+             "ce_ltp": row["call_options"]["market_data"]["ltp"], "pe_ltp": row["put_options"]["market_data"]["ltp"]}
+            for row in chain["data"]
+        ] * 4,
+    }
+
+    results = {
+        "parse chain": (_timed(lambda: json.loads(chain_raw), 50), _timed(lambda: loads(chain_raw), 50)),
+        "parse quotes": (_timed(lambda: json.loads(quotes_raw), 20), _timed(lambda: loads(quotes_raw), 20)),
+        "emit chain": (_timed(lambda: json.dumps(processed, default=str), 50),
+                       _timed(lambda: dumps(processed), 50)),
+    }
+    print(f"\n{'payload':14} {'size':>8} {'stdlib':>9} {'layer':>9}")
+    sizes = {"parse chain": len(chain_raw), "parse quotes": len(quotes_raw), "emit chain": len(dumps_bytes(processed))}
+    for name, (old, new) in results.items():
+        print(f"{name:14} {sizes[name] / 1024:7.0f}K {old:8.2f}ms {new:8.2f}ms  ({old / new:.1f}x)")
+
+    assert loads(dumps(processed))["strikes"][0]["ce_iv"] == processed["strikes"][0]["ce_iv"]
+    assert results["parse chain"][1] < results["parse chain"][0]
+    assert results["emit chain"][1] * 2 < results["emit chain"][0]
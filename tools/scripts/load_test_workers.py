@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Load test: gunicorn worker models against a fake (slow) Upstox upstream
+=======================================================================
+
+Starts a local fake Upstox REST server that answers every call after
+``--upstream-delay`` seconds, boots the API server under gunicorn with each
+requested worker class, and hammers /api/portfolio (three upstream calls
+per request) with ``--concurrency`` clients. Reports throughput, p50/p99
+latency and the RSS of the whole gunicorn process tree.
+
+With sync workers throughput is capped at ``workers / upstream_delay``
+and requests queue behind blocked processes. gthread (the default) and
+gevent should both sustain far more; run this before switching the default
+worker class in gunicorn_config.py.
+
+Usage:
+    python tools/scripts/load_test_workers.py
+    python tools/scripts/load_test_workers.py --worker-class sync gthread gevent --concurrency 200 --duration 20
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import signal
+import socket
+import argparse
+import tempfile
+import statistics
+import subprocess
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import psutil
+import requests
+from cryptography.fernet import Fernet
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class FakeUpstoxHandler(BaseHTTPRequestHandler):
+    """Minimal /v2 responses used by /api/portfolio"""
+
+    delay = 0.5
+    bodies = {
+        "/v2/user/profile": {"status": "success", "data": {"user_name": "Load Test"}},
+        "/v2/portfolio/short-term-positions": {"status": "success", "data": [{"symbol": "INFY"}]},
+        "/v2/user/get-funds-and-margin": {
+            "status": "success",
+            "data": {"equity": {"available_margin": 50000, "used_margin": 10000}},
+        },
+    }
+
+    def do_GET(self):
+        time.sleep(self.delay)
+        body = json.dumps(self.bodies.get(self.path.split("?")[0], {"data": {}})).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_fake_upstox(delay: float):
+    FakeUpstoxHandler.delay = delay
+    server = ThreadingHTTPServer(("127.0.0.1", free_port()), FakeUpstoxHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def seed_token(db_path: str):
+    """Store a non-expiring token so /api/portfolio takes the live (upstream) path"""
+    from backend.utils.auth.manager import AuthManager
+
+    AuthManager(db_path=db_path).save_token(
+        "default", {"access_token": "LOAD_TEST", "refresh_token": "LOAD_TEST", "expires_in": 86400}
+    )
+
+
+def tree_rss_mb(pid: int) -> float:
+    try:
+        root = psutil.Process(pid)
+        procs = [root] + root.children(recursive=True)
+        return sum(p.memory_info().rss for p in procs if p.is_running()) / 1024 / 1024
+    except psutil.NoSuchProcess:
+        return 0.0
+
+
+def run_load(url: str, concurrency: int, duration: float, pid: int):
+    latencies, errors = [], 0
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+    rss_samples = []
+
+    def client():
+        nonlocal errors
+        session = requests.Session()
+        while time.monotonic() < stop_at:
+            start = time.perf_counter()
+            try:
+                ok = session.get(url, timeout=30).status_code == 200
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                if ok:
+                    latencies.append(elapsed)
+                else:
+                    errors += 1
+
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    while time.monotonic() < stop_at:
+        rss_samples.append(tree_rss_mb(pid))
+        time.sleep(1)
+    for t in threads:
+        t.join(timeout=35)
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / duration,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0,
+        "rss_start_mb": rss_samples[0] if rss_samples else 0,
+        "rss_max_mb": max(rss_samples) if rss_samples else 0,
+        "rss_end_mb": rss_samples[-1] if rss_samples else 0,
+    }
+
+
+def wait_ready(url: str, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(url, timeout=2).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"API server did not become ready at {url}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test gunicorn worker classes against a fake Upstox")
+    parser.add_argument("--worker-class", nargs="+", default=["sync", "gthread", "gevent"])
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--upstream-delay", type=float, default=0.5)
+    args = parser.parse_args()
+
+    upstox = start_fake_upstox(args.upstream_delay)
+    workdir = Path(tempfile.mkdtemp(prefix="upstox_load_"))
+    db_path = str(workdir / "market_data.db")
+
+    env = dict(
+        os.environ,
+        APP_MODE="api",
+        DATABASE_PATH=db_path,
+        UPSTOX_API_BASE=f"http://127.0.0.1:{upstox.server_port}/v2",
+        ENCRYPTION_KEY=os.getenv("ENCRYPTION_KEY") or Fernet.generate_key().decode(),
+        GUNICORN_WORKERS=str(args.workers),
+        GUNICORN_LOG_LEVEL="warning",
+    )
+    os.environ["ENCRYPTION_KEY"] = env["ENCRYPTION_KEY"]
+    seed_token(db_path)
+
+    print(f"Fake Upstox: {env['UPSTOX_API_BASE']} (delay {args.upstream_delay}s), "
+          f"{args.workers} workers, {args.concurrency} clients, {args.duration:.0f}s each\n")
+
+    results = {}
+    try:
+        for worker_class in args.worker_class:
+            port = free_port()
+            proc = subprocess.Popen(
+                [sys.executable, "-m", "gunicorn", "--config", "gunicorn_config.py",
+                 "--access-logfile", "/dev/null", "wsgi:application"],
+                cwd=PROJECT_ROOT,
+                env=dict(env, GUNICORN_WORKER_CLASS=worker_class, PORT=str(port)),
+            )
+            try:
+                wait_ready(f"http://127.0.0.1:{port}/api/health")
+                results[worker_class] = run_load(
+                    f"http://127.0.0.1:{port}/api/portfolio", args.concurrency, args.duration, proc.pid
+                )
+            finally:
+                proc.send_signal(signal.SIGTERM)
+                proc.wait(timeout=40)
+    finally:
+        upstox.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{'worker':<8} {'req/s':>8} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7} {'RSS start/max/end MB':>24}")
+    for worker_class, r in results.items():
+        print(f"{worker_class:<8} {r['rps']:>8.1f} {r['p50_ms']:>9.0f} {r['p99_ms']:>9.0f} {r['errors']:>7} "
+              f"{r['rss_start_mb']:>8.0f}/{r['rss_max_mb']:.0f}/{r['rss_end_mb']:.0f}")
+
+
+if __name__ == "__main__":
+    main()
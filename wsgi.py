@@ -16,7 +16,7 @@ APP_MODE = os.getenv("APP_MODE", "api").lower()
 
 if APP_MODE == "api":
     # Import API Server
-    from scripts.api_server import app as application
+    from backend.api.servers.api_server import app as application
 
     print("🚀 Starting API Server in production mode")
 
@@ -28,7 +28,7 @@ elif APP_MODE == "nicegui":
     # NiceGUI dashboard
     print("⚠️  NiceGUI should be run directly with 'python nicegui_dashboard.py'")
     print("   Falling back to API server...")
-    from scripts.api_server import app as application
+    from backend.api.servers.api_server import app as application
 
 else:
     raise ValueError(